@@ -9,7 +9,22 @@ Uses FFmpeg to:
 5. Enforce 9:16 aspect ratio and max duration
 
 Output: final MP4 ready for upload.
+
+Two assembly modes (per job via `assembly_mode`, default from ASSEMBLY_MODE):
+  - multipass   (default): normalize each clip, pad audio, one encode per
+                transition, concat, then a music-mix pass.
+  - filtergraph: compile the whole timeline (scale/pad, silent-audio fill,
+                xfade/acrossfade chain, music amix + fade, duration cap) into
+                one ffmpeg filter_complex and encode once. Falls back to
+                multipass if the single-pass encode fails.
+Benchmark the two with scripts/benchmark_assembly.py.
+
+Captions can be burned during assembly (`subtitle_path`): transcribe the
+render_timeline_audio() mix, build the ASS track, and pass it in — the
+filtergraph mode then produces a captioned video with a single encode.
+Compare against post-assembly captioning with scripts/benchmark_captions.py.
 """
+import os
 import subprocess
 import shutil
 import uuid
@@ -66,11 +81,70 @@ def trim_video(input_path, output_path, duration, mode="start"):
     return str(output_path)
 
 
-def normalize_video(input_path, output_path, target_width=1080, target_height=1920):
+# Encoder settings for normalized clips. Part of the normalized-clip cache
+# key, so changing them naturally invalidates every cached rendition.
+NORMALIZE_CODEC_ARGS = [
+    "-c:v", "libx264",
+    "-c:a", "aac",
+    "-ar", "44100",
+    "-preset", "veryfast",
+    "-r", "30",
+]
+
+_normalized_cache = None
+
+
+def normalized_clip_cache():
+    """
+    Persistent cache of normalized renditions (see media_cache.MediaCache).
+
+    Keyed by (source content hash, width, height, codec args) so an app clip
+    reused across a bulk campaign is only re-encoded once per geometry.
+
+    Config:
+      NORMALIZED_CACHE_DIR           (default <tmp>/ugc_normalized_cache)
+      NORMALIZED_CACHE_MAX_MB        (default 4096)
+      NORMALIZED_CACHE_MAX_AGE_DAYS  (default 14; unused renditions are evicted)
+    """
+    global _normalized_cache
+    if _normalized_cache is None:
+        import tempfile
+        from media_cache import MediaCache
+        _normalized_cache = MediaCache(
+            root=os.getenv("NORMALIZED_CACHE_DIR") or Path(tempfile.gettempdir()) / "ugc_normalized_cache",
+            max_bytes=int(float(os.getenv("NORMALIZED_CACHE_MAX_MB", "4096")) * 1024 * 1024),
+            url_ttl=0,
+            max_age=float(os.getenv("NORMALIZED_CACHE_MAX_AGE_DAYS", "14")) * 86400,
+            label="normalized-clip",
+        )
+    return _normalized_cache
+
+
+def _normalized_cache_key(input_path, target_width, target_height):
+    from media_cache import file_sha256
+    return f"normalized:{file_sha256(input_path)}:{target_width}x{target_height}:{' '.join(NORMALIZE_CODEC_ARGS)}"
+
+
+def normalize_video(input_path, output_path, target_width=1080, target_height=1920, cache=False):
     """
     Normalize a video to 9:16 aspect ratio with consistent encoding.
     Handles videos that may have different resolutions or codecs.
+
+    With `cache=True` the rendition is looked up in / stored to the
+    normalized-clip cache. Use it for reused sources (app clips), not for
+    one-off provider renders that would only churn the cache.
     """
+    key = None
+    if cache:
+        try:
+            key = _normalized_cache_key(input_path, target_width, target_height)
+            if normalized_clip_cache().get(key, output_path) is not None:
+                print(f"      [CACHE] Reused normalized rendition of {Path(input_path).name}")
+                return str(output_path)
+        except OSError as e:
+            print(f"      !! Normalized-clip cache unavailable: {e}")
+            key = None
+
     cmd = [
         "ffmpeg", "-y",
         "-i", str(input_path),
@@ -79,17 +153,33 @@ def normalize_video(input_path, output_path, target_width=1080, target_height=19
             f"force_original_aspect_ratio=decrease,"
             f"pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2:black"
         ),
-        "-c:v", "libx264",
-        "-c:a", "aac",
-        "-ar", "44100",
-        "-preset", "veryfast",
-        "-r", "30",
+        *NORMALIZE_CODEC_ARGS,
         str(output_path),
     ]
     subprocess.run(cmd, capture_output=True, check=True)
+    if key:
+        normalized_clip_cache().put(key, output_path)
     return str(output_path)
 
 
+def prewarm_normalized_clip(video_url, target_width=1080, target_height=1920):
+    """
+    Download an app clip and store its normalized rendition ahead of the
+    first job that uses it. Runs on the job worker (Celery task or local job
+    queue) when a clip is created.
+    """
+    import tempfile
+    from media_cache import media_cache
+    work_dir = Path(tempfile.mkdtemp(prefix="prewarm_"))
+    try:
+        src = work_dir / "source.mp4"
+        media_cache.fetch(video_url, src)
+        normalize_video(src, work_dir / "normalized.mp4", target_width, target_height, cache=True)
+        print(f"      [CACHE] Pre-warmed normalized rendition for {str(video_url)[:80]}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
 # ---------------------------------------------------------------------------
 # Scene Transition Generator
 # ---------------------------------------------------------------------------
@@ -292,11 +382,249 @@ def apply_transitions_between_veo_scenes(video_paths, scene_types, work_dir):
     return result_paths
 
 
-def assemble_video(video_paths, output_path, music_path=None, max_duration=None, scene_types=None, brand_names=None):
+# ---------------------------------------------------------------------------
+# Single-pass filtergraph assembly
+# ---------------------------------------------------------------------------
+
+AI_SCENE_TYPES = {"veo", "physical_product_scene", "digital_ugc"}
+ASSEMBLY_MODES = ("multipass", "filtergraph")
+
+
+def _crossfade_joins(durations, scene_types=None):
+    """For each clip after the first, whether it crossfades into the run
+    before it (an AI scene followed by an AI scene or app clip) or hard-cuts."""
+    td = TRANSITION_DURATION
+    eligible = AI_SCENE_TYPES | {"clip"}
+    joins = []
+    cur_dur = durations[0]
+    head_type = scene_types[0] if scene_types else None
+    for i in range(1, len(durations)):
+        next_type = scene_types[i] if scene_types and i < len(scene_types) else None
+        if head_type in AI_SCENE_TYPES and next_type in eligible and cur_dur > td:
+            joins.append(True)
+            cur_dur += durations[i] - td
+        else:
+            joins.append(False)
+            cur_dur = durations[i]
+            head_type = next_type
+    return joins
+
+
+def timeline_offsets(durations, scene_types=None):
+    """Start time (s) of each clip on the filtergraph timeline."""
+    if not durations:
+        return []
+    offsets = [0.0]
+    end = durations[0]
+    for i, joined in enumerate(_crossfade_joins(durations, scene_types), start=1):
+        start = end - TRANSITION_DURATION if joined else end
+        offsets.append(start)
+        end = start + durations[i]
+    return offsets
+
+
+def build_timeline_filtergraph(durations, audio_flags, scene_types=None, music_input=None,
+                               target_width=1080, target_height=1920, fps=30, audio_only=False):
+    """
+    Compile the assembly timeline into one ffmpeg filter_complex.
+
+    Mirrors the multipass path step by step so both modes produce the same
+    timeline: every clip is scaled/padded to the target geometry at 30fps,
+    clips without audio get silence of their own length, an AI scene
+    followed by an AI scene or app clip gets a TRANSITION_DURATION
+    xfade/acrossfade (chained, so a merged run can transition again), other
+    boundaries are hard cuts, and the music bed is trimmed, faded and mixed
+    at 25% exactly like the music-mix pass.
+
+    Args:
+        durations:    Probed duration (s) of each input clip, in order.
+        audio_flags:  Whether each input clip has an audio stream.
+        scene_types:  Scene type per clip; None disables transitions.
+        music_input:  ffmpeg input index of the music track, or None.
+        audio_only:   Build only the audio chain (same timing, no video
+                      filters); video_label is None.
+
+    Returns:
+        (filter_complex, video_label, audio_label, total_duration)
+    """
+    td = TRANSITION_DURATION
+    parts = []
+
+    for i, (dur, has_audio) in enumerate(zip(durations, audio_flags)):
+        if not audio_only:
+            parts.append(
+                f"[{i}:v]scale={target_width}:{target_height}:force_original_aspect_ratio=decrease,"
+                f"pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2:black,"
+                f"setsar=1,fps={fps},format=yuv420p,settb=AVTB,setpts=PTS-STARTPTS[v{i}]"
+            )
+        if has_audio:
+            parts.append(
+                f"[{i}:a]aresample=44100,aformat=sample_fmts=fltp:channel_layouts=stereo,"
+                f"apad,atrim=0:{dur:.3f},asetpts=PTS-STARTPTS[a{i}]"
+            )
+        else:
+            parts.append(
+                f"anullsrc=channel_layout=stereo:sample_rate=44100,"
+                f"atrim=0:{dur:.3f},aformat=sample_fmts=fltp[a{i}]"
+            )
+
+    # Fold clips into runs joined by xfade; runs are joined by hard cuts.
+    runs = []  # [(video_label, audio_label, duration)]
+    cur_v, cur_a, cur_dur = "v0", "a0", durations[0]
+    for i, joined in enumerate(_crossfade_joins(durations, scene_types), start=1):
+        if joined:
+            out_v, out_a = f"x{i}v", f"x{i}a"
+            if not audio_only:
+                parts.append(
+                    f"[{cur_v}][v{i}]xfade=transition=fade:duration={td}:offset={cur_dur - td:.3f}[{out_v}]"
+                )
+            parts.append(f"[{cur_a}][a{i}]acrossfade=d={td}[{out_a}]")
+            cur_v, cur_a, cur_dur = out_v, out_a, cur_dur + durations[i] - td
+        else:
+            runs.append((cur_v, cur_a, cur_dur))
+            cur_v, cur_a, cur_dur = f"v{i}", f"a{i}", durations[i]
+    runs.append((cur_v, cur_a, cur_dur))
+
+    total = sum(r[2] for r in runs)
+    if audio_only:
+        if len(runs) > 1:
+            inputs = "".join(f"[{a}]" for _, a, _ in runs)
+            parts.append(f"{inputs}concat=n={len(runs)}:v=0:a=1[acat]")
+            video_label, audio_label = None, "acat"
+        else:
+            video_label, audio_label = None, runs[0][1]
+    elif len(runs) > 1:
+        inputs = "".join(f"[{v}][{a}]" for v, a, _ in runs)
+        parts.append(f"{inputs}concat=n={len(runs)}:v=1:a=1[vcat][acat]")
+        video_label, audio_label = "vcat", "acat"
+    else:
+        video_label, audio_label = runs[0][0], runs[0][1]
+
+    if music_input is not None:
+        fade_start = max(0, total - 2)
+        parts.append(
+            f"[{music_input}:a]atrim=0:{total:.3f},"
+            f"afade=t=out:st={fade_start:.3f}:d=2,volume=0.25[bg]"
+        )
+        parts.append(f"[{audio_label}][bg]amix=inputs=2:duration=longest:dropout_transition=2[amix]")
+        audio_label = "amix"
+
+    return ";".join(parts), video_label, audio_label, total
+
+
+def ass_filter(subtitle_path):
+    """ffmpeg `ass=` filter for `subtitle_path`, escaped for use in a filtergraph."""
+    safe = str(Path(subtitle_path).resolve()).replace("\\", "/").replace(":", "\\:")
+    return f"ass=\\'{safe}\\'"
+
+
+def assemble_video_single_pass(paths, output_path, music_path=None, max_duration=None,
+                               scene_types=None, crf=20, subtitle_path=None):
+    """
+    Assemble `paths` into `output_path` with one ffmpeg invocation / one encode.
+
+    With `subtitle_path` (an ASS file timed against this timeline) the
+    captions are burned into the same encode.
+
+    Raises subprocess.CalledProcessError if ffmpeg fails, so callers can fall
+    back to the multipass path.
+    """
+    durations = [get_video_duration(p) for p in paths]
+    audio_flags = [_has_audio_stream(p) for p in paths]
+
+    cmd = ["ffmpeg", "-y"]
+    for p in paths:
+        cmd += ["-i", str(p)]
+    music_input = None
+    if music_path and Path(music_path).exists():
+        music_input = len(paths)
+        cmd += ["-i", str(music_path)]
+
+    graph, v_label, a_label, total = build_timeline_filtergraph(
+        durations, audio_flags, scene_types=scene_types, music_input=music_input,
+    )
+    if subtitle_path:
+        graph += f";[{v_label}]{ass_filter(subtitle_path)}[vsub]"
+        v_label = "vsub"
+    cmd += [
+        "-filter_complex", graph,
+        "-map", f"[{v_label}]",
+        "-map", f"[{a_label}]",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", str(crf),
+        "-c:a", "aac", "-b:a", "192k", "-ar", "44100",
+    ]
+    limit = max_duration or config.VIDEO_MAX_DURATION
+    if total > limit:
+        cmd += ["-t", str(limit)]
+    cmd += ["-movflags", "+faststart", str(output_path)]
+
+    print(f"   [GRAPH] Single-pass assembly: {len(paths)} clip(s), {total:.1f}s timeline"
+          f"{', music' if music_input is not None else ''}"
+          f"{', captions' if subtitle_path else ''}")
+    subprocess.run(cmd, capture_output=True, check=True)
+    return str(output_path)
+
+
+def render_timeline_audio(video_paths, output_path, music_path=None, max_duration=None,
+                          scene_types=None):
+    """
+    Render only the audio of the assembly timeline (no video decode/encode).
+
+    Uses the same clip durations, silence fill and acrossfade points as the
+    filtergraph, so word timestamps transcribed from this mix line up with
+    the assembled video — captions can then be burned during assembly
+    instead of re-encoding the finished file. Leave `music_path` unset for
+    transcription; the bed only hurts Whisper.
+
+    Raises subprocess.CalledProcessError if ffmpeg fails.
+    """
+    paths = [s["path"] if isinstance(s, dict) else s for s in video_paths]
+    durations = [get_video_duration(p) for p in paths]
+    audio_flags = [_has_audio_stream(p) for p in paths]
+
+    cmd = ["ffmpeg", "-y"]
+    for p in paths:
+        cmd += ["-i", str(p)]
+    music_input = None
+    if music_path and Path(music_path).exists():
+        music_input = len(paths)
+        cmd += ["-i", str(music_path)]
+
+    graph, _, a_label, total = build_timeline_filtergraph(
+        durations, audio_flags,
+        scene_types=list(scene_types) if scene_types else None,
+        music_input=music_input, audio_only=True,
+    )
+    cmd += [
+        "-filter_complex", graph,
+        "-map", f"[{a_label}]",
+        "-vn", "-c:a", "aac", "-b:a", "128k", "-ar", "44100",
+    ]
+    limit = max_duration or config.VIDEO_MAX_DURATION
+    if total > limit:
+        cmd += ["-t", str(limit)]
+    cmd.append(str(output_path))
+
+    print(f"   [GRAPH] Timeline audio mix: {len(paths)} clip(s), {min(total, limit):.1f}s")
+    subprocess.run(cmd, capture_output=True, check=True)
+    return str(output_path)
+
+
+def _resolve_assembly_mode(assembly_mode=None):
+    mode = (assembly_mode or os.getenv("ASSEMBLY_MODE") or "multipass").strip().lower()
+    return mode if mode in ASSEMBLY_MODES else "multipass"
+
+
+def assemble_video(video_paths, output_path, music_path=None, max_duration=None, scene_types=None, brand_names=None, assembly_mode=None, subtitle_path=None):
     """Assembles the final UGC video with word-perfect, transcription-based subtitles.
     
     Args:
         brand_names: Optional list of brand/product names to ensure correct spelling in subtitles.
+        assembly_mode: "multipass" or "filtergraph" (see module docstring).
+                       Defaults to the ASSEMBLY_MODE env var, then multipass.
+        subtitle_path: Optional ASS file (timed against render_timeline_audio)
+                       to burn in during assembly. filtergraph burns it in its
+                       single encode; multipass burns it in the final step.
     """
     if output_path is None:
         output_path = config.OUTPUT_DIR / "final_ugc.mp4"
@@ -309,6 +637,25 @@ def assemble_video(video_paths, output_path, music_path=None, max_duration=None,
 
     print("\n[BUILD] Assembling final video...")
 
+    if _resolve_assembly_mode(assembly_mode) == "filtergraph":
+        paths = [s["path"] if isinstance(s, dict) else s for s in video_paths]
+        try:
+            assemble_video_single_pass(
+                paths, output_path, music_path=music_path,
+                max_duration=max_duration,
+                scene_types=list(scene_types) if scene_types else None,
+                subtitle_path=subtitle_path,
+            )
+            final_dur = get_video_duration(output_path)
+            size_mb = output_path.stat().st_size / (1024 * 1024)
+            print(f"\n[OK] Final video: {output_path}")
+            print(f"   Duration: {final_dur:.1f}s | Size: {size_mb:.1f} MB")
+            shutil.rmtree(work_dir, ignore_errors=True)
+            return str(output_path)
+        except subprocess.CalledProcessError as e:
+            stderr = (e.stderr or b"")[-500:].decode("utf-8", errors="ignore")
+            print(f"   !! Single-pass assembly failed, falling back to multipass: {stderr}")
+
     # Step 1: Normalize all clips to same resolution/codec (No Trimming)
     print("   [NORM] Normalizing to 9:16...")
     normalized_paths = []
@@ -336,9 +683,10 @@ def assemble_video(video_paths, output_path, music_path=None, max_duration=None,
             print(f"      Scene {i+1} ({scene_type}): Using full duration {actual_dur:.1f}s (no trim)")
             continue
 
-        # Normal normalization for digital app / cinematic videos
+        # Normal normalization for digital app / cinematic videos.
+        # App clips are reused across jobs, so their renditions are cached.
         normalized = work_dir / f"normalized_{i}.mp4"
-        normalize_video(path, normalized)
+        normalize_video(path, normalized, cache=scene_type == "clip")
         normalized_paths.append(str(normalized))
         scene_metadata.append({"index": i, "type": scene_type, "path": str(normalized)})
         
@@ -489,7 +837,23 @@ def assemble_video(video_paths, output_path, music_path=None, max_duration=None,
     final_dur = get_video_duration(current_input)
 
     limit = max_duration or config.VIDEO_MAX_DURATION
-    if final_dur > limit:
+    if subtitle_path:
+        # The only video re-encode of the multipass path when captioning:
+        # burn captions and enforce the duration cap together. Failures
+        # propagate so the caller can fall back to uncaptioned assembly.
+        print("      Burning captions...")
+        cmd = [
+            "ffmpeg", "-y",
+            "-i", current_input,
+            "-vf", ass_filter(subtitle_path),
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
+            "-c:a", "copy",
+        ]
+        if final_dur > limit:
+            cmd += ["-t", str(limit)]
+        cmd += ["-movflags", "+faststart", str(output_path)]
+        subprocess.run(cmd, capture_output=True, check=True)
+    elif final_dur > limit:
         cmd = [
             "ffmpeg", "-y",
             "-i", current_input,
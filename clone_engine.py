@@ -15,7 +15,7 @@ Pipeline:
 
 This module imports ONLY:
   - config (for API keys and model IDs)
-  - elevenlabs_client (shared utility — never modified)
+  - tts_service (parallel, cached ElevenLabs synthesis via elevenlabs_client)
   - storage_helper (shared utility — never modified)
   - subtitle_engine (shared utility — never modified)
   - Standard library: os, time, json, shutil, subprocess, requests, pathlib, logging
@@ -33,9 +33,11 @@ from PIL import Image
 from pathlib import Path
 
 import config
-import elevenlabs_client
 import storage_helper
+import media_derivatives
+import tts_service
 import subtitle_engine
+from media_cache import media_cache
 
 # ── Logging setup — force flush so background-thread output is always visible ─
 logger = logging.getLogger("clone_engine")
@@ -112,6 +114,7 @@ def generate_clone_video(
     gender: str = "male",
     video_language: str = "en",
     progress_callback=None,
+    make_derivatives: bool = False,
 ) -> str:
     """
     Generate an AI Clone video.
@@ -140,6 +143,10 @@ def generate_clone_video(
         If set, caps TTS audio to this length (for B-roll stitching).
     skip_subtitles : bool
         If True, skip subtitle burning (caller handles subtitles after B-roll assembly).
+    make_derivatives : bool
+        If True, render poster / sprite / preview (media_derivatives) for the
+        uploaded video and record them on the clone_video_jobs row. Leave off
+        when the caller re-uploads a processed final video.
 
     Returns
     -------
@@ -164,48 +171,46 @@ def generate_clone_video(
             # Fallback if empty script
             raw_parts = ["I love this product."]
             
+        part_texts = [p.replace("  ", " ").strip() for p in raw_parts]
+
+        # Parts are synthesized in parallel (and served from the phrase cache
+        # when this voice has said them before) but consumed in script order.
         audio_chunks = []
         cumulative_duration = 0.0
-        for i, part_text in enumerate(raw_parts):
-            safe_text = part_text.replace("  ", " ").strip()
-            if not safe_text:
-                continue
-                
-            chunk_filename = f"clone_{job_id}_chunk_{i}.mp3"
-            returned_path = elevenlabs_client.generate_voiceover(
-                text=safe_text,
-                voice_id=elevenlabs_voice_id,
-                filename=chunk_filename,
-            )
-            chunk_path = output_dir / f"voiceover_chunk_{i}.mp3"
-            shutil.copy2(returned_path, str(chunk_path))
-            
-            dur = _get_audio_duration(str(chunk_path))
-            logger.info(f"Chunk {i} audio: {chunk_path.stat().st_size / 1024:.1f} KB, {dur:.1f}s")
-            
-            # Sub-split only if a singular semantic part somehow exceeds WaveSpeed limits
-            if dur > MAX_CHUNK_SECONDS:
-                logger.warning(f"Chunk {i} exceeded {MAX_CHUNK_SECONDS}s. Force-splitting audio.")
-                sub_dir = output_dir / f"subchunk_{i}"
-                sub_dir.mkdir(exist_ok=True)
-                sub_chunks = _split_audio(str(chunk_path), sub_dir)
-                audio_chunks.extend(sub_chunks)
-                cumulative_duration += dur
-            else:
-                audio_chunks.append(chunk_path)
-                cumulative_duration += dur
-            
-            # If avatar_duration is set (B-roll/app clip follows), stop generating
-            # audio beyond the allotted avatar speaking time
-            if avatar_duration and cumulative_duration >= avatar_duration:
-                remaining = len(raw_parts) - (i + 1)
-                if remaining > 0:
-                    logger.info(
-                        f"Avatar duration cap reached ({cumulative_duration:.1f}s >= {avatar_duration:.1f}s). "
-                        f"Skipping remaining {remaining} script part(s) — B-roll will fill the rest."
-                    )
-                break
-                
+        parts = tts_service.synthesize_parts(
+            part_texts, elevenlabs_voice_id, output_dir, prefix="voiceover_chunk",
+        )
+        try:
+            for part in parts:
+                i, chunk_path, dur = part.index, part.path, part.duration
+                source = "cache" if part.cached else "ElevenLabs"
+                logger.info(f"Chunk {i} audio: {chunk_path.stat().st_size / 1024:.1f} KB, {dur:.1f}s ({source})")
+
+                # Sub-split only if a singular semantic part somehow exceeds WaveSpeed limits
+                if dur > MAX_CHUNK_SECONDS:
+                    logger.warning(f"Chunk {i} exceeded {MAX_CHUNK_SECONDS}s. Force-splitting audio.")
+                    sub_dir = output_dir / f"subchunk_{i}"
+                    sub_dir.mkdir(exist_ok=True)
+                    sub_chunks = _split_audio(str(chunk_path), sub_dir)
+                    audio_chunks.extend(sub_chunks)
+                    cumulative_duration += dur
+                else:
+                    audio_chunks.append(chunk_path)
+                    cumulative_duration += dur
+
+                # If avatar_duration is set (B-roll/app clip follows), stop generating
+                # audio beyond the allotted avatar speaking time
+                if avatar_duration and cumulative_duration >= avatar_duration:
+                    remaining = len(part_texts) - (i + 1)
+                    if remaining > 0:
+                        logger.info(
+                            f"Avatar duration cap reached ({cumulative_duration:.1f}s >= {avatar_duration:.1f}s). "
+                            f"Skipping remaining {remaining} script part(s) — B-roll will fill the rest."
+                        )
+                    break
+        finally:
+            parts.close()  # cancels parts past the avatar cap that haven't started
+
         total_chunks = len(audio_chunks)
         logger.info(f"Total audio chunks for InfiniteTalk: {total_chunks} ({cumulative_duration:.1f}s total)")
 
@@ -497,6 +502,8 @@ def generate_clone_video(
             destination_path=destination,
         )
         logger.info(f"✓ Final video URL: {final_url}")
+        if make_derivatives:
+            media_derivatives.attach("clone_video_jobs", job_id, final_video_path)
         return final_url
 
     finally:
@@ -537,26 +544,32 @@ def _extract_video_url(data: dict) -> str | None:
 
 
 def _download_file(url: str, output_path: Path, max_retries: int = 5):
-    """Download a file from URL to a local path with exponential-backoff retries."""
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    for attempt in range(max_retries):
-        try:
-            resp = requests.get(url, stream=True, timeout=120)
-            resp.raise_for_status()
-            with open(output_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            return
-        except Exception as e:
-            if attempt < max_retries - 1:
-                wait = (2 ** attempt) * 5
-                logger.warning(f"Download attempt {attempt + 1} failed ({e}), retrying in {wait}s...")
-                time.sleep(wait)
-            else:
-                raise RuntimeError(
-                    f"Download failed after {max_retries} attempts: {e}"
-                )
+    """Download a file from URL to a local path with exponential-backoff retries.
+
+    Goes through the shared media cache, so clone avatars and B-roll reused
+    across jobs are only fetched once.
+    """
+    def _fetch(src_url, dest):
+        for attempt in range(max_retries):
+            try:
+                resp = requests.get(src_url, stream=True, timeout=120)
+                resp.raise_for_status()
+                with open(dest, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=8192):
+                        if chunk:
+                            f.write(chunk)
+                return
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    wait = (2 ** attempt) * 5
+                    logger.warning(f"Download attempt {attempt + 1} failed ({e}), retrying in {wait}s...")
+                    time.sleep(wait)
+                else:
+                    raise RuntimeError(
+                        f"Download failed after {max_retries} attempts: {e}"
+                    )
+
+    media_cache.fetch(url, output_path, downloader=_fetch)
 
 
 def _generate_product_composite(
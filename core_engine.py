@@ -20,9 +20,13 @@ import config
 import scene_builder
 import generate_scenes
 import subtitle_engine
+import transcription_store
+import remotion_pool
 import assemble_video
 import elevenlabs_client
 import storage_helper
+import scene_scheduler
+import provider_hedging
 import random
 
 
@@ -40,6 +44,20 @@ def _upload_scene_preview(video_path):
         return None
 
 
+CAPTION_MODES = ("assembly", "post")
+# Remotion subtitle styles the in-assembly ASS track reproduces; any other
+# style is rendered by Remotion after assembly ("post").
+ASS_CAPTION_STYLES = ("hormozi",)
+
+
+def _resolve_caption_mode(caption_mode=None) -> str:
+    """Where captions are burned: "assembly" (default) transcribes the timeline
+    audio mix and burns the ASS track in the assembly encode; "post" keeps the
+    old assemble → Whisper → Remotion/FFmpeg re-encode flow."""
+    mode = (caption_mode or os.getenv("CAPTION_MODE") or "assembly").strip().lower()
+    return mode if mode in CAPTION_MODES else "assembly"
+
+
 def _should_force_kie_digital(product, product_type: str) -> bool:
     """Kie extend only for digital UGC with an actual product (phone UI continuity)."""
     if product_type != "digital":
@@ -101,7 +119,7 @@ def should_use_extend_pipeline(scenes):
     return leading_veo_count >= 2
 
 
-def run_seedance_chain_pipeline(scenes, output_dir, model_api, status_callback=None):
+def run_seedance_chain_pipeline(scenes, output_dir, model_api, status_callback=None, sched=None):
     """
     Isolated pipeline for Seedance 2.0 multi-scene chaining.
 
@@ -111,115 +129,152 @@ def run_seedance_chain_pipeline(scenes, output_dir, model_api, status_callback=N
       - Clips break the chain (reset last_frame_url)
       - Only the first AI scene in each chain generates a Nano Banana composite
 
+    Each AI scene is a scheduler node depending on the previous AI scene of
+    its chain (it needs that scene's last frame); clips, cinematic shots and
+    separate chains render alongside.
+
     This function is completely separate from the Veo Extend pipeline.
     """
+    if sched is None:
+        if status_callback:
+            status_callback = scene_scheduler.serialized(status_callback)
+        with scene_scheduler.SceneScheduler() as own_sched:
+            return run_seedance_chain_pipeline(scenes, output_dir, model_api, status_callback, own_sched)
+
     print(f"      [SEEDANCE] Starting Seedance chain pipeline for {len(scenes)} scenes")
-    video_paths = []
-    last_frame_url = None
-    nano_banana_generated = False  # Only generate NB for the first AI scene in a chain
 
-    for i, scene in enumerate(scenes, 1):
+    def _new_chain():
+        # nano_banana_generated: only the first AI scene in a chain generates NB
+        return {"last_frame_url": None, "nano_banana_generated": False}
+
+    def _render_ai_scene(i, scene, chain):
         if status_callback:
             status_callback(f"Gen: {scene['name'].title()} ({i}/{len(scenes)})")
 
         output_path = output_dir / f"scene_{i}_{scene['name']}.mp4"
-
-        if scene["type"] in ("veo", "physical_product_scene"):
-            # Get this scene's Seedance-specific duration (default 12 for safety)
-            scene_duration = scene.get("seedance_duration", 12)
-
-            # Determine if we need the last frame for chaining to the next AI scene
-            # Look ahead past any clip scenes to find the next AI scene
-            needs_last_frame = False
-            for j in range(i, len(scenes)):  # i is 1-indexed, scenes[i] = next scene
-                next_scene = scenes[j]
-                if next_scene["type"] in ("veo", "physical_product_scene"):
-                    needs_last_frame = True
-                    break
-                elif next_scene["type"] == "clip":
-                    # Clips break visual continuity — no chaining across clips
-                    break
-
-            if scene["type"] == "physical_product_scene" and not nano_banana_generated:
-                # Nano Banana composite for the first AI scene only
-                if status_callback:
-                    status_callback(f"Gen: Composite Image ({i}/{len(scenes)})")
-                composite_url = generate_scenes.generate_composite_image_with_retry(
-                    scene=scene, influencer=None, product=None, seed=scene.get("seed")
-                )
-                ref_image = composite_url
-                nano_banana_generated = True
-                # Preview: show the composite image immediately
-                if status_callback:
-                    status_callback(f"Gen: Animating Scene ({i}/{len(scenes)})", preview_url=composite_url, preview_type="image")
-            elif last_frame_url:
-                # Chained scene: use last frame as ref, no need for NB or influencer ref
-                ref_image = None  # first_frame_url handles visual continuity
-            else:
-                ref_image = scene.get("reference_image_url")
-
-            # Generate with Seedance 2.0 (chaining via first_frame_url / return_last_frame)
-            print(f"      [SEEDANCE] Scene {i}: duration={scene_duration}s, "
-                  f"has_video_input={bool(last_frame_url)}, return_last_frame={needs_last_frame}")
-
-            result = generate_scenes.generate_video_with_retry(
-                prompt=scene.get("video_animation_prompt") or scene.get("prompt", ""),
-                reference_image_url=ref_image,
-                model_api=model_api,
-                first_frame_url=last_frame_url,
-                return_last_frame=needs_last_frame,
-                duration=scene_duration,
+        last_frame_url = chain["last_frame_url"]
+
+        # Get this scene's Seedance-specific duration (default 12 for safety)
+        scene_duration = scene.get("seedance_duration", 12)
+
+        # Determine if we need the last frame for chaining to the next AI scene
+        # Look ahead past any clip scenes to find the next AI scene
+        needs_last_frame = False
+        for j in range(i, len(scenes)):  # i is 1-indexed, scenes[i] = next scene
+            next_scene = scenes[j]
+            if next_scene["type"] in ("veo", "physical_product_scene"):
+                needs_last_frame = True
+                break
+            elif next_scene["type"] == "clip":
+                # Clips break visual continuity — no chaining across clips
+                break
+
+        if scene["type"] == "physical_product_scene" and not chain["nano_banana_generated"]:
+            # Nano Banana composite for the first AI scene only
+            if status_callback:
+                status_callback(f"Gen: Composite Image ({i}/{len(scenes)})")
+            composite_url = generate_scenes.generate_composite_image_with_retry(
+                scene=scene, influencer=None, product=None, seed=scene.get("seed")
             )
+            ref_image = composite_url
+            chain["nano_banana_generated"] = True
+            # Preview: show the composite image immediately
+            if status_callback:
+                status_callback(f"Gen: Animating Scene ({i}/{len(scenes)})", preview_url=composite_url, preview_type="image")
+        elif last_frame_url:
+            # Chained scene: use last frame as ref, no need for NB or influencer ref
+            ref_image = None  # first_frame_url handles visual continuity
+        else:
+            ref_image = scene.get("reference_image_url")
+
+        # Generate with Seedance 2.0 (chaining via first_frame_url / return_last_frame)
+        print(f"      [SEEDANCE] Scene {i}: duration={scene_duration}s, "
+              f"has_video_input={bool(last_frame_url)}, return_last_frame={needs_last_frame}")
+
+        result = generate_scenes.generate_video_with_retry(
+            prompt=scene.get("video_animation_prompt") or scene.get("prompt", ""),
+            reference_image_url=ref_image,
+            model_api=model_api,
+            first_frame_url=last_frame_url,
+            return_last_frame=needs_last_frame,
+            duration=scene_duration,
+        )
 
-            generate_scenes.download_video(result["videoUrl"], output_path)
+        generate_scenes.download_video(result["videoUrl"], output_path)
 
-            # Preview: upload completed scene video
-            if status_callback:
-                preview = _upload_scene_preview(output_path)
-                if preview:
-                    status_callback(f"Gen: {scene['name'].title()} ({i}/{len(scenes)}) ✓", preview_url=preview, preview_type="video")
+        # Preview: upload completed scene video
+        if status_callback:
+            preview = _upload_scene_preview(output_path)
+            if preview:
+                status_callback(f"Gen: {scene['name'].title()} ({i}/{len(scenes)}) ✓", preview_url=preview, preview_type="video")
 
-            # Store the last frame for the next iteration
-            last_frame_url = result.get("lastFrameUrl")
-            if not last_frame_url and needs_last_frame:
-                try:
-                    import uuid
-                    from ugc_backend.vision_analysis import extract_last_frame
-                    from ugc_db.db_manager import get_supabase
-                    
-                    frame_name = f"frame_{uuid.uuid4().hex[:8]}.jpg"
-                    frame_path = output_dir / frame_name
-                    extract_last_frame(str(output_path), str(frame_path))
-                    
-                    sb = get_supabase()
-                    with open(frame_path, "rb") as f:
-                        sb.storage.from_("video-previews").upload(
-                            frame_name, f.read(), file_options={"content-type": "image/jpeg"}
-                        )
-                    last_frame_url = sb.storage.from_("video-previews").get_public_url(frame_name)
-                    print(f"      [SEEDANCE] Fallback: Extracted last frame locally for chaining")
-                except Exception as e:
-                    print(f"      [SEEDANCE] Local frame extraction failed: {e}")
+        # Store the last frame for the next scene in the chain
+        last_frame_url = result.get("lastFrameUrl")
+        if not last_frame_url and needs_last_frame:
+            try:
+                import uuid
+                from ugc_backend.vision_analysis import extract_last_frame
+                from ugc_db.db_manager import get_supabase
+                
+                frame_name = f"frame_{uuid.uuid4().hex[:8]}.jpg"
+                frame_path = output_dir / frame_name
+                extract_last_frame(str(output_path), str(frame_path))
+                
+                sb = get_supabase()
+                with open(frame_path, "rb") as f:
+                    sb.storage.from_("video-previews").upload(
+                        frame_name, f.read(), file_options={"content-type": "image/jpeg"}
+                    )
+                last_frame_url = sb.storage.from_("video-previews").get_public_url(frame_name)
+                print(f"      [SEEDANCE] Fallback: Extracted last frame locally for chaining")
+            except Exception as e:
+                print(f"      [SEEDANCE] Local frame extraction failed: {e}")
+        chain["last_frame_url"] = last_frame_url
 
-            print(f"      [SEEDANCE] Scene {i} complete. Last frame URL: "
-                  f"{'set' if last_frame_url else 'None'}")
+        print(f"      [SEEDANCE] Scene {i} complete. Last frame URL: "
+              f"{'set' if last_frame_url else 'None'}")
 
-        elif scene["type"] == "clip":
-            generate_scenes.download_video(scene["video_url"], output_path)
-            # Clips break the visual chain — reset last_frame_url
-            last_frame_url = None
-            nano_banana_generated = False  # Next AI chain may need its own NB
+        scene["path"] = str(output_path)
+        return scene
 
-        elif scene["type"] == "cinematic_shot":
+    def _download_scene(i, scene):
+        if status_callback:
+            status_callback(f"Gen: {scene['name'].title()} ({i}/{len(scenes)})")
+        output_path = output_dir / f"scene_{i}_{scene['name']}.mp4"
+        if scene["type"] in ("clip", "cinematic_shot"):
             generate_scenes.download_video(scene["video_url"], output_path)
-
         scene["path"] = str(output_path)
-        video_paths.append(scene)
+        return scene
 
+    keys = []
+    chain = _new_chain()
+    prev_ai_key = None
+    for i, scene in enumerate(scenes, 1):
+        if scene["type"] in ("veo", "physical_product_scene"):
+            prev_ai_key = sched.add(
+                f"seedance_{i}",
+                lambda i=i, scene=scene, chain=chain: _render_ai_scene(i, scene, chain),
+                deps=[prev_ai_key] if prev_ai_key else (),
+                resource="video",
+            )
+            keys.append(prev_ai_key)
+        else:
+            keys.append(sched.add(
+                f"seedance_{i}",
+                lambda i=i, scene=scene: _download_scene(i, scene),
+                resource="download",
+            ))
+            if scene["type"] == "clip":
+                # Clips break the visual chain — the next AI scene starts a new one
+                chain = _new_chain()
+                prev_ai_key = None
+
+    video_paths = sched.results(keys)
     print(f"      [SEEDANCE] Chain pipeline complete: {len(video_paths)} segments ready")
     return video_paths
 
 
+@provider_hedging.job_budget()
 def run_generation_pipeline(
     project_name: str,
     influencer: dict,
@@ -234,8 +289,41 @@ def run_generation_pipeline(
     The main industrial generation flow.
     Takes discrete data objects instead of Airtable record IDs.
     """
+    # Scene DAG scheduler: independent work (music, clip downloads, independent
+    # scenes) runs concurrently; extend / last-frame chains are ordered by
+    # dependency edges. The context manager shuts its pool down on every exit
+    # path and skips queued renders when the pipeline fails. Nodes report
+    # progress from pool threads, so the callback is serialized.
+    if status_callback:
+        status_callback = scene_scheduler.serialized(status_callback)
+    with scene_scheduler.SceneScheduler() as sched:
+        return _run_generation_pipeline(
+            sched, project_name, influencer, app_clip, fields,
+            status_callback=status_callback,
+            skip_music=skip_music,
+            product=product,
+            product_type=product_type,
+        )
+
+
+def _run_generation_pipeline(
+    sched: scene_scheduler.SceneScheduler,
+    project_name: str,
+    influencer: dict,
+    app_clip: dict,
+    fields: dict,
+    status_callback=None,
+    skip_music: bool = False,
+    product: dict = None,
+    product_type: str = "digital"
+):
     # Editor integration: ensure transcription is always defined
     transcription = None
+    # Whisper language hint for every pass below — also the transcription
+    # store's key, so the passes can reuse each other's results.
+    whisper_language = fields.get("video_language", "en")
+    if whisper_language not in ("en", "es"):
+        whisper_language = None
 
     # 0. Product Analysis (Just-in-Time)
     if product and not product.get("visual_description") and not product.get("visual_analysis"):
@@ -305,12 +393,35 @@ def run_generation_pipeline(
     output_dir = config.TEMP_DIR / project_name
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # Background music depends on nothing but the theme — start it now so it
+    # renders while the scenes do instead of after them.
+    if not skip_music:
+        theme = fields.get("Theme", "")
+        music_prompt = (
+            f"upbeat trendy background music for a short social media video about {theme}, "
+            f"energetic positive modern pop instrumental"
+        )
+
+        def _generate_music_track():
+            try:
+                music_url = generate_scenes.generate_music(music_prompt)
+                if music_url:
+                    music_file = output_dir / "music.mp3"
+                    generate_scenes.download_video(music_url, music_file)
+                    return str(music_file)
+                print("      [MUSIC] ⚠️ Music generation returned no URL — video will have no background music")
+            except Exception as music_err:
+                print(f"      [MUSIC] ⚠️ Music generation failed: {music_err} — video will have no background music")
+            return None
+
+        sched.add("music", _generate_music_track, resource="music")
+
 
     # model_api already extracted above (line 192) for Seedance duration stamping
     # --- NEW: Route to isolated Seedance Chain Pipeline ---
     # If model is Seedance 2.0, use the dedicated chain pipeline and skip Veo logic entirely.
     if "seedance" in model_api.lower():
-        video_paths = run_seedance_chain_pipeline(scenes, output_dir, model_api, status_callback)
+        video_paths = run_seedance_chain_pipeline(scenes, output_dir, model_api, status_callback, sched=sched)
         use_extend = False  # Signal to skip Veo extend / fallback blocks below
     else:
         # --- Decide whether to use the Veo Extend pipeline (VEO ONLY) ---
@@ -326,6 +437,11 @@ def run_generation_pipeline(
     # composite here so the fallback can reuse it.
     cached_composite_url = None
 
+    # scene index -> scheduler key of a node the extend pipeline already
+    # started for it; the fallback reuses these instead of rendering the same
+    # scene (and output file) a second time.
+    remaining_keys_by_index: dict[int, str] = {}
+
     if use_extend:
         try:
             # === VEO EXTEND PIPELINE ===
@@ -346,10 +462,47 @@ def run_generation_pipeline(
 
             print(f"      [EXTEND] {len(veo_scenes)} Veo scenes to chain, {len(remaining_scenes)} remaining")
 
+            # Remaining scenes don't depend on the chain — clips and cinematic
+            # shots download while it runs, collected at Step 5.
+            def _render_remaining(idx, scene):
+                r_output_path = output_dir / f"scene_{idx}_{scene['name']}.mp4"
+                if scene["type"] == "clip":
+                    generate_scenes.download_video(scene["video_url"], r_output_path)
+                elif scene["type"] == "cinematic_shot":
+                    print(f"      [EXTEND] Downloading cinematic shot: {scene['video_url']}")
+                    generate_scenes.download_video(scene["video_url"], r_output_path)
+                else:
+                    # Unexpected type in remaining — generate normally
+                    result = generate_scenes.generate_video_with_retry(
+                        prompt=scene.get("prompt", ""),
+                        reference_image_url=scene.get("reference_image_url"),
+                        model_api=model_api,
+                        ugc=True,
+                    )
+                    generate_scenes.download_video(result["videoUrl"], r_output_path)
+                return str(r_output_path)
+
+            def _add_remaining_node(idx, scene):
+                resource = "download" if scene["type"] in ("clip", "cinematic_shot") else "video"
+                return sched.add(
+                    f"remaining_{idx}",
+                    lambda idx=idx, scene=scene: _render_remaining(idx, scene),
+                    resource=resource,
+                )
+
+            # Downloads are identical in the fallback, so they start now and
+            # the fallback can reuse them. Anything rendered is only added
+            # once the chain has succeeded (Step 5) — the fallback renders
+            # those scenes its own way (composite first, voiceover).
+            for idx, scene in enumerate(remaining_scenes, len(veo_scenes) + 1):
+                if scene["type"] in ("clip", "cinematic_shot"):
+                    remaining_keys_by_index[idx] = _add_remaining_node(idx, scene)
+
             # -- Step 1: Generate Scene 1 / composite anchor --
             scene_1 = veo_scenes[0]
             extend_chunks = []
             extended_video_path = output_dir / "extended_chain.mp4"
+            scene_1_path = output_dir / "extended_chunk_0.mp4"
             final_cumulative_path = None
             trim_segment_overlap = True
             current_task_id = None
@@ -412,62 +565,82 @@ def run_generation_pipeline(
                             )
             else:
                 # Digital Kie extend, or legacy physical WS video-extend.
+                # Each step extends the previous step's provider task, so the
+                # chain is a line of scheduler nodes: composite → scene 1 →
+                # extend 2 → ... → extend N.
                 extend_assembly_mode = "segment" if product_type == "digital" else "cumulative"
-                if status_callback:
-                    status_callback(f"Gen: {scene_1['name'].title()} (1/{len(scenes)})")
-                print(f"      [EXTEND] Generating Scene 1: {scene_1['name']}")
+                chain_keys = []
+                chain_stopped = False
 
                 if scene_1["type"] == "physical_product_scene":
+                    def _extend_composite():
+                        nonlocal cached_composite_url
+                        if status_callback:
+                            status_callback(f"Gen: Composite Image (1/{len(scenes)})")
+                        cached_composite_url = _composite_or_influencer_ref(
+                            scene_1, influencer, product, seed=global_seed,
+                        )
+                        print(f"      [EXTEND] Composite ready: {cached_composite_url}")
+                        return cached_composite_url
+
+                    chain_keys.append(sched.add("extend_composite", _extend_composite, resource="image"))
+
+                # -- Step 1: Scene 1 --
+                def _extend_scene_1():
+                    nonlocal current_task_id, current_video_url
                     if status_callback:
-                        status_callback(f"Gen: Composite Image (1/{len(scenes)})")
-                    composite_url = _composite_or_influencer_ref(
-                        scene_1, influencer, product, seed=global_seed,
-                    )
-                    cached_composite_url = composite_url
-                    print(f"      [EXTEND] Composite ready: {composite_url}")
-                    if status_callback:
-                        status_callback(
-                            f"Gen: Animating Scene (1/{len(scenes)})",
-                            preview_url=composite_url,
-                            preview_type="image",
+                        status_callback(f"Gen: {scene_1['name'].title()} (1/{len(scenes)})")
+                    print(f"      [EXTEND] Generating Scene 1: {scene_1['name']}")
+
+                    if scene_1["type"] == "physical_product_scene":
+                        composite_url = cached_composite_url
+                        if status_callback:
+                            status_callback(
+                                f"Gen: Animating Scene (1/{len(scenes)})",
+                                preview_url=composite_url,
+                                preview_type="image",
+                            )
+                        _force_kie_for_chain = _should_force_kie_digital(product, product_type)
+                        result = generate_scenes.animate_image(
+                            image_url=composite_url,
+                            scene=scene_1,
+                            force_kie=_force_kie_for_chain,
+                            ugc=True,
+                        )
+                    else:
+                        result = generate_scenes.generate_video_with_retry(
+                            prompt=scene_1["prompt"],
+                            reference_image_url=scene_1.get("reference_image_url"),
+                            model_api="veo-3.1-fast",
+                            ugc=True,
                         )
-                    _force_kie_for_chain = _should_force_kie_digital(product, product_type)
-                    result = generate_scenes.animate_image(
-                        image_url=composite_url,
-                        scene=scene_1,
-                        force_kie=_force_kie_for_chain,
-                        ugc=True,
-                    )
-                    current_task_id = result["taskId"]
-                    current_video_url = result["videoUrl"]
-                else:
-                    result = generate_scenes.generate_video_with_retry(
-                        prompt=scene_1["prompt"],
-                        reference_image_url=scene_1.get("reference_image_url"),
-                        model_api="veo-3.1-fast",
-                        ugc=True,
-                    )
                     current_task_id = result["taskId"]
                     current_video_url = result["videoUrl"]
 
-                scene_1_path = output_dir / "extended_chunk_0.mp4"
-                generate_scenes.download_video(current_video_url, scene_1_path)
-                if extend_assembly_mode == "segment":
-                    extend_chunks.append(scene_1_path)
-                print(f"      [EXTEND] Scene 1 downloaded: {scene_1_path}")
+                    generate_scenes.download_video(current_video_url, scene_1_path)
+                    if extend_assembly_mode == "segment":
+                        extend_chunks.append(scene_1_path)
+                    print(f"      [EXTEND] Scene 1 downloaded: {scene_1_path}")
 
-                if status_callback:
-                    preview = _upload_scene_preview(scene_1_path)
-                    if preview:
-                        status_callback(
-                            f"Gen: {scene_1['name'].title()} (1/{len(scenes)})",
-                            preview_url=preview,
-                            preview_type="video",
-                        )
+                    if status_callback:
+                        preview = _upload_scene_preview(scene_1_path)
+                        if preview:
+                            status_callback(
+                                f"Gen: {scene_1['name'].title()} (1/{len(scenes)})",
+                                preview_url=preview,
+                                preview_type="video",
+                            )
 
-            # -- Step 2: Extend chain (Scenes 2..N) — skipped for parallel i2v --
-            if not use_parallel_i2v:
-                for idx, ext_scene in enumerate(veo_scenes[1:], 2):
+                chain_keys.append(sched.add(
+                    "extend_1", _extend_scene_1, deps=chain_keys[-1:], resource="video",
+                ))
+
+                # -- Step 2: Extend chain (Scenes 2..N) --
+                def _extend_step(idx, ext_scene):
+                    nonlocal current_task_id, current_video_url, final_cumulative_path
+                    nonlocal extend_assembly_mode, extend_chunks, chain_stopped
+                    if chain_stopped:
+                        return
                     if status_callback:
                         status_callback(f"Extend: {ext_scene['name'].title()} ({idx}/{len(scenes)})")
                     print(f"      [EXTEND] Extending with Scene {idx}: {ext_scene['name']}")
@@ -492,7 +665,9 @@ def run_generation_pipeline(
                                 status_callback(f"Extend: scene {idx} failed — finalizing with {len(extend_chunks)} scene(s)")
                             except Exception:
                                 pass
-                        break
+                        # Later steps have nothing to extend from.
+                        chain_stopped = True
+                        return
 
                     output_mode = result.get("extend_output_mode", "segment")
                     chunk_idx_path = output_dir / f"extended_chunk_{idx-1}.mp4"
@@ -531,6 +706,16 @@ def run_generation_pipeline(
                         if preview:
                             status_callback(f"Extend: {ext_scene['name'].title()} ({idx}/{len(scenes)}) ✓", preview_url=preview, preview_type="video")
 
+                for idx, ext_scene in enumerate(veo_scenes[1:], 2):
+                    chain_keys.append(sched.add(
+                        f"extend_{idx}",
+                        lambda idx=idx, ext_scene=ext_scene: _extend_step(idx, ext_scene),
+                        deps=chain_keys[-1:],
+                        resource="video",
+                    ))
+
+                sched.results(chain_keys)
+
             # -- Step 2(b): Finalize extended chain --
             from assemble_video import get_video_duration, ensure_audio_stream
 
@@ -657,7 +842,12 @@ def run_generation_pipeline(
                 subprocess.run(cmd, check=True)
 
                 transcription_client = TranscriptionClient()
-                transcription = transcription_client.transcribe_audio(str(audio_extract_path))
+                transcription = transcription_client.transcribe_audio(
+                    str(audio_extract_path), language=whisper_language,
+                )
+                # File it under the chain video too, so assembly can compose
+                # the timeline transcript from it.
+                transcription_store.remember(extended_video_path, whisper_language, transcription)
             except Exception as e:
                 print(f"      [EXTEND] Transcription failed: {e}. Subtitles will use fallback timing.")
                 transcription = None
@@ -681,28 +871,17 @@ def run_generation_pipeline(
             video_paths.append(extended_scene)
 
             # -- Step 5: Process remaining scenes (clips, cinematic shots) --
-            for idx, scene in enumerate(remaining_scenes, len(veo_scenes) + 1):
+            remaining_keys = [
+                remaining_keys_by_index.get(idx) or _add_remaining_node(idx, scene)
+                for idx, scene in enumerate(remaining_scenes, len(veo_scenes) + 1)
+            ]
+            # Let every render settle before a failure falls back and writes
+            # the same scene files.
+            sched.wait(remaining_keys)
+            for idx, (key, scene) in enumerate(zip(remaining_keys, remaining_scenes), len(veo_scenes) + 1):
                 if status_callback:
                     status_callback(f"Gen: {scene['name'].title()} ({idx}/{len(scenes)})")
-
-                r_output_path = output_dir / f"scene_{idx}_{scene['name']}.mp4"
-
-                if scene["type"] == "clip":
-                    generate_scenes.download_video(scene["video_url"], r_output_path)
-                elif scene["type"] == "cinematic_shot":
-                    print(f"      [EXTEND] Downloading cinematic shot: {scene['video_url']}")
-                    generate_scenes.download_video(scene["video_url"], r_output_path)
-                else:
-                    # Unexpected type in remaining — generate normally
-                    result = generate_scenes.generate_video_with_retry(
-                        prompt=scene.get("prompt", ""),
-                        reference_image_url=scene.get("reference_image_url"),
-                        model_api=model_api,
-                        ugc=True,
-                    )
-                    generate_scenes.download_video(result["videoUrl"], r_output_path)
-
-                scene["path"] = str(r_output_path)
+                scene["path"] = sched.result(key)
                 video_paths.append(scene)
 
             print(f"      [EXTEND] Pipeline complete: {len(video_paths)} segments ready for assembly")
@@ -715,8 +894,12 @@ def run_generation_pipeline(
             video_paths = []
 
     if not use_extend and not video_paths:
-        # === ORIGINAL PIPELINE (scene-by-scene) ===
-        for i, scene in enumerate(scenes, 1):
+        # === ORIGINAL PIPELINE (scene DAG) ===
+        # No extend chain here, so every scene is an independent node and they
+        # render concurrently under the scheduler's per-resource caps. Ordered
+        # work (the cinematic auto-transition that merges into the preceding
+        # scene) runs afterwards, in scene order.
+        def _render_scene(i, scene):
             if status_callback:
                 status_callback(f"Gen: {scene['name'].title()} ({i}/{len(scenes)})")
 
@@ -724,280 +907,319 @@ def run_generation_pipeline(
 
             output_path = output_dir / f"scene_{i}_{scene['name']}.mp4"
 
-            try:
-                if scene["type"] == "physical_product_scene":
-                    # Step 1: Nano Banana (Composite Image) — skip when no product
-                    if status_callback: status_callback(f"Gen: Composite Image ({i}/{len(scenes)})")
-                    if (product or {}).get("image_url"):
-                        print(f"      Generating composite product image with prompt: {scene['nano_banana_prompt'][:50]}...")
-                    composite_url = _composite_or_influencer_ref(
-                        scene, influencer, product, seed=global_seed,
-                    )
-                    print(f"      Composite Ready: {composite_url}")
+            if scene["type"] == "physical_product_scene":
+                # Step 1: Nano Banana (Composite Image) — its own node, see _add_scene_node
+                composite_url = sched.result(f"composite_{i}")
 
-                    # Step 2: Veo Animation (Image-to-Video)
-                    # Preview: show composite image immediately
-                    if status_callback: status_callback(f"Gen: Animating Scene ({i}/{len(scenes)})", preview_url=composite_url, preview_type="image")
-                    print(f"      Animating with Veo...")
+                # Step 2: Veo Animation (Image-to-Video)
+                # Preview: show composite image immediately
+                if status_callback: status_callback(f"Gen: Animating Scene ({i}/{len(scenes)})", preview_url=composite_url, preview_type="image")
+                print(f"      Animating with Veo...")
 
-                    result = generate_scenes.animate_image(
-                        image_url=composite_url,
-                        scene=scene,
-                        ugc=True,
-                    )
+                result = generate_scenes.animate_image(
+                    image_url=composite_url,
+                    scene=scene,
+                    ugc=True,
+                )
 
-                    generate_scenes.download_video(result["videoUrl"], output_path)
+                generate_scenes.download_video(result["videoUrl"], output_path)
 
-                    # Preview: upload completed scene video
-                    if status_callback:
-                        preview = _upload_scene_preview(output_path)
-                        if preview:
-                            status_callback(f"Gen: {scene['name'].title()} ({i}/{len(scenes)})", preview_url=preview, preview_type="video")
+                # Preview: upload completed scene video
+                if status_callback:
+                    preview = _upload_scene_preview(output_path)
+                    if preview:
+                        status_callback(f"Gen: {scene['name'].title()} ({i}/{len(scenes)})", preview_url=preview, preview_type="video")
 
-                    # Veo 3.1 image-to-video produces native audio/speech.
-                    # Skip ElevenLabs — just extract transcription for subtitle sync.
-                    MODELS_WITH_NATIVE_AUDIO = {"veo-3.1-fast", "veo-3.1", "seedance-1.5-pro", "seedance-2.0"}
-                    model_used = "veo-3.1-fast"
+                # Veo 3.1 image-to-video produces native audio/speech.
+                # Skip ElevenLabs — just extract transcription for subtitle sync.
+                MODELS_WITH_NATIVE_AUDIO = {"veo-3.1-fast", "veo-3.1", "seedance-1.5-pro", "seedance-2.0"}
+                model_used = "veo-3.1-fast"
 
-                    if model_used in MODELS_WITH_NATIVE_AUDIO:
-                        print(f"      [OK] Veo 3.1 native audio — skipping ElevenLabs.")
-                        try:
-                            print(f"      [MIC] Extracting native audio for transcription...")
-                            audio_extract_path = output_dir / f"scene_{i}_{scene['name']}.mp3"
-                            cmd = [
-                                "ffmpeg", "-y", "-v", "quiet",
-                                "-i", str(output_path),
-                                "-vn",
-                                "-acodec", "libmp3lame",
-                                "-q:a", "2",
-                                str(audio_extract_path)
-                            ]
-                            subprocess.run(cmd, check=True)
-
-                            transcription_client = TranscriptionClient()
-                            transcription = transcription_client.transcribe_audio(str(audio_extract_path))
-                            if transcription:
-                                scene["transcription"] = transcription
-                                print("      [OK] Transcription attached to scene data")
-                        except Exception as e:
-                            print(f"      !! Transcription failed: {e}. Falling back to default timing.")
-
-                    elif scene.get("subtitle_text"):
-                        # Fallback for non-audio models: add ElevenLabs voiceover
-                        if status_callback: status_callback(f"Voiceover: {scene['name'].title()}")
-                        print(f"      [MIC] Adding ElevenLabs voiceover (model {model_used} has no native audio)...")
-                        voice_id = scene.get("voice_id", config.VOICE_MAP.get(influencer['name'], "pNInz6obpgDQGcFmaJgB"))
-                        audio_file = elevenlabs_client.generate_voiceover(
-                            text=scene["subtitle_text"],
-                            voice_id=voice_id,
-                            filename=f"vo_{i}_{scene['name']}.mp3"
-                        )
-                        video_with_vo = output_dir / f"scene_{i}_{scene['name']}_vo.mp4"
+                if model_used in MODELS_WITH_NATIVE_AUDIO:
+                    print(f"      [OK] Veo 3.1 native audio — skipping ElevenLabs.")
+                    try:
+                        print(f"      [MIC] Extracting native audio for transcription...")
+                        audio_extract_path = output_dir / f"scene_{i}_{scene['name']}.mp3"
                         cmd = [
-                            "ffmpeg", "-y",
+                            "ffmpeg", "-y", "-v", "quiet",
                             "-i", str(output_path),
-                            "-i", str(audio_file),
-                            "-c:v", "copy",
-                            "-c:a", "aac",
-                            "-map", "0:v",
-                            "-map", "1:a",
-                            "-shortest",
-                            str(video_with_vo),
+                            "-vn",
+                            "-acodec", "libmp3lame",
+                            "-q:a", "2",
+                            str(audio_extract_path)
                         ]
-                        subprocess.run(cmd, capture_output=True, check=True)
-                        shutil.move(str(video_with_vo), str(output_path))
-                        print(f"      [OK] Voiceover added to scene {i}")
-
+                        subprocess.run(cmd, check=True)
 
-                elif scene["type"] == "veo":
-                    # Models that include native audio/lip-sync
-                    MODELS_WITH_NATIVE_AUDIO = {"infinitalk", "seedance", "veo-3.1", "veo-3.1-fast"}
-                    has_native_audio = any(m in model_api.lower() for m in MODELS_WITH_NATIVE_AUDIO)
-
-                    if "infinitalk" in model_api:
-                        # ElevenLabs Audio + Lip-Sync
-                        audio_file = elevenlabs_client.generate_voiceover(
-                            text=scene["subtitle_text"],
-                            voice_id=scene.get("voice_id", config.VOICE_MAP.get(influencer['name'], config.VOICE_MAP["Meg"])),
-                            filename=f"audio_{i}_{scene['name']}.mp3"
+                        transcription_client = TranscriptionClient()
+                        transcription = transcription_client.transcribe_audio(
+                            str(audio_extract_path), language=whisper_language,
                         )
+                        transcription_store.remember(output_path, whisper_language, transcription)
+                        if transcription:
+                            scene["transcription"] = transcription
+                            print("      [OK] Transcription attached to scene data")
+                    except Exception as e:
+                        print(f"      !! Transcription failed: {e}. Falling back to default timing.")
+
+                elif scene.get("subtitle_text"):
+                    # Fallback for non-audio models: add ElevenLabs voiceover
+                    if status_callback: status_callback(f"Voiceover: {scene['name'].title()}")
+                    print(f"      [MIC] Adding ElevenLabs voiceover (model {model_used} has no native audio)...")
+                    voice_id = scene.get("voice_id", config.VOICE_MAP.get(influencer['name'], "pNInz6obpgDQGcFmaJgB"))
+                    audio_file = elevenlabs_client.generate_voiceover(
+                        text=scene["subtitle_text"],
+                        voice_id=voice_id,
+                        filename=f"vo_{i}_{scene['name']}.mp3"
+                    )
+                    video_with_vo = output_dir / f"scene_{i}_{scene['name']}_vo.mp4"
+                    cmd = [
+                        "ffmpeg", "-y",
+                        "-i", str(output_path),
+                        "-i", str(audio_file),
+                        "-c:v", "copy",
+                        "-c:a", "aac",
+                        "-map", "0:v",
+                        "-map", "1:a",
+                        "-shortest",
+                        str(video_with_vo),
+                    ]
+                    subprocess.run(cmd, capture_output=True, check=True)
+                    shutil.move(str(video_with_vo), str(output_path))
+                    print(f"      [OK] Voiceover added to scene {i}")
+
+
+            elif scene["type"] == "veo":
+                # Models that include native audio/lip-sync
+                MODELS_WITH_NATIVE_AUDIO = {"infinitalk", "seedance", "veo-3.1", "veo-3.1-fast"}
+                has_native_audio = any(m in model_api.lower() for m in MODELS_WITH_NATIVE_AUDIO)
+
+                if "infinitalk" in model_api:
+                    # ElevenLabs Audio + Lip-Sync
+                    audio_file = elevenlabs_client.generate_voiceover(
+                        text=scene["subtitle_text"],
+                        voice_id=scene.get("voice_id", config.VOICE_MAP.get(influencer['name'], config.VOICE_MAP["Meg"])),
+                        filename=f"audio_{i}_{scene['name']}.mp3"
+                    )
 
-                        audio_url = storage_helper.upload_temporary_file(audio_file)
+                    audio_url = storage_helper.upload_temporary_file(audio_file)
 
-                        # Asset Mirroring Strategy (Robust Fix)
-                        raw_ref_url = scene["reference_image_url"]
-                        print(f"      Mirroring asset: {raw_ref_url}")
+                    # Asset Mirroring Strategy (Robust Fix)
+                    raw_ref_url = scene["reference_image_url"]
+                    print(f"      Mirroring asset: {raw_ref_url}")
 
-                        try:
-                            if "cloudflarestorage.com" in raw_ref_url or "r2.dev" in raw_ref_url:
-                                clean_url = raw_ref_url.replace("https://", "")
-                                download_url = f"https://images.weserv.nl/?url={clean_url}"
-                            else:
-                                download_url = raw_ref_url
-
-                            img_resp = requests.get(download_url, timeout=10)
-                            if img_resp.status_code == 200:
-                                try:
-                                    img_content = img_resp.content
-                                    with Image.open(io.BytesIO(img_content)) as pil_img:
-                                        pil_img = pil_img.convert("RGB")
-                                        temp_img_path = output_dir / f"mirror_{i}_{int(time.time())}.jpg"
-                                        pil_img.save(temp_img_path, format="JPEG", quality=95)
-                                except Exception as e:
-                                    print(f"      Image conversion failed: {e}, falling back to raw write")
+                    try:
+                        if "cloudflarestorage.com" in raw_ref_url or "r2.dev" in raw_ref_url:
+                            clean_url = raw_ref_url.replace("https://", "")
+                            download_url = f"https://images.weserv.nl/?url={clean_url}"
+                        else:
+                            download_url = raw_ref_url
+
+                        img_resp = requests.get(download_url, timeout=10)
+                        if img_resp.status_code == 200:
+                            try:
+                                img_content = img_resp.content
+                                with Image.open(io.BytesIO(img_content)) as pil_img:
+                                    pil_img = pil_img.convert("RGB")
                                     temp_img_path = output_dir / f"mirror_{i}_{int(time.time())}.jpg"
-                                    with open(temp_img_path, "wb") as f:
-                                        f.write(img_resp.content)
-
-                                image_url = storage_helper.upload_temporary_file(temp_img_path)
-                                print(f"      Asset mirrored successfully: {image_url}")
-
-                                try:
-                                    os.remove(temp_img_path)
-                                except:
-                                    pass
-                            else:
-                                print(f"      Mirror download failed ({img_resp.status_code}), reverting to raw URL")
-                                image_url = raw_ref_url
-                        except Exception as e:
-                            print(f"      Mirroring failed: {e}, reverting to raw URL")
-                            image_url = raw_ref_url
+                                    pil_img.save(temp_img_path, format="JPEG", quality=95)
+                            except Exception as e:
+                                print(f"      Image conversion failed: {e}, falling back to raw write")
+                                temp_img_path = output_dir / f"mirror_{i}_{int(time.time())}.jpg"
+                                with open(temp_img_path, "wb") as f:
+                                    f.write(img_resp.content)
 
-                        print(f"      Waiting 10s for propagation: {audio_url}")
-                        time.sleep(10)
+                            image_url = storage_helper.upload_temporary_file(temp_img_path)
+                            print(f"      Asset mirrored successfully: {image_url}")
 
-                        video_url = generate_scenes.generate_lipsync_video(
-                            image_url=image_url,
-                            audio_url=audio_url,
-                            prompt=scene["prompt"]
-                        )
-                    else:
-                        # Pure AI Model generation (Seedance, Kling, Veo, etc.)
-                        # If extend already generated a product composite for
-                        # scene 1 and then failed, use that composite as the
-                        # reference for subsequent veo scenes so they keep the
-                        # product on screen instead of hallucinating one.
-                        fallback_ref = cached_composite_url or scene.get("reference_image_url")
-                        if cached_composite_url:
-                            print(f"      [FALLBACK] Reusing extend's composite as reference for scene {i}")
-                        result = generate_scenes.generate_video_with_retry(
-                            prompt=scene["prompt"],
-                            reference_image_url=fallback_ref,
-                            model_api=model_api,
-                            ugc=True,
-                        )
-                        video_url = result["videoUrl"]
+                            try:
+                                os.remove(temp_img_path)
+                            except:
+                                pass
+                        else:
+                            print(f"      Mirror download failed ({img_resp.status_code}), reverting to raw URL")
+                            image_url = raw_ref_url
+                    except Exception as e:
+                        print(f"      Mirroring failed: {e}, reverting to raw URL")
+                        image_url = raw_ref_url
 
-                    generate_scenes.download_video(video_url, output_path)
+                    print(f"      Waiting 10s for propagation: {audio_url}")
+                    time.sleep(10)
 
-                    # Preview: upload completed veo scene video
-                    if status_callback:
-                        preview = _upload_scene_preview(output_path)
-                        if preview:
-                            status_callback(f"Gen: {scene['name'].title()} ({i}/{len(scenes)})", preview_url=preview, preview_type="video")
+                    video_url = generate_scenes.generate_lipsync_video(
+                        image_url=image_url,
+                        audio_url=audio_url,
+                        prompt=scene["prompt"]
+                    )
+                else:
+                    # Pure AI Model generation (Seedance, Kling, Veo, etc.)
+                    # If extend already generated a product composite for
+                    # scene 1 and then failed, use that composite as the
+                    # reference for subsequent veo scenes so they keep the
+                    # product on screen instead of hallucinating one.
+                    fallback_ref = cached_composite_url or scene.get("reference_image_url")
+                    if cached_composite_url:
+                        print(f"      [FALLBACK] Reusing extend's composite as reference for scene {i}")
+                    result = generate_scenes.generate_video_with_retry(
+                        prompt=scene["prompt"],
+                        reference_image_url=fallback_ref,
+                        model_api=model_api,
+                        ugc=True,
+                    )
+                    video_url = result["videoUrl"]
 
-                    # Post-generation voiceover for silent models
-                    if not has_native_audio and scene.get("subtitle_text"):
-                        if status_callback:
-                            status_callback(f"Voiceover: {scene['name'].title()} ({i}/{len(scenes)})")
-                        print(f"      Silent model detected — generating ElevenLabs voiceover...")
-
-                        voice_id = scene.get("voice_id", config.VOICE_MAP.get(
-                            influencer['name'], config.VOICE_MAP.get("Meg", "pNInz6obpgDQGcFmaJgB")
-                        ))
-                        audio_file = elevenlabs_client.generate_voiceover(
-                            text=scene["subtitle_text"],
-                            voice_id=voice_id,
-                            filename=f"vo_{i}_{scene['name']}.mp3"
-                        )
+                generate_scenes.download_video(video_url, output_path)
 
-                        video_with_vo = output_dir / f"scene_{i}_{scene['name']}_vo.mp4"
-                        cmd = [
-                            "ffmpeg", "-y",
-                            "-i", str(output_path),
-                            "-i", str(audio_file),
-                            "-c:v", "copy",
-                            "-c:a", "aac",
-                            "-map", "0:v",
-                            "-map", "1:a",
-                            "-shortest",
-                            str(video_with_vo),
-                        ]
-                        subprocess.run(cmd, capture_output=True, check=True)
-
-                        shutil.move(str(video_with_vo), str(output_path))
-                        print(f"      Voiceover added to scene {i}")
+                # Preview: upload completed veo scene video
+                if status_callback:
+                    preview = _upload_scene_preview(output_path)
+                    if preview:
+                        status_callback(f"Gen: {scene['name'].title()} ({i}/{len(scenes)})", preview_url=preview, preview_type="video")
 
-                elif scene["type"] == "clip":
-                    # App Clip
-                    generate_scenes.download_video(scene["video_url"], output_path)
+                # Post-generation voiceover for silent models
+                if not has_native_audio and scene.get("subtitle_text"):
+                    if status_callback:
+                        status_callback(f"Voiceover: {scene['name'].title()} ({i}/{len(scenes)})")
+                    print(f"      Silent model detected — generating ElevenLabs voiceover...")
+
+                    voice_id = scene.get("voice_id", config.VOICE_MAP.get(
+                        influencer['name'], config.VOICE_MAP.get("Meg", "pNInz6obpgDQGcFmaJgB")
+                    ))
+                    audio_file = elevenlabs_client.generate_voiceover(
+                        text=scene["subtitle_text"],
+                        voice_id=voice_id,
+                        filename=f"vo_{i}_{scene['name']}.mp3"
+                    )
 
-                elif scene["type"] == "cinematic_shot":
-                    # Pre-rendered cinematic product shot — just download
-                    print(f"      Using pre-rendered cinematic shot: {scene['video_url']}")
-                    generate_scenes.download_video(scene["video_url"], output_path)
-
-                    # Auto-Transition: if enabled, stitch this cinematic shot with
-                    # the preceding influencer scene using an xfade transition.
-                    auto_trans = fields.get("auto_transition_type")
-                    if auto_trans and video_paths:
-                        prev_scene = video_paths[-1]
-                        prev_path = prev_scene.get("path")
-                        if prev_path and prev_scene.get("type") == "physical_product_scene":
-                            try:
-                                if status_callback:
-                                    status_callback(f"Transition: {scene['name'].title()} ({i}/{len(scenes)})")
-                                print(f"      Applying {auto_trans} transition...")
-                                from ugc_worker.video_tools import stitch_with_transition
-                                stitched_path = output_dir / f"scene_{i}_{scene['name']}_stitched.mp4"
-                                stitch_with_transition(
-                                    influencer_clip=prev_path,
-                                    cinematic_clip=str(output_path),
-                                    transition_type=auto_trans,
-                                    output_path=str(stitched_path),
-                                )
-                                shutil.move(str(stitched_path), prev_path)
-                                print(f"      Transition applied — merged into preceding scene")
-                                scene["_merged"] = True
-                            except Exception as e:
-                                print(f"      Auto-transition failed: {e}. Using hard cut.")
+                    video_with_vo = output_dir / f"scene_{i}_{scene['name']}_vo.mp4"
+                    cmd = [
+                        "ffmpeg", "-y",
+                        "-i", str(output_path),
+                        "-i", str(audio_file),
+                        "-c:v", "copy",
+                        "-c:a", "aac",
+                        "-map", "0:v",
+                        "-map", "1:a",
+                        "-shortest",
+                        str(video_with_vo),
+                    ]
+                    subprocess.run(cmd, capture_output=True, check=True)
+
+                    shutil.move(str(video_with_vo), str(output_path))
+                    print(f"      Voiceover added to scene {i}")
+
+            elif scene["type"] == "clip":
+                # App Clip
+                generate_scenes.download_video(scene["video_url"], output_path)
+
+            elif scene["type"] == "cinematic_shot":
+                # Pre-rendered cinematic product shot — just download
+                print(f"      Using pre-rendered cinematic shot: {scene['video_url']}")
+                generate_scenes.download_video(scene["video_url"], output_path)
+
+            scene["path"] = str(output_path)
+            return scene
+
+        def _make_composite(i, scene):
+            # Skip the Nano Banana call when there is no product image
+            if status_callback: status_callback(f"Gen: Composite Image ({i}/{len(scenes)})")
+            if (product or {}).get("image_url"):
+                print(f"      Generating composite product image with prompt: {scene['nano_banana_prompt'][:50]}...")
+            composite_url = _composite_or_influencer_ref(
+                scene, influencer, product, seed=global_seed,
+            )
+            print(f"      Composite Ready: {composite_url}")
+            return composite_url
+
+        def _add_scene_node(i, scene):
+            resource = "download" if scene["type"] in ("clip", "cinematic_shot") else "video"
+            deps = ()
+            if scene["type"] == "physical_product_scene":
+                # Composites run under the image cap and don't hold a video slot.
+                deps = (sched.add(
+                    f"composite_{i}",
+                    lambda i=i, scene=scene: _make_composite(i, scene),
+                    resource="image",
+                ),)
+            return sched.add(
+                f"scene_{i}",
+                lambda i=i, scene=scene: _render_scene(i, scene),
+                deps=deps,
+                resource=resource,
+            )
 
-                scene["path"] = str(output_path)
-                if not scene.get("_merged"):
-                    video_paths.append(scene)
+        scene_keys = [
+            remaining_keys_by_index.get(i) or _add_scene_node(i, scene)
+            for i, scene in enumerate(scenes, 1)
+        ]
 
+        for i, (key, scene) in enumerate(zip(scene_keys, scenes), 1):
+            try:
+                if key == remaining_keys_by_index.get(i):
+                    try:
+                        scene["path"] = sched.result(key)
+                    except Exception as remaining_err:
+                        # The extend-time render has settled without a file;
+                        # only now is it safe to render the scene again.
+                        print(f"      [EXTEND] Remaining scene {i} failed ({remaining_err}) — re-rendering")
+                        sched.result(_add_scene_node(i, scene))
+                else:
+                    sched.result(key)
             except Exception as e:
+                sched.cancel()
                 raise RuntimeError(f"Scene {i} ({scene['name']}) generation failed: {e}")
 
+            output_path = Path(scene["path"])
+            if scene["type"] == "cinematic_shot":
+                # Auto-Transition: if enabled, stitch this cinematic shot with
+                # the preceding influencer scene using an xfade transition.
+                auto_trans = fields.get("auto_transition_type")
+                if auto_trans and video_paths:
+                    prev_scene = video_paths[-1]
+                    prev_path = prev_scene.get("path")
+                    if prev_path and prev_scene.get("type") == "physical_product_scene":
+                        try:
+                            if status_callback:
+                                status_callback(f"Transition: {scene['name'].title()} ({i}/{len(scenes)})")
+                            print(f"      Applying {auto_trans} transition...")
+                            from ugc_worker.video_tools import stitch_with_transition
+                            stitched_path = output_dir / f"scene_{i}_{scene['name']}_stitched.mp4"
+                            stitch_with_transition(
+                                influencer_clip=prev_path,
+                                cinematic_clip=str(output_path),
+                                transition_type=auto_trans,
+                                output_path=str(stitched_path),
+                            )
+                            shutil.move(str(stitched_path), prev_path)
+                            print(f"      Transition applied — merged into preceding scene")
+                            scene["_merged"] = True
+                        except Exception as e:
+                            print(f"      Auto-transition failed: {e}. Using hard cut.")
+
+            if not scene.get("_merged"):
+                video_paths.append(scene)
+
+        # Native-audio scenes carry their own Whisper result; keep the last one
+        # as the job-level transcription like the sequential loop did.
+        for scene in video_paths:
+            if scene.get("transcription"):
+                transcription = scene["transcription"]
+
     # 3. Generate subtitles (Legacy block removed - now handled in assemble_video)
     # if status_callback:
     #     status_callback("Subtitling")
     # subtitle_path = output_dir / "subtitles.ass"
     # subtitle_engine.generate_subtitles(scenes, subtitle_path)
 
-    # 4. Generate music (optional)
+    # 4. Collect music (started as a scheduler node alongside the scenes)
     music_path = None
     if not skip_music:
         if status_callback:
             status_callback("Adding Music")
-            
-        theme = fields.get("Theme", "")
-        music_prompt = (
-            f"upbeat trendy background music for a short social media video about {theme}, "
-            f"energetic positive modern pop instrumental"
-        )
-        try:
-            music_url = generate_scenes.generate_music(music_prompt)
-            if music_url:
-                music_file = output_dir / "music.mp3"
-                generate_scenes.download_video(music_url, music_file)
-                music_path = str(music_file)
-            else:
-                print("      [MUSIC] ⚠️ Music generation returned no URL — video will have no background music")
-        except Exception as music_err:
-            print(f"      [MUSIC] ⚠️ Music generation failed: {music_err} — video will have no background music")
+        music_path = sched.result("music")
+    print(f"      [DAG] Node timings: {sched.timings()}")
+    sched.shutdown(wait=False)
 
-    # 5. Assemble final video (WITHOUT subtitles — subtitles are applied after)
+    # 5. Assemble final video (captions burned in during assembly by default)
     if status_callback:
         status_callback("Assembling")
 
@@ -1016,101 +1238,131 @@ def run_generation_pipeline(
         print(f"      [BRAND] Brand names for subtitle correction: {brand_names}")
 
     length = fields.get("Length", "15s")
-    final_path = assemble_video.assemble_video(
-        video_paths=video_paths,
-        output_path=output_path,
-        music_path=music_path,
-        max_duration=config.get_max_duration(length),
-        scene_types=[s.get("type", "clip") for s in video_paths],
-        brand_names=brand_names or None,
-    )
+    max_duration = config.get_max_duration(length)
+    scene_types = [s.get("type", "clip") for s in video_paths]
 
-    # 6. Apply subtitles (Remotion primary, FFmpeg fallback)
     subtitles_enabled = fields.get("subtitles_enabled", True)
     subtitle_style = fields.get("subtitle_style", "hormozi")
     subtitle_placement = fields.get("subtitle_placement", "middle")
     use_remotion = os.getenv("USE_REMOTION_SUBTITLES", "true").lower() == "true"
+    caption_mode = _resolve_caption_mode(fields.get("caption_mode"))
+    if caption_mode == "assembly" and use_remotion and subtitle_style not in ASS_CAPTION_STYLES:
+        print(f"      [SUBTITLES] Style '{subtitle_style}' needs Remotion — captioning after assembly")
+        caption_mode = "post"
+    # Pass the known script text so Whisper knows what words to expect
+    script_text = fields.get("Hook") or fields.get("script_text")
 
     captioned_path = None
+    burn_subtitle_path = None
+    timeline_words = False
+
+    # 5a. Fast path: transcribe the timeline's audio mix (no video encode) and
+    # burn the ASS track during the assembly encode itself.
+    if subtitles_enabled and caption_mode == "assembly":
+        timeline_transcription = None
+        try:
+            # Every voiced clip already transcribed (extended chain, native-
+            # audio scenes) → stitch those transcripts, no Whisper call.
+            clip_paths = [s["path"] for s in video_paths]
+            durations = [assemble_video.get_video_duration(p) for p in clip_paths]
+            timeline_transcription = transcription_store.compose_timeline(
+                clip_paths, assemble_video.timeline_offsets(durations, scene_types), durations,
+                language=whisper_language, limit=max_duration,
+            )
+            if timeline_transcription is not None:
+                print(f"      [CACHE] Timeline transcript composed from cached clip transcripts "
+                      f"({len(timeline_transcription['words'])} words)")
+        except Exception as compose_err:
+            print(f"      !! Could not compose timeline transcript: {compose_err}")
+
+        if timeline_transcription is None:
+            try:
+                audio_mix = output_dir / "timeline_audio.m4a"
+                assemble_video.render_timeline_audio(
+                    video_paths, audio_mix, max_duration=max_duration, scene_types=scene_types,
+                )
+                print("      [SUBTITLES] Transcribing timeline audio mix with Whisper...")
+                if script_text:
+                    print(f"      [SUBTITLES] Script hint: {script_text[:80]}...")
+                timeline_transcription = subtitle_engine.extract_transcription_with_whisper(
+                    str(audio_mix), brand_names=brand_names or None, script_text=script_text,
+                    video_language=fields.get("video_language", "en"),
+                )
+            except Exception as mix_err:
+                print(f"      [SUBTITLES] ⚠️ Timeline audio mix failed: {mix_err}")
+                timeline_transcription = None
+
+        if timeline_transcription is None:
+            print("      [SUBTITLES] ⚠️ No timeline transcription. Captioning after assembly instead.")
+            caption_mode = "post"
+        else:
+            transcription = timeline_transcription
+            timeline_words = bool(transcription.get("words"))
+            if timeline_words:
+                subtitle_path = output_dir / "subtitles_synced.ass"
+                subtitle_engine.generate_subtitles_from_whisper(
+                    transcription, subtitle_path, brand_names=brand_names or None,
+                    placement=subtitle_placement,
+                )
+                if subtitle_path.exists() and subtitle_path.stat().st_size > 250:
+                    burn_subtitle_path = subtitle_path
+            else:
+                print("      [SUBTITLES] ⚠️ No transcription words found. Skipping subtitles.")
 
-    if subtitles_enabled:
+    assembly_kwargs = dict(
+        video_paths=video_paths,
+        output_path=output_path,
+        music_path=music_path,
+        max_duration=max_duration,
+        scene_types=scene_types,
+        brand_names=brand_names or None,
+        assembly_mode=fields.get("assembly_mode"),
+    )
+    if burn_subtitle_path:
+        try:
+            final_path = assemble_video.assemble_video(subtitle_path=burn_subtitle_path, **assembly_kwargs)
+            captioned_path = str(final_path)
+            print(f"      [SUBTITLES] ✅ Captions burned during assembly: {captioned_path}")
+        except subprocess.CalledProcessError as burn_err:
+            print(f"      [SUBTITLES] ⚠️ Captioned assembly failed: {burn_err}. Re-assembling without captions.")
+            caption_mode = "post"
+    if not captioned_path:
+        final_path = assemble_video.assemble_video(**assembly_kwargs)
+    if timeline_words:
+        # The editor re-transcribes the final render; make that a cache hit.
+        transcription_store.remember(final_path, whisper_language, transcription)
+
+    # 6. Post-assembly subtitles (Remotion, FFmpeg fallback) — used when
+    # CAPTION_MODE=post or the in-assembly burn could not run.
+    if subtitles_enabled and caption_mode == "post" and not captioned_path:
         if status_callback:
             status_callback("Subtitling")
 
-        # Always run Whisper on the FINAL assembled video for accurate timestamps
-        # Pass the known script text so Whisper knows what words to expect
-        script_text = fields.get("Hook") or fields.get("script_text")
-        print("      [SUBTITLES] Transcribing final assembled video with Whisper...")
-        if script_text:
-            print(f"      [SUBTITLES] Script hint: {script_text[:80]}...")
-        transcription = subtitle_engine.extract_transcription_with_whisper(
-            str(final_path), brand_names=brand_names or None, script_text=script_text,
-            video_language=fields.get("video_language", "en"),
-        )
+        if not timeline_words:
+            # Run Whisper on the FINAL assembled video for accurate timestamps
+            print("      [SUBTITLES] Transcribing final assembled video with Whisper...")
+            if script_text:
+                print(f"      [SUBTITLES] Script hint: {script_text[:80]}...")
+            transcription = subtitle_engine.extract_transcription_with_whisper(
+                str(final_path), brand_names=brand_names or None, script_text=script_text,
+                video_language=fields.get("video_language", "en"),
+            )
 
         if transcription and transcription.get("words"):
-            # --- PRIMARY PATH: Remotion (via subprocess) ---
+            # --- PRIMARY PATH: Remotion (warm renderer pool) ---
             if use_remotion:
                 try:
                     print(f"      [SUBTITLES] Rendering with Remotion (style={subtitle_style}, placement={subtitle_placement})...")
 
                     from pathlib import Path as _Path
-                    import json as _json
-                    import tempfile as _tempfile
-
-                    # Determine the Remotion renderer directory
-                    # In Modal: /root/remotion_renderer
-                    # Locally: ./remotion_renderer (relative to project root)
-                    remotion_dir = "/root/remotion_renderer"
-                    if not os.path.isdir(remotion_dir):
-                        remotion_dir = os.path.join(os.path.dirname(__file__), "remotion_renderer")
-
-                    render_script = os.path.join(remotion_dir, "render_captions.js")
-                    if not os.path.isfile(render_script):
-                        raise FileNotFoundError(f"Remotion render script not found: {render_script}")
-
-                    # Write input props to a temp JSON file
-                    props = {
-                        "transcription": transcription,
-                        "subtitleStyle": subtitle_style,
-                        "subtitlePlacement": subtitle_placement,
-                    }
-                    with _tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as pf:
-                        _json.dump(props, pf)
-                        props_path = pf.name
-
-                    # Output path
-                    captioned_output = str(_Path(str(final_path)).parent / f"{_Path(str(final_path)).stem}_captioned.mp4")
 
-                    # Call the Node.js render script via subprocess
-                    cmd = [
-                        "node", render_script,
-                        "--input", str(final_path),
-                        "--props", props_path,
-                        "--output", captioned_output,
-                    ]
-                    print(f"      [SUBTITLES] Running: node render_captions.js ...")
-                    result = subprocess.run(
-                        cmd, capture_output=True, text=True, timeout=300,
-                        cwd=remotion_dir,
+                    captioned_output = str(_Path(str(final_path)).parent / f"{_Path(str(final_path)).stem}_captioned.mp4")
+                    captioned_path = remotion_pool.render_captions(
+                        final_path, transcription, captioned_output,
+                        subtitle_style=subtitle_style, subtitle_placement=subtitle_placement,
+                        timeout=300,
                     )
-
-                    # Cleanup temp props file
-                    try:
-                        os.unlink(props_path)
-                    except OSError:
-                        pass
-
-                    if result.returncode == 0 and os.path.isfile(captioned_output):
-                        captioned_path = captioned_output
-                        # Print Remotion stdout for debugging
-                        for line in result.stdout.strip().split("\n"):
-                            if line.strip():
-                                print(f"      {line}")
-                        print(f"      [SUBTITLES] ✅ Remotion render complete: {captioned_path}")
-                    else:
-                        stderr_msg = result.stderr.strip()[-500:] if result.stderr else "no stderr"
-                        raise RuntimeError(f"Remotion exited with code {result.returncode}: {stderr_msg}")
+                    print(f"      [SUBTITLES] ✅ Remotion render complete: {captioned_path}")
 
                 except Exception as remotion_err:
                     print(f"      [SUBTITLES] ⚠️ Remotion failed: {remotion_err}. Falling back to FFmpeg.")
@@ -1123,7 +1375,8 @@ def run_generation_pipeline(
                     from pathlib import Path as _Path
                     subtitle_path = _Path(str(final_path)).parent / "subtitles_synced.ass"
                     subtitle_engine.generate_subtitles_from_whisper(
-                        transcription, subtitle_path, brand_names=brand_names or None
+                        transcription, subtitle_path, brand_names=brand_names or None,
+                        placement=subtitle_placement,
                     )
                     if subtitle_path.exists() and subtitle_path.stat().st_size > 250:
                         subtitled_path = _Path(str(final_path)).parent / f"{_Path(str(final_path)).stem}_captioned.mp4"
@@ -1157,5 +1410,7 @@ def run_generation_pipeline(
         "transcription": transcription if (
             isinstance(transcription, dict) and transcription.get("words")
         ) else None,
+        # Lets the editor trust the stored transcript for non-English jobs.
+        "transcription_language": whisper_language,
     }
 
@@ -2,13 +2,33 @@
 Naiara Content Distribution Engine — ElevenLabs Client
 
 Handles high-fidelity TTS generation for premium voiceovers.
+
+Rate limits: a 429 from ElevenLabs pauses every thread in the process (the
+limit is per account), honouring Retry-After when the API sends it.
+Cached / parallel synthesis for clone videos lives in tts_service.py.
 """
+import random
 import re
+import threading
 import time
 import requests
 import config
 from pathlib import Path
 
+# Voice settings for every premium voiceover (part of the tts_service cache key).
+VOICE_SETTINGS = {
+    "stability": 0.65,
+    "similarity_boost": 0.70,
+    "style": 0.15,
+    "use_speaker_boost": True,
+    "speed": 0.92,
+}
+FALLBACK_VOICE_ID = "pNInz6obpgDQGcFmaJgB"
+
+# Shared 429 backoff: no thread sends a request before this time.monotonic().
+_backoff_lock = threading.Lock()
+_backoff_until = 0.0
+
 
 class ElevenLabsAPIError(RuntimeError):
     """Structured ElevenLabs HTTP failure for voiceover tooling."""
@@ -139,17 +159,40 @@ def ping_elevenlabs_tts() -> dict:
         return {"ok": False, "status_code": None, "detail": str(e)[:200]}
 
 
-def generate_voiceover(
+def _wait_for_rate_limit():
+    """Block while a 429 backoff set by any thread is in effect."""
+    while True:
+        with _backoff_lock:
+            delay = _backoff_until - time.monotonic()
+        if delay <= 0:
+            return
+        time.sleep(delay)
+
+
+def _note_rate_limited(resp, attempt: int) -> float:
+    """Extend the shared backoff after a 429; returns the wait in seconds."""
+    global _backoff_until
+    try:
+        wait = float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        wait = (2 ** attempt) * 2
+    wait = min(60.0, max(1.0, wait)) * random.uniform(1.0, 1.25)
+    with _backoff_lock:
+        _backoff_until = max(_backoff_until, time.monotonic() + wait)
+    return wait
+
+
+def synthesize_to_file(
     text,
     voice_id,
-    filename="voiceover.mp3",
+    output_path,
     *,
     language_code=None,
     max_retries=3,
 ):
     """
-    Generate audio from text using ElevenLabs API.
-    Returns the local path to the generated MP3 file.
+    Synthesize `text` into `output_path` (MP3). Returns the voice ID actually
+    used — FALLBACK_VOICE_ID when the account hit 402 Payment Required.
     """
     if not config.ELEVENLABS_API_KEY:
         raise ValueError("ELEVENLABS_API_KEY is not set in .env")
@@ -174,13 +217,7 @@ def generate_voiceover(
     payload = {
         "text": processed_text,
         "model_id": config.ELEVENLABS_MODEL_ID,
-        "voice_settings": {
-            "stability": 0.65,
-            "similarity_boost": 0.70,
-            "style": 0.15,
-            "use_speaker_boost": True,
-            "speed": 0.92,
-        },
+        "voice_settings": dict(VOICE_SETTINGS),
     }
     if language_code:
         payload["language_code"] = language_code
@@ -189,36 +226,40 @@ def generate_voiceover(
     last_error = None
 
     for attempt in range(max_retries):
+        _wait_for_rate_limit()
         resp = requests.post(url, headers=headers, json=payload, timeout=120)
 
         if resp.status_code == 402:
             print("   ⚠️ ElevenLabs Payment Required (402). Falling back to standard voice...")
-            fallback_voice = "pNInz6obpgDQGcFmaJgB"
-            if voice_id == fallback_voice:
+            if voice_id == FALLBACK_VOICE_ID:
                 raise ElevenLabsAPIError(resp.status_code, resp.text)
-            return generate_voiceover(
+            return synthesize_to_file(
                 text,
-                fallback_voice,
-                filename,
+                FALLBACK_VOICE_ID,
+                output_path,
                 language_code=language_code,
                 max_retries=max_retries,
             )
 
         if resp.status_code == 200:
-            output_path = config.TEMP_DIR / filename
+            output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
             with open(output_path, "wb") as f:
                 f.write(resp.content)
             print(f"   ✅ Voiceover saved: {output_path}")
-            return str(output_path)
+            return voice_id
 
         last_error = ElevenLabsAPIError(resp.status_code, resp.text)
         print(f"   [ElevenLabs] HTTP {resp.status_code} (attempt {attempt + 1}/{max_retries})")
 
         if resp.status_code in retriable and attempt < max_retries - 1:
-            wait = (2 ** attempt) * 2
-            print(f"   [ElevenLabs] Retrying in {wait}s...")
-            time.sleep(wait)
+            if resp.status_code == 429:
+                wait = _note_rate_limited(resp, attempt)
+                print(f"   [ElevenLabs] Rate limited — all requests paused for {wait:.1f}s")
+            else:
+                wait = (2 ** attempt) * 2
+                print(f"   [ElevenLabs] Retrying in {wait}s...")
+                time.sleep(wait)
             continue
         raise last_error
 
@@ -227,6 +268,29 @@ def generate_voiceover(
     raise ElevenLabsAPIError(0, "ElevenLabs TTS failed with no response")
 
 
+def generate_voiceover(
+    text,
+    voice_id,
+    filename="voiceover.mp3",
+    *,
+    language_code=None,
+    max_retries=3,
+):
+    """
+    Generate audio from text using ElevenLabs API.
+    Returns the local path to the generated MP3 file.
+    """
+    output_path = config.TEMP_DIR / filename
+    synthesize_to_file(
+        text,
+        voice_id,
+        output_path,
+        language_code=language_code,
+        max_retries=max_retries,
+    )
+    return str(output_path)
+
+
 if __name__ == "__main__":
     try:
         if config.ELEVENLABS_API_KEY:
@@ -15,6 +15,10 @@ import json
 import requests
 from pathlib import Path
 import config
+from task_tracker import tracker as task_tracker, kie_callback_url, with_wavespeed_webhook
+from media_cache import media_cache
+import provider_routing
+import provider_hedging
 
 
 # ---------------------------------------------------------------------------
@@ -88,7 +92,7 @@ def generate_video(prompt, reference_image_url=None, model_api=None, first_frame
                 "generate_audio": config.SEEDANCE_AUDIO,
                 "web_search": False,
             },
-            "callBackUrl": "https://example.com/callback",
+            "callBackUrl": kie_callback_url(),
         }
 
         # Handle reference images (Seedance 2.0 supports up to 9)
@@ -142,6 +146,10 @@ def generate_video(prompt, reference_image_url=None, model_api=None, first_frame
             payload["imageUrls"] = [reference_image_url, reference_image_url]
             payload["generationType"] = "IMAGE_2_VIDEO"
 
+    callback_url = kie_callback_url(required=False)
+    if callback_url and "callBackUrl" not in payload:
+        payload["callBackUrl"] = callback_url
+
     try:
         resp = requests.post(endpoints["generate"], headers=config.KIE_HEADERS, json=payload, timeout=60)
     except Exception as e:
@@ -163,11 +171,12 @@ def generate_video(prompt, reference_image_url=None, model_api=None, first_frame
     task_id = result["data"]["taskId"]
     print(f"      Task: {task_id[:30]}...")
 
-    # Poll for completion — typically 1-3 minutes, up to 15-20min for complex scenes
-    poll_limit = (max_poll_seconds // 10) if max_poll_seconds else 120  # default 20 min
-    for i in range(poll_limit):
-        time.sleep(10)
+    # Wait for completion — typically 1-3 minutes, up to 15-20min for complex scenes.
+    # The shared task tracker polls adaptively and wakes early on Kie callbacks.
+    started = time.time()
 
+    def _poll(task_id):
+        elapsed = int(time.time() - started)
         try:
             resp = requests.get(
                 endpoints["poll"],
@@ -178,11 +187,11 @@ def generate_video(prompt, reference_image_url=None, model_api=None, first_frame
             result = resp.json()
         except Exception as poll_err:
             print(f"      ⚠️ Poll network warning: {poll_err} (Continuing...)")
-            continue
+            return None
 
         if result.get("code") != 200:
-            print(f"      ⚠️ Poll error: {result.get('msg', '')} ({i * 10}s)")
-            continue
+            print(f"      ⚠️ Poll error: {result.get('msg', '')} ({elapsed}s)")
+            return None
 
         data = result.get("data", {})
 
@@ -201,48 +210,51 @@ def generate_video(prompt, reference_image_url=None, model_api=None, first_frame
                 if isinstance(result_urls, str):
                     result_urls = json.loads(result_urls)
                 if result_urls:
-                    print(f"      [OK] Generation complete! ({i * 10}s)")
+                    print(f"      [OK] Generation complete! ({elapsed}s)")
                     return {"taskId": task_id, "videoUrl": result_urls[0]}
-                print(f"      ⚠️ Success but no resultUrls ({i * 10}s)")
+                print(f"      ⚠️ Success but no resultUrls ({elapsed}s)")
                 print(f"      DEBUG data keys: {list(data.keys())}")
-                continue
+                return None
             elif flag in (2, 3):
                 error_msg = data.get("failMsg", data.get("statusDescription", "Unknown generation error"))
                 raise RuntimeError(f"Generation failed: {error_msg}")
             else:
                 status_desc = data.get("statusDescription", "generating")
-                print(f"      ⏳ {status_desc}... ({i * 10}s)")
-        else:
-            # Seedance / Kling use state: success/fail/processing
-            state = data.get("state", "processing").lower()
+                print(f"      ⏳ {status_desc}... ({elapsed}s)")
+                return None
 
-            if state == "success":
-                result_json_str = data.get("resultJson", "{}")
-                try:
-                    result_data = json.loads(result_json_str)
-                    video_url = result_data.get("resultUrls", [None])[0]
-                    last_frame_url = result_data.get("lastFrameUrl")  # Seedance 2.0 chain
-                    if video_url:
-                        print(f"      [OK] Generation complete! ({i * 10}s)")
-                        return {
-                            "taskId": task_id,
-                            "videoUrl": video_url,
-                            "lastFrameUrl": last_frame_url,
-                        }
-                except Exception as e:
-                    print(f"      ⚠️ Error parsing resultJson: {e}")
-                    continue
+        # Seedance / Kling use state: success/fail/processing
+        state = data.get("state", "processing").lower()
 
-            elif state == "fail":
-                error_msg = data.get("failMsg", "Unknown generation error")
-                raise RuntimeError(f"Generation failed: {error_msg}")
-            elif state == "waiting" or state == "processing":
-                print(f"      ⏳ Generating... ({i * 10}s)")
-            else:
-                print(f"      ⚠️ Unknown state: {state} ({i * 10}s)")
+        if state == "success":
+            result_json_str = data.get("resultJson", "{}")
+            try:
+                result_data = json.loads(result_json_str)
+                video_url = result_data.get("resultUrls", [None])[0]
+                last_frame_url = result_data.get("lastFrameUrl")  # Seedance 2.0 chain
+                if video_url:
+                    print(f"      [OK] Generation complete! ({elapsed}s)")
+                    return {
+                        "taskId": task_id,
+                        "videoUrl": video_url,
+                        "lastFrameUrl": last_frame_url,
+                    }
+            except Exception as e:
+                print(f"      ⚠️ Error parsing resultJson: {e}")
+        elif state == "fail":
+            error_msg = data.get("failMsg", "Unknown generation error")
+            raise RuntimeError(f"Generation failed: {error_msg}")
+        elif state == "waiting" or state == "processing":
+            print(f"      ⏳ Generating... ({elapsed}s)")
+        else:
+            print(f"      ⚠️ Unknown state: {state} ({elapsed}s)")
+        return None
 
-    timeout_mins = (max_poll_seconds // 60) if max_poll_seconds else 20
-    raise RuntimeError(f"{model_display} generation timed out after {timeout_mins} minutes")
+    try:
+        return task_tracker.wait(task_id, _poll, timeout=max_poll_seconds or 1200, label=model_display)
+    except TimeoutError:
+        timeout_mins = (max_poll_seconds // 60) if max_poll_seconds else 20
+        raise RuntimeError(f"{model_display} generation timed out after {timeout_mins} minutes")
 
 
 # ---------------------------------------------------------------------------
@@ -252,19 +264,20 @@ import threading
 
 class ProviderRouter:
     """
-    Smart API provider routing with PRE-FLIGHT health probes.
-
-    Before sending any Veo generation job, this system:
-      1. Pings both Kie.ai and WaveSpeed endpoints (3s timeout)
-      2. Measures response time + HTTP status
-      3. Routes to the healthy/fastest provider IMMEDIATELY
-      4. Tracks past generation outcomes as a secondary signal
+    Smart API provider routing backed by fleet-wide provider state.
 
-    This ensures users NEVER wait for Kie.ai to fail before WaveSpeed kicks in.
+    Health, success rate, completion times and circuit breakers live in
+    provider_routing (Redis, or SQLite per host), so every worker process
+    routes from the same view:
+      1. Providers whose breaker is open are skipped (one half-open trial
+         after the cooldown)
+      2. Health probes run only when no process has a fresh result — and a
+         completed render counts as one
+      3. Healthy providers are ranked by EWMA cost/latency score
 
     Providers:
-      - "kie"        → Kie.ai (primary, cheapest)
-      - "wavespeed"  → WaveSpeed (fallback, higher reliability)
+      - "kie"        → Kie.ai (cheapest)
+      - "wavespeed"  → WaveSpeed (higher reliability)
     """
 
     # Health check probe endpoints (lightweight — return fast even on error)
@@ -285,13 +298,8 @@ class ProviderRouter:
         },
     }
 
-    def __init__(self, probe_timeout: float = 3.0, cache_ttl: int = 60, window_seconds: int = 600):
+    def __init__(self, probe_timeout: float = 3.0):
         self._probe_timeout = probe_timeout   # Max time to wait for health probe
-        self._cache_ttl = cache_ttl           # Cache health results for N seconds
-        self._window = window_seconds         # Rolling window for generation outcomes
-        self._health_cache: dict[str, tuple[float, bool, float]] = {}  # {key: (timestamp, is_healthy, response_ms)}
-        self._results: dict[str, list[tuple[float, bool]]] = {}        # {key: [(timestamp, success), ...]}
-        self._lock = threading.Lock()
 
     # ── Health Probing ───────────────────────────────────────────────────
 
@@ -349,112 +357,77 @@ class ProviderRouter:
 
     def probe_health(self, model_family: str) -> dict[str, tuple[bool, float]]:
         """
-        Probe both providers' health, using cache if fresh.
+        Both providers' health from the shared store, probing (in parallel)
+        only the ones nobody in the fleet has checked within the probe TTL.
         Returns {provider: (is_healthy, response_ms)}.
-
-        Probes run in PARALLEL (threaded) to avoid adding latency.
-        Results are cached for cache_ttl seconds.
         """
-        now = time.time()
-        kie_key = f"kie_{model_family}"
-        ws_key = "wavespeed"
         results = {}
 
-        # Check cache first
-        with self._lock:
-            kie_cached = self._health_cache.get(kie_key)
-            ws_cached = self._health_cache.get(ws_key)
-
-        kie_fresh = kie_cached and (now - kie_cached[0]) < self._cache_ttl
-        ws_fresh = ws_cached and (now - ws_cached[0]) < self._cache_ttl
+        def _kie():
+            ok, ms = provider_routing.routing.health(
+                "kie", model_family, lambda: self._probe_kie(model_family))
+            results["kie"] = (True if ok is None else ok, ms)  # No data, assume healthy
 
-        if kie_fresh and ws_fresh:
-            results["kie"] = (kie_cached[1], kie_cached[2])
-            results["wavespeed"] = (ws_cached[1], ws_cached[2])
-            return results
-
-        # Probe in parallel for speed
-        kie_result = [None]
-        ws_result = [None]
-
-        def _probe_kie_thread():
-            kie_result[0] = self._probe_kie(model_family)
-
-        def _probe_ws_thread():
-            ws_result[0] = self._probe_wavespeed()
+        def _ws():
+            if not os.getenv("WAVESPEED_API_KEY", ""):
+                results["wavespeed"] = (False, 0)  # No key = unavailable
+                return
+            ok, ms = provider_routing.routing.health("wavespeed", model_family, self._probe_wavespeed)
+            results["wavespeed"] = (bool(ok), ms)
 
-        threads = []
-        if not kie_fresh:
-            t = threading.Thread(target=_probe_kie_thread)
-            t.start()
-            threads.append(t)
-        if not ws_fresh:
-            t = threading.Thread(target=_probe_ws_thread)
+        threads = [threading.Thread(target=_kie), threading.Thread(target=_ws)]
+        for t in threads:
             t.start()
-            threads.append(t)
-
         for t in threads:
-            t.join(timeout=self._probe_timeout + 1)
-
-        # Store results
-        with self._lock:
-            if kie_result[0] is not None:
-                self._health_cache[kie_key] = (now, kie_result[0][0], kie_result[0][1])
-                results["kie"] = kie_result[0]
-            elif kie_cached:
-                results["kie"] = (kie_cached[1], kie_cached[2])
-            else:
-                results["kie"] = (True, 0)  # No data, assume healthy
-
-            if ws_result[0] is not None:
-                self._health_cache[ws_key] = (now, ws_result[0][0], ws_result[0][1])
-                results["wavespeed"] = ws_result[0]
-            elif ws_cached:
-                results["wavespeed"] = (ws_cached[1], ws_cached[2])
-            else:
-                results["wavespeed"] = (False, 0)  # No key = unavailable
-
+            t.join(timeout=self._probe_timeout + 2)
+        results.setdefault("kie", (True, 0))
+        results.setdefault("wavespeed", (False, 0))
         return results
 
     # ── Generation Outcome Tracking ──────────────────────────────────────
 
-    def record(self, provider: str, success: bool):
-        """Record a generation outcome for a provider."""
-        now = time.time()
-        with self._lock:
-            if provider not in self._results:
-                self._results[provider] = []
-            self._results[provider].append((now, success))
-            cutoff = now - self._window
-            self._results[provider] = [
-                (t, s) for t, s in self._results[provider] if t > cutoff
-            ]
+    @staticmethod
+    def _split(key: str) -> tuple[str, str]:
+        provider, _, family = key.partition("_")
+        return provider, family or "veo"
+
+    def record(self, provider: str, success: bool, seconds: float = None):
+        """Record a generation outcome for a provider key ("kie_veo")."""
+        name, family = self._split(provider)
+        try:
+            provider_routing.routing.record(name, family, success, seconds)
+        except Exception as e:
+            print(f"      [Router] ⚠️ Could not record outcome: {e}")
 
     def get_success_rate(self, provider: str) -> tuple[float, int]:
-        """Get recent success rate. Returns (rate 0.0-1.0, sample_count)."""
-        now = time.time()
-        cutoff = now - self._window
-        with self._lock:
-            entries = [
-                (t, s) for t, s in self._results.get(provider, []) if t > cutoff
-            ]
-        if not entries:
+        """EWMA success rate. Returns (rate 0.0-1.0, sample_count)."""
+        name, family = self._split(provider)
+        r = provider_routing.routing.get(name, family)
+        if r["ewma_success"] is None:
             return 1.0, 0
-        successes = sum(1 for _, s in entries if s)
-        return successes / len(entries), len(entries)
+        return r["ewma_success"], r["samples"]
+
+    def is_available(self, provider: str) -> bool:
+        """False while the provider's breaker is open. Once the cooldown has
+        elapsed (half-open) the provider counts as available again: gates
+        that read this instead of calling `allow()` (kie_veo_reliable, the
+        digital force-Kie check) would otherwise never send the request
+        whose recorded outcome closes or re-opens the breaker."""
+        name, family = self._split(provider)
+        return provider_routing.routing.breaker_state(name, family) != provider_routing.OPEN
 
     # ── Routing Decision ─────────────────────────────────────────────────
 
     def choose_provider(self, model_family: str) -> str:
         """
-        Choose the best provider by running pre-flight health probes.
+        Choose the best provider from shared health, breaker and score state.
 
         Decision logic:
-          1. Probe both providers (parallel, 3s max, cached 60s)
-          2. If only one is healthy → use that one
-          3. If both healthy → check past success rates for tiebreak
-          4. If both healthy + no history → use Kie.ai (cheaper)
-          5. If neither healthy → use Kie.ai (default, might recover)
+          1. WAVESPEED_PRIMARY (default) → WaveSpeed whenever it is healthy
+             and its breaker lets the request through
+          2. Otherwise drop unhealthy providers and ones whose breaker is
+             open, and take the lowest cost/latency score
+          3. If nothing is left → Kie.ai (cheaper, might recover)
 
         Only applies to "veo" family. Other families always use Kie.ai.
         """
@@ -464,66 +437,38 @@ class ProviderRouter:
         if not os.getenv("WAVESPEED_API_KEY", ""):
             return "kie"
 
+        routing = provider_routing.routing
+        health = self.probe_health(model_family)
+
         # When WAVESPEED_PRIMARY=true, route Veo work to Wavespeed first
         # whenever it's healthy. Kie remains the fallback. This is the
         # production preference because Kie's Veo 3.1 endpoints have been
         # unreliable (frequent 500s mid-render). Set WAVESPEED_PRIMARY=false
-        # to revert to the cost-optimized Kie-first behavior.
+        # to revert to the cost-optimized score-based behavior.
         wavespeed_primary = (os.getenv("USE_WAVESPEED_PRIMARY") or os.getenv("WAVESPEED_PRIMARY") or "true").lower() == "true"
-        if wavespeed_primary:
-            health = self.probe_health(model_family)
-            ws_healthy, _ = health.get("wavespeed", (False, 0))
-            if ws_healthy:
-                print(f"      [Router] ──────────────────────────────────────────")
-                print(f"      [Router] WAVESPEED_PRIMARY=true → routing to WaveSpeed")
-                print(f"      [Router] ──────────────────────────────────────────")
-                return "wavespeed"
-            # Wavespeed down — fall through to existing Kie/probe logic.
-
-        # ── Step 1: Pre-flight health probes ──
-        health = self.probe_health(model_family)
-        kie_healthy, kie_ms = health.get("kie", (True, 0))
-        ws_healthy, ws_ms = health.get("wavespeed", (False, 0))
-
-        # ── Step 2: Get past generation success rates ──
-        kie_rate, kie_count = self.get_success_rate("kie_veo")
-        ws_rate, ws_count = self.get_success_rate("wavespeed_veo")
-
-        # ── Step 3: Make routing decision ──
-        # Kie.ai is 4x cheaper ($0.30 vs $1.20) so it stays PRIMARY.
-        # BUT we use a fast-fail timeout (3 min) on the first attempt.
-        # If Kie.ai doesn't complete in 3 min → bail to WaveSpeed.
-        # After a failure, the circuit breaker routes directly to WaveSpeed
-        # for the next 10 minutes (no 3-min probe overhead).
-
-        if kie_healthy and not ws_healthy:
+        if wavespeed_primary and health["wavespeed"][0] and routing.allow("wavespeed", model_family):
+            print(f"      [Router] WAVESPEED_PRIMARY=true → routing to WaveSpeed")
+            return "wavespeed"
+
+        choice, reason = None, None
+        ranked = routing.rank(["kie", "wavespeed"], model_family)
+        for provider, score, r in ranked:
+            if not health[provider][0]:
+                continue
+            if routing.allow(provider, model_family):
+                choice = provider
+                reason = f"best score ${score:.2f}/clip"
+                break
+        if choice is None:
             choice = "kie"
-            reason = "WaveSpeed unavailable"
-        elif ws_healthy and not kie_healthy:
-            choice = "wavespeed"
-            reason = "Kie.ai server unreachable"
-        elif not kie_healthy and not ws_healthy:
-            choice = "kie"  # Both down, try the cheaper one
-            reason = "both unhealthy — trying Kie.ai (cheaper)"
-        else:
-            # Both servers respond — use circuit breaker for routing
-            if kie_count >= 2 and kie_rate < 0.5:
-                # Kie.ai recently failed → skip it, go straight to WaveSpeed
-                choice = "wavespeed"
-                reason = f"Kie.ai failing ({kie_rate:.0%} of {kie_count}) → WaveSpeed"
-            elif ws_count >= 2 and ws_rate < 0.5 and kie_rate > ws_rate:
-                choice = "kie"
-                reason = f"WaveSpeed degraded ({ws_rate:.0%}), Kie.ai better ({kie_rate:.0%})"
-            else:
-                choice = "kie"  # Default — 4x cheaper
-                reason = "default (Kie.ai primary, $0.30/clip)"
+            reason = "no healthy provider with a closed breaker — trying Kie.ai (cheaper)"
 
         print(f"      [Router] ──────────────────────────────────────────")
-        print(f"      [Router] Health probe: kie={'✅' if kie_healthy else '❌'} ({kie_ms:.0f}ms) | "
-              f"ws={'✅' if ws_healthy else '❌'} ({ws_ms:.0f}ms)")
-        print(f"      [Router] History:      kie={kie_rate:.0%} ({kie_count}) | "
-              f"ws={ws_rate:.0%} ({ws_count})")
-        print(f"      [Router] Decision:     → {choice.upper()} ({reason})")
+        print(f"      [Router] Health:   " + " | ".join(
+            f"{p}={'✅' if health[p][0] else '❌'} ({health[p][1]:.0f}ms)" for p in ("kie", "wavespeed")))
+        print(f"      [Router] Scores:   " + " | ".join(
+            f"{p}=${sc:.2f} [{routing.effective_breaker(r, time.time())}]" for p, sc, r in ranked))
+        print(f"      [Router] Decision: → {choice.upper()} ({reason})")
         print(f"      [Router] ──────────────────────────────────────────")
         return choice
 
@@ -534,18 +479,16 @@ class ProviderRouter:
         return f"kie={kie_rate:.0%}({kie_n}) ws={ws_rate:.0%}({ws_n})"
 
 
-# Global singleton — shared across all generation calls in this process
-provider_router = ProviderRouter(probe_timeout=3.0, cache_ttl=60, window_seconds=600)
+# Global singleton — state is shared fleet-wide through provider_routing
+provider_router = ProviderRouter(probe_timeout=3.0)
 
 
 def kie_veo_reliable() -> bool:
-    """False when Kie Veo is in a known outage or the circuit breaker tripped."""
+    """False when Kie Veo is in a known outage or its breaker is open and
+    still cooling down (half-open lets the next Kie request be the trial)."""
     if os.getenv("UGC_FORCE_WAVESPEED", "").strip().lower() == "true":
         return False
-    rate, count = provider_router.get_success_rate("kie_veo")
-    if count >= 2 and rate < 0.5:
-        return False
-    return True
+    return provider_router.is_available("kie_veo")
 
 
 def _ugc_wavespeed_primary_enabled(*, ugc: bool = False) -> bool:
@@ -644,7 +587,7 @@ def generate_video_wavespeed(prompt, reference_image_url=None, duration=8, aspec
 
     print(f"      [WaveSpeed] Submitting to {endpoint}...")
     try:
-        resp = requests.post(endpoint, headers=ws_headers, json=payload, timeout=60)
+        resp = requests.post(with_wavespeed_webhook(endpoint), headers=ws_headers, json=payload, timeout=60)
     except Exception as e:
         raise RuntimeError(f"WaveSpeed network error: {str(e)}")
 
@@ -663,18 +606,17 @@ def generate_video_wavespeed(prompt, reference_image_url=None, duration=8, aspec
 
     print(f"      [WaveSpeed] Task: {prediction_id}")
 
-    # ── Poll for completion ──
-    for i in range(120):  # 20 minutes max
-        wait_secs = 10 if i < 30 else 20
-        time.sleep(wait_secs)
+    # ── Wait for completion (shared tracker; webhook wakes it early) ──
+    started = time.time()
 
+    def _poll(pred_id):
+        elapsed = int(time.time() - started)
         try:
             poll_resp = requests.get(status_url, headers=ws_headers, timeout=30)
             poll_data = poll_resp.json()
         except Exception as poll_err:
-            elapsed = sum(10 if j < 30 else 20 for j in range(i + 1))
             print(f"      [WaveSpeed] Poll warning at ~{elapsed}s: {poll_err}")
-            continue
+            return None
 
         poll_inner = poll_data.get("data", poll_data)
         status = poll_inner.get("status", "processing").lower()
@@ -683,19 +625,20 @@ def generate_video_wavespeed(prompt, reference_image_url=None, duration=8, aspec
             outputs = poll_inner.get("outputs", [])
             if outputs:
                 video_url = outputs[0]
-                elapsed = sum(10 if j < 30 else 20 for j in range(i + 1))
                 print(f"      [WaveSpeed] ✅ Complete after ~{elapsed}s: {video_url[:80]}...")
-                return {"taskId": prediction_id, "videoUrl": video_url}
+                return {"taskId": pred_id, "videoUrl": video_url}
             print(f"      [WaveSpeed] Completed but no outputs — retrying poll...")
         elif status == "failed":
             error_msg = poll_inner.get("error", "Unknown WaveSpeed error")
             raise RuntimeError(f"WaveSpeed generation failed: {error_msg}")
         else:
-            if i % 6 == 0:
-                elapsed = sum(10 if j < 30 else 20 for j in range(i + 1))
-                print(f"      [WaveSpeed] ⏳ Generating... (~{elapsed}s, status={status})")
+            print(f"      [WaveSpeed] ⏳ Generating... (~{elapsed}s, status={status})")
+        return None
 
-    raise RuntimeError("WaveSpeed Veo 3.1 generation timed out after 20 minutes")
+    try:
+        return task_tracker.wait(prediction_id, _poll, timeout=1200, label="WaveSpeed Veo 3.1")
+    except TimeoutError:
+        raise RuntimeError("WaveSpeed Veo 3.1 generation timed out after 20 minutes")
 
 
 def generate_video_with_retry(prompt, reference_image_url=None, model_api=None, first_frame_url=None, return_last_frame=False, duration=12, max_retries=3, kling_elements=None, multi_prompt=None, aspect_ratio=None, force_kie: bool = False, seed=None, ugc: bool = False):
@@ -742,12 +685,13 @@ def generate_video_with_retry(prompt, reference_image_url=None, model_api=None,
     if ugc and family == "veo" and _ugc_wavespeed_primary_enabled(ugc=True):
         try:
             print("      [Router] UGC → trying WaveSpeed primary...")
+            ws_started = time.time()
             result = generate_video_wavespeed(
                 prompt, reference_image_url, duration,
                 aspect_ratio=aspect_ratio or "9:16",
                 seed=seed,
             )
-            provider_router.record("wavespeed_veo", True)
+            provider_router.record("wavespeed_veo", True, time.time() - ws_started)
             return result
         except RuntimeError as ws_err:
             provider_router.record("wavespeed_veo", False)
@@ -772,8 +716,48 @@ def generate_video_with_retry(prompt, reference_image_url=None, model_api=None,
     if has_wavespeed and not effective_force_kie:
         providers_to_try.append(secondary)
 
+    # Opt-in hedging: give the primary a head start, then race the alternate
+    # provider against it (see provider_hedging.py for the spend caps).
+    if (len(providers_to_try) == 2 and provider_hedging.enabled()
+            and provider_router.is_available(f"{secondary}_veo")
+            and provider_hedging.can_hedge(secondary)):
+        def _send(provider, kie_timeout):
+            if provider == "kie":
+                print(f"      [Router] → Sending job to Kie.ai (hedged, {kie_timeout // 60}-min)...")
+                return generate_video(
+                    prompt, reference_image_url, model_api,
+                    first_frame_url, return_last_frame, duration,
+                    kling_elements=kling_elements,
+                    max_poll_seconds=kie_timeout,
+                    aspect_ratio=aspect_ratio,
+                )
+            print(f"      [Router] → Sending job to WaveSpeed (hedged, $1.20/clip)...")
+            return generate_video_wavespeed(
+                prompt, reference_image_url, duration,
+                aspect_ratio=aspect_ratio or "9:16",
+                seed=seed,
+            )
+
+        def _should_fallback(err):
+            error_str = str(err).lower()
+            return any(p in error_str for p in RETRIABLE_PATTERNS) or any(
+                p in error_str for p in ("401", "unauthorized", "403", "invalid api key", "unavailable")
+            )
+
+        # The hedge replaces Kie's 3-min fast-fail, so Kie gets the 10-min window.
+        winner, result = provider_hedging.run(
+            primary, lambda: _send(primary, 600),
+            secondary, lambda: _send(secondary, 600),
+            family,
+            record=lambda p, ok, secs: provider_router.record(f"{p}_veo", ok, secs),
+            should_fallback=_should_fallback,
+        )
+        print(f"      [Router] ✅ {winner} succeeded ({provider_router.status_summary()})")
+        return result
+
     last_error = None
     for provider in providers_to_try:
+        attempt_started = time.time()
         try:
             if provider == "kie":
                 # Fast-fail 3min on primary Kie when WS fallback exists.
@@ -805,8 +789,8 @@ def generate_video_with_retry(prompt, reference_image_url=None, model_api=None,
                     seed=seed,
                 )
 
-            # ✅ Success — record and return
-            provider_router.record(f"{provider}_veo", True)
+            # ✅ Success — record (with completion time) and return
+            provider_router.record(f"{provider}_veo", True, time.time() - attempt_started)
             print(f"      [Router] ✅ {provider} succeeded ({provider_router.status_summary()})")
             return result
 
@@ -872,6 +856,9 @@ def extend_video(task_id, prompt, seed=None, model="veo-3.1-fast"):
     }
     if seed is not None:
         payload["seeds"] = seed
+    callback_url = kie_callback_url(required=False)
+    if callback_url:
+        payload["callBackUrl"] = callback_url
 
     print(f"      [EXTEND] Payload: taskId={task_id[:30]}..., model={model_api}, prompt={prompt[:60]}...")
     try:
@@ -895,25 +882,26 @@ def extend_video(task_id, prompt, seed=None, model="veo-3.1-fast"):
     new_task_id = result["data"]["taskId"]
     print(f"      [EXTEND] New task: {new_task_id[:30]}...")
 
-    # Poll for completion -- mirrors generate_video's Veo polling loop exactly
-    for i in range(120):  # 20 minutes max
-        time.sleep(10)
+    # Wait for completion -- mirrors generate_video's Veo polling exactly
+    started = time.time()
 
+    def _poll(task_id):
+        elapsed = int(time.time() - started)
         try:
             resp = requests.get(
                 poll_endpoint,
                 headers=config.KIE_HEADERS,
-                params={"taskId": new_task_id},
+                params={"taskId": task_id},
                 timeout=30,
             )
             result = resp.json()
         except Exception as poll_err:
             print(f"      [EXTEND] Poll warning: {poll_err}")
-            continue
+            return None
 
         if result.get("code") != 200:
-            print(f"      [EXTEND] Poll error: {result.get('msg', '')} ({i * 10}s)")
-            continue
+            print(f"      [EXTEND] Poll error: {result.get('msg', '')} ({elapsed}s)")
+            return None
 
         data = result.get("data", {})
         flag = data.get("successFlag", 0)
@@ -930,22 +918,25 @@ def extend_video(task_id, prompt, seed=None, model="veo-3.1-fast"):
             if isinstance(result_urls, str):
                 result_urls = json.loads(result_urls)
             if result_urls:
-                print(f"      [EXTEND] Extension complete! ({i * 10}s)")
+                print(f"      [EXTEND] Extension complete! ({elapsed}s)")
                 return {
-                    "taskId": new_task_id,
+                    "taskId": task_id,
                     "videoUrl": result_urls[0],
                     "extend_output_mode": "segment",
                 }
-            print(f"      [EXTEND] Success but no resultUrls ({i * 10}s)")
-            continue
+            print(f"      [EXTEND] Success but no resultUrls ({elapsed}s)")
         elif flag in (2, 3):
             error_msg = data.get("failMsg", data.get("statusDescription", "Unknown extend error"))
             raise RuntimeError(f"Veo Extend failed: {error_msg}")
         else:
             status_desc = data.get("statusDescription", "extending")
-            print(f"      [EXTEND] {status_desc}... ({i * 10}s)")
+            print(f"      [EXTEND] {status_desc}... ({elapsed}s)")
+        return None
 
-    raise RuntimeError("Veo Extend generation timed out after 20 minutes")
+    try:
+        return task_tracker.wait(new_task_id, _poll, timeout=1200, label="Veo Extend")
+    except TimeoutError:
+        raise RuntimeError("Veo Extend generation timed out after 20 minutes")
 
 
 def _lean_extend_prompt(structured_prompt: str) -> str:
@@ -1042,7 +1033,7 @@ def _extend_video_wavespeed(video_url: str, prompt: str, seed=None) -> dict:
         payload["seed"] = int(seed)
 
     print(f"      [WaveSpeed] Submitting extend to {endpoint}")
-    resp = requests.post(endpoint, headers=headers, json=payload, timeout=60)
+    resp = requests.post(with_wavespeed_webhook(endpoint), headers=headers, json=payload, timeout=60)
     if resp.status_code != 200:
         raise RuntimeError(f"WaveSpeed extend submit error ({resp.status_code}): {resp.text[:300]}")
     api = resp.json()
@@ -1053,14 +1044,13 @@ def _extend_video_wavespeed(video_url: str, prompt: str, seed=None) -> dict:
     status_url = data.get("urls", {}).get("get") or f"https://api.wavespeed.ai/api/v3/predictions/{pred_id}/result"
     print(f"      [WaveSpeed] Extend task: {pred_id}")
 
-    for i in range(120):  # 20 minutes max
-        time.sleep(10 if i < 30 else 20)
+    def _poll(pred_id):
         try:
             r = requests.get(status_url, headers=headers, timeout=20)
             j = r.json().get("data", r.json())
         except Exception as e:
             print(f"      [WaveSpeed] Poll error: {e}")
-            continue
+            return None
         status = (j.get("status") or "").lower()
         if status in ("completed", "succeeded", "success"):
             outputs = j.get("outputs") or []
@@ -1075,7 +1065,12 @@ def _extend_video_wavespeed(video_url: str, prompt: str, seed=None) -> dict:
             raise RuntimeError("WaveSpeed extend completed with no output URL")
         if status in ("failed", "error", "canceled"):
             raise RuntimeError(f"WaveSpeed extend failed: {j.get('error') or j}")
-    raise RuntimeError("WaveSpeed extend timed out after 20 min")
+        return None
+
+    try:
+        return task_tracker.wait(pred_id, _poll, timeout=1200, label="WaveSpeed extend")
+    except TimeoutError:
+        raise RuntimeError("WaveSpeed extend timed out after 20 min")
 
 
 def _extract_last_frame_to_supabase(video_path, job_id: str, scene_idx: int) -> str:
@@ -1269,7 +1264,7 @@ def generate_lipsync_video(image_url, audio_url, prompt="Lip-syncing video"):
             "prompt": prompt or "Lip-syncing video",
             "resolution": config.LIPSYNC_QUALITY
         },
-        "callBackUrl": "https://example.com/callback",
+        "callBackUrl": kie_callback_url(),
     }
 
     print(f"   👄 Submitting Lip-Sync task (InfiniteTalk)...")
@@ -1288,30 +1283,29 @@ def generate_lipsync_video(image_url, audio_url, prompt="Lip-syncing video"):
     task_id = result["data"]["taskId"]
     print(f"      Task: {task_id}")
 
-    # Poll for completion with adaptive backoff
-    for i in range(120): # 20 minutes max (InfiniteTalk can be slow)
-        # Adaptive sleep: start frequent, then back off to prevent socket timeouts
-        wait_time = 10 if i < 30 else 20
-        time.sleep(wait_time)
-        
+    # Wait for completion — InfiniteTalk can be slow, the tracker backs off adaptively
+    started = time.time()
+
+    def _poll(task_id):
+        elapsed = int(time.time() - started)
         try:
             resp = requests.get(endpoints["poll"], headers=config.KIE_HEADERS, params={"taskId": task_id}, timeout=30)
             result = resp.json()
         except Exception as poll_err:
             print(f"      ⚠️ Poll network warning: {poll_err}")
-            continue
-        
+            return None
+
         if result.get("code") != 200:
             print(f"      ⚠️ API warning: {result.get('msg', 'Unknown error')}")
-            continue
-            
+            return None
+
         data = result.get("data", {})
         state = data.get("state", "processing").lower()
 
         if state == "success":
             video_url = _extract_video_url(data)
             if video_url:
-                print(f"      ✨ Lip-Sync complete! ({i * 10}s)")
+                print(f"      ✨ Lip-Sync complete! ({elapsed}s)")
                 return video_url
         elif state == "fail":
             fail_msg = data.get("failMsg", "Unknown error")
@@ -1319,10 +1313,14 @@ def generate_lipsync_video(image_url, audio_url, prompt="Lip-syncing video"):
             if "audio file is unavailable" in fail_msg.lower():
                 fail_msg += " (Try verifying the direct download link format)"
             raise RuntimeError(f"Lip-Sync failed: {fail_msg}")
-        
-        print(f"      ⏳ Syncing... ({i * wait_time}s)")
 
-    raise RuntimeError("Lip-Sync generation timed out after 20 minutes")
+        print(f"      ⏳ Syncing... ({elapsed}s)")
+        return None
+
+    try:
+        return task_tracker.wait(task_id, _poll, timeout=1200, label="Lip-Sync")
+    except TimeoutError:
+        raise RuntimeError("Lip-Sync generation timed out after 20 minutes")
 
 
 def _extract_video_url(data):
@@ -1351,33 +1349,40 @@ def _extract_video_url(data):
 
 
 def download_video(url, output_path, max_retries=5):
-    """Download a video from URL to local file with retries on transient connection errors like 524."""
+    """Download a video from URL to local file with retries on transient connection errors like 524.
+
+    Served from the shared media cache (media_cache.py) when the same URL was
+    fetched before — app clips, music beds and reference media repeat across jobs.
+    """
     import time
     print(f"   📥 Downloading video...")
     
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    for attempt in range(max_retries):
-        try:
-            resp = requests.get(url, stream=True, timeout=60)
-            resp.raise_for_status()
+    def _fetch(src_url, dest):
+        for attempt in range(max_retries):
+            try:
+                resp = requests.get(src_url, stream=True, timeout=60)
+                resp.raise_for_status()
+
+                with open(dest, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=8192):
+                        if chunk:
+                            f.write(chunk)
+                return
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    wait_time = (2 ** attempt) * 5
+                    print(f"      ⚠️ Download failed ({str(e)[:150]}). Retrying in {wait_time}s... (Attempt {attempt + 2}/{max_retries})")
+                    time.sleep(wait_time)
+                else:
+                    raise RuntimeError(f"Failed to download video after {max_retries} attempts: {e}")
 
-            with open(output_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-
-            size_mb = output_path.stat().st_size / (1024 * 1024)
-            print(f"      💾 Saved: {output_path} ({size_mb:.1f} MB)")
-            return str(output_path)
-        except Exception as e:
-            if attempt < max_retries - 1:
-                wait_time = (2 ** attempt) * 5
-                print(f"      ⚠️ Download failed ({str(e)[:150]}). Retrying in {wait_time}s... (Attempt {attempt + 2}/{max_retries})")
-                time.sleep(wait_time)
-            else:
-                raise RuntimeError(f"Failed to download video after {max_retries} attempts: {e}")
+    media_cache.fetch(url, output_path, downloader=_fetch)
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    print(f"      💾 Saved: {output_path} ({size_mb:.1f} MB)")
+    return str(output_path)
 
 
 def generate_all_scenes(scenes, project_name="video", record_id=None, status_callback=None):
@@ -1396,10 +1401,12 @@ def generate_all_scenes(scenes, project_name="video", record_id=None, status_cal
     output_dir = config.TEMP_DIR / project_name
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    video_paths = []
-    total_cost = 0
+    import scene_scheduler
+
+    if status_callback:
+        status_callback = scene_scheduler.serialized(status_callback)
 
-    for i, scene in enumerate(scenes, 1):
+    def _render_scene(i, scene):
         # Update status before starting scene
         if status_callback and record_id:
             scene_status = f"Gen: {scene['name'].title()} ({i}/{len(scenes)})"
@@ -1410,6 +1417,7 @@ def generate_all_scenes(scenes, project_name="video", record_id=None, status_cal
         print(f"{'='*50}")
 
         output_path = output_dir / f"scene_{i}_{scene['name']}.mp4"
+        clip_cost = 0
 
         try:
             if scene["type"] == "veo":
@@ -1421,8 +1429,7 @@ def generate_all_scenes(scenes, project_name="video", record_id=None, status_cal
                 video_url = result["videoUrl"]
                 download_video(video_url, output_path)
                 clip_cost = 0.28 if _get_model_family() == "seedance" else 0.30
-                total_cost += clip_cost
-                
+
                 # Log the generated video asset
                 import airtable_client
                 airtable_client.log_asset(
@@ -1440,7 +1447,7 @@ def generate_all_scenes(scenes, project_name="video", record_id=None, status_cal
                 # Download pre-recorded footage
                 print(f"   📱 Using pre-recorded app clip")
                 download_video(scene["video_url"], output_path)
-                
+
                 # Log the app clip
                 import airtable_client
                 airtable_client.log_asset(
@@ -1453,11 +1460,11 @@ def generate_all_scenes(scenes, project_name="video", record_id=None, status_cal
                 )
 
             scene["path"] = str(output_path)
-            video_paths.append(scene)
+            return clip_cost
 
         except Exception as e:
             print(f"   ❌ Error in scene {i} ({scene['name']}): {e}")
-            
+
             # Log failure to Generated Assets
             import airtable_client
             airtable_client.log_asset(
@@ -1468,9 +1475,29 @@ def generate_all_scenes(scenes, project_name="video", record_id=None, status_cal
                 status="Failed",
                 error_msg=str(e)
             )
-            
-            # Fail fast — an incomplete video is not helpful
-            raise RuntimeError(f"Scene {i} ({scene['name']}) generation failed: {e}")
+            raise
+
+    # Scenes are independent here, so render them concurrently (capped per
+    # resource class by the scheduler) and collect in scene order.
+    video_paths = []
+    total_cost = 0
+    with scene_scheduler.SceneScheduler() as sched:
+        keys = [
+            sched.add(
+                f"scene_{i}",
+                lambda i=i, scene=scene: _render_scene(i, scene),
+                resource="video" if scene["type"] == "veo" else "download",
+            )
+            for i, scene in enumerate(scenes, 1)
+        ]
+        for i, (key, scene) in enumerate(zip(keys, scenes), 1):
+            try:
+                total_cost += sched.result(key)
+            except Exception as e:
+                # Fail fast — an incomplete video is not helpful
+                sched.cancel()
+                raise RuntimeError(f"Scene {i} ({scene['name']}) generation failed: {e}")
+            video_paths.append(scene)
 
     print(f"\n✅ All {len(scenes)} scenes ready! Cost: ~${total_cost:.2f}")
     return video_paths
@@ -1495,7 +1522,7 @@ def generate_music(prompt="upbeat, trendy, short-form social media background mu
         "customMode": False,
         "instrumental": instrumental,
         "model": "V4",
-        "callBackUrl": "https://example.com/callback",
+        "callBackUrl": kie_callback_url(),
     }
 
     resp = requests.post(
@@ -1512,18 +1539,25 @@ def generate_music(prompt="upbeat, trendy, short-form social media background mu
     task_id = result["data"]["taskId"]
     print(f"   Task: {task_id[:20]}...")
 
-    for i in range(48):  # 8 minutes max
-        time.sleep(10)
-        resp = requests.get(
-            "https://api.kie.ai/api/v1/generate/record-info",
-            headers=config.KIE_HEADERS,
-            params={"taskId": task_id},
-        )
-        result = resp.json()
+    started = time.time()
+
+    def _poll(task_id):
+        elapsed = int(time.time() - started)
+        try:
+            resp = requests.get(
+                "https://api.kie.ai/api/v1/generate/record-info",
+                headers=config.KIE_HEADERS,
+                params={"taskId": task_id},
+                timeout=30,
+            )
+            result = resp.json()
+        except Exception as poll_err:
+            print(f"   ⚠️ Poll network warning: {poll_err}")
+            return None
 
         if result.get("code") != 200:
-            print(f"   Waiting... ({i * 10}s)")
-            continue
+            print(f"   Waiting... ({elapsed}s)")
+            return None
 
         status = result["data"]["status"]
 
@@ -1543,12 +1577,17 @@ def generate_music(prompt="upbeat, trendy, short-form social media background mu
             except (KeyError, IndexError, TypeError) as parse_err:
                 print(f"   ⚠️ Error parsing music response: {parse_err}")
         elif status in ["CREATE_TASK_FAILED", "GENERATE_AUDIO_FAILED"]:
-            print("   ⚠️ Music generation failed")
-            return None
+            raise RuntimeError("Music generation failed")
 
-        print(f"   ⏳ Generating... ({i * 10}s)")
+        print(f"   ⏳ Generating... ({elapsed}s)")
+        return None
 
-    print("   ⚠️ Music generation timed out")
+    try:
+        return task_tracker.wait(task_id, _poll, timeout=480, label="Suno music")
+    except TimeoutError:
+        print("   ⚠️ Music generation timed out")
+    except Exception as e:
+        print(f"   ⚠️ {e}")
     return None
 
 
@@ -1613,7 +1652,7 @@ def _generate_composite_wavespeed(scene: dict, aspect_ratio: str = "9:16") -> st
     }
     print(f"      [WaveSpeed] Submitting composite to {endpoint} (aspect={ar}, refs={len(images)})")
 
-    resp = requests.post(endpoint, headers=headers, json=payload, timeout=60)
+    resp = requests.post(with_wavespeed_webhook(endpoint), headers=headers, json=payload, timeout=60)
     if resp.status_code != 200:
         raise RuntimeError(f"WaveSpeed nano-banana submit error ({resp.status_code}): {resp.text[:300]}")
     api = resp.json()
@@ -1624,26 +1663,32 @@ def _generate_composite_wavespeed(scene: dict, aspect_ratio: str = "9:16") -> st
     status_url = data.get("urls", {}).get("get") or f"https://api.wavespeed.ai/api/v3/predictions/{pred_id}/result"
     print(f"      [WaveSpeed] Composite task: {pred_id}")
 
-    # Poll up to 5 minutes
-    for i in range(30):
-        time.sleep(10)
+    # Wait up to 5 minutes
+    started = time.time()
+
+    def _poll(pred_id):
         try:
             r = requests.get(status_url, headers=headers, timeout=20)
             j = r.json().get("data", r.json())
         except Exception as e:
             print(f"      [WaveSpeed] Poll error: {e}")
-            continue
+            return None
         status = (j.get("status") or "").lower()
         if status in ("completed", "succeeded", "success"):
             outputs = j.get("outputs") or []
             url = outputs[0] if outputs else None
             if url:
-                print(f"      ✨ Composite ready via WaveSpeed ({(i + 1) * 10}s)")
+                print(f"      ✨ Composite ready via WaveSpeed ({int(time.time() - started)}s)")
                 return url
             raise RuntimeError("WaveSpeed nano-banana completed but no output URL")
         if status in ("failed", "error", "canceled"):
             raise RuntimeError(f"WaveSpeed nano-banana failed: {j.get('error') or j}")
-    raise RuntimeError("WaveSpeed nano-banana timed out after 5 min")
+        return None
+
+    try:
+        return task_tracker.wait(pred_id, _poll, timeout=300, label="WaveSpeed nano-banana")
+    except TimeoutError:
+        raise RuntimeError("WaveSpeed nano-banana timed out after 5 min")
 
 
 def generate_composite_image(scene: dict, influencer: dict, product: dict, seed: int = None, aspect_ratio: str = "9:16") -> str:
@@ -1692,7 +1737,8 @@ def generate_composite_image(scene: dict, influencer: dict, product: dict, seed:
             ],
             "aspect_ratio": aspect_ratio,
             "resolution": "2K"
-        }
+        },
+        "callBackUrl": kie_callback_url(),
     }
     
     # if seed is not None:
@@ -1712,22 +1758,22 @@ def generate_composite_image(scene: dict, influencer: dict, product: dict, seed:
     task_id = result["data"]["taskId"]
     print(f"      Task: {task_id}")
 
-    # Poll for completion
+    # Wait for completion
     poll_endpoint = f"{config.KIE_API_URL}/api/v1/jobs/recordInfo"
-    
-    for i in range(60):  # 10 minutes max
-        time.sleep(10)
-        
+    started = time.time()
+
+    def _poll(task_id):
+        elapsed = int(time.time() - started)
         try:
             resp = requests.get(poll_endpoint, headers=config.KIE_HEADERS, params={"taskId": task_id}, timeout=30)
             result = resp.json()
         except Exception as e:
             print(f"      ⚠️ Poll error: {e}")
-            continue
+            return None
 
         if result.get("code") != 200:
             print(f"      ⚠️ API warning: {result.get('msg', 'Unknown')}")
-            continue
+            return None
 
         data = result.get("data", {})
         state = data.get("state", "processing").lower()
@@ -1739,17 +1785,21 @@ def generate_composite_image(scene: dict, influencer: dict, product: dict, seed:
                 result_json = data.get("resultJson", "{}")
                 if isinstance(result_json, str): result_json = json.loads(result_json)
                 video_url = result_json.get("resultUrls", [None])[0]
-            
+
             if video_url:
-                print(f"      ✨ Composite Image ready! ({i * 10}s)")
+                print(f"      ✨ Composite Image ready! ({elapsed}s)")
                 return video_url
         elif state == "fail":
             fail_msg = data.get("failMsg", "Unknown error")
             raise RuntimeError(f"Nano Banana generation failed: {fail_msg}")
-            
-        print(f"      ⏳ Composing... ({i * 10}s)")
 
-    raise RuntimeError("Nano Banana generation timed out")
+        print(f"      ⏳ Composing... ({elapsed}s)")
+        return None
+
+    try:
+        return task_tracker.wait(task_id, _poll, timeout=600, label="Nano Banana composite")
+    except TimeoutError:
+        raise RuntimeError("Nano Banana generation timed out")
 
 
 def animate_scenes_from_composite_parallel(
@@ -1890,7 +1940,8 @@ def generate_cinematic_product_image(prompt: str, product_image_url: str, influe
             "image_input": image_input,
             "aspect_ratio": "9:16",
             "resolution": "2K"
-        }
+        },
+        "callBackUrl": kie_callback_url(),
     }
     if seed:
         payload["input"]["seed"] = seed
@@ -1908,19 +1959,21 @@ def generate_cinematic_product_image(prompt: str, product_image_url: str, influe
     task_id = result["data"]["taskId"]
     print(f"      Task: {task_id}")
 
-    # Poll for completion
+    # Wait for completion
     poll_endpoint = f"{config.KIE_API_URL}/api/v1/jobs/recordInfo"
-    for i in range(60):  # 10 minutes max
-        time.sleep(10)
+    started = time.time()
+
+    def _poll(task_id):
+        elapsed = int(time.time() - started)
         try:
             resp = requests.get(poll_endpoint, headers=config.KIE_HEADERS, params={"taskId": task_id}, timeout=30)
             result = resp.json()
         except Exception as e:
             print(f"      Poll error: {e}")
-            continue
+            return None
 
         if result.get("code") != 200:
-            continue
+            return None
 
         data = result.get("data", {})
         state = data.get("state", "processing").lower()
@@ -1931,15 +1984,19 @@ def generate_cinematic_product_image(prompt: str, product_image_url: str, influe
                 result_json = json.loads(result_json)
             image_url = result_json.get("resultUrls", [None])[0]
             if image_url:
-                print(f"      Cinematic image ready! ({i * 10}s)")
+                print(f"      Cinematic image ready! ({elapsed}s)")
                 return image_url
         elif state == "fail":
             fail_msg = data.get("failMsg", "Unknown error")
             raise RuntimeError(f"Nano Banana generation failed: {fail_msg}")
 
-        print(f"      Composing cinematic image... ({i * 10}s)")
+        print(f"      Composing cinematic image... ({elapsed}s)")
+        return None
 
-    raise RuntimeError("Cinematic image generation timed out")
+    try:
+        return task_tracker.wait(task_id, _poll, timeout=600, label="Cinematic still")
+    except TimeoutError:
+        raise RuntimeError("Cinematic image generation timed out")
 
 
 def animate_cinematic_still(image_url: str, shot_type: str) -> str:
@@ -0,0 +1,371 @@
+"""
+Media Cache — content-addressed on-disk cache for downloaded media.
+
+Every job re-downloads the same influencer reference images, app clips,
+product images and music beds; a /jobs/bulk campaign can fetch one asset
+dozens of times. All download paths (generate_scenes.download_video,
+clone_engine._download_file, ugc_backend's _download_to_path, the worker's
+_upload_url_to_storage and creative-os persist_media.download_url_to_file)
+go through this cache instead.
+
+Layout under MEDIA_CACHE_DIR:
+  blobs/<aa>/<sha256>   file contents, named by their content hash
+  urls/<aa>/<sha256>    URL index entry: the content hash the URL resolved to
+
+Keying by URL *and* content hash means two URLs serving the same bytes (e.g.
+a provider URL later mirrored to Supabase) share one blob, and a URL index
+entry older than MEDIA_CACHE_URL_TTL_SECONDS is re-fetched so overwritten
+storage objects are eventually picked up.
+
+  - Atomic writes: blobs and index entries are written to a temp file and
+    os.replace()d into place, so a crash or a concurrent process never sees
+    a partial file.
+  - Single-flight: concurrent requests for the same URL in one process share
+    one download; followers wait for the leader's result.
+  - LRU budget: hits touch the blob's mtime, and once the cache exceeds
+    MEDIA_CACHE_MAX_MB the least recently used blobs are evicted.
+  - Metrics: `stats()` returns hit/miss/dedup/eviction counters.
+
+`get(key, dest)` / `put(key, path)` store derived artifacts under arbitrary
+string keys (e.g. assemble_video's normalized-clip renditions, which use a
+separate MediaCache instance with its own budget and `max_age`).
+
+Config:
+  MEDIA_CACHE_ENABLED            (default true)
+  MEDIA_CACHE_DIR                (default <tmp>/ugc_media_cache)
+  MEDIA_CACHE_MAX_MB             (default 2048)
+  MEDIA_CACHE_URL_TTL_SECONDS    (default 7 days)
+"""
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+
+
+_CHUNK = 1024 * 1024
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_sha256(path) -> str:
+    """Hex sha256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _default_downloader(url: str, dest: Path) -> None:
+    import requests
+    resp = requests.get(url, stream=True, timeout=120)
+    resp.raise_for_status()
+    with open(dest, "wb") as f:
+        for chunk in resp.iter_content(chunk_size=8192):
+            if chunk:
+                f.write(chunk)
+
+
+class MediaCache:
+    """
+    Process-wide content-addressed cache. Safe to share between threads and
+    between processes pointing at the same directory.
+    """
+
+    def __init__(self, root=None, max_bytes: int = None, url_ttl: float = None, enabled: bool = None,
+                 max_age: float = None, label: str = "media"):
+        self.root = Path(root or os.getenv("MEDIA_CACHE_DIR") or Path(tempfile.gettempdir()) / "ugc_media_cache")
+        self.max_bytes = max_bytes or int(float(os.getenv("MEDIA_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+        self.url_ttl = url_ttl if url_ttl is not None else float(os.getenv("MEDIA_CACHE_URL_TTL_SECONDS", str(7 * 86400)))
+        if enabled is None:
+            enabled = os.getenv("MEDIA_CACHE_ENABLED", "true").lower() != "false"
+        self.enabled = enabled
+        self.max_age = max_age  # evict blobs unused for this many seconds (None = size-only)
+        self.label = label
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._size: int | None = None  # lazily computed total blob bytes
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "dedup_waits": 0,
+            "errors": 0,
+            "evictions": 0,
+            "bytes_served": 0,
+            "bytes_downloaded": 0,
+        }
+
+    # ── Paths ────────────────────────────────────────────────────────────
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def _index_path(self, url: str) -> Path:
+        key = _sha256(url)
+        return self.root / "urls" / key[:2] / key
+
+    @staticmethod
+    def cacheable(url) -> bool:
+        return isinstance(url, str) and url.startswith(("http://", "https://"))
+
+    # ── Lookup / store ───────────────────────────────────────────────────
+
+    def lookup(self, url: str) -> Path | None:
+        """Path of the cached blob for `url`, or None on a miss / stale entry."""
+        index = self._index_path(url)
+        try:
+            if self.url_ttl and time.time() - index.stat().st_mtime > self.url_ttl:
+                return None
+            digest = index.read_text().strip()
+        except (OSError, ValueError):
+            return None
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            return None
+        try:
+            os.utime(blob)  # LRU touch
+        except OSError:
+            pass
+        return blob
+
+    def _store(self, url: str, tmp_file: Path) -> Path:
+        """Move a freshly downloaded temp file into the blob store and index it."""
+        digest = file_sha256(tmp_file)
+        blob = self._blob_path(digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        size = tmp_file.stat().st_size
+        if blob.exists():
+            tmp_file.unlink(missing_ok=True)
+            os.utime(blob)
+            added = 0
+        else:
+            os.replace(tmp_file, blob)
+            added = size
+
+        index = self._index_path(url)
+        index.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_index = tempfile.mkstemp(dir=index.parent, prefix=".idx-")
+        with os.fdopen(fd, "w") as f:
+            f.write(digest)
+        os.replace(tmp_index, index)
+
+        with self._lock:
+            self._counters["bytes_downloaded"] += size
+            if self._size is not None:
+                self._size += added
+        self._evict_if_needed()
+        return blob
+
+    def _download(self, url: str, downloader) -> Path:
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, prefix="dl-")
+        os.close(fd)
+        tmp_file = Path(tmp_name)
+        try:
+            downloader(url, tmp_file)
+            if tmp_file.stat().st_size == 0:
+                raise RuntimeError(f"empty download from {url[:96]}")
+            return self._store(url, tmp_file)
+        finally:
+            tmp_file.unlink(missing_ok=True)
+
+    def _get_blob(self, url: str, downloader) -> Path:
+        """Cached blob for `url`, downloading it (single-flight) on a miss."""
+        blob = self.lookup(url)
+        if blob is not None:
+            with self._lock:
+                self._counters["hits"] += 1
+            return blob
+
+        with self._lock:
+            fut = self._inflight.get(url)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._inflight[url] = fut
+                self._counters["misses"] += 1
+            else:
+                self._counters["dedup_waits"] += 1
+
+        if not leader:
+            return fut.result()
+
+        try:
+            blob = self._download(url, downloader)
+            fut.set_result(blob)
+            return blob
+        except BaseException as e:
+            with self._lock:
+                self._counters["errors"] += 1
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+
+    # ── Public API ───────────────────────────────────────────────────────
+
+    def fetch(self, url: str, dest, downloader=None) -> Path:
+        """
+        Materialize `url` at `dest`, serving it from the cache when possible.
+
+        `downloader(url, path)` performs the actual fetch (with the caller's own
+        retry policy) into a temp path. Non-http URLs and a disabled cache go
+        straight to the downloader.
+        """
+        downloader = downloader or _default_downloader
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if not self.enabled or not self.cacheable(url):
+            downloader(url, dest)
+            return dest
+
+        tmp_dest = dest.with_name(f".{dest.name}.{threading.get_ident()}.part")
+        try:
+            shutil.copyfile(self._get_blob(url, downloader), tmp_dest)
+        except FileNotFoundError:
+            # Blob evicted by another process between lookup and copy.
+            shutil.copyfile(self._get_blob(url, downloader), tmp_dest)
+        os.replace(tmp_dest, dest)
+        with self._lock:
+            self._counters["bytes_served"] += dest.stat().st_size
+        return dest
+
+    def get(self, key: str, dest) -> Path | None:
+        """Copy the artifact stored under `key` to `dest`. Returns None on a miss."""
+        if not self.enabled:
+            return None
+        blob = self.lookup(key)
+        if blob is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dest = dest.with_name(f".{dest.name}.{threading.get_ident()}.part")
+        try:
+            shutil.copyfile(blob, tmp_dest)
+        except FileNotFoundError:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        os.replace(tmp_dest, dest)
+        with self._lock:
+            self._counters["hits"] += 1
+            self._counters["bytes_served"] += dest.stat().st_size
+        return dest
+
+    def put(self, key: str, path) -> Path | None:
+        """Store a copy of the file at `path` under `key`. Failures are logged, not raised."""
+        if not self.enabled:
+            return None
+        try:
+            tmp_dir = self.root / "tmp"
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, prefix="put-")
+            os.close(fd)
+            tmp_file = Path(tmp_name)
+            try:
+                shutil.copyfile(path, tmp_file)
+                return self._store(key, tmp_file)
+            finally:
+                tmp_file.unlink(missing_ok=True)
+        except OSError as e:
+            with self._lock:
+                self._counters["errors"] += 1
+            print(f"   !! [CACHE] Could not store {self.label} artifact: {e}")
+            return None
+
+    def get_bytes(self, url: str, downloader=None) -> bytes:
+        """Contents of `url` as bytes, served from the cache when possible."""
+        downloader = downloader or _default_downloader
+        if not self.enabled or not self.cacheable(url):
+            tmp_dir = Path(tempfile.mkdtemp(prefix="media-"))
+            try:
+                path = tmp_dir / "body"
+                downloader(url, path)
+                return path.read_bytes()
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        data = self._get_blob(url, downloader).read_bytes()
+        with self._lock:
+            self._counters["bytes_served"] += len(data)
+        return data
+
+    # ── Eviction ─────────────────────────────────────────────────────────
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        blobs = self.root / "blobs"
+        if not blobs.exists():
+            return entries
+        for path in blobs.glob("*/*"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict_if_needed(self):
+        now = time.time()
+        with self._lock:
+            age_due = self.max_age is not None and now - self._last_scan > min(self.max_age, 3600)
+            if self._size is not None and self._size <= self.max_bytes and not age_due:
+                return
+            self._last_scan = now
+        entries = self._scan()
+        total = sum(e[1] for e in entries)
+        evicted = 0
+        if self.max_age is not None:
+            fresh = []
+            for entry in entries:
+                if now - entry[0] > self.max_age:
+                    try:
+                        entry[2].unlink()
+                    except OSError:
+                        fresh.append(entry)
+                        continue
+                    total -= entry[1]
+                    evicted += 1
+                else:
+                    fresh.append(entry)
+            entries = fresh
+        if total > self.max_bytes:
+            target = int(self.max_bytes * 0.9)
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+        if evicted:
+            print(f"   [CACHE] Evicted {evicted} {self.label} blob(s); cache now {total / (1024 * 1024):.0f} MB")
+        with self._lock:
+            self._size = total
+            self._counters["evictions"] += evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            size = self._size
+        lookups = counters["hits"] + counters["misses"] + counters["dedup_waits"]
+        counters["hit_rate"] = round((counters["hits"] + counters["dedup_waits"]) / lookups, 3) if lookups else None
+        counters["size_mb"] = round(size / (1024 * 1024), 1) if size is not None else None
+        counters["enabled"] = self.enabled
+        return counters
+
+
+# Global singleton — shared by every download path in this process
+media_cache = MediaCache()
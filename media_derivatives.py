@@ -0,0 +1,188 @@
+"""
+Media Derivatives — poster, scrub sprite and preview clip, made once at write time.
+
+Thumbnails used to be produced lazily wherever a list page needed one: the
+Creative OS /video-thumbnails endpoint ran ffmpeg per job (after a HEAD
+check), and app clips / analytics posts each had their own first-frame
+extractor. Now, when a finished video lands in storage, one ffmpeg pass over
+the local file renders:
+
+  - poster.jpg   first meaningful frame (~1s in), ≤720px wide, plus a
+                 poster.webp re-encode of it (Pillow)
+  - sprite.jpg   SPRITE_FRAMES evenly spaced frames, SPRITE_COLUMNS per row,
+                 SPRITE_TILE_WIDTH px each — hover scrubbing in the grid
+  - preview.mp4  ≤360p, 24 fps, CRF 30, mono audio — autoplay previews
+
+They are uploaded next to each other under derivatives/<row id>/ in the
+generated-videos bucket and recorded on the row: `thumbnail_url` (the
+poster) and `media_derivatives` (all URLs plus sprite geometry, migration
+075). Everything here is best-effort — a failure never fails the job.
+
+    media_derivatives.attach("video_jobs", job_id, final_video_path)
+
+Config:
+  MEDIA_DERIVATIVES_ENABLED    (default true)
+"""
+import json
+import math
+import mimetypes
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+mimetypes.add_type("image/webp", ".webp")
+
+# Mirrored in services/creative-os/utils/thumbnail.py.
+BUCKET = "generated-videos"
+POSTER_MAX_WIDTH = 720
+PREVIEW_MAX_HEIGHT = 360
+SPRITE_FRAMES = 20
+SPRITE_COLUMNS = 5
+SPRITE_TILE_WIDTH = 160
+
+
+def enabled() -> bool:
+    return os.getenv("MEDIA_DERIVATIVES_ENABLED", "true").lower() != "false"
+
+
+def probe_duration(video_path) -> float | None:
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", str(video_path)],
+            capture_output=True, text=True, timeout=30,
+        )
+        if result.returncode == 0:
+            return float(json.loads(result.stdout)["format"]["duration"])
+    except (OSError, subprocess.TimeoutExpired, ValueError, KeyError):
+        pass
+    return None
+
+
+def ffmpeg_args(source: str, out_dir, duration: float) -> list[str]:
+    """One ffmpeg invocation producing poster.jpg, sprite.jpg and preview.mp4."""
+    # Twin: services/creative-os/utils/thumbnail.py `_ffmpeg_args` (Creative OS
+    # can't import this module) — keep the graph and constants in sync.
+    out_dir = Path(out_dir)
+    poster_at = min(1.0, duration / 2)
+    rows = math.ceil(SPRITE_FRAMES / SPRITE_COLUMNS)
+    sprite_fps = SPRITE_FRAMES / max(duration, 0.1)
+    graph = (
+        "[0:v]split=3[p][s][v];"
+        f"[p]trim=start={poster_at:.3f},setpts=PTS-STARTPTS,"
+        f"scale='min({POSTER_MAX_WIDTH},iw)':-2[poster];"
+        f"[s]fps={sprite_fps:.5f},scale={SPRITE_TILE_WIDTH}:-2,"
+        f"tile={SPRITE_COLUMNS}x{rows}[sprite];"
+        f"[v]scale=-2:'min({PREVIEW_MAX_HEIGHT},ih)',setsar=1,fps=24[preview]"
+    )
+    return [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-i", source,
+        "-filter_complex", graph,
+        "-map", "[poster]", "-frames:v", "1", "-q:v", "3", str(out_dir / "poster.jpg"),
+        "-map", "[sprite]", "-frames:v", "1", "-q:v", "5", str(out_dir / "sprite.jpg"),
+        "-map", "[preview]", "-map", "0:a?",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "30", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", "64k", "-ac", "1",
+        "-movflags", "+faststart",
+        str(out_dir / "preview.mp4"),
+    ]
+
+
+def build(video_path, out_dir, duration: float = None) -> dict[str, Path]:
+    """Render the derivatives into out_dir. Returns {name: path} for those that exist."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    duration = duration or probe_duration(video_path)
+    if not duration:
+        raise RuntimeError("could not determine video duration")
+
+    result = subprocess.run(ffmpeg_args(str(video_path), out_dir, duration), capture_output=True, timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace')[-300:]}")
+
+    files = {
+        name: out_dir / filename
+        for name, filename in (("poster_jpg", "poster.jpg"), ("sprite", "sprite.jpg"), ("preview_mp4", "preview.mp4"))
+        if (out_dir / filename).exists() and (out_dir / filename).stat().st_size > 0
+    }
+    if "poster_jpg" in files:
+        try:
+            from PIL import Image
+            with Image.open(files["poster_jpg"]) as im:
+                im.save(out_dir / "poster.webp", "WEBP", quality=80, method=4)
+            files["poster_webp"] = out_dir / "poster.webp"
+        except Exception as e:
+            print(f"      [DERIV] WebP poster skipped: {e}")
+    return files
+
+
+def _sprite_tile_height(sprite_path: Path) -> int | None:
+    try:
+        from PIL import Image
+        with Image.open(sprite_path) as im:
+            return im.height // math.ceil(SPRITE_FRAMES / SPRITE_COLUMNS)
+    except Exception:
+        return None
+
+
+def publish(video_path, row_id: str, duration: float = None) -> dict:
+    """Build and upload; returns the media_derivatives record (URLs + sprite geometry)."""
+    import storage_helper
+
+    duration = duration or probe_duration(video_path)
+    record = {}
+    with tempfile.TemporaryDirectory(prefix="derivatives-") as tmp:
+        files = build(video_path, tmp, duration)
+        for name, path in files.items():
+            record[name] = storage_helper.upload_to_supabase_storage(
+                file_path=str(path),
+                bucket=BUCKET,
+                destination_path=f"derivatives/{row_id}/{path.name}",
+            )
+        if "sprite" in record:
+            record["sprite"] = {
+                "url": record["sprite"],
+                "frames": SPRITE_FRAMES,
+                "columns": SPRITE_COLUMNS,
+                "tile_width": SPRITE_TILE_WIDTH,
+                "tile_height": _sprite_tile_height(files["sprite"]),
+                "interval_seconds": round(duration / SPRITE_FRAMES, 3),
+            }
+    record["duration_seconds"] = round(duration, 3)
+    return record
+
+
+def record_on_row(table: str, row_id: str, derivatives: dict) -> None:
+    """Write thumbnail_url + media_derivatives; falls back to thumbnail_url alone
+    when migration 075 hasn't been applied."""
+    from ugc_db.db_manager import get_supabase
+
+    sb = get_supabase()
+    updates = {"media_derivatives": derivatives}
+    if derivatives.get("poster_jpg"):
+        updates["thumbnail_url"] = derivatives["poster_jpg"]
+    try:
+        sb.table(table).update(updates).eq("id", row_id).execute()
+    except Exception as e:
+        if "media_derivatives" not in str(e) or "thumbnail_url" not in updates:
+            raise
+        print(f"      [DERIV] {table}.media_derivatives missing (apply migration 075) — saving poster only")
+        sb.table(table).update({"thumbnail_url": updates["thumbnail_url"]}).eq("id", row_id).execute()
+
+
+def attach(table: str, row_id: str, video_path, duration: float = None) -> dict | None:
+    """
+    Build, upload and record the derivatives of a finished video. Never raises;
+    returns the record, or None when disabled or anything failed.
+    """
+    if not enabled() or not row_id or not video_path or not Path(video_path).exists():
+        return None
+    try:
+        derivatives = publish(video_path, row_id, duration)
+        record_on_row(table, row_id, derivatives)
+        print(f"      [DERIV] {table} {row_id}: {', '.join(k for k in derivatives if k != 'duration_seconds')}")
+        return derivatives
+    except Exception as e:
+        print(f"      !! [DERIV] {table} {row_id} derivatives failed (non-fatal): {e}")
+        return None
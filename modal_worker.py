@@ -106,6 +106,13 @@ worker_image = (
         "storage_helper",
         "social_media_poster",
         "clone_engine",
+        "media_cache",
+        "transcription_store",
+        "remotion_pool",
+        "tts_service",
+        "provider_routing",
+        "provider_hedging",
+        "media_derivatives",
         # Packages (directories with __init__.py)
         "ugc_worker",
         "ugc_db",
@@ -323,6 +330,7 @@ def process_clone_video(job_id: str):
             subtitle_placement=job.get("subtitle_placement", "middle"),
             product_name=product_name,
             progress_callback=on_progress,
+            make_derivatives=True,
         )
 
         # 6. Mark job as complete
@@ -378,12 +386,10 @@ def trigger_clone_job(request: dict):
 def render_editor_video(render_id: str, editor_state: dict, codec: str = "h264"):
     """
     Renders a Remotion composition from the Editor's state JSON.
-    Runs the Remotion renderer server as a subprocess, posts the editor state,
-    streams the resulting MP4, and uploads to Supabase Storage.
+    Borrows a warm renderer from the container's Remotion pool (bundles are
+    already built after the first call), posts the editor state, streams the
+    resulting MP4, and uploads to Supabase Storage.
     """
-    import subprocess
-    import time
-    import json
     import tempfile
     import requests as _req
 
@@ -391,88 +397,42 @@ def render_editor_video(render_id: str, editor_state: dict, codec: str = "h264")
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
 
-    remotion_dir = "/root/remotion_renderer"
-    server_script = os.path.join(remotion_dir, "server.js")
-
-    if not os.path.isfile(server_script):
-        raise RuntimeError(f"Remotion server.js not found: {server_script}")
-
-    # Start the Remotion renderer HTTP server on a random port
-    port = 8090
-    print(f"[EDITOR RENDER] Starting Remotion renderer on port {port}...")
-    env = os.environ.copy()
-    env["PORT"] = str(port)
-    env["DBUS_SESSION_BUS_ADDRESS"] = "/dev/null"
-
-    proc = subprocess.Popen(
-        ["node", server_script],
-        cwd=remotion_dir,
-        env=env,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-    )
-
-    # The renderer logs browser output during a render. Nothing else reads this
-    # pipe, so without a drainer node blocks once the 64KB buffer fills and the
-    # render hangs until the request timeout. Keep the tail for start failures.
-    import collections
-    import threading
-
-    startup_log = collections.deque(maxlen=200)
-
-    def _drain_renderer_output():
-        for raw in iter(proc.stdout.readline, b""):
-            line = raw.decode("utf-8", errors="replace").rstrip()
-            startup_log.append(line)
-            print(f"[renderer] {line}", flush=True)
-
-    threading.Thread(target=_drain_renderer_output, daemon=True).start()
+    import remotion_pool
 
-    # Wait for server to be ready (up to 60s for first-time bundle)
-    renderer_url = f"http://localhost:{port}"
-    ready = False
-    for i in range(120):
-        time.sleep(0.5)
-        try:
-            resp = _req.get(f"{renderer_url}/health", timeout=2)
-            if resp.status_code == 200:
-                ready = True
-                print(f"[EDITOR RENDER] Renderer ready after {(i+1)*0.5:.1f}s")
-                break
-        except Exception:
-            pass
-
-    if not ready:
-        proc.kill()
-        raise RuntimeError(
-            "Remotion renderer failed to start. Output: " + "\n".join(startup_log)[-2000:]
-        )
+    # The pool lives as long as the container, so warm containers skip the
+    # node start-up and bundling entirely.
+    pool = remotion_pool.get_pool()
+    pool_stats = pool.stats()
+    print(f"[EDITOR RENDER] Renderer pool: {pool_stats['idle']} idle, "
+          f"{pool_stats['queue_depth']} waiting")
 
     try:
-        # Call the /render-editor endpoint
-        print(f"[EDITOR RENDER] Sending editor state to renderer...")
-        response = _req.post(
-            f"{renderer_url}/render-editor",
-            json={"editorState": editor_state, "codec": codec},
-            timeout=540,
-            stream=True,
-        )
-
-        if response.status_code != 200:
-            raise RuntimeError(
-                f"Renderer returned {response.status_code}: {response.text[:500]}"
-            )
-
-        # Stream the MP4 to a temp file
         from datetime import datetime as _dt
         timestamp = _dt.now().strftime("%Y%m%d_%H%M%S")
         storage_filename = f"edited_{render_id[:8]}_{timestamp}.mp4"
 
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    tmp.write(chunk)
-            tmp_path = tmp.name
+        with pool.worker(timeout=540) as renderer_url:
+            # Call the /render-editor endpoint
+            print(f"[EDITOR RENDER] Sending editor state to renderer {renderer_url}...")
+            response = _req.post(
+                f"{renderer_url}/render-editor",
+                json={"editorState": editor_state, "codec": codec},
+                timeout=540,
+                stream=True,
+            )
+
+            if response.status_code != 200:
+                raise RuntimeError(
+                    f"Renderer returned {response.status_code}: {response.text[:500]}"
+                )
+
+            # Stream the MP4 to a temp file (the worker is released once the
+            # response body is fully read)
+            with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    if chunk:
+                        tmp.write(chunk)
+                tmp_path = tmp.name
 
         output_size = os.path.getsize(tmp_path)
         print(f"[EDITOR RENDER] Rendered {output_size / 1024 / 1024:.1f} MB")
@@ -527,10 +487,6 @@ def render_editor_video(render_id: str, editor_state: dict, codec: str = "h264")
             pass
         raise
 
-    finally:
-        proc.kill()
-        proc.wait()
-
 
 @app.function(
     image=worker_image,
@@ -0,0 +1,253 @@
+"""
+Provider Hedging — tail-latency control for Veo renders.
+
+generate_video_with_retry waits out Kie's full fast-fail timeout before it
+tries WaveSpeed, so one stuck Kie render adds 3+ minutes to the job and
+those stragglers dominate p95 job time. With hedging on, the primary
+provider gets a head start; if it has not finished by the VEO_HEDGE_PERCENTILE
+completion time seen for it across the fleet (provider_routing), the same
+request is also sent to the alternate provider. The first success wins; the
+other request's polling is cancelled (task_tracker cancel scope) and its
+result ignored — neither provider can abort a render already queued, so the
+hedge is paid for either way.
+
+Every hedge reserves the alternate provider's clip price
+(provider_routing.provider_cost) against two caps before it is sent:
+  - per job: VEO_HEDGE_MAX_PER_JOB_USD. A job is one `job_budget()` scope
+    (run_generation_pipeline is wrapped in one); calls outside a scope count
+    as their own job.
+  - per day (UTC): VEO_HEDGE_DAILY_BUDGET_USD, a fleet-wide spend bucket in
+    the provider_routing store.
+When a cap is reached the primary simply keeps running, as without hedging.
+
+Counters are served with the routing table by GET /api/admin/provider-routing.
+
+Config:
+  VEO_HEDGING                  opt in (default false)
+  VEO_HEDGE_PERCENTILE         primary completion-time quantile to wait for (default 0.9)
+  VEO_HEDGE_MIN_SAMPLES        completions needed before the quantile is trusted (default 5)
+  VEO_HEDGE_DEFAULT_SECONDS    head start until then (default 150)
+  VEO_HEDGE_MAX_PER_JOB_USD    extra spend per job (default 2.40)
+  VEO_HEDGE_DAILY_BUDGET_USD   extra spend per UTC day, fleet-wide (default 25)
+"""
+import contextvars
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from provider_routing import provider_cost, routing
+from task_tracker import CancelScope, TaskCancelled, tracker
+
+_lock = threading.Lock()
+_counters = {
+    "hedged_calls": 0,      # calls that ran in hedge mode
+    "hedges_sent": 0,       # alternate requests actually sent
+    "hedge_wins": 0,        # ... that finished first
+    "budget_denied": 0,     # hedges skipped by a spend cap
+    "spend_usd": 0.0,       # reserved by this process
+}
+
+
+class _JobBudget:
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.spent = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, usd: float) -> bool:
+        with self._lock:
+            if self.spent + usd > self.limit + 1e-9:
+                return False
+            self.spent += usd
+            return True
+
+    def release(self, usd: float):
+        with self._lock:
+            self.spent = max(0.0, self.spent - usd)
+
+
+_job: contextvars.ContextVar[_JobBudget | None] = contextvars.ContextVar("hedge_job_budget", default=None)
+
+
+def enabled() -> bool:
+    return os.getenv("VEO_HEDGING", "false").lower() == "true"
+
+
+def _job_limit() -> float:
+    return float(os.getenv("VEO_HEDGE_MAX_PER_JOB_USD", "2.40"))
+
+
+def _daily_limit() -> float:
+    return float(os.getenv("VEO_HEDGE_DAILY_BUDGET_USD", "25"))
+
+
+def _day_bucket() -> str:
+    return "hedge:" + datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+@contextmanager
+def job_budget():
+    """
+    Scope one job's hedge spend. Also usable as a decorator; threads started
+    through scene_scheduler inherit the scope.
+    """
+    token = _job.set(_JobBudget(_job_limit()))
+    try:
+        yield
+    finally:
+        _job.reset(token)
+
+
+def hedge_delay(provider: str, family: str) -> float:
+    """Seconds the primary runs alone before the hedge is sent."""
+    r = routing.get(provider, family)
+    min_samples = int(os.getenv("VEO_HEDGE_MIN_SAMPLES", "5"))
+    if len(r.get("recent_seconds") or []) >= min_samples:
+        q = float(os.getenv("VEO_HEDGE_PERCENTILE", "0.9"))
+        return max(30.0, routing.percentile(r, q))
+    return float(os.getenv("VEO_HEDGE_DEFAULT_SECONDS", "150"))
+
+
+def can_hedge(provider: str) -> bool:
+    """Cheap pre-check (no reservation): is there budget left for one hedge?"""
+    usd = provider_cost(provider)
+    job = _job.get()
+    if job is not None and job.spent + usd > job.limit + 1e-9:
+        return False
+    if usd > _job_limit():
+        return False
+    return routing.spend(_day_bucket())["usd"] + usd <= _daily_limit() + 1e-9
+
+
+def _reserve(provider: str) -> bool:
+    usd = provider_cost(provider)
+    job = _job.get() or _JobBudget(_job_limit())
+    if not job.reserve(usd):
+        return False
+    try:
+        ok = routing.reserve_spend(_day_bucket(), usd, _daily_limit())
+    except Exception as e:
+        print(f"      !! [HEDGE] Daily budget check failed ({e}) — not hedging")
+        ok = False
+    if not ok:
+        job.release(usd)
+        return False
+    with _lock:
+        _counters["spend_usd"] = round(_counters["spend_usd"] + usd, 4)
+    return True
+
+
+def run(primary: str, primary_fn, secondary: str, secondary_fn, family: str,
+        record=None, should_fallback=None):
+    """
+    Run primary_fn(); hedge with secondary_fn() once the primary is slow.
+
+    Returns (provider, result) of the first success. A primary failure before
+    the hedge falls back to the secondary when should_fallback(exc) allows
+    (no budget needed — that is the normal fallback). Raises the last error
+    when every request that was sent failed.
+
+    record(provider, success, seconds) is called for every finished request
+    except the cancelled loser.
+    """
+    delay = hedge_delay(primary, family)
+    with _lock:
+        _counters["hedged_calls"] += 1
+    print(f"      [HEDGE] {primary} first; hedging to {secondary} after {delay:.0f}s")
+
+    results: queue.Queue = queue.Queue()
+    scopes = {}
+
+    def _launch(provider, fn):
+        ctx = contextvars.copy_context()
+        started = time.time()
+        scopes[provider] = CancelScope(tracker)
+
+        def _branch():
+            with tracker.cancel_scope(scopes[provider]):
+                try:
+                    value = fn()
+                except TaskCancelled:
+                    return
+                except Exception as e:
+                    if record:
+                        record(provider, False, None)
+                    results.put((provider, False, e))
+                    return
+                if record:
+                    record(provider, True, time.time() - started)
+                results.put((provider, True, value))
+
+        threading.Thread(target=lambda: ctx.run(_branch), name=f"hedge-{provider}", daemon=True).start()
+
+    def _cancel_others(winner):
+        for provider, scope in list(scopes.items()):
+            if provider != winner:
+                scope.cancel()
+
+    _launch(primary, primary_fn)
+    running = {primary}
+    hedge_decided = False
+    hedged = False
+    hedge_due = time.monotonic() + delay
+    last_error = None
+
+    while running:
+        timeout = max(0.0, hedge_due - time.monotonic()) if not hedge_decided else None
+        try:
+            provider, ok, value = results.get(timeout=timeout)
+        except queue.Empty:
+            # Primary is past its percentile — hedge if the budget allows.
+            hedge_decided = True
+            if _reserve(secondary):
+                with _lock:
+                    _counters["hedges_sent"] += 1
+                print(f"      [HEDGE] {primary} still running after {delay:.0f}s → hedging to {secondary}")
+                hedged = True
+                _launch(secondary, secondary_fn)
+                running.add(secondary)
+            else:
+                with _lock:
+                    _counters["budget_denied"] += 1
+                print(f"      [HEDGE] Spend cap reached — waiting on {primary} alone")
+            continue
+
+        running.discard(provider)
+        if ok:
+            _cancel_others(provider)
+            if provider == secondary and hedged:
+                with _lock:
+                    _counters["hedge_wins"] += 1
+            print(f"      [HEDGE] ✅ {provider} finished first")
+            return provider, value
+
+        last_error = value
+        print(f"      [HEDGE] ❌ {provider} failed: {value}")
+        if provider == primary and secondary not in scopes:
+            hedge_decided = True
+            if should_fallback is None or should_fallback(value):
+                print(f"      [HEDGE] Falling back to {secondary}")
+                _launch(secondary, secondary_fn)
+                running.add(secondary)
+
+    raise last_error
+
+
+def stats() -> dict:
+    """This process's hedge counters plus today's fleet-wide hedge spend."""
+    with _lock:
+        snapshot = dict(_counters)
+    try:
+        today = routing.spend(_day_bucket())
+    except Exception:
+        today = None
+    return {
+        "enabled": enabled(),
+        **snapshot,
+        "daily_budget_usd": _daily_limit(),
+        "per_job_budget_usd": _job_limit(),
+        "today": today,
+    }
@@ -0,0 +1,434 @@
+"""
+Provider Routing — fleet-wide provider health, scoring and circuit breakers.
+
+generate_scenes.ProviderRouter used to keep its health-probe cache and
+outcome history in a per-process dict, so every Celery worker, Modal
+container and in-process job thread learned provider health on its own and
+fired its own 3s probes. The state now lives in one shared store:
+
+  - Redis (PROVIDER_ROUTING_REDIS_URL, else REDIS_URL / CELERY_BROKER_URL
+    when set) so the whole fleet shares one view; SQLite
+    (PROVIDER_ROUTING_DB) when Redis isn't configured or reachable, shared
+    by every process on the host.
+  - One record per provider + model family ("kie:veo", "wavespeed:veo"):
+    EWMA success rate and completion time, the last ROUTER_LATENCY_SAMPLES
+    completion times (p50/p95), last probe result and breaker state.
+
+Routing:
+  - score = cost / p(success) + ROUTER_LATENCY_USD_PER_MIN × expected
+    minutes / p(success); lowest wins. Costs default to the list prices
+    (Kie Veo $0.30, WaveSpeed $1.20 per clip), override with
+    PROVIDER_COST_<PROVIDER>.
+  - Circuit breaker per record: closed → open after ROUTER_BREAKER_FAILURES
+    consecutive failures (or EWMA success < 50% over 5+ samples); after
+    ROUTER_BREAKER_COOLDOWN_SECONDS one caller in the fleet gets the
+    half-open trial request; its success closes the breaker, its failure
+    re-opens it.
+  - Probes: a fresh result (ROUTER_PROBE_TTL_SECONDS) from any process is
+    reused, a real completion counts as a passing probe, and a probe lease
+    lets only one process re-probe a stale provider at a time.
+
+Spend buckets ("spend:<bucket>") hold fleet-wide USD counters with a cap,
+used by provider_hedging for the daily hedge budget.
+
+`routing_table()` is served by GET /api/admin/provider-routing.
+
+Config:
+  PROVIDER_ROUTING_REDIS_URL          shared store (falls back to REDIS_URL, CELERY_BROKER_URL)
+  PROVIDER_ROUTING_DB                 SQLite fallback (default <tmp>/ugc_provider_routing.sqlite3)
+  ROUTER_EWMA_ALPHA                   weight of the newest outcome (default 0.2)
+  ROUTER_LATENCY_USD_PER_MIN          price of one minute of waiting (default 0.10)
+  ROUTER_LATENCY_SAMPLES              completion times kept per record (default 50)
+  ROUTER_BREAKER_FAILURES             consecutive failures that open the breaker (default 2)
+  ROUTER_BREAKER_COOLDOWN_SECONDS     open → half-open after (default 600)
+  ROUTER_BREAKER_TRIAL_SECONDS        how long a half-open trial may run (default 1200)
+  ROUTER_PROBE_TTL_SECONDS            probe/health freshness (default 60)
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_COSTS = {"kie": 0.30, "wavespeed": 1.20}
+
+_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.2"))
+_LATENCY_USD_PER_MIN = float(os.getenv("ROUTER_LATENCY_USD_PER_MIN", "0.10"))
+_LATENCY_SAMPLES = int(os.getenv("ROUTER_LATENCY_SAMPLES", "50"))
+_BREAKER_FAILURES = int(os.getenv("ROUTER_BREAKER_FAILURES", "2"))
+_BREAKER_COOLDOWN = float(os.getenv("ROUTER_BREAKER_COOLDOWN_SECONDS", "600"))
+_BREAKER_TRIAL = float(os.getenv("ROUTER_BREAKER_TRIAL_SECONDS", "1200"))
+_PROBE_TTL = float(os.getenv("ROUTER_PROBE_TTL_SECONDS", "60"))
+_PROBE_LEASE = 10.0
+_RECORD_TTL = 7 * 86400  # Redis expiry for records nobody has touched
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def provider_cost(provider: str) -> float:
+    env = os.getenv(f"PROVIDER_COST_{provider.upper()}")
+    if env:
+        try:
+            return float(env)
+        except ValueError:
+            pass
+    return DEFAULT_COSTS.get(provider, 1.0)
+
+
+def _new_record(provider: str, family: str) -> dict:
+    return {
+        "provider": provider,
+        "family": family,
+        "samples": 0,
+        "ewma_success": None,
+        "ewma_seconds": None,
+        "recent_seconds": [],
+        "consecutive_failures": 0,
+        "breaker": CLOSED,
+        "opened_at": None,
+        "trial_until": None,
+        "health_ok": None,
+        "health_ms": None,
+        "health_at": None,
+        "probe_until": None,
+        "last_success_at": None,
+        "last_failure_at": None,
+        "updated_at": None,
+    }
+
+
+# ── State backends ───────────────────────────────────────────────────────
+
+class _SQLiteState:
+    """Records in a local SQLite file (shared by processes on one host)."""
+
+    name = "sqlite"
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.getenv("PROVIDER_ROUTING_DB")
+                         or Path(tempfile.gettempdir()) / "ugc_provider_routing.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS provider_state "
+                "(key TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM provider_state WHERE key=?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, key: str, fn):
+        """Atomically apply fn(record | None) -> (record, result); returns result."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT data FROM provider_state WHERE key=?", (key,)).fetchone()
+                record, result = fn(json.loads(row[0]) if row else None)
+                conn.execute(
+                    "INSERT INTO provider_state (key, data, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET data=excluded.data, updated_at=excluded.updated_at",
+                    (key, json.dumps(record), time.time()),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def all(self) -> list[dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM provider_state ORDER BY key").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+
+class _RedisState:
+    """Records in Redis, updated with WATCH/MULTI so the fleet never races."""
+
+    name = "redis"
+    _PREFIX = "provider_routing:"
+
+    def __init__(self, url: str):
+        import redis  # optional dependency; ImportError → SQLite fallback
+        self._redis = redis
+        self.client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=1)
+        self.client.ping()
+
+    def _k(self, key: str) -> str:
+        return self._PREFIX + key
+
+    def get(self, key: str) -> dict | None:
+        raw = self.client.get(self._k(key))
+        return json.loads(raw) if raw else None
+
+    def update(self, key: str, fn):
+        rkey = self._k(key)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(rkey)
+                    raw = pipe.get(rkey)
+                    record, result = fn(json.loads(raw) if raw else None)
+                    pipe.multi()
+                    pipe.set(rkey, json.dumps(record), ex=_RECORD_TTL)
+                    pipe.sadd(self._PREFIX + "keys", key)
+                    pipe.execute()
+                    return result
+                except self._redis.WatchError:
+                    continue
+
+    def all(self) -> list[dict]:
+        keys = sorted(k.decode() if isinstance(k, bytes) else k
+                      for k in self.client.smembers(self._PREFIX + "keys"))
+        if not keys:
+            return []
+        raws = self.client.mget([self._k(k) for k in keys])
+        return [json.loads(r) for r in raws if r]
+
+
+def _redis_url() -> str | None:
+    return (os.getenv("PROVIDER_ROUTING_REDIS_URL") or os.getenv("REDIS_URL")
+            or os.getenv("CELERY_BROKER_URL") or None)
+
+
+# ── Router ───────────────────────────────────────────────────────────────
+
+class RoutingState:
+    """Provider records in the shared store, plus the routing policy."""
+
+    def __init__(self):
+        self._store = None
+        self._lock = threading.Lock()
+
+    def _backend(self):
+        with self._lock:
+            if self._store is None:
+                url = _redis_url()
+                if url and url.startswith(("redis://", "rediss://")):
+                    try:
+                        self._store = _RedisState(url)
+                    except Exception as e:
+                        print(f"   !! [ROUTER] Redis state unavailable ({e}); using local SQLite")
+                if self._store is None:
+                    self._store = _SQLiteState()
+            return self._store
+
+    def _call(self, method: str, *args):
+        store = self._backend()
+        try:
+            return getattr(store, method)(*args)
+        except (sqlite3.Error, OSError):
+            raise
+        except Exception as e:
+            if store.name != "redis":
+                raise
+            print(f"   !! [ROUTER] Redis state error ({e}); switching to local SQLite")
+            with self._lock:
+                self._store = _SQLiteState()
+            return getattr(self._store, method)(*args)
+
+    def _update(self, provider: str, family: str, fn):
+        key = f"{provider}:{family}"
+
+        def apply(record):
+            record = record or _new_record(provider, family)
+            result = fn(record, time.time())
+            record["updated_at"] = time.time()
+            return record, result
+
+        return self._call("update", key, apply)
+
+    def get(self, provider: str, family: str) -> dict:
+        return self._call("get", f"{provider}:{family}") or _new_record(provider, family)
+
+    # ── Outcomes ─────────────────────────────────────────────────────────
+
+    def record(self, provider: str, family: str, success: bool, seconds: float = None):
+        """Record one generation outcome (and its completion time on success)."""
+        def fn(r, now):
+            alpha = _EWMA_ALPHA
+            value = 1.0 if success else 0.0
+            r["ewma_success"] = value if r["ewma_success"] is None else (1 - alpha) * r["ewma_success"] + alpha * value
+            r["samples"] += 1
+            if success:
+                r["consecutive_failures"] = 0
+                r["last_success_at"] = now
+                # A completed render is a better health signal than a probe.
+                r["health_ok"], r["health_at"] = True, now
+                if seconds is not None and seconds > 0:
+                    r["ewma_seconds"] = seconds if r["ewma_seconds"] is None else (1 - alpha) * r["ewma_seconds"] + alpha * seconds
+                    r["recent_seconds"] = (r["recent_seconds"] + [round(seconds, 1)])[-_LATENCY_SAMPLES:]
+                if r["breaker"] != CLOSED:
+                    print(f"      [ROUTER] {provider}:{family} breaker closed after successful trial")
+                r["breaker"], r["opened_at"], r["trial_until"] = CLOSED, None, None
+            else:
+                r["consecutive_failures"] += 1
+                r["last_failure_at"] = now
+                trip = (
+                    r["breaker"] == HALF_OPEN
+                    or r["consecutive_failures"] >= _BREAKER_FAILURES
+                    or (r["samples"] >= 5 and r["ewma_success"] < 0.5)
+                )
+                if trip:
+                    if r["breaker"] != OPEN:
+                        print(f"      [ROUTER] {provider}:{family} breaker OPEN "
+                              f"({r['consecutive_failures']} consecutive failures)")
+                    r["breaker"], r["opened_at"], r["trial_until"] = OPEN, now, None
+
+        self._update(provider, family, fn)
+
+    # ── Breaker ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    def effective_breaker(r: dict, now: float) -> str:
+        if r["breaker"] == OPEN and r["opened_at"] and now - r["opened_at"] >= _BREAKER_COOLDOWN:
+            return HALF_OPEN
+        return r["breaker"]
+
+    def breaker_state(self, provider: str, family: str) -> str:
+        return self.effective_breaker(self.get(provider, family), time.time())
+
+    def allow(self, provider: str, family: str) -> bool:
+        """
+        May a request go to this provider now? Closed → yes. Open → no until
+        the cooldown passes; then exactly one caller in the fleet is granted
+        the half-open trial (re-granted if it overruns the trial window).
+        """
+        def fn(r, now):
+            state = self.effective_breaker(r, now)
+            if state == CLOSED:
+                return True
+            if state == OPEN:
+                return False
+            if r["trial_until"] and r["trial_until"] > now:
+                return False  # someone else's trial is in flight
+            r["breaker"], r["trial_until"] = HALF_OPEN, now + _BREAKER_TRIAL
+            print(f"      [ROUTER] {provider}:{family} half-open — granting trial request")
+            return True
+
+        return self._update(provider, family, fn)
+
+    # ── Health probes ────────────────────────────────────────────────────
+
+    def health(self, provider: str, family: str, probe) -> tuple[bool | None, float]:
+        """
+        (healthy, response_ms) from the shared store when fresh. Otherwise the
+        process that wins the probe lease runs `probe()` -> (ok, ms) and
+        publishes it; everyone else keeps using the last known result
+        (None when nothing is known yet).
+        """
+        def claim(r, now):
+            fresh = r["health_at"] and now - r["health_at"] < _PROBE_TTL
+            if fresh:
+                return ("fresh", r["health_ok"], r["health_ms"] or 0.0)
+            if r["probe_until"] and r["probe_until"] > now:
+                return ("busy", r["health_ok"], r["health_ms"] or 0.0)
+            r["probe_until"] = now + _PROBE_LEASE
+            return ("probe", r["health_ok"], r["health_ms"] or 0.0)
+
+        status, ok, ms = self._update(provider, family, claim)
+        if status != "probe":
+            return ok, ms
+
+        ok, ms = probe()
+
+        def publish(r, now):
+            r["health_ok"], r["health_ms"], r["health_at"], r["probe_until"] = ok, round(ms, 1), now, None
+
+        self._update(provider, family, publish)
+        return ok, ms
+
+    # ── Scoring ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    def percentile(r: dict, q: float) -> float | None:
+        samples = sorted(r.get("recent_seconds") or [])
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, max(0, int(round(q * (len(samples) - 1)))))
+        return samples[idx]
+
+    def completion_percentile(self, provider: str, family: str, q: float) -> float | None:
+        """q-quantile (0..1) of recent completion times in seconds, or None."""
+        return self.percentile(self.get(provider, family), q)
+
+    def score(self, r: dict) -> float:
+        """Expected USD per successful clip, waiting time priced in (lower is better)."""
+        p_success = max(0.05, r["ewma_success"] if r["ewma_success"] is not None else 1.0)
+        seconds = r["ewma_seconds"] or self.percentile(r, 0.5) or 120.0
+        return (provider_cost(r["provider"]) + _LATENCY_USD_PER_MIN * seconds / 60.0) / p_success
+
+    def rank(self, providers, family: str) -> list[tuple[str, float, dict]]:
+        """[(provider, score, record)] sorted best first."""
+        ranked = []
+        for p in providers:
+            r = self.get(p, family)
+            ranked.append((p, self.score(r), r))
+        ranked.sort(key=lambda t: t[1])
+        return ranked
+
+    # ── Spend buckets ────────────────────────────────────────────────────
+
+    def reserve_spend(self, bucket: str, usd: float, cap: float) -> bool:
+        """Atomically add `usd` to the bucket unless that would exceed `cap`."""
+        def apply(record):
+            record = record or {"bucket": bucket, "usd": 0.0, "count": 0, "denied": 0}
+            ok = record["usd"] + usd <= cap + 1e-9
+            if ok:
+                record["usd"] = round(record["usd"] + usd, 4)
+                record["count"] += 1
+            else:
+                record["denied"] += 1
+            record["updated_at"] = time.time()
+            return record, ok
+
+        return self._call("update", f"spend:{bucket}", apply)
+
+    def spend(self, bucket: str) -> dict:
+        return self._call("get", f"spend:{bucket}") or {"bucket": bucket, "usd": 0.0, "count": 0, "denied": 0}
+
+    # ── Introspection ────────────────────────────────────────────────────
+
+    def routing_table(self) -> dict:
+        now = time.time()
+        rows = []
+        spend = []
+        for r in self._call("all"):
+            if "provider" not in r:
+                spend.append(r)
+                continue
+            rows.append({
+                "provider": r["provider"],
+                "family": r["family"],
+                "breaker": self.effective_breaker(r, now),
+                "score": round(self.score(r), 4),
+                "cost_usd": provider_cost(r["provider"]),
+                "success_ewma": round(r["ewma_success"], 3) if r["ewma_success"] is not None else None,
+                "seconds_ewma": round(r["ewma_seconds"], 1) if r["ewma_seconds"] else None,
+                "p50_seconds": self.percentile(r, 0.5),
+                "p95_seconds": self.percentile(r, 0.95),
+                "samples": r["samples"],
+                "consecutive_failures": r["consecutive_failures"],
+                "health_ok": r["health_ok"],
+                "health_ms": r["health_ms"],
+                "health_age_seconds": round(now - r["health_at"], 1) if r["health_at"] else None,
+                "last_success_at": r["last_success_at"],
+                "last_failure_at": r["last_failure_at"],
+            })
+        return {"backend": self._backend().name, "providers": rows, "spend": spend}
+
+
+routing = RoutingState()
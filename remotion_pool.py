@@ -0,0 +1,427 @@
+"""
+Remotion Pool — warm `node server.js` renderer processes managed from Python.
+
+Captioning used to shell out to `node render_captions.js` per job (which
+re-bundles the Remotion project every time), and the Modal editor render
+spawned `node server.js`, polled /health for up to 60s while it bundled, and
+killed it afterwards. Both now borrow a worker from this pool:
+
+  - N renderer processes (remotion_renderer/server.js) are kept running on
+    free local ports, each with its bundles already built — a worker only
+    counts as ready once `/ready` reports the caption bundle done.
+  - Renders go to an idle worker; callers block while all are busy (the
+    number waiting is `queue_depth` in `stats()`).
+  - A worker is recycled after REMOTION_POOL_MAX_RENDERS renders (Chromium
+    and the offthread video cache grow over time) and replaced immediately;
+    a monitor thread health-checks idle workers and replaces dead ones.
+  - If workers repeatedly fail to start (no node, missing deps), the pool
+    gives up and `worker()` raises at once so callers take their fallback.
+
+    with remotion_pool.get_pool().worker() as base_url:
+        requests.post(f"{base_url}/render-editor", json=..., stream=True)
+
+`render_captions()` wraps the caption render (pool, or the one-shot CLI
+when REMOTION_POOL_ENABLED=false) for core_engine and the clone pipeline.
+
+Config:
+  REMOTION_POOL_ENABLED          (default true)
+  REMOTION_POOL_SIZE             warm workers per process (default 1)
+  REMOTION_POOL_MAX_RENDERS      renders before a worker is recycled (default 50)
+  REMOTION_POOL_READY_TIMEOUT    seconds to wait for a worker's bundle (default 120)
+  REMOTION_DIR                   renderer directory (default /root/remotion_renderer,
+                                 then ./remotion_renderer)
+"""
+import atexit
+import collections
+import json
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+
+_HEALTH_INTERVAL = 30.0
+_MAX_START_FAILURES = 3
+
+
+def remotion_dir() -> str:
+    configured = os.getenv("REMOTION_DIR")
+    if configured:
+        return configured
+    if os.path.isdir("/root/remotion_renderer"):
+        return "/root/remotion_renderer"
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "remotion_renderer")
+
+
+def pool_enabled() -> bool:
+    return os.getenv("REMOTION_POOL_ENABLED", "true").lower() != "false"
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _Worker:
+    """One `node server.js` process and its bookkeeping."""
+
+    def __init__(self, renderer_dir: str):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        env = os.environ.copy()
+        env["PORT"] = str(self.port)
+        env["DBUS_SESSION_BUS_ADDRESS"] = "/dev/null"
+        self.proc = subprocess.Popen(
+            ["node", os.path.join(renderer_dir, "server.js")],
+            cwd=renderer_dir,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        self.log = collections.deque(maxlen=200)
+        self.state = "starting"   # starting | idle | busy | retired
+        self.renders = 0
+        self.started_at = time.time()
+        self.ready_seconds = None
+        # Nothing else reads the pipe; without a drainer node blocks once the
+        # 64KB buffer fills and the render hangs.
+        threading.Thread(target=self._drain, daemon=True).start()
+
+    def _drain(self):
+        for raw in iter(self.proc.stdout.readline, b""):
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            self.log.append(line)
+            print(f"[renderer:{self.port}] {line}", flush=True)
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Poll /ready (falls back to /health on servers without it)."""
+        deadline = time.time() + timeout
+        path = "/ready"
+        while time.time() < deadline:
+            if not self.alive():
+                return False
+            try:
+                resp = requests.get(f"{self.url}{path}", timeout=2)
+                if resp.status_code == 404 and path == "/ready":
+                    path = "/health"
+                    continue
+                if resp.status_code == 200:
+                    self.ready_seconds = round(time.time() - self.started_at, 1)
+                    return True
+                if resp.status_code == 503 and resp.json().get("status") == "error":
+                    return False  # bundling failed; waiting longer won't help
+            except (requests.RequestException, ValueError):
+                pass
+            time.sleep(0.5)
+        return False
+
+    def healthy(self) -> bool:
+        if not self.alive():
+            return False
+        try:
+            return requests.get(f"{self.url}/health", timeout=5).status_code == 200
+        except requests.RequestException:
+            return False
+
+    def stop(self):
+        if self.alive():
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+
+class RendererPool:
+    """Fixed-size pool of warm Remotion renderer processes."""
+
+    def __init__(self, size: int = None, max_renders: int = None,
+                 ready_timeout: float = None, renderer_dir: str = None):
+        self.size = max(1, size or int(os.getenv("REMOTION_POOL_SIZE", "1")))
+        self.max_renders = max(1, max_renders or int(os.getenv("REMOTION_POOL_MAX_RENDERS", "50")))
+        self.ready_timeout = ready_timeout or float(os.getenv("REMOTION_POOL_READY_TIMEOUT", "120"))
+        self.renderer_dir = renderer_dir or remotion_dir()
+        self._cond = threading.Condition()
+        self._workers: list[_Worker] = []
+        self._waiting = 0
+        self._started = False
+        self._closed = False
+        self._start_failures = 0
+        self._last_error = None
+        self._counters = {"renders": 0, "failed_renders": 0, "recycled": 0,
+                          "replaced_unhealthy": 0, "start_failures": 0}
+        self._wait_seconds_total = 0.0
+
+    # ── Lifecycle ────────────────────────────────────────────────────────
+
+    def start(self):
+        """Spawn the workers (bundling happens in the background)."""
+        with self._cond:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self._started:
+            return
+        if not os.path.isfile(os.path.join(self.renderer_dir, "server.js")):
+            raise RuntimeError(f"Remotion server.js not found in {self.renderer_dir}")
+        self._started = True
+        print(f"[REMOTION] Starting renderer pool: {self.size} worker(s), "
+              f"recycle after {self.max_renders} renders")
+        for _ in range(self.size):
+            self._spawn_locked()
+        threading.Thread(target=self._monitor, daemon=True, name="remotion-pool-monitor").start()
+
+    def _spawn_locked(self):
+        if self._closed or self._start_failures >= _MAX_START_FAILURES:
+            return
+        try:
+            worker = _Worker(self.renderer_dir)
+        except OSError as e:
+            self._record_start_failure_locked(f"could not launch node: {e}")
+            return
+        self._workers.append(worker)
+        threading.Thread(target=self._warm, args=(worker,), daemon=True).start()
+
+    def _record_start_failure_locked(self, reason: str):
+        self._start_failures += 1
+        self._counters["start_failures"] += 1
+        self._last_error = reason
+        print(f"   !! [REMOTION] Renderer failed to start ({reason})")
+        self._cond.notify_all()
+
+    def _warm(self, worker: _Worker):
+        ok = worker.wait_ready(self.ready_timeout)
+        with self._cond:
+            if worker.state != "starting":
+                return
+            if ok:
+                worker.state = "idle"
+                self._start_failures = 0
+                print(f"[REMOTION] Worker :{worker.port} ready after {worker.ready_seconds}s")
+                self._cond.notify_all()
+                return
+            tail = "\n".join(list(worker.log)[-20:])
+            if worker.alive():
+                reason = f"not ready within {self.ready_timeout:.0f}s"
+            else:
+                reason = f"exited with code {worker.proc.returncode}"
+            self._retire_locked(worker)
+            self._record_start_failure_locked(f"{reason}: {tail[-500:]}")
+            self._spawn_locked()
+
+    def _retire_locked(self, worker: _Worker):
+        worker.state = "retired"
+        if worker in self._workers:
+            self._workers.remove(worker)
+        threading.Thread(target=worker.stop, daemon=True).start()
+
+    def _replace_locked(self, worker: _Worker, reason: str):
+        print(f"[REMOTION] Replacing worker :{worker.port} ({reason})")
+        self._retire_locked(worker)
+        self._spawn_locked()
+
+    def _monitor(self):
+        while not self._closed:
+            time.sleep(_HEALTH_INTERVAL)
+            with self._cond:
+                idle = [w for w in self._workers if w.state == "idle"]
+                dead = [w for w in self._workers if w.state != "retired" and not w.alive()]
+            unhealthy = [w for w in idle if w not in dead and not w.healthy()]
+            with self._cond:
+                for w in dead + unhealthy:
+                    if w.state in ("idle", "starting"):
+                        self._counters["replaced_unhealthy"] += 1
+                        self._replace_locked(w, "failed health check")
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            workers, self._workers = list(self._workers), []
+            self._cond.notify_all()
+        for w in workers:
+            w.state = "retired"
+            w.stop()
+
+    # ── Checkout ─────────────────────────────────────────────────────────
+
+    def _unavailable_locked(self) -> bool:
+        return self._closed or (
+            self._start_failures >= _MAX_START_FAILURES
+            and not any(w.state in ("idle", "busy", "starting") for w in self._workers)
+        )
+
+    @contextmanager
+    def worker(self, timeout: float = 600):
+        """
+        Borrow an idle worker for one render; yields its base URL. Raises
+        RuntimeError if none frees up within `timeout` or the pool can't run.
+        A connection error during the render replaces the worker.
+        """
+        started = time.time()
+        with self._cond:
+            self._start_locked()
+            self._waiting += 1
+            try:
+                while True:
+                    if self._unavailable_locked():
+                        raise RuntimeError(f"Remotion renderer pool unavailable: {self._last_error}")
+                    idle = next((w for w in self._workers if w.state == "idle"), None)
+                    if idle is not None:
+                        break
+                    remaining = timeout - (time.time() - started)
+                    if remaining <= 0:
+                        raise RuntimeError(f"No Remotion renderer free within {timeout:.0f}s")
+                    self._cond.wait(min(remaining, 5.0))
+            finally:
+                self._waiting -= 1
+            idle.state = "busy"
+            self._wait_seconds_total += time.time() - started
+
+        ok = False
+        broken = False
+        try:
+            yield idle.url
+            ok = True
+        except requests.ConnectionError:
+            broken = True
+            raise
+        finally:
+            with self._cond:
+                idle.renders += 1
+                self._counters["renders"] += 1
+                if not ok:
+                    self._counters["failed_renders"] += 1
+                if idle.state == "busy":
+                    if broken or not idle.alive():
+                        self._counters["replaced_unhealthy"] += 1
+                        self._replace_locked(idle, "connection lost during render")
+                    elif idle.renders >= self.max_renders:
+                        self._counters["recycled"] += 1
+                        self._replace_locked(idle, f"recycled after {idle.renders} renders")
+                    else:
+                        idle.state = "idle"
+                self._cond.notify_all()
+
+    # ── Introspection ────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._cond:
+            workers = [
+                {
+                    "port": w.port,
+                    "state": w.state,
+                    "renders": w.renders,
+                    "uptime_seconds": round(now - w.started_at, 1),
+                    "ready_seconds": w.ready_seconds,
+                }
+                for w in self._workers
+            ]
+            renders = self._counters["renders"]
+            return {
+                "started": self._started,
+                "size": self.size,
+                "max_renders": self.max_renders,
+                "queue_depth": self._waiting,
+                "idle": sum(1 for w in self._workers if w.state == "idle"),
+                "busy": sum(1 for w in self._workers if w.state == "busy"),
+                "starting": sum(1 for w in self._workers if w.state == "starting"),
+                "available": not self._unavailable_locked(),
+                "last_error": self._last_error,
+                "avg_wait_seconds": round(self._wait_seconds_total / renders, 2) if renders else None,
+                **self._counters,
+                "workers": workers,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> RendererPool:
+    """Process-wide pool, created (and its workers spawned) on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RendererPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def stats() -> dict:
+    """Pool stats without starting it."""
+    with _pool_lock:
+        pool = _pool
+    return pool.stats() if pool is not None else {"started": False}
+
+
+def _render_captions_cli(input_path, props: dict, output_path, timeout: float):
+    """One-shot `node render_captions.js` (bundles on every call)."""
+    renderer_dir = remotion_dir()
+    render_script = os.path.join(renderer_dir, "render_captions.js")
+    if not os.path.isfile(render_script):
+        raise FileNotFoundError(f"Remotion render script not found: {render_script}")
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as pf:
+        json.dump(props, pf)
+        props_path = pf.name
+    try:
+        result = subprocess.run(
+            ["node", render_script, "--input", str(input_path), "--props", props_path,
+             "--output", str(output_path)],
+            capture_output=True, text=True, timeout=timeout, cwd=renderer_dir,
+        )
+    finally:
+        try:
+            os.unlink(props_path)
+        except OSError:
+            pass
+    for line in (result.stdout or "").strip().split("\n"):
+        if line.strip():
+            print(f"      {line}")
+    if result.returncode != 0 or not os.path.isfile(output_path):
+        stderr_msg = result.stderr.strip()[-500:] if result.stderr else "no stderr"
+        raise RuntimeError(f"Remotion exited with code {result.returncode}: {stderr_msg}")
+
+
+def render_captions(input_path, transcription: dict, output_path,
+                    subtitle_style: str = "hormozi", subtitle_placement: str = "middle",
+                    timeout: float = 300) -> str:
+    """
+    Burn Remotion captions onto `input_path`, writing `output_path`.
+
+    Uses a warm pool worker (POST /render) unless REMOTION_POOL_ENABLED=false,
+    then the one-shot CLI. Raises on failure so callers can fall back to ffmpeg.
+    """
+    props = {
+        "transcription": transcription,
+        "subtitleStyle": subtitle_style,
+        "subtitlePlacement": subtitle_placement,
+    }
+    if not pool_enabled():
+        _render_captions_cli(input_path, props, output_path, timeout)
+        return str(output_path)
+
+    with get_pool().worker(timeout=timeout) as base_url:
+        resp = requests.post(
+            f"{base_url}/render",
+            json={"videoPath": str(Path(input_path).resolve()), **props},
+            stream=True,
+            timeout=timeout,
+        )
+        if resp.status_code != 200:
+            raise RuntimeError(f"Remotion renderer returned {resp.status_code}: {resp.text[:500]}")
+        with open(output_path, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=1024 * 1024):
+                if chunk:
+                    f.write(chunk)
+    return str(output_path)
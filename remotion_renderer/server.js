@@ -21,6 +21,8 @@ const OFFTHREAD_CACHE_SIZE = 50 * 1024 * 1024; // 50MB
 
 // Pre-bundle the Remotion project on startup (cached for all subsequent renders)
 let bundlePromise = null;
+let bundleReady = false;
+let bundleError = null;
 
 async function getBundle() {
   if (!bundlePromise) {
@@ -29,7 +31,16 @@ async function getBundle() {
     bundlePromise = bundle({
       entryPoint: path.join(__dirname, 'src/index.ts'),
     });
-    bundlePromise.then(url => console.log('[Remotion] Bundle ready:', url));
+    bundlePromise.then(
+      url => {
+        bundleReady = true;
+        bundleError = null;
+        console.log('[Remotion] Bundle ready:', url);
+      },
+      err => {
+        bundleError = err.message;
+      },
+    );
   }
   return bundlePromise;
 }
@@ -39,6 +50,15 @@ app.get('/health', (req, res) => {
   res.json({ status: 'ok', service: 'remotion-renderer' });
 });
 
+// Readiness: 200 once the caption bundle is built (the Python renderer pool
+// only routes work to a worker after this), 503 while bundling or if it failed.
+app.get('/ready', (req, res) => {
+  if (bundleReady) {
+    return res.json({ status: 'ready' });
+  }
+  res.status(503).json({ status: bundleError ? 'error' : 'bundling', error: bundleError });
+});
+
 // Debug endpoint to inspect Chrome Headless Shell and system info
 app.get('/debug', (req, res) => {
   const os = require('os');
@@ -0,0 +1,233 @@
+"""
+Scene Scheduler — dependency-aware concurrent execution for the generation pipeline.
+
+The pipeline used to render scenes one at a time, even though most of the
+work in a video does not depend on anything else: app-clip and cinematic
+downloads, Nano Banana composites, independent Veo scenes and the Suno
+music track can all be in flight together. Only extend / last-frame chains
+are truly ordered.
+
+SceneScheduler runs a DAG of nodes on a shared thread pool:
+
+  - Nodes are added with `add(key, fn, deps=..., resource=...)` and start as
+    soon as every dependency has finished successfully. Nodes can be added
+    while others are already running, so a pipeline can start the music
+    node early and add scene nodes later.
+  - `resource` names a provider/resource class ("video", "image", "music",
+    "download"). Each class has a concurrency cap so a 30s video cannot
+    flood Kie/WaveSpeed with more renders than our account allows.
+  - A node whose dependency failed is marked failed without running.
+  - `result(key)` blocks until the node finishes and returns its value or
+    re-raises its exception.
+
+Ordered chains are expressed as edges: `add("extend_3", fn, deps=["extend_2"])`
+(the Veo extend chain, Seedance last-frame chains, and a Nano Banana
+composite feeding its scene's animation). Each node runs in a copy of the
+context it was added from, so contextvars set by the pipeline (e.g.
+provider_hedging's per-job budget) reach it. Nodes run on pool threads, so
+callbacks they share (status updates) go through `serialized()`.
+
+Config (env overrides for the per-resource caps):
+  SCENE_CONCURRENCY_VIDEO     (default 4)
+  SCENE_CONCURRENCY_IMAGE     (default 3)
+  SCENE_CONCURRENCY_MUSIC     (default 1)
+  SCENE_CONCURRENCY_DOWNLOAD  (default 6)
+"""
+import os
+import time
+import functools
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_RESOURCE_LIMITS = {
+    "video": 4,
+    "image": 3,
+    "music": 1,
+    "download": 6,
+}
+
+
+def _resource_limits() -> dict[str, int]:
+    limits = {}
+    for name, default in DEFAULT_RESOURCE_LIMITS.items():
+        try:
+            limits[name] = max(1, int(os.getenv(f"SCENE_CONCURRENCY_{name.upper()}", default)))
+        except ValueError:
+            limits[name] = default
+    return limits
+
+
+def serialized(fn):
+    """Wrap `fn` so concurrent nodes call it one at a time."""
+    lock = threading.Lock()
+
+    @functools.wraps(fn)
+    def _call(*args, **kwargs):
+        with lock:
+            return fn(*args, **kwargs)
+    return _call
+
+
+class DependencyFailed(RuntimeError):
+    """Raised for nodes skipped because an upstream node failed."""
+
+
+class _Node:
+    __slots__ = ("key", "fn", "deps", "resource", "context", "done", "result", "error", "started", "finished")
+
+    def __init__(self, key, fn, deps, resource):
+        self.key = key
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.resource = resource
+        self.context = contextvars.copy_context()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+
+
+class SceneScheduler:
+    """
+    Run pipeline nodes concurrently, respecting dependencies and per-resource caps.
+
+    Nodes are only handed to the worker pool once their dependencies are done
+    and their resource class has a free slot, so waiting nodes never occupy
+    a worker thread.
+
+    Use as a context manager so the worker pool is always shut down:
+
+        with SceneScheduler() as sched:
+            sched.add("music", _make_music, resource="music")
+            sched.add("scene_1", _render_scene_1, resource="video")
+            path = sched.result("scene_1")
+    """
+
+    def __init__(self, resource_limits: dict[str, int] = None, max_workers: int = None):
+        self._limits = resource_limits or _resource_limits()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or sum(self._limits.values()) + 2,
+            thread_name_prefix="scene",
+        )
+        self._nodes: dict[str, _Node] = {}
+        self._waiting: list[_Node] = []
+        self._ready: dict[str, deque] = {}
+        self._running: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._cancelled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # Don't block the failing pipeline on renders it no longer needs.
+            self.cancel()
+            self.shutdown(wait=False)
+        else:
+            self.shutdown()
+        return False
+
+    # ── Graph building ───────────────────────────────────────────────────
+
+    def add(self, key: str, fn, deps=(), resource: str = None) -> str:
+        """Register a node. It starts once all `deps` have completed successfully."""
+        with self._lock:
+            if key in self._nodes:
+                raise ValueError(f"SceneScheduler: duplicate node '{key}'")
+            missing = [d for d in deps if d not in self._nodes]
+            if missing:
+                raise ValueError(f"SceneScheduler: node '{key}' depends on unknown {missing}")
+            node = _Node(key, fn, deps, resource)
+            self._nodes[key] = node
+            self._waiting.append(node)
+            self._promote_locked()
+            self._dispatch_locked()
+        return key
+
+    def _promote_locked(self):
+        """Move waiting nodes whose dependencies have settled to the ready queues."""
+        changed = True
+        while changed:
+            changed = False
+            for node in list(self._waiting):
+                deps = [self._nodes[d] for d in node.deps]
+                if not all(d.done.is_set() for d in deps):
+                    continue
+                self._waiting.remove(node)
+                changed = True
+                failed = next((d for d in deps if d.error is not None), None)
+                if failed is not None or self._cancelled:
+                    reason = (
+                        f"dependency '{failed.key}' failed: {failed.error}"
+                        if failed is not None else "pipeline cancelled"
+                    )
+                    node.error = DependencyFailed(f"'{node.key}' skipped — {reason}")
+                    node.done.set()
+                    continue
+                self._ready.setdefault(node.resource, deque()).append(node)
+
+    def _dispatch_locked(self):
+        for resource, queue in self._ready.items():
+            limit = self._limits.get(resource)
+            while queue and (limit is None or self._running.get(resource, 0) < limit):
+                node = queue.popleft()
+                self._running[resource] = self._running.get(resource, 0) + 1
+                self._pool.submit(self._execute, node)
+
+    def _execute(self, node: _Node):
+        try:
+            if self._cancelled:
+                raise DependencyFailed(f"'{node.key}' skipped — pipeline cancelled")
+            node.started = time.time()
+            node.result = node.context.run(node.fn)
+        except BaseException as e:
+            node.error = e
+        finally:
+            node.finished = time.time()
+            with self._lock:
+                self._running[node.resource] -= 1
+                node.done.set()
+                self._promote_locked()
+                self._dispatch_locked()
+
+    # ── Results ──────────────────────────────────────────────────────────
+
+    def result(self, key: str, timeout: float = None):
+        """Block until `key` finishes; return its value or re-raise its error."""
+        node = self._nodes[key]
+        if not node.done.wait(timeout):
+            raise TimeoutError(f"SceneScheduler: node '{key}' still running after {timeout}s")
+        if node.error is not None:
+            raise node.error
+        return node.result
+
+    def wait(self, keys):
+        """Block until every node in `keys` has finished, successfully or not."""
+        for key in keys:
+            self._nodes[key].done.wait()
+
+    def results(self, keys) -> list:
+        """Results for `keys` in order. Raises the first failure in that order."""
+        return [self.result(k) for k in keys]
+
+    def cancel(self):
+        """Skip every node that has not started yet. In-flight nodes finish normally."""
+        with self._lock:
+            self._cancelled = True
+            self._promote_locked()
+
+    def timings(self) -> dict[str, float]:
+        """Wall-clock seconds spent running each finished node (excludes queueing)."""
+        return {
+            k: round(n.finished - n.started, 2)
+            for k, n in self._nodes.items()
+            if n.started and n.finished
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,70 @@
+"""One-time backfill: build analytics_daily_rollups from existing posts.
+
+The dashboard endpoints read pre-aggregated daily buckets (migration 072)
+that are maintained on every analytics_posts write. Posts ingested before
+the migration have no buckets yet; this rebuilds them for every user with
+analytics posts. A user whose rollups are still empty on first dashboard
+load is also backfilled lazily, but running this once after the migration
+avoids a slow first load for large accounts.
+
+Idempotent: each account slice is rebuilt from scratch. Pass --dry-run to
+list the users that would be processed.
+"""
+import sys
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(root))
+
+from dotenv import load_dotenv
+
+load_dotenv(root / ".env.saas")
+load_dotenv(root / "env.saas")
+load_dotenv(root / ".env")
+load_dotenv(root / "env")
+
+from ugc_db.db_manager import get_supabase
+from ugc_backend.analytics import db as analytics_db
+
+
+def _user_ids(sb) -> list[str]:
+    users: set[str] = set()
+    start, page = 0, 1000
+    while True:
+        batch = (
+            sb.table("analytics_posts")
+            .select("user_id")
+            .order("id")
+            .range(start, start + page - 1)
+            .execute()
+        ).data or []
+        users.update(str(r["user_id"]) for r in batch if r.get("user_id"))
+        if len(batch) < page:
+            break
+        start += page
+    return sorted(users)
+
+
+def main() -> int:
+    dry_run = "--dry-run" in sys.argv
+    sb = get_supabase()
+
+    users = _user_ids(sb)
+    print(f"Users with analytics posts: {len(users)}")
+    if dry_run:
+        for uid in users[:20]:
+            print(f"  - {uid[:8]}...")
+        print("\nDry run — no changes written.")
+        return 0
+
+    total = 0
+    for uid in users:
+        written = analytics_db.rebuild_user_rollups(uid)
+        total += written
+        print(f"  {uid[:8]}...  {written} bucket(s)")
+    print(f"\nWrote {total} rollup buckets for {len(users)} users.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
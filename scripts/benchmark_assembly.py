@@ -0,0 +1,95 @@
+"""
+Benchmark the multipass vs single-pass filtergraph assembly engines.
+
+Assembles the same clips with both modes, reports wall time, and scores each
+output against a lossless single-pass reference (libx264 -crf 0) with ffmpeg's
+SSIM and PSNR filters, so a switch of ASSEMBLY_MODE can be justified with
+numbers rather than eyeballing.
+
+Run:
+  python scripts/benchmark_assembly.py clip1.mp4 clip2.mp4 clip3.mp4 \
+      --types veo,veo,clip --music music.mp3 --max-duration 30 --runs 3
+
+Without --types every clip is treated as 'veo' (transitions everywhere).
+"""
+import argparse
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import assemble_video  # noqa: E402
+
+
+def _score(distorted: Path, reference: Path) -> tuple[float, float]:
+    """Return (SSIM All, average PSNR) of `distorted` against `reference`."""
+    out = {}
+    for name, filt in (("ssim", "ssim"), ("psnr", "psnr")):
+        cmd = [
+            "ffmpeg", "-i", str(distorted), "-i", str(reference),
+            "-lavfi", f"[0:v][1:v]{filt}", "-f", "null", "-",
+        ]
+        stderr = subprocess.run(cmd, capture_output=True, text=True).stderr
+        pattern = r"All:([\d.]+)" if name == "ssim" else r"average:([\d.]+|inf)"
+        match = re.findall(pattern, stderr)
+        out[name] = float(match[-1]) if match else float("nan")
+    return out["ssim"], out["psnr"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="+", help="Scene clips, in timeline order")
+    parser.add_argument("--types", help="Comma-separated scene types (veo, clip, cinematic_shot, ...)")
+    parser.add_argument("--music", help="Optional background music track")
+    parser.add_argument("--max-duration", type=float, default=None)
+    parser.add_argument("--runs", type=int, default=1, help="Timed runs per mode")
+    args = parser.parse_args()
+
+    scene_types = args.types.split(",") if args.types else ["veo"] * len(args.clips)
+    if len(scene_types) != len(args.clips):
+        parser.error("--types must list one type per clip")
+
+    work = Path(tempfile.mkdtemp(prefix="assembly_bench_"))
+    try:
+        reference = work / "reference.mp4"
+        print("[BENCH] Rendering near-lossless reference...")
+        assemble_video.assemble_video_single_pass(
+            args.clips, reference, music_path=args.music,
+            max_duration=args.max_duration, scene_types=list(scene_types), crf=0,
+        )
+
+        rows = []
+        for mode in assemble_video.ASSEMBLY_MODES:
+            times = []
+            output = work / f"{mode}.mp4"
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                assemble_video.assemble_video(
+                    [{"path": c, "type": t} for c, t in zip(args.clips, scene_types)],
+                    output,
+                    music_path=args.music,
+                    max_duration=args.max_duration,
+                    scene_types=list(scene_types),
+                    assembly_mode=mode,
+                )
+                times.append(time.perf_counter() - started)
+            ssim, psnr = _score(output, reference)
+            size_mb = output.stat().st_size / (1024 * 1024)
+            rows.append((mode, min(times), sum(times) / len(times), ssim, psnr, size_mb))
+
+        print("\n[BENCH] Results")
+        print(f"   {'mode':<12} {'best s':>8} {'mean s':>8} {'SSIM':>8} {'PSNR dB':>8} {'MB':>6}")
+        for mode, best, mean, ssim, psnr, size_mb in rows:
+            print(f"   {mode:<12} {best:>8.2f} {mean:>8.2f} {ssim:>8.4f} {psnr:>8.2f} {size_mb:>6.1f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
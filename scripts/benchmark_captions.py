@@ -0,0 +1,148 @@
+"""
+Benchmark captioned-video wall time: post-assembly captioning vs. burning
+captions during the assembly encode.
+
+Flows timed on the same clips (each run starts from the raw scene clips):
+  post-ffmpeg   assemble -> transcribe final file -> ffmpeg `ass=` re-encode
+  post-remotion assemble -> transcribe final file -> node render_captions.js
+                (only with --remotion; needs remotion_renderer/ installed)
+  assembly      render_timeline_audio -> transcribe mix -> assemble with the
+                ASS track burned into the (single) encode   [CAPTION_MODE=assembly]
+
+By default the Whisper call is replaced by a synthetic word track so the
+numbers isolate ffmpeg/Remotion cost (audio extraction is still timed);
+pass --whisper to include real transcription (needs OPENAI_API_KEY).
+Results are reported per run and normalised to seconds per 30s of video.
+
+Run:
+  python scripts/benchmark_captions.py clip1.mp4 clip2.mp4 clip3.mp4 \\
+      --types veo,veo,clip --music music.mp3 --max-duration 30 --runs 3
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import assemble_video  # noqa: E402
+import subtitle_engine  # noqa: E402
+
+
+def _transcribe(media_path: Path, use_whisper: bool) -> dict:
+    if use_whisper:
+        return subtitle_engine.extract_transcription_with_whisper(str(media_path)) or {}
+    # Same audio extraction Whisper does, then a fixed 2.5 words/s track.
+    audio = media_path.with_suffix(".bench.mp3")
+    subprocess.run(["ffmpeg", "-y", "-i", str(media_path), "-q:a", "0", "-map", "a", str(audio)],
+                   capture_output=True, check=True)
+    duration = assemble_video.get_video_duration(audio)
+    audio.unlink(missing_ok=True)
+    words, t = [], 0.0
+    while t + 0.4 <= duration:
+        words.append({"word": f"word{len(words)}", "start": round(t, 2), "end": round(t + 0.35, 2)})
+        t += 0.4
+    return {"text": " ".join(w["word"] for w in words), "words": words}
+
+
+def _post_ffmpeg(scenes, scene_types, args, work: Path) -> Path:
+    assembled = work / "post_assembled.mp4"
+    assemble_video.assemble_video(scenes, assembled, music_path=args.music, max_duration=args.max_duration,
+                                  scene_types=scene_types, assembly_mode=args.mode)
+    transcription = _transcribe(assembled, args.whisper)
+    ass = work / "post.ass"
+    subtitle_engine.generate_subtitles_from_whisper(transcription, ass)
+    output = work / "post_ffmpeg.mp4"
+    subprocess.run([
+        "ffmpeg", "-y", "-i", str(assembled), "-vf", assemble_video.ass_filter(ass),
+        "-c:v", "libx264", "-c:a", "copy", "-preset", "veryfast", str(output),
+    ], capture_output=True, check=True)
+    return output
+
+
+def _post_remotion(scenes, scene_types, args, work: Path) -> Path:
+    remotion_dir = ROOT / "remotion_renderer"
+    assembled = work / "remotion_assembled.mp4"
+    assemble_video.assemble_video(scenes, assembled, music_path=args.music, max_duration=args.max_duration,
+                                  scene_types=scene_types, assembly_mode=args.mode)
+    props = work / "props.json"
+    props.write_text(json.dumps({
+        "transcription": _transcribe(assembled, args.whisper),
+        "subtitleStyle": "hormozi",
+        "subtitlePlacement": "middle",
+    }))
+    output = work / "post_remotion.mp4"
+    subprocess.run([
+        "node", str(remotion_dir / "render_captions.js"),
+        "--input", str(assembled), "--props", str(props), "--output", str(output),
+    ], capture_output=True, check=True, cwd=remotion_dir)
+    return output
+
+
+def _assembly(scenes, scene_types, args, work: Path) -> Path:
+    mix = work / "timeline_audio.m4a"
+    assemble_video.render_timeline_audio(scenes, mix, max_duration=args.max_duration, scene_types=scene_types)
+    transcription = _transcribe(mix, args.whisper)
+    ass = work / "assembly.ass"
+    subtitle_engine.generate_subtitles_from_whisper(transcription, ass)
+    output = work / "assembly.mp4"
+    assemble_video.assemble_video(scenes, output, music_path=args.music, max_duration=args.max_duration,
+                                  scene_types=scene_types, assembly_mode=args.mode, subtitle_path=ass)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="+", help="Scene clips, in timeline order")
+    parser.add_argument("--types", help="Comma-separated scene types (veo, clip, cinematic_shot, ...)")
+    parser.add_argument("--music", help="Optional background music track")
+    parser.add_argument("--max-duration", type=float, default=30)
+    parser.add_argument("--mode", choices=assemble_video.ASSEMBLY_MODES, default="filtergraph",
+                        help="Assembly engine used by every flow (default filtergraph)")
+    parser.add_argument("--runs", type=int, default=1, help="Timed runs per flow")
+    parser.add_argument("--whisper", action="store_true", help="Use real Whisper transcription")
+    parser.add_argument("--remotion", action="store_true", help="Also time the Remotion flow")
+    args = parser.parse_args()
+
+    scene_types = args.types.split(",") if args.types else ["veo"] * len(args.clips)
+    if len(scene_types) != len(args.clips):
+        parser.error("--types must list one type per clip")
+    if args.whisper and not os.getenv("OPENAI_API_KEY"):
+        parser.error("--whisper needs OPENAI_API_KEY")
+    scenes = [{"path": c, "type": t} for c, t in zip(args.clips, scene_types)]
+
+    flows = [("post-ffmpeg", _post_ffmpeg)]
+    if args.remotion:
+        flows.append(("post-remotion", _post_remotion))
+    flows.append(("assembly", _assembly))
+
+    work = Path(tempfile.mkdtemp(prefix="caption_bench_"))
+    try:
+        rows = []
+        for name, flow in flows:
+            times = []
+            output = None
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                output = flow(scenes, list(scene_types), args, work)
+                times.append(time.perf_counter() - started)
+            duration = assemble_video.get_video_duration(output) or float("nan")
+            per_30s = min(times) * 30.0 / duration
+            rows.append((name, min(times), sum(times) / len(times), duration, per_30s))
+
+        print("\n[BENCH] Results")
+        print(f"   {'flow':<14} {'best s':>8} {'mean s':>8} {'video s':>8} {'s / 30s':>8}")
+        for name, best, mean, duration, per_30s in rows:
+            print(f"   {name:<14} {best:>8.2f} {mean:>8.2f} {duration:>8.1f} {per_30s:>8.2f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
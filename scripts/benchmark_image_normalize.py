@@ -0,0 +1,115 @@
+"""
+Benchmark image normalization over a corpus of product photos.
+
+Modes timed on every image in the corpus (JPEG / PNG / WebP):
+  legacy      the old path: full decode, ≤4096px, PNG optimize=True
+  agent       ≤1568px JPEG q85                  (agent vision input)
+  reference   ≤2048px JPEG q92 4:4:4            (provider reference)
+  original    ≤4096px JPEG q95 4:4:4 / fast PNG (storage original)
+  png-fast    normalize_image_bytes (≤4096px, PNG compress_level=1)
+
+Reports median / p95 milliseconds and mean output size per mode, then runs
+the corpus through normalize_image_async twice with --concurrency uploads
+in flight (cold, then cached) to show pool throughput and cache hits.
+
+Run:
+  python scripts/benchmark_image_normalize.py path/to/product_photos --runs 3
+"""
+import argparse
+import asyncio
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PIL import Image, ImageOps  # noqa: E402
+
+from ugc_db import image_normalize  # noqa: E402
+
+EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def _legacy(raw: bytes) -> bytes:
+    """normalize_image_bytes as it was before destination presets."""
+    im = Image.open(io.BytesIO(raw))
+    im = ImageOps.exif_transpose(im)
+    if im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info):
+        bg = Image.new("RGB", im.size, (255, 255, 255))
+        rgba = im.convert("RGBA")
+        bg.paste(rgba, mask=rgba.split()[-1])
+        im = bg
+    elif im.mode != "RGB":
+        im = im.convert("RGB")
+    if max(im.size) > 4096:
+        im.thumbnail((4096, 4096), Image.LANCZOS)
+    out = io.BytesIO()
+    im.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+MODES = {
+    "legacy": _legacy,
+    "agent": lambda raw: image_normalize.normalize_image(raw, image_normalize.AGENT).data,
+    "reference": lambda raw: image_normalize.normalize_image(raw, image_normalize.REFERENCE).data,
+    "original": lambda raw: image_normalize.normalize_image(raw, image_normalize.ORIGINAL).data,
+    "png-fast": image_normalize.normalize_image_bytes,
+}
+
+
+def _pct(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _pool_pass(corpus, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(raw):
+        async with sem:
+            await image_normalize.normalize_image_async(raw, image_normalize.REFERENCE)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(raw) for raw in corpus))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="Directory of product photos")
+    parser.add_argument("--runs", type=int, default=1, help="Timed runs per image and mode")
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated subset of modes")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight images for the pool pass")
+    args = parser.parse_args()
+
+    files = sorted(p for p in Path(args.corpus).rglob("*") if p.suffix.lower() in EXTS)
+    if not files:
+        parser.error(f"no images under {args.corpus}")
+    corpus = [p.read_bytes() for p in files]
+    print(f"{len(files)} images, {sum(map(len, corpus)) / 1e6:.1f} MB input")
+
+    print(f"\n{'mode':<10} {'median ms':>10} {'p95 ms':>10} {'mean KB':>10}")
+    for mode in args.modes.split(","):
+        fn = MODES[mode]
+        times, sizes = [], []
+        for raw in corpus:
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                out = fn(raw)
+                times.append((time.perf_counter() - started) * 1000)
+            sizes.append(len(out))
+        print(f"{mode:<10} {statistics.median(times):>10.1f} {_pct(times, 0.95):>10.1f} "
+              f"{statistics.mean(sizes) / 1024:>10.0f}")
+
+    cold = asyncio.run(_pool_pass(corpus, args.concurrency))
+    warm = asyncio.run(_pool_pass(corpus, args.concurrency))
+    print(f"\npool ({image_normalize.stats()['workers']} workers, reference): "
+          f"cold {len(corpus) / cold:.1f} img/s, cached {len(corpus) / warm:.0f} img/s")
+    print(f"cache: {image_normalize.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,8 @@ from pathlib import Path
 from env_loader import load_env
 load_env(Path(__file__))
 
+from services import http_pool, project_snapshot
+
 CORE_API_URL = os.getenv("CORE_API_URL", "http://localhost:8000")
 
 
@@ -35,46 +37,49 @@ class CoreAPIClient:
             self._headers["X-Skip-Project-Scope"] = "1"
 
     async def _request(self, method: str, path: str, _retries: int = 3, **kwargs) -> dict:
-        import asyncio as _aio
-
-        last_exc = None
-        for attempt in range(1, _retries + 1):
+        # Shared keep-alive pool; transient transport errors are retried
+        # with jittered backoff inside http_pool (all methods, as before).
+        resp = await http_pool.request(
+            method,
+            f"{CORE_API_URL}{path}",
+            headers=self._headers,
+            timeout=60.0,
+            retries=_retries - 1,
+            retry_all_methods=True,
+            **kwargs,
+        )
+        if method.upper() != "GET":
+            # Any write may change the cached agent snapshot.
+            project_snapshot.invalidate(self.token)
+        if resp.is_error:
+            detail = resp.text
             try:
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    resp = await client.request(
-                        method,
-                        f"{CORE_API_URL}{path}",
-                        headers=self._headers,
-                        **kwargs,
-                    )
-                    if resp.is_error:
-                        detail = resp.text
-                        try:
-                            body = resp.json()
-                            if isinstance(body, dict) and body.get("detail"):
-                                detail = body["detail"]
-                        except Exception:
-                            pass
-                        raise httpx.HTTPStatusError(
-                            f"{resp.status_code} {resp.reason_phrase}: {detail}",
-                            request=resp.request,
-                            response=resp,
-                        )
-                    return resp.json()
-            except (httpx.RemoteProtocolError, httpx.ReadError, httpx.ConnectError) as e:
-                last_exc = e
-                if attempt < _retries:
-                    wait = 2 ** (attempt - 1)
-                    print(f"[CoreAPI] {method} {path} — transient error ({e}), retry {attempt}/{_retries} in {wait}s")
-                    await _aio.sleep(wait)
-                else:
-                    print(f"[CoreAPI] {method} {path} — failed after {_retries} attempts: {e}")
-                    raise
+                body = resp.json()
+                if isinstance(body, dict) and body.get("detail"):
+                    detail = body["detail"]
+            except Exception:
+                pass
+            raise httpx.HTTPStatusError(
+                f"{resp.status_code} {resp.reason_phrase}: {detail}",
+                request=resp.request,
+                response=resp,
+            )
+        return resp.json()
 
     # ── Projects ──────────────────────────────────────────────────────
     async def list_projects(self) -> list:
         return await self._request("GET", "/api/projects")
 
+    async def get_project_snapshot(self, project_id: str, fields: Optional[list[str]] = None,
+                                   jobs_limit: int = 25) -> dict:
+        """Products, influencers, clones (with looks), scripts, app clips and
+        recent jobs in one round-trip. Prefer project_snapshot.get_section,
+        which caches this per (user, project)."""
+        params: dict = {"jobs_limit": jobs_limit}
+        if fields:
+            params["fields"] = ",".join(fields)
+        return await self._request("GET", f"/api/projects/{project_id}/snapshot", params=params)
+
     async def get_project(self, project_id: str) -> dict:
         projects = await self.list_projects()
         for p in projects:
@@ -204,7 +209,7 @@ class CoreAPIClient:
             "Prefer": "return=representation",
         }
 
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with http_pool.client(timeout=15.0) as client:
             resp = await client.post(
                 f"{supabase_url}/rest/v1/product_shots",
                 headers=headers,
@@ -233,7 +238,7 @@ class CoreAPIClient:
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with http_pool.client(timeout=15.0) as client:
             resp = await client.get(
                 f"{supabase_url}/rest/v1/product_shots",
                 headers=headers,
@@ -336,24 +341,26 @@ class CoreAPIClient:
         if language_accent:
             payload["language_accent"] = language_accent
         # Script generation uses a 3-call prompt chain — may take 30-60s
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with http_pool.client(timeout=120.0) as client:
             resp = await client.request(
                 "POST",
                 f"{CORE_API_URL}/api/scripts/generate",
                 headers=self._headers,
                 json=payload,
             )
+            project_snapshot.invalidate(self.token)
             resp.raise_for_status()
             return resp.json()
 
     # ── Product Analysis ──────────────────────────────────────────────
     async def analyze_product(self, product_id: str) -> dict:
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with http_pool.client(timeout=120.0) as client:
             resp = await client.request(
                 "POST",
                 f"{CORE_API_URL}/analyze-product/{product_id}",
                 headers=self._headers,
             )
+            project_snapshot.invalidate(self.token)
             resp.raise_for_status()
             return resp.json()
 
@@ -398,13 +405,14 @@ class CoreAPIClient:
             payload["context"] = context
         if language_accent:
             payload["language_accent"] = language_accent
-        async with httpx.AsyncClient(timeout=180.0) as client:
+        async with http_pool.client(timeout=180.0) as client:
             resp = await client.request(
                 "POST",
                 f"{CORE_API_URL}/api/scripts/generate",
                 headers=self._headers,
                 json=payload,
             )
+            project_snapshot.invalidate(self.token)
             resp.raise_for_status()
             return resp.json()
 
@@ -513,13 +521,14 @@ class CoreAPIClient:
             payload["shadow_offset_x"] = shadow_offset_x
         if shadow_offset_y is not None:
             payload["shadow_offset_y"] = shadow_offset_y
-        async with httpx.AsyncClient(timeout=300.0) as client:
+        async with http_pool.client(timeout=300.0) as client:
             resp = await client.request(
                 "POST",
                 f"{CORE_API_URL}/api/editor/caption-video/{job_id}",
                 headers=self._headers,
                 json=payload,
             )
+            project_snapshot.invalidate(self.token)
             resp.raise_for_status()
             return resp.json()
 
@@ -129,6 +129,12 @@ async def _stop_campaign_watcher() -> None:
             pass
 
 
+@app.on_event("shutdown")
+async def _close_http_pool() -> None:
+    from services import http_pool
+    await http_pool.aclose()
+
+
 # ── Upload Endpoint (server-side, bypasses RLS) ────────────────────────
 from fastapi import Depends
 from auth import get_current_user
@@ -158,10 +164,12 @@ async def upload_image_base64(request: dict, user: dict = Depends(get_current_us
     filename = f"upload_{uuid.uuid4().hex[:12]}.{ext}"
 
     if content_type.startswith("image/"):
-        from services.image_normalize import normalize_image_bytes
-        image_bytes = normalize_image_bytes(image_bytes)
-        content_type = "image/png"
-        filename = filename.rsplit(".", 1)[0] + ".png"
+        # Custom uploads from the create bar are generation references.
+        from services.image_normalize import REFERENCE, normalize_image_async
+        normalized = await normalize_image_async(image_bytes, REFERENCE)
+        image_bytes = normalized.data
+        content_type = normalized.content_type
+        filename = filename.rsplit(".", 1)[0] + "." + normalized.ext
 
     # Upload via service key (no RLS issues)
     try:
@@ -225,12 +233,21 @@ async def upload_file_multipart(
     if not ext:
         ext = content_type.split("/")[-1].replace("jpeg", "jpg")
     filename = f"agent_uploads/upload_{uuid.uuid4().hex[:12]}.{ext}"
+    vision = None
 
     if kind == "image":
-        from services.image_normalize import normalize_image_bytes
-        contents = normalize_image_bytes(contents)
-        content_type = "image/png"
-        filename = filename.rsplit(".", 1)[0] + ".png"
+        # The stored file is forwarded as a generation reference, so keep the
+        # full-size original; the agent's vision input gets a downsized
+        # sibling (see utils.persist_media.agent_vision_url).
+        from services.image_normalize import AGENT, ORIGINAL, normalize_image_async
+        from utils.persist_media import agent_upload_paths
+        normalized, vision = await _asyncio.gather(
+            normalize_image_async(contents, ORIGINAL),
+            normalize_image_async(contents, AGENT),
+        )
+        contents = normalized.data
+        content_type = normalized.content_type
+        filename, vision_filename = agent_upload_paths(f"upload_{uuid.uuid4().hex[:12]}", normalized.ext)
 
     try:
         from supabase import create_client
@@ -238,6 +255,11 @@ async def upload_file_multipart(
             os.getenv("SUPABASE_URL"),
             os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY"),
         )
+        if vision is not None:
+            sb.storage.from_("user-uploads").upload(
+                vision_filename, vision.data,
+                file_options={"content-type": vision.content_type, "upsert": "true"},
+            )
         sb.storage.from_("user-uploads").upload(
             filename, contents,
             file_options={"content-type": content_type, "upsert": "true"},
@@ -315,6 +337,20 @@ async def health_check():
     }
 
 
+@app.get("/creative-os/health/http")
+async def health_http(user: dict = Depends(get_current_user)):  # noqa: ARG001
+    """Per-endpoint latency histograms for the shared outbound HTTP pool."""
+    from services import http_pool
+    return {"endpoints": http_pool.latency_stats()}
+
+
+@app.get("/creative-os/health/campaign-watcher")
+async def health_campaign_watcher(user: dict = Depends(get_current_user)):  # noqa: ARG001
+    """Campaign watcher tick timings, item counters and concurrency limits."""
+    from workers import campaign_watcher
+    return campaign_watcher.stats()
+
+
 @app.get("/creative-os/routing-version")
 def routing_version():
     """Probe that the running process has dynamic-speaking v3 routing loaded."""
@@ -1536,14 +1536,15 @@ async def rename_project_video(project_id: str, job_id: str, data: dict, user: d
 
 @router.post("/video-thumbnails")
 async def generate_video_thumbnails(data: dict, user: dict = Depends(get_current_user)):
-    """Generate thumbnail images for videos that don't have image previews.
+    """Return poster thumbnails for videos that don't have image previews.
 
     Body: { "jobs": [{"id": "...", "video_url": "..."}] }
-    Returns: { "thumbnails": {"job_id": "thumb_url", ...} }
+    Returns: { "thumbnails": {"job_id": "thumb_url", ...}, "pending": [job_id, ...] }
 
-    Uses FFmpeg to extract the first frame, uploads to Supabase Storage,
-    and updates the video_jobs.thumbnail_url field for caching. Subsequent
-    calls for the same job_id will return the cached thumbnail instantly.
+    Posters are rendered at write time when a job finishes (media_derivatives),
+    so this only reads video_jobs.thumbnail_url. Jobs without one (older rows)
+    are queued for a background backfill and reported as `pending` — ffmpeg
+    never runs on the request path; the next list fetch carries the poster.
     """
     from pathlib import Path
     from env_loader import load_env
@@ -1551,14 +1552,14 @@ async def generate_video_thumbnails(data: dict, user: dict = Depends(get_current
 
     jobs = data.get("jobs", [])
     if not jobs:
-        return {"thumbnails": {}}
+        return {"thumbnails": {}, "pending": []}
 
     supabase_url = os.getenv("SUPABASE_URL")
     anon_key = os.getenv("SUPABASE_ANON_KEY") or os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
 
-    # First, check which jobs already have thumbnail_url cached in the DB
     thumbnails: dict[str, str] = {}
-    jobs_needing_gen: list[dict] = []
+    # Rows the user can see (RLS via their token) — only these are backfilled.
+    visible: set[str] = set()
 
     if supabase_url and anon_key:
         import httpx
@@ -1581,54 +1582,21 @@ async def generate_video_thumbnails(data: dict, user: dict = Depends(get_current
                     )
                     if resp.status_code == 200:
                         for row in resp.json() or []:
+                            visible.add(row["id"])
                             if row.get("thumbnail_url"):
                                 thumbnails[row["id"]] = row["thumbnail_url"]
             except Exception as e:
                 print(f"[Thumbnails] DB check failed: {e}")
 
-    # Filter to only jobs that need generation
-    for job in jobs:
-        jid = job.get("id", "")
-        if jid not in thumbnails and job.get("video_url"):
-            jobs_needing_gen.append(job)
-
-    if not jobs_needing_gen:
-        return {"thumbnails": thumbnails}
-
-    # Generate thumbnails concurrently (max 3 at a time)
-    from utils.thumbnail import generate_thumbnail
-    sem = asyncio.Semaphore(3)
-
-    async def _gen(job: dict):
-        async with sem:
-            jid = job["id"]
-            url = job["video_url"]
-            thumb = await generate_thumbnail(url, jid)
-            if thumb:
-                thumbnails[jid] = thumb
-                # Cache in DB for future requests
-                if supabase_url and anon_key:
-                    try:
-                        import httpx
-                        # Use service role key if available for reliable writes
-                        service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-                        auth_token = service_key if service_key else user["token"]
-                        async with httpx.AsyncClient(timeout=10.0) as http:
-                            await http.patch(
-                                f"{supabase_url}/rest/v1/video_jobs?id=eq.{jid}",
-                                headers={
-                                    "apikey": anon_key,
-                                    "Authorization": f"Bearer {auth_token}",
-                                    "Content-Type": "application/json",
-                                    "Prefer": "return=minimal",
-                                },
-                                json={"thumbnail_url": thumb},
-                            )
-                    except Exception as e:
-                        print(f"[Thumbnails] DB cache write failed for {jid}: {e}")
-
-    await asyncio.gather(*[_gen(j) for j in jobs_needing_gen], return_exceptions=True)
-    return {"thumbnails": thumbnails}
+    missing = [
+        j for j in jobs
+        if j.get("id") in visible and j["id"] not in thumbnails and j.get("video_url")
+    ]
+    if missing:
+        from utils.thumbnail import schedule_backfill
+        schedule_backfill(missing)
+
+    return {"thumbnails": thumbnails, "pending": [j["id"] for j in missing]}
 
 
 # ── AI Caption Generation (for images and generic assets) ──────────────────
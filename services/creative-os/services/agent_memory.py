@@ -20,7 +20,7 @@ import re
 from pathlib import Path, PurePosixPath
 from typing import Optional
 
-import httpx
+from services import http_pool
 
 from env_loader import load_env
 load_env(Path(__file__))
@@ -137,7 +137,7 @@ def _format_file(path: str, content: str, view_range: Optional[list[int]] = None
 
 async def _get_file(user_token: str, user_id: str, path: str) -> Optional[dict]:
     url, anon = _supabase_creds()
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+    async with http_pool.client(timeout=_TIMEOUT) as client:
         resp = await client.get(
             f"{url}/rest/v1/agent_memories",
             headers=_headers(user_token, anon),
@@ -159,7 +159,7 @@ async def _list_under(user_token: str, user_id: str, prefix: str) -> list[dict]:
     """List files whose path starts with `prefix`. Pass the directory form
     (trailing `/`) to avoid matching sibling files with longer names."""
     url, anon = _supabase_creds()
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+    async with http_pool.client(timeout=_TIMEOUT) as client:
         resp = await client.get(
             f"{url}/rest/v1/agent_memories",
             headers=_headers(user_token, anon),
@@ -179,7 +179,7 @@ async def _list_under(user_token: str, user_id: str, prefix: str) -> list[dict]:
 
 async def _total_size(user_token: str, user_id: str) -> int:
     url, anon = _supabase_creds()
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+    async with http_pool.client(timeout=_TIMEOUT) as client:
         resp = await client.get(
             f"{url}/rest/v1/agent_memories",
             headers=_headers(user_token, anon),
@@ -205,7 +205,7 @@ async def _upsert_file(user_token: str, user_id: str, path: str, content: str) -
         "content": content,
         "updated_at": datetime.now(timezone.utc).isoformat(),
     }
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+    async with http_pool.client(timeout=_TIMEOUT) as client:
         resp = await client.post(
             f"{url}/rest/v1/agent_memories",
             headers=headers,
@@ -221,7 +221,7 @@ async def _upsert_file(user_token: str, user_id: str, path: str, content: str) -
 async def _delete_exact(user_token: str, user_id: str, path: str) -> int:
     url, anon = _supabase_creds()
     headers = _headers(user_token, anon, prefer_repr=True)
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+    async with http_pool.client(timeout=_TIMEOUT) as client:
         resp = await client.delete(
             f"{url}/rest/v1/agent_memories",
             headers=headers,
@@ -243,7 +243,7 @@ async def _delete_exact(user_token: str, user_id: str, path: str) -> int:
 async def _delete_prefix(user_token: str, user_id: str, prefix: str) -> int:
     url, anon = _supabase_creds()
     headers = _headers(user_token, anon, prefer_repr=True)
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+    async with http_pool.client(timeout=_TIMEOUT) as client:
         resp = await client.delete(
             f"{url}/rest/v1/agent_memories",
             headers=headers,
@@ -14,7 +14,7 @@ import os
 from pathlib import Path
 from typing import Optional
 
-import httpx
+from services import http_pool
 
 from env_loader import load_env
 load_env(Path(__file__))
@@ -45,7 +45,7 @@ def _headers(user_token: str, anon: str, *, prefer_repr: bool = False) -> dict:
 async def get_thread(user_token: str, user_id: str, project_id: str) -> Optional[dict]:
     """Return the thread row for (user, project) or None if it doesn't exist."""
     url, anon = _supabase_creds()
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+    async with http_pool.client(timeout=_TIMEOUT) as client:
         resp = await client.get(
             f"{url}/rest/v1/agent_threads",
             headers=_headers(user_token, anon),
@@ -94,7 +94,7 @@ async def upsert_thread(
     headers = _headers(user_token, anon, prefer_repr=True)
     headers["Prefer"] = "resolution=merge-duplicates,return=representation"
 
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+    async with http_pool.client(timeout=_TIMEOUT) as client:
         resp = await client.post(
             f"{url}/rest/v1/agent_threads",
             headers=headers,
@@ -134,7 +134,7 @@ async def append_thread_turn_service(
     turn.setdefault("ts", int(_time.time() * 1000))
 
     try:
-        async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        async with http_pool.client(timeout=_TIMEOUT) as client:
             resp = await client.get(
                 f"{url}/rest/v1/agent_threads",
                 headers=headers,
@@ -183,7 +183,7 @@ async def append_thread_turn_service(
 
 async def reset_thread(user_token: str, user_id: str, project_id: str) -> bool:
     url, anon = _supabase_creds()
-    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+    async with http_pool.client(timeout=_TIMEOUT) as client:
         resp = await client.delete(
             f"{url}/rest/v1/agent_threads",
             headers=_headers(user_token, anon),
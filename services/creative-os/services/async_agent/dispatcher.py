@@ -22,7 +22,7 @@ import os
 from pathlib import Path
 from typing import Optional
 
-import httpx
+from services import http_pool
 
 from env_loader import load_env
 load_env(Path(__file__))
@@ -77,7 +77,7 @@ async def _insert_image_job(
         "prompt": prompt,
         "status": "dispatched",
     }
-    async with httpx.AsyncClient(timeout=_REST_TIMEOUT) as client:
+    async with http_pool.client(timeout=_REST_TIMEOUT) as client:
         resp = await client.post(
             f"{url}/rest/v1/async_image_jobs",
             headers=_rest_headers(user_token, anon, prefer_repr=True),
@@ -113,7 +113,7 @@ async def _submit_kie_image(prompt: str, image_input: list[str], aspect_ratio: s
         payload["input"]["image_input"] = image_input
 
     headers = {"Authorization": f"Bearer {kie_key}", "Content-Type": "application/json"}
-    async with httpx.AsyncClient(timeout=_KIE_TIMEOUT) as http:
+    async with http_pool.client(timeout=_KIE_TIMEOUT) as http:
         resp = await http.post(f"{kie_url}/api/v1/jobs/createTask", headers=headers, json=payload)
     if resp.status_code != 200:
         raise RuntimeError(f"KIE submit error ({resp.status_code}): {resp.text[:300]}")
@@ -178,7 +178,7 @@ async def cancel_image_job(*, user_token: str, job_id: str) -> dict:
     poller checks the row's status before each tick and exits on cancel.
     """
     url, anon = _supabase_creds()
-    async with httpx.AsyncClient(timeout=_REST_TIMEOUT) as client:
+    async with http_pool.client(timeout=_REST_TIMEOUT) as client:
         resp = await client.patch(
             f"{url}/rest/v1/async_image_jobs",
             headers=_rest_headers(user_token, anon, prefer_repr=True),
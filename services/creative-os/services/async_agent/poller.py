@@ -20,7 +20,7 @@ import os
 from pathlib import Path
 from typing import Optional
 
-import httpx
+from services import http_pool
 
 from env_loader import load_env
 load_env(Path(__file__))
@@ -53,7 +53,7 @@ def _rest_headers(user_token: str, anon: str) -> dict:
 
 async def _patch_row(user_token: str, job_id: str, fields: dict) -> Optional[dict]:
     url, anon = _supabase_creds()
-    async with httpx.AsyncClient(timeout=_REST_TIMEOUT) as client:
+    async with http_pool.client(timeout=_REST_TIMEOUT) as client:
         resp = await client.patch(
             f"{url}/rest/v1/async_image_jobs",
             headers=_rest_headers(user_token, anon),
@@ -69,7 +69,7 @@ async def _patch_row(user_token: str, job_id: str, fields: dict) -> Optional[dic
 
 async def _read_status(user_token: str, job_id: str) -> Optional[str]:
     url, anon = _supabase_creds()
-    async with httpx.AsyncClient(timeout=_REST_TIMEOUT) as client:
+    async with http_pool.client(timeout=_REST_TIMEOUT) as client:
         resp = await client.get(
             f"{url}/rest/v1/async_image_jobs",
             headers={"apikey": anon, "Authorization": f"Bearer {user_token}"},
@@ -97,7 +97,7 @@ async def _poll_kie_image(user_token: str, job_id: str, kie_task_id: str) -> Non
             return
 
         try:
-            async with httpx.AsyncClient(timeout=_REST_TIMEOUT) as http:
+            async with http_pool.client(timeout=_REST_TIMEOUT) as http:
                 resp = await http.get(poll_endpoint, headers=headers, params={"taskId": kie_task_id})
             body = resp.json()
         except Exception as e:
@@ -10,9 +10,10 @@ context.
 from __future__ import annotations
 
 import os
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
-import httpx
+from services import http_pool
 
 
 def _supabase_base() -> str:
@@ -72,7 +73,7 @@ async def insert_campaign(
         "plan_json": plan_json,
     }
     row = {k: v for k, v in row.items() if v is not None}
-    async with httpx.AsyncClient(timeout=15.0) as http:
+    async with http_pool.client(timeout=15.0) as http:
         resp = await http.post(
             f"{_supabase_base()}/rest/v1/campaigns",
             headers=_headers(user_token),
@@ -87,7 +88,7 @@ async def insert_plan_items(user_token: str, campaign_id: str, items: list[dict]
     if not items:
         return []
     rows = [{**item, "campaign_id": campaign_id} for item in items]
-    async with httpx.AsyncClient(timeout=20.0) as http:
+    async with http_pool.client(timeout=20.0) as http:
         resp = await http.post(
             f"{_supabase_base()}/rest/v1/campaign_plan_items",
             headers=_headers(user_token),
@@ -104,7 +105,7 @@ async def update_campaign(
     *,
     service: bool = False,
 ) -> dict:
-    async with httpx.AsyncClient(timeout=15.0) as http:
+    async with http_pool.client(timeout=15.0) as http:
         resp = await http.patch(
             f"{_supabase_base()}/rest/v1/campaigns?id=eq.{campaign_id}",
             headers=_headers(user_token, service=service),
@@ -122,7 +123,7 @@ async def update_plan_item(
     *,
     service: bool = False,
 ) -> dict:
-    async with httpx.AsyncClient(timeout=15.0) as http:
+    async with http_pool.client(timeout=15.0) as http:
         resp = await http.patch(
             f"{_supabase_base()}/rest/v1/campaign_plan_items?id=eq.{item_id}",
             headers=_headers(user_token, service=service),
@@ -142,7 +143,7 @@ async def list_campaigns(user_token: str, *, status: Optional[str] = None, limit
     }
     if status:
         params["status"] = f"eq.{status}"
-    async with httpx.AsyncClient(timeout=15.0) as http:
+    async with http_pool.client(timeout=15.0) as http:
         resp = await http.get(
             f"{_supabase_base()}/rest/v1/campaigns",
             headers=_headers(user_token),
@@ -154,7 +155,7 @@ async def list_campaigns(user_token: str, *, status: Optional[str] = None, limit
 
 
 async def get_campaign(user_token: str, campaign_id: str) -> Optional[dict]:
-    async with httpx.AsyncClient(timeout=15.0) as http:
+    async with http_pool.client(timeout=15.0) as http:
         resp = await http.get(
             f"{_supabase_base()}/rest/v1/campaigns",
             headers=_headers(user_token),
@@ -180,7 +181,7 @@ async def list_plan_items(
     }
     if status:
         params["status"] = f"eq.{status}"
-    async with httpx.AsyncClient(timeout=15.0) as http:
+    async with http_pool.client(timeout=15.0) as http:
         resp = await http.get(
             f"{_supabase_base()}/rest/v1/campaign_plan_items",
             headers=_headers(user_token, service=service),
@@ -191,23 +192,106 @@ async def list_plan_items(
     return resp.json() or []
 
 
-async def list_items_by_status(statuses: list[str], *, limit: int = 100) -> list[dict]:
+async def list_items_by_status(
+    statuses: list[str],
+    *,
+    limit: int = 100,
+    after_id: Optional[str] = None,
+) -> list[dict]:
     """Service-role read used by the background worker. Returns items across
-    all users whose status is in `statuses`."""
+    all users whose status is in `statuses`, ordered by id; pass the last id
+    of a page as `after_id` for the next one."""
     if not statuses:
         return []
     status_filter = "in.(" + ",".join(statuses) + ")"
-    async with httpx.AsyncClient(timeout=15.0) as http:
+    params = {
+        "select": "*,campaigns(id,user_id,branding_notes,status)",
+        "status": status_filter,
+        "order": "id.asc",
+        "limit": str(limit),
+    }
+    if after_id:
+        params["id"] = f"gt.{after_id}"
+    async with http_pool.client(timeout=15.0) as http:
         resp = await http.get(
             f"{_supabase_base()}/rest/v1/campaign_plan_items",
             headers=_headers(None, service=True),
-            params={
-                "select": "*,campaigns(id,user_id,branding_notes,status)",
-                "status": status_filter,
-                "order": "updated_at.asc",
-                "limit": str(limit),
-            },
+            params=params,
         )
     if resp.status_code != 200:
         return []
     return resp.json() or []
+
+
+# ── Watcher leases ─────────────────────────────────────────────────────
+async def claim_items(
+    owner: str,
+    statuses: list[str],
+    *,
+    limit: int = 100,
+    after_id: Optional[str] = None,
+    lease_seconds: int = 300,
+) -> Optional[list[dict]]:
+    """Lease up to `limit` items (id order, after `after_id`) that no other
+    watcher holds, via the claim_campaign_plan_items RPC (migration 073).
+    Returns None when the RPC isn't deployed so the caller can fall back to
+    unleased reads."""
+    async with http_pool.client(timeout=15.0) as http:
+        resp = await http.post(
+            f"{_supabase_base()}/rest/v1/rpc/claim_campaign_plan_items",
+            headers=_headers(None, service=True),
+            json={
+                "p_owner": owner,
+                "p_statuses": statuses,
+                "p_after": after_id,
+                "p_limit": limit,
+                "p_lease_seconds": lease_seconds,
+            },
+        )
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return resp.json() or []
+
+
+# ids per `id=in.(...)` filter — keeps lease PATCH URLs well under proxy limits.
+_LEASE_CHUNK = 100
+
+
+async def renew_items(owner: str, item_ids: list[str], *, lease_seconds: int = 300) -> list[str]:
+    """Extend `owner`'s leases on `item_ids`; returns the ids still held
+    (a lease that expired and was claimed by another watcher is not)."""
+    held: list[str] = []
+    expires = (datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)).isoformat()
+    async with http_pool.client(timeout=15.0) as http:
+        for i in range(0, len(item_ids), _LEASE_CHUNK):
+            chunk = item_ids[i:i + _LEASE_CHUNK]
+            resp = await http.patch(
+                f"{_supabase_base()}/rest/v1/campaign_plan_items",
+                headers=_headers(None, service=True),
+                params={
+                    "id": "in.(" + ",".join(chunk) + ")",
+                    "lease_owner": f"eq.{owner}",
+                    "select": "id",
+                },
+                json={"lease_expires_at": expires},
+            )
+            resp.raise_for_status()
+            held.extend(row["id"] for row in resp.json() or [])
+    return held
+
+
+async def release_items(owner: str, item_ids: list[str]) -> None:
+    """Drop `owner`'s leases on `item_ids` (no-op for leases it lost)."""
+    if not item_ids:
+        return
+    async with http_pool.client(timeout=15.0) as http:
+        for i in range(0, len(item_ids), _LEASE_CHUNK):
+            chunk = item_ids[i:i + _LEASE_CHUNK]
+            resp = await http.patch(
+                f"{_supabase_base()}/rest/v1/campaign_plan_items",
+                headers={**_headers(None, service=True), "Prefer": "return=minimal"},
+                params={"id": "in.(" + ",".join(chunk) + ")", "lease_owner": f"eq.{owner}"},
+                json={"lease_owner": None, "lease_expires_at": None},
+            )
+            resp.raise_for_status()
@@ -0,0 +1,253 @@
+"""
+Creative OS — shared pooled HTTP client
+
+CoreAPIClient and the Supabase REST helpers (agent_memory, agent_threads,
+campaign_store, async_agent) used to open a throwaway `httpx.AsyncClient`
+per call, so one agent turn that lists projects, products, influencers and
+jobs paid a TCP+TLS handshake on every request. They now share one pooled
+client per event loop:
+
+    async with http_pool.client(timeout=15.0) as http:
+        resp = await http.get(url, headers=..., params=...)
+
+`client()` is a drop-in for `httpx.AsyncClient(timeout=...)` in an
+`async with` block — exiting it does NOT close the pool. Each request gets:
+
+  - keep-alive connections (optionally HTTP/2 when `h2` is installed)
+  - a per-host concurrency cap on top of the global pool limits
+  - retries with jittered exponential backoff on transport errors
+    (idempotent methods; any method when the connection never opened)
+  - a latency histogram entry keyed by method + host + templated path
+    (`/api/projects/{id}`), exposed via `latency_stats()`
+
+The app closes every pool on shutdown via `aclose()`.
+
+Config:
+  HTTP_POOL_MAX_CONNECTIONS   total connections per pool (default 100)
+  HTTP_POOL_MAX_KEEPALIVE     idle keep-alive connections (default 20)
+  HTTP_POOL_MAX_PER_HOST      concurrent requests per host (default 20)
+  HTTP_POOL_HTTP2             "1" to negotiate HTTP/2 (requires `h2`)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+_MAX_PER_HOST = int(os.getenv("HTTP_POOL_MAX_PER_HOST", "20"))
+_DEFAULT_TIMEOUT = 60.0
+_IDEMPOTENT = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+_RETRYABLE = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+    httpx.ReadError,
+    httpx.RemoteProtocolError,
+)
+# Errors raised before any bytes reached the server — safe to retry a POST.
+_NOT_SENT = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Latency histogram bucket upper bounds, in milliseconds.
+_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+_ID_SEGMENT = re.compile(
+    r"^(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{24,})$"
+)
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("HTTP_POOL_HTTP2", "0") != "1":
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("[http_pool] HTTP_POOL_HTTP2=1 but `h2` is not installed — using HTTP/1.1")
+        return False
+    return True
+
+
+# ── Per-loop pools ─────────────────────────────────────────────────────
+# httpx connections are bound to the event loop that opened them; worker
+# threads that run their own loop (asyncio.run) get their own pool.
+
+class _LoopPool:
+    def __init__(self) -> None:
+        self.client = httpx.AsyncClient(
+            timeout=_DEFAULT_TIMEOUT,
+            http2=_http2_enabled(),
+            limits=httpx.Limits(
+                max_connections=_MAX_CONNECTIONS,
+                max_keepalive_connections=_MAX_KEEPALIVE,
+                keepalive_expiry=30.0,
+            ),
+        )
+        self.host_slots: dict[str, asyncio.Semaphore] = {}
+
+    def slot(self, host: str) -> asyncio.Semaphore:
+        sem = self.host_slots.get(host)
+        if sem is None:
+            sem = self.host_slots[host] = asyncio.Semaphore(_MAX_PER_HOST)
+        return sem
+
+
+_pools: dict[asyncio.AbstractEventLoop, _LoopPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool() -> _LoopPool:
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        pool = _pools.get(loop)
+        if pool is None or pool.client.is_closed:
+            # Drop pools whose loop has gone away (finished asyncio.run threads).
+            for dead in [l for l in _pools if l.is_closed()]:
+                _pools.pop(dead, None)
+            pool = _pools[loop] = _LoopPool()
+        return pool
+
+
+# ── Latency histograms ─────────────────────────────────────────────────
+
+_stats: dict[str, dict] = {}
+_stats_lock = threading.Lock()
+
+
+def _endpoint_key(method: str, url: str) -> str:
+    parts = urlsplit(url)
+    segments = ["{id}" if _ID_SEGMENT.match(s) else s for s in parts.path.split("/")]
+    return f"{method} {parts.netloc}{'/'.join(segments)}"
+
+
+def _record(key: str, elapsed_ms: float, ok: bool) -> None:
+    with _stats_lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = {
+                "count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "buckets": [0] * len(_BUCKETS_MS),
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        if not ok:
+            entry["errors"] += 1
+        for i, bound in enumerate(_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                entry["buckets"][i] += 1
+                break
+
+
+def latency_stats() -> dict:
+    """Per-endpoint request count, errors, mean/max latency and histogram."""
+    labels = [f"le_{int(b)}ms" if b != float("inf") else "le_inf" for b in _BUCKETS_MS]
+    with _stats_lock:
+        return {
+            key: {
+                "count": e["count"],
+                "errors": e["errors"],
+                "mean_ms": round(e["total_ms"] / e["count"], 1) if e["count"] else 0.0,
+                "max_ms": round(e["max_ms"], 1),
+                "histogram": dict(zip(labels, e["buckets"])),
+            }
+            for key, e in sorted(_stats.items())
+        }
+
+
+# ── Requests ───────────────────────────────────────────────────────────
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    timeout: Optional[float] = None,
+    retries: int = 2,
+    retry_all_methods: bool = False,
+    **kwargs,
+) -> httpx.Response:
+    """Send one request through the shared pool.
+
+    Transport errors are retried up to `retries` times with jittered
+    exponential backoff — for idempotent methods, or for any method when
+    the connection never opened (or `retry_all_methods` is set).
+    HTTP error statuses are returned to the caller, never retried here.
+    """
+    method = method.upper()
+    pool = _pool()
+    host = urlsplit(url).netloc
+    key = _endpoint_key(method, url)
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            async with pool.slot(host):
+                resp = await pool.client.request(method, url, **kwargs)
+        except _RETRYABLE as e:
+            _record(key, (time.perf_counter() - started) * 1000, ok=False)
+            can_retry = retry_all_methods or method in _IDEMPOTENT or isinstance(e, _NOT_SENT)
+            if attempt >= retries or not can_retry:
+                raise
+            attempt += 1
+            wait = min(8.0, 0.5 * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+            print(f"[http_pool] {key} — transient error ({e!r}), retry {attempt}/{retries} in {wait:.1f}s")
+            await asyncio.sleep(wait)
+            continue
+        except Exception:
+            _record(key, (time.perf_counter() - started) * 1000, ok=False)
+            raise
+        _record(key, (time.perf_counter() - started) * 1000, ok=resp.status_code < 500)
+        return resp
+
+
+class PooledClient:
+    """`httpx.AsyncClient`-shaped facade over `request()` with a default timeout."""
+
+    def __init__(self, timeout: Optional[float] = None, retries: int = 2):
+        self._timeout = timeout
+        self._retries = retries
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        kwargs.setdefault("retries", self._retries)
+        return await request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+
+@asynccontextmanager
+async def client(timeout: Optional[float] = None, retries: int = 2):
+    """Drop-in for `async with httpx.AsyncClient(timeout=...) as c:` that
+    borrows the shared pool instead of opening (and closing) a new one."""
+    yield PooledClient(timeout=timeout, retries=retries)
+
+
+async def aclose() -> None:
+    """Close the pool owned by the running loop (app shutdown)."""
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        pool = _pools.pop(loop, None)
+    if pool is not None:
+        await pool.client.aclose()
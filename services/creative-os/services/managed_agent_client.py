@@ -76,6 +76,7 @@ def _ensure_ugc_repo_on_path() -> str:
     return root
 
 from core_api_client import CoreAPIClient
+from services import project_snapshot
 from services.model_router import (
     DIRECTOR_STYLES,
     IMAGE_MODES,
@@ -3158,33 +3159,55 @@ async def _tool_list_project_assets(ctx: ToolContext, **_: Any) -> str:
     influencers: list = []
     clones: list = []
     shots: list = []
+    # One batched (cached) snapshot read; per-section direct calls remain as
+    # the fallback when the snapshot is unavailable.
+    snap_products = await project_snapshot.get_section(core, ctx.project_id, "products")
+    snap_influencers = await project_snapshot.get_section(core, ctx.project_id, "influencers")
+    snap_clones = await project_snapshot.get_section(core, ctx.project_id, "clones")
     try:
-        products = await global_core.list_products()
+        products = snap_products if snap_products is not None else await global_core.list_products()
     except Exception as e:  # pragma: no cover - best-effort
         products = [{"error": f"list_products failed: {e}"}]
     try:
-        influencers = await global_core.list_influencers()
+        influencers = (
+            snap_influencers if snap_influencers is not None
+            else await global_core.list_influencers()
+        )
     except Exception as e:
         influencers = [{"error": f"list_influencers failed: {e}"}]
-    try:
-        clone_rows = await global_core.list_clones()
-        for c in (clone_rows or [])[:20]:
-            if not isinstance(c, dict) or not c.get("id"):
-                continue
-            looks: list[dict] = []
-            try:
-                looks_raw = await global_core.list_clone_looks(c["id"])
-                for l in looks_raw or []:
-                    if not isinstance(l, dict):
-                        continue
-                    url = l.get("image_url")
-                    if url and url != "error" and str(url).startswith("http"):
-                        looks.append({"id": l.get("id"), "label": l.get("label"), "image_url": url})
-            except Exception:
-                pass
-            clones.append({"id": c.get("id"), "name": c.get("name"), "looks": looks})
-    except Exception as e:
-        clones = [{"error": f"list_clones failed: {e}"}]
+    if snap_clones is not None:
+        clones = [
+            {
+                "id": c.get("id"),
+                "name": c.get("name"),
+                "looks": [
+                    {"id": l.get("id"), "label": l.get("label"), "image_url": l.get("image_url")}
+                    for l in (c.get("looks") or [])
+                ],
+            }
+            for c in snap_clones[:20]
+            if isinstance(c, dict) and c.get("id")
+        ]
+    else:
+        try:
+            clone_rows = await global_core.list_clones()
+            for c in (clone_rows or [])[:20]:
+                if not isinstance(c, dict) or not c.get("id"):
+                    continue
+                looks: list[dict] = []
+                try:
+                    looks_raw = await global_core.list_clone_looks(c["id"])
+                    for l in looks_raw or []:
+                        if not isinstance(l, dict):
+                            continue
+                        url = l.get("image_url")
+                        if url and url != "error" and str(url).startswith("http"):
+                            looks.append({"id": l.get("id"), "label": l.get("label"), "image_url": url})
+                except Exception:
+                    pass
+                clones.append({"id": c.get("id"), "name": c.get("name"), "looks": looks})
+        except Exception as e:
+            clones = [{"error": f"list_clones failed: {e}"}]
     if ctx.project_id:
         try:
             shots = await core.list_project_shots(ctx.project_id)
@@ -5373,7 +5396,9 @@ async def _tool_list_projects(ctx: ToolContext, **_: Any) -> str:
 
 async def _tool_list_influencers(ctx: ToolContext, **_: Any) -> str:
     try:
-        rows = await ctx.core().list_influencers()
+        rows = await project_snapshot.get_section(ctx.core(), ctx.project_id, "influencers")
+        if rows is None:
+            rows = await ctx.core().list_influencers()
     except Exception as e:
         return json.dumps({"error": f"list_influencers failed: {e}"})
     return json.dumps({
@@ -5382,8 +5407,10 @@ async def _tool_list_influencers(ctx: ToolContext, **_: Any) -> str:
 
 
 async def _tool_list_clones(ctx: ToolContext, **_: Any) -> str:
+    # Snapshot clones already carry their looks — no per-clone round-trip.
+    snap = await project_snapshot.get_section(ctx.core(), ctx.project_id, "clones")
     try:
-        rows = await ctx.core().list_clones()
+        rows = snap if snap is not None else await ctx.core().list_clones()
     except Exception as e:
         return json.dumps({"error": f"list_clones failed: {e}"})
     clones_out: list[dict] = []
@@ -5392,7 +5419,10 @@ async def _tool_list_clones(ctx: ToolContext, **_: Any) -> str:
             continue
         looks: list[dict] = []
         try:
-            looks_raw = await ctx.core().list_clone_looks(c["id"])
+            if snap is not None:
+                looks_raw = c.get("looks") or []
+            else:
+                looks_raw = await ctx.core().list_clone_looks(c["id"])
             for l in looks_raw or []:
                 if not isinstance(l, dict):
                     continue
@@ -5417,7 +5447,9 @@ async def _tool_list_clones(ctx: ToolContext, **_: Any) -> str:
 
 async def _tool_list_products(ctx: ToolContext, **_: Any) -> str:
     try:
-        rows = await ctx.core().list_products()
+        rows = await project_snapshot.get_section(ctx.core(), ctx.project_id, "products")
+        if rows is None:
+            rows = await ctx.core().list_products()
     except Exception as e:
         return json.dumps({"error": f"list_products failed: {e}"})
     return json.dumps({
@@ -5426,8 +5458,13 @@ async def _tool_list_products(ctx: ToolContext, **_: Any) -> str:
 
 
 async def _tool_list_scripts(ctx: ToolContext, **kwargs: Any) -> str:
+    product_id = kwargs.get("product_id")
     try:
-        rows = await ctx.core().list_scripts(product_id=kwargs.get("product_id"))
+        rows = await project_snapshot.get_section(ctx.core(), ctx.project_id, "scripts")
+        if rows is None:
+            rows = await ctx.core().list_scripts(product_id=product_id)
+        elif product_id:
+            rows = [r for r in rows if isinstance(r, dict) and r.get("product_id") == product_id]
     except Exception as e:
         return json.dumps({"error": f"list_scripts failed: {e}"})
     return json.dumps({
@@ -5437,10 +5474,18 @@ async def _tool_list_scripts(ctx: ToolContext, **kwargs: Any) -> str:
 
 async def _tool_list_jobs(ctx: ToolContext, **kwargs: Any) -> str:
     try:
-        rows = await ctx.core().list_jobs(
-            status=kwargs.get("status"),
-            limit=int(kwargs.get("limit", 25)),
-        )
+        limit = int(kwargs.get("limit", 25))
+        rows = None
+        # The snapshot holds the 25 newest jobs; filtered or larger reads go direct.
+        if not kwargs.get("status") and limit <= 25:
+            rows = await project_snapshot.get_section(ctx.core(), ctx.project_id, "jobs")
+            if rows is not None:
+                rows = rows[:limit]
+        if rows is None:
+            rows = await ctx.core().list_jobs(
+                status=kwargs.get("status"),
+                limit=limit,
+            )
     except Exception as e:
         return json.dumps({"error": f"list_jobs failed: {e}"})
     return json.dumps({
@@ -10380,7 +10425,9 @@ async def _tool_list_app_clips(ctx: ToolContext, **kwargs: Any) -> str:
         if product_id:
             clips = await ctx.core()._request("GET", "/api/app-clips", params={"product_id": product_id})
         else:
-            clips = await ctx.core()._request("GET", "/app-clips")
+            clips = await project_snapshot.get_section(ctx.core(), ctx.project_id, "app_clips")
+            if clips is None:
+                clips = await ctx.core()._request("GET", "/app-clips")
     except Exception as e:
         return json.dumps({"error": f"list_app_clips failed: {e}"})
 
@@ -11772,11 +11819,12 @@ class ManagedAgentClient:
             text = _build_context_primer() if with_primer else brief
             if not text:
                 text = brief
+            from utils.persist_media import agent_vision_url
             content: list[dict] = [{"type": "text", "text": text}]
             for url in (image_urls or []):
                 content.append({
                     "type": "image",
-                    "source": {"type": "url", "url": url},
+                    "source": {"type": "url", "url": agent_vision_url(url)},
                 })
             await self._client.beta.sessions.events.send(
                 sid,
@@ -231,11 +231,12 @@ class MessagesAgentClient:
         user_content: list[dict] | str
         if image_urls:
             # Multi-modal user message. Each image becomes an image block.
+            from utils.persist_media import agent_vision_url
             blocks: list[dict] = []
             for url in image_urls:
                 blocks.append({
                     "type": "image",
-                    "source": {"type": "url", "url": url},
+                    "source": {"type": "url", "url": agent_vision_url(url)},
                 })
             blocks.append({"type": "text", "text": brief})
             user_content = blocks
@@ -0,0 +1,108 @@
+"""
+Creative OS — project snapshot cache
+
+Agent turns prime their context with list_products / list_influencers /
+list_clones / list_scripts / list_jobs / list_app_clips. Each used to be its
+own CoreAPIClient round-trip (plus one looks call per clone). They now read
+sections of one batched `GET /api/projects/{id}/snapshot` response, cached
+per (user, project) for a few seconds so the parallel tool calls of a turn
+share a single backend request.
+
+Entries are keyed by the caller's token (a cache hit never crosses users)
+and invalidated for every project of the user whenever CoreAPIClient sends a
+write — products, influencers and clones are account-wide, so one write can
+change every project's snapshot. Jobs progress on their own, hence the
+short TTL.
+
+Config:
+  PROJECT_SNAPSHOT_TTL_SECONDS   cache lifetime (default 15, 0 disables)
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+_TTL = float(os.getenv("PROJECT_SNAPSHOT_TTL_SECONDS", "15"))
+
+# (user_sub, token_hash, project_id) -> (expires_at, snapshot)
+_cache: dict[tuple[str, str, str], tuple[float, dict]] = {}
+# In-flight loads, so concurrent tool calls in one turn coalesce.
+_inflight: dict[tuple[str, str, str], asyncio.Future] = {}
+# Bumped on invalidation; a load that started before it must not be cached.
+_generation: dict[str, int] = {}
+
+
+def _user_sub(token: str) -> str:
+    """Unverified JWT `sub` — only used to group entries for invalidation."""
+    try:
+        payload_b64 = token.split(".")[1]
+        padding = "=" * (-len(payload_b64) % 4)
+        return str(json.loads(base64.urlsafe_b64decode(payload_b64 + padding)).get("sub") or "")
+    except Exception:
+        return ""
+
+
+def _key(token: str, project_id: str) -> tuple[str, str, str]:
+    return (_user_sub(token), hashlib.sha256(token.encode()).hexdigest()[:32], project_id)
+
+
+def invalidate(token: str) -> None:
+    """Drop every cached snapshot for the token's user (call after writes)."""
+    sub = _user_sub(token)
+    _generation[sub] = _generation.get(sub, 0) + 1
+    for key in [k for k in _cache if k[0] == sub]:
+        _cache.pop(key, None)
+
+
+async def get_snapshot(core, project_id: str) -> dict:
+    """Full snapshot for `project_id` via `core` (a CoreAPIClient), served
+    from cache when fresh."""
+    key = _key(core.token, project_id)
+    now = time.monotonic()
+    hit = _cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    loop = asyncio.get_running_loop()
+    pending = _inflight.get(key)
+    if pending is not None and pending.get_loop() is loop:
+        return await asyncio.shield(pending)
+
+    generation = _generation.get(key[0], 0)
+    fut = loop.create_future()
+    _inflight[key] = fut
+    try:
+        snapshot = await core.get_project_snapshot(project_id)
+        if _TTL > 0 and _generation.get(key[0], 0) == generation:
+            _cache[key] = (time.monotonic() + _TTL, snapshot)
+        fut.set_result(snapshot)
+        return snapshot
+    except BaseException as e:
+        fut.set_exception(e)
+        # Waiters observe the exception; mark it retrieved for this task.
+        fut.exception()
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+async def get_section(core, project_id: Optional[str], field: str) -> Optional[list]:
+    """One snapshot section, or None when it can't be served (no project,
+    older core backend, or the section failed) so callers fall back to
+    their direct list call."""
+    if not project_id:
+        return None
+    try:
+        snapshot = await get_snapshot(core, project_id)
+    except Exception as e:
+        print(f"[snapshot] {field} unavailable ({e}) — falling back to direct call")
+        return None
+    if field in (snapshot.get("errors") or {}):
+        return None
+    section = snapshot.get(field)
+    return section if isinstance(section, list) else None
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import os
+import re
 import uuid
 from typing import Awaitable, Callable, Optional
 
@@ -57,6 +58,25 @@ def needs_persistence(url: str) -> bool:
     return not is_supabase_storage_url(url)
 
 
+# Agent-panel uploads are stored full size (they are forwarded as generation
+# references) with a downsized sibling for the agent's own vision input:
+#   agent_uploads/upload_<hex>_v.<ext>  →  agent_uploads/upload_<hex>_v.agent.jpg
+# Older uploads (no `_v` marker) have no sibling and are sent as-is.
+_AGENT_UPLOAD_RE = re.compile(r"(/user-uploads/agent_uploads/upload_[0-9a-f]{12}_v)\.[A-Za-z0-9]+(\?.*)?$")
+
+
+def agent_upload_paths(name: str, ext: str) -> tuple[str, str]:
+    """(original, vision) object paths in user-uploads for an agent upload."""
+    base = f"agent_uploads/{name}_v"
+    return f"{base}.{ext}", f"{base}.agent.jpg"
+
+
+def agent_vision_url(url: str) -> str:
+    """URL to put in an agent image block: the vision-sized sibling of an
+    agent upload, any other URL unchanged."""
+    return _AGENT_UPLOAD_RE.sub(r"\1.agent.jpg\2", url or "")
+
+
 def _canonical_public_url(url: str) -> str:
     """Prefer object/public URLs over render/transform URLs for DB storage."""
     if "/storage/v1/render/image/public/" in url:
@@ -102,6 +122,15 @@ async def _download_bytes(url: str, *, timeout: float = 300.0) -> bytes:
     raise PersistMediaError(f"download failed ({url[:96]}): {last_err}")
 
 
+def _shared_media_cache():
+    """Repo-root media_cache singleton, or None when creative-os runs standalone."""
+    try:
+        from media_cache import media_cache
+    except ImportError:
+        return None
+    return media_cache
+
+
 def download_url_to_file(
     url: str,
     dest: "Path | str",
@@ -109,33 +138,44 @@ def download_url_to_file(
     timeout: float = 300.0,
     max_retries: int = _INLINE_RETRIES,
 ) -> "Path":
-    """Sync download for ffmpeg/concat paths (httpx, Kie CDN SSL bypass, retries)."""
+    """Sync download for ffmpeg/concat paths (httpx, Kie CDN SSL bypass, retries).
+
+    Uses the repo-root media cache when it is importable, so assets reused
+    across renders are only fetched once.
+    """
     import time
     from pathlib import Path
 
     import httpx
 
+    def _fetch(src_url: str, path: "Path") -> None:
+        last_err: Exception | None = None
+        for attempt in range(max_retries):
+            try:
+                with httpx.Client(
+                    timeout=timeout,
+                    follow_redirects=True,
+                    verify=_httpx_verify(src_url),
+                ) as client:
+                    resp = client.get(src_url)
+                    resp.raise_for_status()
+                    if not resp.content:
+                        raise PersistMediaError(f"empty response body from {src_url[:96]}")
+                    Path(path).write_bytes(resp.content)
+                    return
+            except Exception as e:
+                last_err = e
+                if attempt < max_retries - 1:
+                    time.sleep(2.0 * (attempt + 1))
+        raise PersistMediaError(f"download failed ({src_url[:96]}): {last_err}")
+
     out = Path(dest)
     out.parent.mkdir(parents=True, exist_ok=True)
-    last_err: Exception | None = None
-    for attempt in range(max_retries):
-        try:
-            with httpx.Client(
-                timeout=timeout,
-                follow_redirects=True,
-                verify=_httpx_verify(url),
-            ) as client:
-                resp = client.get(url)
-                resp.raise_for_status()
-                if not resp.content:
-                    raise PersistMediaError(f"empty response body from {url[:96]}")
-                out.write_bytes(resp.content)
-                return out
-        except Exception as e:
-            last_err = e
-            if attempt < max_retries - 1:
-                time.sleep(2.0 * (attempt + 1))
-    raise PersistMediaError(f"download failed ({url[:96]}): {last_err}")
+    cache = _shared_media_cache()
+    if cache is not None:
+        return cache.fetch(url, out, downloader=_fetch)
+    _fetch(url, out)
+    return out
 
 
 async def _upload_bytes(
@@ -356,18 +396,19 @@ async def persist_image_url(
 
     try:
         raw = await _download_bytes(url, timeout=120.0)
-        from services.image_normalize import normalize_image_bytes
+        from services.image_normalize import ORIGINAL, normalize_image_async
 
         try:
-            body = normalize_image_bytes(raw)
-            content_type = "image/png"
+            normalized = await normalize_image_async(raw, ORIGINAL)
+            body, content_type, ext = normalized.data, normalized.content_type, normalized.ext
         except Exception as e:
             print(f"[persist_media] normalize failed, using raw bytes: {e}")
             body = raw
             content_type = "image/jpeg"
+            ext = "jpg"
 
         name = shot_id or uuid.uuid4().hex[:16]
-        filename = f"{path_prefix}/{name}.png"
+        filename = f"{path_prefix}/{name}.{ext}"
         return await _upload_bytes(body, bucket=bucket, filename=filename, content_type=content_type)
     except Exception as e:
         print(f"[persist_media] image persist failed ({url[:96]}): {e}")
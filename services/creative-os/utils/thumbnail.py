@@ -1,16 +1,36 @@
 """
-Video Thumbnail Generator
-
-Extracts the first frame from a video URL using FFmpeg, uploads it to
-Supabase Storage, and returns the public URL. Used by the schedule modal
-to show instant video previews instead of loading full video files.
+Video Derivatives Backfill
+
+Finished jobs get their poster / scrub sprite / preview clip rendered at
+write time by the worker (root `media_derivatives.py`, which this image
+cannot import — see nixpacks.toml). This module covers rows that predate it
+or were produced outside the worker: `schedule_backfill` renders the same
+set in ONE ffmpeg pass straight from the video URL, uploads it under
+derivatives/<job id>/ and records `thumbnail_url` + `media_derivatives` on
+video_jobs. It runs in the background with bounded concurrency, so request
+handlers never wait on ffmpeg.
 """
 import os
 import asyncio
+import math
+import re
 import tempfile
 import subprocess
 from pathlib import Path
 
+# Mirrors the constants in root media_derivatives.py.
+BUCKET = "generated-videos"
+POSTER_MAX_WIDTH = 720
+PREVIEW_MAX_HEIGHT = 360
+SPRITE_FRAMES = 20
+SPRITE_COLUMNS = 5
+SPRITE_TILE_WIDTH = 160
+BACKFILL_CONCURRENCY = 2
+
+_backfill_sem: asyncio.Semaphore | None = None
+_backfill_inflight: set[str] = set()
+_backfill_tasks: set[asyncio.Task] = set()
+
 
 def _get_ffmpeg_path() -> str:
     """Resolve the ffmpeg binary path. Tries system ffmpeg first, then imageio-ffmpeg."""
@@ -39,95 +59,165 @@ def _get_storage_client():
     )
 
 
-async def generate_thumbnail(video_url: str, job_id: str) -> str | None:
-    """Extract the first frame of a video and upload as a JPEG thumbnail.
+async def _probe_duration(ffmpeg: str, video_url: str) -> float | None:
+    """Container duration from ffmpeg's input banner (ffprobe isn't bundled
+    with imageio-ffmpeg). Reads the header only."""
+    result = await asyncio.to_thread(
+        subprocess.run, [ffmpeg, "-hide_banner", "-i", video_url],
+        capture_output=True, timeout=20,
+    )
+    m = re.search(rb"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr or b"")
+    if not m:
+        return None
+    h, mnt, sec = m.groups()
+    return int(h) * 3600 + int(mnt) * 60 + float(sec)
+
+
+def _ffmpeg_args(ffmpeg: str, source: str, out_dir: Path, duration: float) -> list[str]:
+    """Same single-pass graph as media_derivatives.ffmpeg_args."""
+    # Twin: root media_derivatives.py `ffmpeg_args` — keep the graph and the
+    # constants at the top of both files in sync.
+    poster_at = min(1.0, duration / 2)
+    rows = math.ceil(SPRITE_FRAMES / SPRITE_COLUMNS)
+    sprite_fps = SPRITE_FRAMES / max(duration, 0.1)
+    graph = (
+        "[0:v]split=3[p][s][v];"
+        f"[p]trim=start={poster_at:.3f},setpts=PTS-STARTPTS,"
+        f"scale='min({POSTER_MAX_WIDTH},iw)':-2[poster];"
+        f"[s]fps={sprite_fps:.5f},scale={SPRITE_TILE_WIDTH}:-2,"
+        f"tile={SPRITE_COLUMNS}x{rows}[sprite];"
+        f"[v]scale=-2:'min({PREVIEW_MAX_HEIGHT},ih)',setsar=1,fps=24[preview]"
+    )
+    return [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-i", source,
+        "-filter_complex", graph,
+        "-map", "[poster]", "-frames:v", "1", "-q:v", "3", str(out_dir / "poster.jpg"),
+        "-map", "[sprite]", "-frames:v", "1", "-q:v", "5", str(out_dir / "sprite.jpg"),
+        "-map", "[preview]", "-map", "0:a?",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "30", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", "64k", "-ac", "1",
+        "-movflags", "+faststart",
+        str(out_dir / "preview.mp4"),
+    ]
+
+
+def _upload(sb, local: Path, dest: str, content_type: str) -> str:
+    with open(local, "rb") as f:
+        sb.storage.from_(BUCKET).upload(
+            dest, f, file_options={"content-type": content_type, "upsert": "true"},
+        )
+    return sb.storage.from_(BUCKET).get_public_url(dest)
 
-    Uses FFmpeg's native HTTP support to read directly from the URL,
-    avoiding the need to download the entire file.
 
-    Returns the public URL of the thumbnail, or None on failure.
+def _record(sb, job_id: str, derivatives: dict) -> None:
+    updates = {"media_derivatives": derivatives, "thumbnail_url": derivatives["poster_jpg"]}
+    try:
+        sb.table("video_jobs").update(updates).eq("id", job_id).execute()
+    except Exception as e:
+        if "media_derivatives" not in str(e):
+            raise
+        # Migration 075 not applied yet — the poster alone still helps.
+        sb.table("video_jobs").update({"thumbnail_url": updates["thumbnail_url"]}).eq("id", job_id).execute()
+
+
+async def generate_derivatives(video_url: str, job_id: str) -> dict | None:
+    """Render poster / sprite / preview for one video URL, upload them and
+    record them on video_jobs. Returns the media_derivatives record or None.
     """
     from env_loader import load_env
     load_env(Path(__file__).parent)
 
-    supabase_url = os.getenv("SUPABASE_URL")
-
-    if not supabase_url or not video_url:
+    if not os.getenv("SUPABASE_URL") or not video_url:
         return None
 
-    # Check if thumbnail already exists in storage (deterministic filename)
-    storage_filename = f"thumb_{job_id[:8]}.jpg"
-    try:
-        sb = _get_storage_client()
-        import httpx
-        thumb_url = sb.storage.from_("generated-videos").get_public_url(storage_filename)
-        async with httpx.AsyncClient(timeout=5.0) as http:
-            head = await http.head(thumb_url)
-            if head.status_code == 200:
-                print(f"[Thumbnail] Cache hit for {job_id}: {thumb_url[:80]}...")
-                return thumb_url
-    except Exception:
-        pass
-
     ffmpeg = _get_ffmpeg_path()
-    thumb_path = None
-
     try:
-        # Extract first frame directly from URL — FFmpeg handles HTTP natively.
-        # This only downloads the bytes needed for a single frame (typically <500KB)
-        # instead of the full video file.
-        thumb_path = tempfile.mktemp(suffix=".jpg")
-        result = await asyncio.to_thread(
-            subprocess.run,
-            [
-                ffmpeg, "-y",
-                "-i", video_url,
-                "-vframes", "1",
-                "-q:v", "3",  # Good quality JPEG
-                "-vf", "scale='min(720,iw)':-2",  # Cap width at 720px
-                thumb_path,
-            ],
-            capture_output=True,
-            timeout=30,
-        )
-        if result.returncode != 0 or not os.path.exists(thumb_path):
-            stderr = result.stderr.decode("utf-8", errors="replace")[-300:] if result.stderr else "unknown"
-            print(f"[Thumbnail] FFmpeg failed for {job_id}: {stderr}")
+        duration = await _probe_duration(ffmpeg, video_url)
+        if not duration:
+            print(f"[Derivatives] Could not read duration for {job_id}")
             return None
 
-        if os.path.getsize(thumb_path) == 0:
-            print(f"[Thumbnail] FFmpeg produced empty file for {job_id}")
-            return None
-
-        # Upload to Supabase Storage
-        sb = _get_storage_client()
-        with open(thumb_path, "rb") as f:
+        with tempfile.TemporaryDirectory(prefix="derivatives-") as tmp:
+            out_dir = Path(tmp)
+            result = await asyncio.to_thread(
+                subprocess.run, _ffmpeg_args(ffmpeg, video_url, out_dir, duration),
+                capture_output=True, timeout=180,
+            )
+            poster = out_dir / "poster.jpg"
+            if result.returncode != 0 or not poster.exists() or poster.stat().st_size == 0:
+                stderr = result.stderr.decode("utf-8", errors="replace")[-300:] if result.stderr else "unknown"
+                print(f"[Derivatives] FFmpeg failed for {job_id}: {stderr}")
+                return None
+
+            sb = _get_storage_client()
+            prefix = f"derivatives/{job_id}"
+            record = {"poster_jpg": await asyncio.to_thread(_upload, sb, poster, f"{prefix}/poster.jpg", "image/jpeg")}
             try:
-                sb.storage.from_("generated-videos").upload(
-                    storage_filename, f,
-                    file_options={"content-type": "image/jpeg"},
+                from PIL import Image
+                with Image.open(poster) as im:
+                    im.save(out_dir / "poster.webp", "WEBP", quality=80, method=4)
+                record["poster_webp"] = await asyncio.to_thread(
+                    _upload, sb, out_dir / "poster.webp", f"{prefix}/poster.webp", "image/webp",
                 )
             except Exception as e:
-                # File might already exist — try update
-                if "Duplicate" in str(e) or "already exists" in str(e):
-                    with open(thumb_path, "rb") as f2:
-                        sb.storage.from_("generated-videos").update(
-                            storage_filename, f2,
-                            file_options={"content-type": "image/jpeg"},
-                        )
-                else:
-                    raise
-        thumb_url = sb.storage.from_("generated-videos").get_public_url(storage_filename)
-        print(f"[Thumbnail] Generated for {job_id}: {thumb_url[:80]}...")
-        return thumb_url
+                print(f"[Derivatives] WebP poster skipped for {job_id}: {e}")
+
+            sprite = out_dir / "sprite.jpg"
+            if sprite.exists() and sprite.stat().st_size > 0:
+                from PIL import Image
+                with Image.open(sprite) as im:
+                    tile_height = im.height // math.ceil(SPRITE_FRAMES / SPRITE_COLUMNS)
+                record["sprite"] = {
+                    "url": await asyncio.to_thread(_upload, sb, sprite, f"{prefix}/sprite.jpg", "image/jpeg"),
+                    "frames": SPRITE_FRAMES,
+                    "columns": SPRITE_COLUMNS,
+                    "tile_width": SPRITE_TILE_WIDTH,
+                    "tile_height": tile_height,
+                    "interval_seconds": round(duration / SPRITE_FRAMES, 3),
+                }
+            preview = out_dir / "preview.mp4"
+            if preview.exists() and preview.stat().st_size > 0:
+                record["preview_mp4"] = await asyncio.to_thread(
+                    _upload, sb, preview, f"{prefix}/preview.mp4", "video/mp4",
+                )
+            record["duration_seconds"] = round(duration, 3)
+
+            await asyncio.to_thread(_record, sb, job_id, record)
+        print(f"[Derivatives] Backfilled {job_id}: {record['poster_jpg'][:80]}...")
+        return record
 
     except Exception as e:
-        print(f"[Thumbnail] Failed for {job_id}: {e}")
-        import traceback; traceback.print_exc()
+        print(f"[Derivatives] Failed for {job_id}: {e}")
         return None
-    finally:
-        if thumb_path:
-            try:
-                os.unlink(thumb_path)
-            except Exception:
-                pass
+
+
+def schedule_backfill(jobs: list[dict]) -> int:
+    """Queue derivative generation for [{"id", "video_url"}] in the background.
+
+    Deduplicated per process and limited to BACKFILL_CONCURRENCY ffmpeg runs;
+    returns how many jobs were newly queued. Results land on the row and are
+    picked up by the next list fetch.
+    """
+    global _backfill_sem
+    if _backfill_sem is None:
+        _backfill_sem = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+    async def _run(jid: str, url: str):
+        try:
+            async with _backfill_sem:
+                await generate_derivatives(url, jid)
+        finally:
+            _backfill_inflight.discard(jid)
+
+    queued = 0
+    for job in jobs:
+        jid, url = job.get("id"), job.get("video_url")
+        if not jid or not url or jid in _backfill_inflight:
+            continue
+        _backfill_inflight.add(jid)
+        task = asyncio.get_running_loop().create_task(_run(jid, url))
+        _backfill_tasks.add(task)
+        task.add_done_callback(_backfill_tasks.discard)
+        queued += 1
+    return queued
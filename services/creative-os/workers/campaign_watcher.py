@@ -12,19 +12,49 @@ Async loop that drives `campaign_plan_items` to completion:
 
 Runs one tick every WATCH_INTERVAL_SECONDS. Safe to restart mid-cycle;
 each transition is status-guarded so repeats are no-ops.
+
+A tick pages through every active item (keyset on id, PAGE_SIZE at a time —
+no 100-item cap) and advances them concurrently, so one slow Ayrshare call
+no longer stalls every other campaign:
+
+  - at most CONCURRENCY items in flight, PER_USER per campaign owner, and
+    per provider: AYRSHARE_CONCURRENCY bookings, JOBS_CONCURRENCY job polls
+  - items are leased through the claim_campaign_plan_items RPC (migration
+    073) so several Creative OS instances can run watchers without
+    double-processing; an item that waited on the semaphores for more than
+    half its lease has the lease renewed before it starts (and is skipped
+    if another watcher took it over). Leases are released at the end of the
+    tick and expire on their own if a watcher dies. Without the RPC the
+    watcher falls back to unleased reads (single-instance behaviour).
+  - tick timings and counters are kept in memory, see `stats()` /
+    GET /creative-os/health/campaign-watcher
+
+Config:
+  CAMPAIGN_WATCHER_INTERVAL              seconds between ticks (default 30)
+  CAMPAIGN_WATCHER_CONCURRENCY           items in flight per tick (default 8)
+  CAMPAIGN_WATCHER_PER_USER              items in flight per user (default 2)
+  CAMPAIGN_WATCHER_AYRSHARE_CONCURRENCY  concurrent Ayrshare bookings (default 3)
+  CAMPAIGN_WATCHER_JOBS_CONCURRENCY      concurrent job polls (default 8)
+  CAMPAIGN_WATCHER_PAGE_SIZE             items claimed per page (default 100)
+  CAMPAIGN_WATCHER_LEASE_SECONDS         lease length (default 300)
 """
 from __future__ import annotations
 
 import asyncio
 import os
+import socket
+import time
+import uuid
 from pathlib import Path
 from typing import Optional
 
-import httpx
-
 from env_loader import load_env
+from services import http_pool
 from services.campaign_store import (
+    claim_items,
     list_items_by_status,
+    release_items,
+    renew_items,
     update_campaign,
     update_plan_item,
 )
@@ -33,6 +63,21 @@ load_env(Path(__file__))
 
 WATCH_INTERVAL_SECONDS = int(os.getenv("CAMPAIGN_WATCHER_INTERVAL", "30"))
 CORE_API_URL = os.getenv("CORE_API_URL", "http://localhost:8000")
+CONCURRENCY = max(1, int(os.getenv("CAMPAIGN_WATCHER_CONCURRENCY", "8")))
+PER_USER = max(1, int(os.getenv("CAMPAIGN_WATCHER_PER_USER", "2")))
+PROVIDER_LIMITS = {
+    "ayrshare": max(1, int(os.getenv("CAMPAIGN_WATCHER_AYRSHARE_CONCURRENCY", "3"))),
+    "jobs": max(1, int(os.getenv("CAMPAIGN_WATCHER_JOBS_CONCURRENCY", "8"))),
+}
+PAGE_SIZE = max(1, int(os.getenv("CAMPAIGN_WATCHER_PAGE_SIZE", "100")))
+LEASE_SECONDS = max(30, int(os.getenv("CAMPAIGN_WATCHER_LEASE_SECONDS", "300")))
+
+ACTIVE_STATUSES = ["generating", "ready_to_post"]
+TERMINAL_STATUSES = {"scheduled", "posted", "failed", "cancelled"}
+
+# Identifies this process's leases.
+WATCHER_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+_claim_rpc_missing = False
 
 
 def _service_headers() -> dict[str, str]:
@@ -46,7 +91,7 @@ def _service_headers() -> dict[str, str]:
 
 async def _poll_video_job(job_id: str) -> dict:
     url = os.getenv("SUPABASE_URL", "").rstrip("/")
-    async with httpx.AsyncClient(timeout=10.0) as http:
+    async with http_pool.client(timeout=10.0) as http:
         resp = await http.get(
             f"{url}/rest/v1/video_jobs",
             headers=_service_headers(),
@@ -65,7 +110,7 @@ async def _poll_video_job(job_id: str) -> dict:
 async def _ayrshare_profile_key(user_id: str) -> Optional[str]:
     """Look up the Ayrshare profile_key for a given user_id via service role."""
     url = os.getenv("SUPABASE_URL", "").rstrip("/")
-    async with httpx.AsyncClient(timeout=10.0) as http:
+    async with http_pool.client(timeout=10.0) as http:
         resp = await http.get(
             f"{url}/rest/v1/ayrshare_profiles",
             headers=_service_headers(),
@@ -85,7 +130,7 @@ async def _insert_social_post(row: dict) -> Optional[str]:
     """Insert a social_posts row via service role. Returns new id or None."""
     url = os.getenv("SUPABASE_URL", "").rstrip("/")
     headers = {**_service_headers(), "Prefer": "return=representation"}
-    async with httpx.AsyncClient(timeout=10.0) as http:
+    async with http_pool.client(timeout=10.0) as http:
         resp = await http.post(
             f"{url}/rest/v1/social_posts",
             headers=headers,
@@ -252,57 +297,212 @@ async def _progress_item(item: dict) -> None:
         return
 
 
-async def _roll_up_campaigns(touched_campaign_ids: set[str]) -> None:
+def _provider_for(item: dict) -> str:
+    return "ayrshare" if item.get("status") == "ready_to_post" else "jobs"
+
+
+async def _roll_up_campaign(cid: str) -> None:
     """Mark a campaign 'completed' when every item reaches a terminal state."""
-    if not touched_campaign_ids:
-        return
     url = os.getenv("SUPABASE_URL", "").rstrip("/")
-    for cid in touched_campaign_ids:
-        async with httpx.AsyncClient(timeout=10.0) as http:
-            resp = await http.get(
-                f"{url}/rest/v1/campaign_plan_items",
-                headers=_service_headers(),
-                params={
-                    "select": "status",
-                    "campaign_id": f"eq.{cid}",
-                },
-            )
-        if resp.status_code != 200:
-            continue
-        rows = resp.json() or []
-        if not rows:
-            continue
-        terminals = {"scheduled", "posted", "failed", "cancelled"}
-        if all(r.get("status") in terminals for r in rows):
-            try:
-                await update_campaign(None, cid, {"status": "completed"}, service=True)
-            except Exception:
-                pass
+    async with http_pool.client(timeout=10.0) as http:
+        resp = await http.get(
+            f"{url}/rest/v1/campaign_plan_items",
+            headers=_service_headers(),
+            params={
+                "select": "status",
+                "campaign_id": f"eq.{cid}",
+            },
+        )
+    if resp.status_code != 200:
+        return
+    rows = resp.json() or []
+    if not rows:
+        return
+    if all(r.get("status") in TERMINAL_STATUSES for r in rows):
+        try:
+            await update_campaign(None, cid, {"status": "completed"}, service=True)
+        except Exception:
+            pass
 
 
-async def run_once() -> None:
-    """One full watcher tick. Exposed for tests / manual runs."""
-    try:
-        items = await list_items_by_status(["generating", "ready_to_post"], limit=100)
-    except Exception as e:
-        print(f"[campaign_watcher] list failed: {e}")
+async def _roll_up_campaigns(touched_campaign_ids: set[str]) -> None:
+    if not touched_campaign_ids:
         return
+    sem = asyncio.Semaphore(CONCURRENCY)
 
-    if not items:
-        return
+    async def _one(cid: str) -> None:
+        async with sem:
+            await _roll_up_campaign(cid)
+
+    await asyncio.gather(*(_one(cid) for cid in touched_campaign_ids), return_exceptions=True)
+
+
+# ── Metrics ────────────────────────────────────────────────────────────
+_totals = {"ticks": 0, "items": 0, "errors": 0, "tick_ms_total": 0.0}
+_last_tick: dict = {}
+
+
+def stats() -> dict:
+    """Cumulative counters plus the timings of the most recent tick."""
+    ticks = _totals["ticks"]
+    return {
+        "watcher_id": WATCHER_ID,
+        "ticks": ticks,
+        "items": _totals["items"],
+        "errors": _totals["errors"],
+        "mean_tick_ms": round(_totals["tick_ms_total"] / ticks, 1) if ticks else 0.0,
+        "limits": {"concurrency": CONCURRENCY, "per_user": PER_USER, **PROVIDER_LIMITS},
+        "last_tick": dict(_last_tick),
+    }
+
+
+class _TickLimits:
+    """Semaphores for one tick (created inside the running loop)."""
+
+    def __init__(self) -> None:
+        self.global_slots = asyncio.Semaphore(CONCURRENCY)
+        self.providers = {name: asyncio.Semaphore(n) for name, n in PROVIDER_LIMITS.items()}
+        self.users: dict[str, asyncio.Semaphore] = {}
+
+    def user(self, user_id: Optional[str]) -> asyncio.Semaphore:
+        key = user_id or ""
+        sem = self.users.get(key)
+        if sem is None:
+            sem = self.users[key] = asyncio.Semaphore(PER_USER)
+        return sem
 
+
+async def _fetch_page(after_id: Optional[str], leased: bool) -> tuple[Optional[list[dict]], bool]:
+    """(items, still_leased). Falls back to unleased reads when the claim RPC
+    is missing (checked once per process)."""
+    global _claim_rpc_missing
+    if leased and not _claim_rpc_missing:
+        items = await claim_items(
+            WATCHER_ID, ACTIVE_STATUSES,
+            limit=PAGE_SIZE, after_id=after_id, lease_seconds=LEASE_SECONDS,
+        )
+        if items is not None:
+            return items, True
+        _claim_rpc_missing = True
+        print("[campaign_watcher] claim_campaign_plan_items RPC missing (migration 073) — "
+              "running without leases")
+    return await list_items_by_status(ACTIVE_STATUSES, limit=PAGE_SIZE, after_id=after_id), False
+
+
+async def run_once() -> None:
+    """One full watcher tick. Exposed for tests / manual runs."""
+    started = time.monotonic()
+    limits = _TickLimits()
     touched: set[str] = set()
-    for it in items:
+    claimed_ids: list[str] = []
+    claimed_at: dict[str, float] = {}
+    item_ms: list[float] = []
+    by_provider: dict[str, int] = {}
+    errors = 0
+    lost = 0
+    pages = 0
+    leased = True
+    pending: set[asyncio.Task] = set()
+
+    async def _still_leased(item_id: str) -> bool:
+        """Renew the lease if it is past half-life; False if it was lost."""
+        nonlocal lost
+        since = claimed_at.get(item_id)
+        if since is None or time.monotonic() - since < LEASE_SECONDS / 2:
+            return True
         try:
-            await _progress_item(it)
+            held = await renew_items(WATCHER_ID, [item_id], lease_seconds=LEASE_SECONDS)
         except Exception as e:
-            print(f"[campaign_watcher] item {it.get('id')} error: {e}")
-            continue
+            print(f"[campaign_watcher] lease renewal failed for {item_id}: {e}")
+            held = []
+        if item_id not in held:
+            lost += 1
+            return False
+        claimed_at[item_id] = time.monotonic()
+        return True
+
+    async def _run_item(it: dict) -> None:
+        nonlocal errors
+        user_id = (it.get("campaigns") or {}).get("user_id")
+        provider = _provider_for(it)
+        async with limits.user(user_id), limits.providers[provider], limits.global_slots:
+            if not await _still_leased(it["id"]):
+                return
+            t0 = time.monotonic()
+            try:
+                await _progress_item(it)
+            except Exception as e:
+                errors += 1
+                print(f"[campaign_watcher] item {it.get('id')} error: {e}")
+                return
+            finally:
+                item_ms.append((time.monotonic() - t0) * 1000)
+                by_provider[provider] = by_provider.get(provider, 0) + 1
         cid = (it.get("campaigns") or {}).get("id") or it.get("campaign_id")
         if cid:
             touched.add(cid)
 
-    await _roll_up_campaigns(touched)
+    try:
+        after_id: Optional[str] = None
+        while True:
+            try:
+                items, leased = await _fetch_page(after_id, leased)
+            except Exception as e:
+                print(f"[campaign_watcher] list failed: {e}")
+                break
+            if not items:
+                break
+            pages += 1
+            if leased:
+                now = time.monotonic()
+                for it in items:
+                    claimed_ids.append(it["id"])
+                    claimed_at[it["id"]] = now
+            for it in items:
+                task = asyncio.create_task(_run_item(it))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if len(items) < PAGE_SIZE:
+                break
+            after_id = items[-1]["id"]
+            # Don't lease the next page until this one has mostly drained.
+            while len(pending) > CONCURRENCY:
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await _roll_up_campaigns(touched)
+    finally:
+        for task in pending:
+            task.cancel()
+        if claimed_ids:
+            try:
+                await release_items(WATCHER_ID, claimed_ids)
+            except Exception as e:
+                print(f"[campaign_watcher] lease release failed (leases will expire): {e}")
+
+        duration_ms = (time.monotonic() - started) * 1000
+        _totals["ticks"] += 1
+        _totals["items"] += len(item_ms)
+        _totals["errors"] += errors
+        _totals["tick_ms_total"] += duration_ms
+        _last_tick.clear()
+        _last_tick.update({
+            "finished_at": time.time(),
+            "duration_ms": round(duration_ms, 1),
+            "pages": pages,
+            "items": len(item_ms),
+            "errors": errors,
+            "leased": leased,
+            "leases_lost": lost,
+            "by_provider": by_provider,
+            "campaigns_touched": len(touched),
+            "item_mean_ms": round(sum(item_ms) / len(item_ms), 1) if item_ms else 0.0,
+            "item_max_ms": round(max(item_ms), 1) if item_ms else 0.0,
+        })
+        if item_ms:
+            print(f"[campaign_watcher] tick: {len(item_ms)} items in {pages} page(s), "
+                  f"{errors} errors, {duration_ms:.0f}ms")
 
 
 async def watcher_loop(stop_event: asyncio.Event) -> None:
@@ -13,6 +13,7 @@ import json
 from difflib import SequenceMatcher
 from openai import OpenAI
 import os
+import transcription_store
 
 
 # Pro UGC subtitle style constants (Alex Hormozi / Mr Beast style)
@@ -179,6 +180,13 @@ def extract_transcription_with_whisper(video_path, brand_names=None, script_text
         script_text: Optional known script text to guide Whisper accuracy
         video_language: Language hint for Whisper (e.g. 'en', 'es'). Defaults to 'en'.
     """
+    # Same key the Whisper call below uses: the hint is only sent for en/es.
+    cache_lang = video_language if video_language in ("en", "es") else None
+    fingerprint, cached = transcription_store.lookup(video_path, cache_lang)
+    if cached is not None:
+        print(f"   [CACHE] Reusing transcription of {Path(video_path).name} ({len(cached['words'])} words)")
+        return cached
+
     try:
         print(f"   🎤 Extracting audio and transcribing with Whisper API... (lang={video_language})")
         audio_path = Path(video_path).parent / f"{Path(video_path).stem}.mp3"
@@ -225,17 +233,20 @@ def extract_transcription_with_whisper(video_path, brand_names=None, script_text
             result["words"] = _restore_numbers_in_words(result["words"], script_text)
         
         print("   ✅ Whisper transcription successful.")
+        transcription_store.put(fingerprint, cache_lang, result)
         return result
     except Exception as e:
         print(f"   ❌ Error during Whisper transcription: {e}")
         return None
 
 
-def generate_subtitles_from_whisper(transcription, output_path, max_words=3, brand_names=None):
-    """Generates an ASS subtitle file from a Whisper API verbose_json response."""
+def generate_subtitles_from_whisper(transcription, output_path, max_words=3, brand_names=None,
+                                    placement="middle"):
+    """Generates an ASS subtitle file from a Whisper API verbose_json response.
+    `placement` is the job's subtitle_placement (top / middle / bottom)."""
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    ass_content = _build_ass_header()
+    ass_content = _build_ass_header(placement)
     
     if not transcription or "words" not in transcription or not transcription["words"]:
         print("   ⚠️ No words found in transcription. Skipping subtitle generation.")
@@ -455,8 +466,18 @@ def generate_synced_subtitles(transcription_data, output_path):
     return str(output_path)
 
 
-def _build_ass_header():
+# subtitle_placement -> (ASS numpad alignment, MarginV at 1920px), matching the
+# Remotion renderer's PLACEMENT_STYLES (top 8%, centred, bottom 12%).
+ASS_PLACEMENTS = {
+    "top": (8, 154),
+    "middle": (5, 0),
+    "bottom": (2, 230),
+}
+
+
+def _build_ass_header(placement="middle"):
     """Build the ASS file header with Hormozi-style formatting."""
+    alignment, margin_v = ASS_PLACEMENTS.get(placement or "middle", ASS_PLACEMENTS["middle"])
     return f"""[Script Info]
 Title: Naiara UGC Subtitles
 ScriptType: v4.00+
@@ -466,7 +487,7 @@ WrapStyle: 0
 
 [V4+ Styles]
 Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
-Style: Hormozi,{FONT_NAME},{FONT_SIZE},{PRIMARY_COLOR},&H000000FF,{OUTLINE_COLOR},{SHADOW_COLOR},{BOLD},0,0,0,100,100,1,0,1,{OUTLINE_WIDTH},{SHADOW_DEPTH},5,40,40,0,1
+Style: Hormozi,{FONT_NAME},{FONT_SIZE},{PRIMARY_COLOR},&H000000FF,{OUTLINE_COLOR},{SHADOW_COLOR},{BOLD},0,0,0,100,100,1,0,1,{OUTLINE_WIDTH},{SHADOW_DEPTH},{alignment},40,40,{margin_v},1
 
 [Events]
 Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
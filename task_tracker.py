@@ -0,0 +1,366 @@
+"""
+Provider Task Tracker — shared completion tracking for Kie.ai / WaveSpeed tasks.
+
+Every provider call in generate_scenes.py submits a task and then needs to
+know when it finishes. Instead of each caller parking in its own
+`time.sleep(10)` loop, callers register the task here and block (or await)
+on a future. One background asyncio loop owns all in-flight tasks:
+
+  - Batched polling: a single scheduler wakes up when the next task is due
+    and dispatches every due task's poll onto one bounded thread pool.
+  - Adaptive intervals: each task starts with a short poll interval that
+    backs off geometrically, so fresh tasks complete near-immediately while
+    long renders stop hammering the provider.
+  - Callbacks: the provider webhook routes in ugc_backend/main.py call
+    `notify(task_id)`, which forces an immediate poll of that task. Polling
+    stays the source of truth, so a spoofed or duplicated callback is
+    harmless. Callbacks only reach the process that serves the webhook
+    routes (the API, which calls `accept_callbacks()` at startup) — Celery
+    and Modal workers still complete via polling alone.
+
+Poll functions follow one contract: return the result when the task is
+done, return None while it is still running, raise RuntimeError on a
+terminal provider failure. `wait()` raises TimeoutError when the deadline
+passes so callers can keep their existing timeout messages.
+
+Cancellation: code running inside `with cancel_scope() as scope:` can be
+abandoned from another thread with `scope.cancel()` — every wait() in that
+scope (now or later) raises TaskCancelled and its polling stops. The
+provider-side task keeps running; Kie and WaveSpeed have no cancel API.
+
+Config:
+  PROVIDER_WEBHOOK_BASE:  public base URL of the API (e.g. Railway URL).
+                          When set, Kie payloads get a real callBackUrl and
+                          WaveSpeed submits get ?webhook=…, and polling
+                          intervals stretch in the API process because
+                          callbacks carry latency.
+  TASK_POLL_MIN_SECONDS:  first poll delay (default 3s).
+  TASK_POLL_MAX_SECONDS:  poll interval ceiling (default 15s, 30s in the
+                          process that receives callbacks).
+  TASK_POLL_CONCURRENCY:  max provider polls in flight at once (default 16).
+"""
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+
+_PLACEHOLDER_CALLBACK_URL = "https://example.com/callback"
+
+
+def _webhook_base() -> str:
+    return (os.getenv("PROVIDER_WEBHOOK_BASE") or "").strip().rstrip("/")
+
+
+def kie_callback_url(required: bool = True) -> str | None:
+    """callBackUrl for Kie payloads.
+
+    Some Kie endpoints (jobs/createTask, Suno) reject payloads without the
+    field, so `required=True` keeps the old placeholder when no public base
+    URL is configured. Optional callers get None and omit the field.
+    """
+    base = _webhook_base()
+    if base:
+        return f"{base}/api/webhooks/kie"
+    return _PLACEHOLDER_CALLBACK_URL if required else None
+
+
+def wavespeed_webhook_url() -> str | None:
+    """Webhook URL to append to WaveSpeed submits, or None when unconfigured."""
+    base = _webhook_base()
+    return f"{base}/api/webhooks/wavespeed" if base else None
+
+
+def with_wavespeed_webhook(endpoint: str) -> str:
+    """Append ?webhook=… to a WaveSpeed model endpoint when configured."""
+    hook = wavespeed_webhook_url()
+    if not hook:
+        return endpoint
+    sep = "&" if "?" in endpoint else "?"
+    return f"{endpoint}{sep}webhook={hook}"
+
+
+class TaskCancelled(RuntimeError):
+    """Raised by wait() when its cancel scope was cancelled."""
+
+
+class CancelScope:
+    """Set of tracked tasks that can be abandoned together (see cancel_scope())."""
+
+    def __init__(self, tracker: "TaskTracker"):
+        self._tracker = tracker
+        self._task_ids: set[str] = set()
+        self._lock = threading.Lock()
+        self.cancelled = False
+
+    def _attach(self, task_id: str):
+        with self._lock:
+            if self.cancelled:
+                raise TaskCancelled(f"task {task_id} cancelled before polling started")
+            self._task_ids.add(task_id)
+
+    def _detach(self, task_id: str):
+        with self._lock:
+            self._task_ids.discard(task_id)
+
+    def cancel(self):
+        """Stop polling every task in this scope. Thread-safe, idempotent."""
+        with self._lock:
+            self.cancelled = True
+            task_ids = list(self._task_ids)
+        for task_id in task_ids:
+            self._tracker.cancel(task_id)
+
+
+_current_scope: contextvars.ContextVar[CancelScope | None] = contextvars.ContextVar(
+    "task_tracker_cancel_scope", default=None
+)
+
+
+class _TrackedTask:
+    __slots__ = (
+        "task_id", "poll_fn", "label", "future", "deadline",
+        "interval", "next_poll_at", "started_at", "polls",
+    )
+
+    def __init__(self, task_id, poll_fn, label, future, deadline, interval):
+        now = time.monotonic()
+        self.task_id = task_id
+        self.poll_fn = poll_fn
+        self.label = label
+        self.future = future
+        self.deadline = deadline
+        self.interval = interval
+        self.next_poll_at = now + interval
+        self.started_at = now
+        self.polls = 0
+
+
+class TaskTracker:
+    """
+    Process-wide tracker for in-flight provider tasks.
+
+    The asyncio loop runs on one daemon thread and is started lazily on the
+    first `wait()`. Blocking provider HTTP polls run on a bounded thread
+    pool so a slow poll never stalls the scheduler.
+    """
+
+    def __init__(self, min_interval: float = None, max_interval: float = None,
+                 backoff: float = 1.5, max_concurrent_polls: int = None):
+        self._min_interval = min_interval or float(os.getenv("TASK_POLL_MIN_SECONDS", "3"))
+        self._max_interval_fixed = max_interval or os.getenv("TASK_POLL_MAX_SECONDS")
+        self._max_interval = float(self._max_interval_fixed or 15)
+        self._callbacks_enabled = False
+        self._backoff = backoff
+        self._max_concurrent_polls = max_concurrent_polls or int(os.getenv("TASK_POLL_CONCURRENCY", "16"))
+        self._tasks: dict[str, _TrackedTask] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._start_lock = threading.Lock()
+        self._completed = 0
+        self._callbacks = 0
+
+    # ── Loop lifecycle ───────────────────────────────────────────────────
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is not None:
+                return self._loop
+            ready = threading.Event()
+
+            def _run():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                self._loop = loop
+                self._wake = asyncio.Event()
+                loop.create_task(self._scheduler())
+                ready.set()
+                loop.run_forever()
+
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_concurrent_polls,
+                thread_name_prefix="task-poll",
+            )
+            threading.Thread(target=_run, name="task-tracker", daemon=True).start()
+            ready.wait()
+            return self._loop
+
+    # ── Scheduler ────────────────────────────────────────────────────────
+
+    async def _scheduler(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = time.monotonic()
+            for task in [t for t in self._tasks.values() if t.next_poll_at <= now]:
+                # Park the task while its poll is in flight; _poll_one reschedules it.
+                task.next_poll_at = float("inf")
+                loop.create_task(self._poll_one(loop, task))
+
+            pending = [t.next_poll_at for t in self._tasks.values() if t.next_poll_at != float("inf")]
+            delay = max(0.0, min(pending) - now) if pending else None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_one(self, loop, task: _TrackedTask):
+        task.polls += 1
+        try:
+            result = await loop.run_in_executor(self._executor, task.poll_fn, task.task_id)
+        except Exception as e:
+            self._finish(task, error=e)
+            return
+
+        if result is not None:
+            self._finish(task, result=result)
+            return
+
+        now = time.monotonic()
+        if now >= task.deadline:
+            self._finish(task, error=TimeoutError(
+                f"{task.label or task.task_id} timed out after {now - task.started_at:.0f}s"
+            ))
+            return
+        task.interval = min(self._max_interval, task.interval * self._backoff)
+        task.next_poll_at = min(task.deadline, now + task.interval)
+        self._wake.set()
+
+    def _finish(self, task: _TrackedTask, result=None, error: Exception = None):
+        self._tasks.pop(task.task_id, None)
+        if task.future.done():
+            return
+        self._completed += 1
+        if error is not None:
+            task.future.set_exception(error)
+        else:
+            task.future.set_result(result)
+
+    # ── Public API ───────────────────────────────────────────────────────
+
+    def accept_callbacks(self) -> bool:
+        """
+        Declare that provider webhooks reach this process (the API serving
+        /api/webhooks/*). Only then can polling back off to the longer
+        ceiling. Returns False when PROVIDER_WEBHOOK_BASE is unset.
+        """
+        if not _webhook_base():
+            return False
+        self._callbacks_enabled = True
+        if not self._max_interval_fixed:
+            self._max_interval = 30.0
+        return True
+
+    async def _register(self, task_id, poll_fn, timeout, label, scope=None):
+        fut = asyncio.get_running_loop().create_future()
+        deadline = time.monotonic() + timeout
+        task = _TrackedTask(task_id, poll_fn, label, fut, deadline, self._min_interval)
+        self._tasks[task_id] = task
+        if scope is not None and scope.cancelled:
+            # Cancelled between attach and registration.
+            self._finish(task, error=TaskCancelled(f"{label or task_id} cancelled"))
+        self._wake.set()
+        try:
+            return await fut
+        finally:
+            self._tasks.pop(task_id, None)
+
+    def wait(self, task_id: str, poll_fn, timeout: float, label: str = ""):
+        """
+        Block the calling thread until `poll_fn(task_id)` yields a result.
+
+        Raises whatever poll_fn raised, or TimeoutError after `timeout` seconds.
+        """
+        scope = _current_scope.get()
+        if scope is not None:
+            scope._attach(task_id)
+        try:
+            loop = self._ensure_loop()
+            fut = asyncio.run_coroutine_threadsafe(self._register(task_id, poll_fn, timeout, label, scope), loop)
+            return fut.result()
+        finally:
+            if scope is not None:
+                scope._detach(task_id)
+
+    async def wait_async(self, task_id: str, poll_fn, timeout: float, label: str = ""):
+        """Awaitable form of `wait()` for callers already on an event loop."""
+        loop = self._ensure_loop()
+        fut = asyncio.run_coroutine_threadsafe(self._register(task_id, poll_fn, timeout, label), loop)
+        return await asyncio.wrap_future(fut)
+
+    def notify(self, task_id: str) -> bool:
+        """
+        Mark a task as due for an immediate poll (called from provider webhooks).
+
+        Thread-safe. Returns False when this process isn't tracking the task.
+        """
+        loop = self._loop
+        if loop is None or task_id not in self._tasks:
+            return False
+        self._callbacks += 1
+
+        def _wake_task():
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            if task.next_poll_at == float("inf"):
+                # A poll is already in flight — make the follow-up one fast.
+                task.interval = self._min_interval / self._backoff
+                return
+            task.next_poll_at = 0
+            self._wake.set()
+
+        loop.call_soon_threadsafe(_wake_task)
+        return True
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        Stop tracking a task; its waiter raises TaskCancelled. Thread-safe.
+        Returns False when the tracker hasn't started.
+        """
+        loop = self._loop
+        if loop is None:
+            return False
+
+        def _cancel_task():
+            task = self._tasks.get(task_id)
+            if task is not None:
+                self._finish(task, error=TaskCancelled(f"{task.label or task_id} cancelled"))
+
+        loop.call_soon_threadsafe(_cancel_task)
+        return True
+
+    @contextmanager
+    def cancel_scope(self, scope: CancelScope = None):
+        """
+        Collect every wait() made in this context (same thread, or threads
+        started with its copied context) so they can be cancelled together.
+        Pass a pre-made `CancelScope(tracker)` to hold a handle before the
+        work starts on another thread.
+        """
+        scope = scope or CancelScope(self)
+        token = _current_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _current_scope.reset(token)
+
+    def stats(self) -> dict:
+        """Snapshot of tracker state for health/debug endpoints."""
+        now = time.monotonic()
+        tasks = list(self._tasks.values())
+        return {
+            "in_flight": len(tasks),
+            "completed": self._completed,
+            "callbacks": self._callbacks,
+            "oldest_seconds": round(max((now - t.started_at for t in tasks), default=0), 1),
+            "callbacks_enabled": self._callbacks_enabled,
+        }
+
+
+# Global singleton — shared by every provider call in this process
+tracker = TaskTracker()
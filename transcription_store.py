@@ -0,0 +1,201 @@
+"""
+Transcription Store — Whisper results keyed by audio content.
+
+The same audio used to be transcribed several times per video: the extended
+chain (or each native-audio Veo scene) in core_engine, the timeline mix
+before assembly, and again when the user opens the editor or asks for
+captions. Every run re-extracted audio with ffmpeg and re-uploaded it to
+OpenAI. TranscriptionClient.transcribe_audio and
+subtitle_engine.extract_transcription_with_whisper now consult this store
+first and record what they get back.
+
+Keys are (audio fingerprint, language):
+  - fingerprint: sha256 of the first audio stream decoded to 16 kHz mono
+    s16le (ffmpeg's `hash` muxer), so a remux or a WAV extracted from the
+    same file hashes the same as its source video. Files without audio have
+    no fingerprint and are never cached.
+  - language: the ISO-639-1 hint passed to Whisper, or "auto".
+
+Prompt hints (script text, brand names) are not part of the key — they only
+bias decoding of the same audio, and brand spelling is re-applied when
+subtitles are built.
+
+Composition: `compose()` shifts per-segment transcripts onto a timeline, and
+`compose_timeline()` does that for an assembly timeline whose voiced clips
+are all cached — the extended chain's transcript becomes the final video's
+without another API call. `remember()` files a transcript under another
+media file (e.g. the final render) so the editor gets a hit on it.
+
+Entries live in a MediaCache instance (atomic writes, LRU + age eviction),
+so every process on the host shares them.
+
+Config:
+  TRANSCRIPTION_CACHE_ENABLED       (default true)
+  TRANSCRIPTION_CACHE_DIR           (default <tmp>/ugc_transcription_cache)
+  TRANSCRIPTION_CACHE_MAX_MB        (default 256)
+  TRANSCRIPTION_CACHE_MAX_AGE_DAYS  (default 30)
+"""
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+_store = None
+_fingerprints: dict[tuple, str | None] = {}  # (path, size, mtime) -> fingerprint
+_lock = threading.Lock()
+
+
+def _cache():
+    global _store
+    if _store is None:
+        from media_cache import MediaCache
+        _store = MediaCache(
+            root=os.getenv("TRANSCRIPTION_CACHE_DIR") or Path(tempfile.gettempdir()) / "ugc_transcription_cache",
+            max_bytes=int(float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "256")) * 1024 * 1024),
+            url_ttl=0,
+            enabled=os.getenv("TRANSCRIPTION_CACHE_ENABLED", "true").lower() != "false",
+            max_age=float(os.getenv("TRANSCRIPTION_CACHE_MAX_AGE_DAYS", "30")) * 86400,
+            label="transcription",
+        )
+    return _store
+
+
+def _key(fingerprint: str, language) -> str:
+    return f"transcription:{fingerprint}:{(language or 'auto').lower()}"
+
+
+def audio_fingerprint(media_path) -> str | None:
+    """sha256 of the decoded audio of `media_path`, or None (no audio / ffmpeg error)."""
+    path = Path(media_path)
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    memo_key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+    with _lock:
+        if memo_key in _fingerprints:
+            return _fingerprints[memo_key]
+
+    cmd = [
+        "ffmpeg", "-v", "error", "-i", str(path),
+        "-map", "0:a:0", "-ac", "1", "-ar", "16000", "-c:a", "pcm_s16le",
+        "-f", "hash", "-hash", "sha256", "-",
+    ]
+    fingerprint = None
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        out = result.stdout.strip()
+        if result.returncode == 0 and out.startswith("SHA256="):
+            fingerprint = out.split("=", 1)[1]
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    with _lock:
+        _fingerprints[memo_key] = fingerprint
+    return fingerprint
+
+
+def get(fingerprint, language=None) -> dict | None:
+    """Cached transcription for `fingerprint` (a private copy), or None."""
+    store = _cache()
+    if not fingerprint or not store.enabled:
+        return None
+    fd, tmp_name = tempfile.mkstemp(prefix="transcription-", suffix=".json")
+    os.close(fd)
+    try:
+        if store.get(_key(fingerprint, language), tmp_name) is None:
+            return None
+        return json.loads(Path(tmp_name).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+def put(fingerprint, language, transcription) -> None:
+    """Store `transcription` (only when it has words). Failures are logged, not raised."""
+    store = _cache()
+    if not fingerprint or not store.enabled or not transcription or not transcription.get("words"):
+        return
+    fd, tmp_name = tempfile.mkstemp(prefix="transcription-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(transcription, f)
+        store.put(_key(fingerprint, language), tmp_name)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"   !! [CACHE] Could not store transcription: {e}")
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+def lookup(media_path, language=None) -> tuple[str | None, dict | None]:
+    """(fingerprint, cached transcription or None) for a media file."""
+    if not _cache().enabled:
+        return None, None
+    fingerprint = audio_fingerprint(media_path)
+    return fingerprint, get(fingerprint, language)
+
+
+def remember(media_path, language, transcription) -> None:
+    """File `transcription` under the audio of `media_path` as well."""
+    if not _cache().enabled or not transcription or not transcription.get("words"):
+        return
+    put(audio_fingerprint(media_path), language, transcription)
+
+
+def compose(segments) -> dict:
+    """
+    Stitch per-segment transcripts into one timeline transcript.
+
+    `segments` is an iterable of (transcription, offset, start, end): words
+    whose start falls in [start, end) of the segment's own time base are
+    shifted to `offset + (t - start)`. `end` may be None (no upper bound).
+    """
+    words = []
+    for transcription, offset, start, end in segments:
+        for w in (transcription or {}).get("words") or []:
+            w_start = float(w.get("start", 0))
+            if w_start < start or (end is not None and w_start >= end):
+                continue
+            w_end = float(w.get("end", w_start))
+            if end is not None:
+                w_end = min(w_end, end)
+            shifted = dict(w)
+            shifted["start"] = round(offset + w_start - start, 3)
+            shifted["end"] = round(offset + w_end - start, 3)
+            words.append(shifted)
+    words.sort(key=lambda w: w["start"])
+    return {"words": words, "text": " ".join(w.get("word", "").strip() for w in words).strip()}
+
+
+def compose_timeline(paths, offsets, durations, language=None, limit=None) -> dict | None:
+    """
+    Timeline transcript built from cached per-clip transcripts, or None if
+    any clip with audio is not cached (the caller then transcribes the mix).
+
+    `offsets`/`durations` are each clip's start and length on the timeline
+    (see assemble_video.timeline_offsets); silent clips are skipped.
+    """
+    if not _cache().enabled:
+        return None
+    segments = []
+    for path, offset, duration in zip(paths, offsets, durations):
+        if limit is not None and offset >= limit:
+            break
+        fingerprint = audio_fingerprint(path)
+        if fingerprint is None:
+            continue
+        cached = get(fingerprint, language)
+        if cached is None:
+            return None
+        end = duration if limit is None else min(duration, limit - offset)
+        segments.append((cached, offset, 0.0, end))
+    if not segments:
+        return None
+    return compose(segments)
+
+
+def stats() -> dict:
+    """Hit/miss counters of the backing MediaCache."""
+    return _cache().stats()
@@ -0,0 +1,193 @@
+"""
+TTS Service — cached, parallel ElevenLabs synthesis for multi-part scripts.
+
+clone_engine used to synthesize each `|||` script part one after another
+through elevenlabs_client.generate_voiceover, then ffprobe every chunk, and
+the same CTA or brand tagline was paid for again on every job. Now:
+
+  - Parts are synthesized concurrently, at most TTS_CONCURRENCY requests in
+    flight per call (ElevenLabs caps concurrent requests per plan).
+    Identical parts within one script are synthesized once.
+  - Clips are cached on disk keyed by (voice_id, model_id, voice_settings,
+    language_code, normalized text). Normalization collapses whitespace only;
+    number/currency rewriting happens inside elevenlabs_client and is
+    deterministic, so it does not need to be part of the key.
+  - Each cached clip has a duration entry next to it (measured once with
+    ffprobe), so a cache hit costs neither an API call nor an ffprobe.
+  - A 429 on any thread pauses all threads (elevenlabs_client's shared
+    backoff), instead of every worker hammering the limit independently.
+
+Clips produced by the 402 fallback voice are not cached under the requested
+voice.
+
+    for part in tts_service.synthesize_parts(texts, voice_id, output_dir):
+        part.index, part.path, part.duration, part.cached
+
+Config:
+  TTS_CONCURRENCY              parallel ElevenLabs requests per call (default 3)
+  TTS_CACHE_ENABLED            (default true)
+  TTS_CACHE_DIR                (default <tmp>/ugc_tts_cache)
+  TTS_CACHE_MAX_MB             (default 512)
+  TTS_CACHE_MAX_AGE_DAYS       (default 30)
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import config
+import elevenlabs_client
+
+_store = None
+_store_lock = threading.Lock()
+
+
+@dataclass
+class SynthesizedPart:
+    index: int          # position in the input list
+    path: Path          # MP3 written for this part
+    duration: float     # seconds
+    cached: bool        # served from the phrase cache
+
+
+def _cache():
+    global _store
+    with _store_lock:
+        if _store is None:
+            from media_cache import MediaCache
+            _store = MediaCache(
+                root=os.getenv("TTS_CACHE_DIR") or Path(tempfile.gettempdir()) / "ugc_tts_cache",
+                max_bytes=int(float(os.getenv("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024),
+                url_ttl=0,
+                enabled=os.getenv("TTS_CACHE_ENABLED", "true").lower() != "false",
+                max_age=float(os.getenv("TTS_CACHE_MAX_AGE_DAYS", "30")) * 86400,
+                label="tts",
+            )
+        return _store
+
+
+def normalize_text(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def cache_key(text: str, voice_id: str, language_code=None) -> str:
+    """Phrase cache key for the current model and voice settings."""
+    ident = json.dumps(
+        {
+            "voice_id": voice_id,
+            "model_id": config.ELEVENLABS_MODEL_ID,
+            "voice_settings": elevenlabs_client.VOICE_SETTINGS,
+            "language_code": language_code or None,
+            "text": normalize_text(text),
+        },
+        sort_keys=True,
+    )
+    return "tts:" + hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+
+def audio_duration(audio_path) -> float:
+    """Audio duration in seconds using ffprobe."""
+    cmd = [
+        "ffprobe", "-v", "quiet", "-print_format", "json",
+        "-show_format", str(audio_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr[:200]}")
+    return float(json.loads(result.stdout)["format"]["duration"])
+
+
+def _get_duration(key: str) -> float | None:
+    fd, tmp_name = tempfile.mkstemp(prefix="tts-meta-", suffix=".json")
+    os.close(fd)
+    try:
+        if _cache().get(f"{key}:meta", tmp_name) is None:
+            return None
+        return float(json.loads(Path(tmp_name).read_text(encoding="utf-8"))["duration"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+def _put_duration(key: str, duration: float) -> None:
+    fd, tmp_name = tempfile.mkstemp(prefix="tts-meta-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"duration": duration}, f)
+        _cache().put(f"{key}:meta", tmp_name)
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+def synthesize(text: str, voice_id: str, dest, language_code=None) -> tuple[Path, float, bool]:
+    """
+    Write the speech for `text` to `dest`. Returns (dest, duration, cached).
+    """
+    dest = Path(dest)
+    store = _cache()
+    key = cache_key(text, voice_id, language_code)
+
+    if store.enabled and store.get(key, dest) is not None:
+        duration = _get_duration(key)
+        if duration is None:  # meta evicted separately — re-measure once
+            duration = audio_duration(dest)
+            _put_duration(key, duration)
+        print(f"   [CACHE] TTS hit ({duration:.1f}s): {normalize_text(text)[:60]}")
+        return dest, duration, True
+
+    used_voice = elevenlabs_client.synthesize_to_file(
+        normalize_text(text), voice_id, dest, language_code=language_code,
+    )
+    duration = audio_duration(dest)
+    if store.enabled and used_voice == voice_id:
+        store.put(key, dest)
+        _put_duration(key, duration)
+    return dest, duration, False
+
+
+def synthesize_parts(texts, voice_id: str, output_dir, language_code=None,
+                     max_workers: int = None, prefix: str = "voiceover_chunk"):
+    """
+    Synthesize every text concurrently; yields SynthesizedPart in input order
+    as soon as each (and all before it) is ready. Closing the generator early
+    (e.g. once enough audio exists) cancels parts that have not started.
+    Raises the first synthesis error in order.
+    """
+    texts = list(texts)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = max(1, max_workers or int(os.getenv("TTS_CONCURRENCY", "3")))
+
+    # Duplicate phrases in one script share a single request.
+    first_index: dict[str, int] = {}
+    for i, text in enumerate(texts):
+        first_index.setdefault(cache_key(text, voice_id, language_code), i)
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+    try:
+        futures = {
+            i: pool.submit(synthesize, texts[i], voice_id, output_dir / f"{prefix}_{i}.mp3", language_code)
+            for i in sorted(first_index.values())
+        }
+        for i, text in enumerate(texts):
+            source = first_index[cache_key(text, voice_id, language_code)]
+            path, duration, cached = futures[source].result()
+            if source != i:
+                dest = output_dir / f"{prefix}_{i}.mp3"
+                shutil.copyfile(path, dest)
+                path, cached = dest, True
+            yield SynthesizedPart(index=i, path=path, duration=duration, cached=cached)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def stats() -> dict:
+    """Hit/miss counters of the phrase cache."""
+    return _cache().stats()
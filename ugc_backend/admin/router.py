@@ -415,6 +415,35 @@ def api_reflection_last_sweep(user: dict = Depends(get_current_user)):
     return studio_service.get_last_sweep()
 
 
+@router.get("/analytics/work-queue")
+def api_analytics_work_queue(user: dict = Depends(get_current_user)):
+    """Analytics background pools: queue depth, in-flight work, provider
+    throttling, breakdown-cache hit rate and remote poster extraction
+    (per web process)."""
+    _require_admin(user)
+    from ugc_backend.analytics import breakdown_cache, rate_limits, remote_frames
+    from ugc_backend.analytics.work_scheduler import scheduler
+
+    return {
+        **scheduler.stats(),
+        "rate_limits": rate_limits.stats(),
+        "breakdown_cache": breakdown_cache.stats(),
+        "remote_frames": remote_frames.stats(),
+    }
+
+
+@router.get("/provider-routing")
+def api_provider_routing(user: dict = Depends(get_current_user)):
+    """Live video-provider routing table: breaker state, EWMA score, success
+    rate and p50/p95 completion time per provider + model family (shared
+    across the worker fleet), plus Veo hedging counters and spend."""
+    _require_admin(user)
+    import provider_hedging
+    import provider_routing
+
+    return {**provider_routing.routing.routing_table(), "hedging": provider_hedging.stats()}
+
+
 @router.get("/reflection/users", response_model=List[ReflectionUserOut])
 def api_reflection_users(user: dict = Depends(get_current_user)):
     """Active users with tracked accounts, for the admin viewer's picker."""
@@ -44,6 +44,7 @@ from typing import Optional
 from ugc_db.db_manager import get_supabase
 
 from . import db as analytics_db
+from . import rate_limits
 
 logger = logging.getLogger(__name__)
 
@@ -282,6 +283,7 @@ def _generate_account_report(
 
     client = _get_llm_client()
     system_prompt = _ACCOUNT_SYSTEM_PROMPT + locale_content.markdown_prompt_suffix(loc)
+    rate_limits.acquire(rate_limits.OPENAI)
     response = client.chat.completions.create(
         model=_MODEL,
         messages=[
@@ -420,6 +422,7 @@ def generate_strategy_report(
 
         client = _get_llm_client()
         system_prompt = _SYSTEM_PROMPT + locale_content.markdown_prompt_suffix(loc)
+        rate_limits.acquire(rate_limits.OPENAI)
         response = client.chat.completions.create(
             model=_MODEL,
             messages=[
@@ -0,0 +1,361 @@
+"""Shared Pass 1 result cache for AI video breakdowns.
+
+The same underlying video is analysed over and over: a trending post
+tracked by many users, a Studio publication and its scraped twin
+(``db.find_internal_twin``), a re-scrape of an unchanged post. Pass 1 (the
+Gemini video call) only depends on the video, the output locale and the
+prompt, so its sanitized result is cached in ``analytics_breakdown_cache``
+(migration 074).
+
+Lookup order inside ``vision_service.analyze_video``:
+
+1. **URL** — the exact video URL this user analysed before (no download at
+   all).
+2. **Content hash** — SHA-256 of the downloaded bytes (identical file
+   behind a different / re-signed URL). The only key shared across users:
+   identical bytes are the same video whoever tracks it.
+3. **Perceptual fingerprint** — a 64-bit difference hash per second of
+   video, taken from the analysis proxy. Matches the same clip after a
+   platform re-encode or resize (Studio upload vs. its TikTok/IG twin):
+   an exact fingerprint first, then same length ±1s and mean Hamming
+   distance ≤ ``ANALYTICS_BREAKDOWN_FP_MAX_DISTANCE``. Scoped to the same
+   user — visually similar UGC from two users must never share an analysis.
+
+Entries are owned by a user and keyed on ``fingerprint_key`` (the
+fingerprint, else the SHA-256), so a forced re-run overwrites its entry
+instead of adding another.
+
+Every key includes ``prompt_version`` — a hash of the Pass 1 prompt (with
+the locale suffix), the model and ``RESULT_VERSION`` — so editing the
+prompt or the sanitizer invalidates old entries; a locale's rows from
+other versions are pruned once per process. Pass 2 takeaways depend on each post's own
+metrics and are never cached.
+
+Config:
+  ANALYTICS_BREAKDOWN_CACHE_ENABLED    (default true)
+  ANALYTICS_BREAKDOWN_FP_MAX_DISTANCE  mean bits per frame (default 6)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import subprocess
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from ugc_db.db_manager import get_supabase
+
+logger = logging.getLogger(__name__)
+
+_TABLE = "analytics_breakdown_cache"
+
+# Bump when _sanitize_structured / the cached payload shape changes.
+RESULT_VERSION = "1"
+
+_ENABLED = os.getenv("ANALYTICS_BREAKDOWN_CACHE_ENABLED", "true").lower() != "false"
+_FP_MAX_DISTANCE = float(os.getenv("ANALYTICS_BREAKDOWN_FP_MAX_DISTANCE", "6"))
+_FP_MAX_FRAMES = 180  # first 3 minutes are plenty to identify a clip
+_FP_MIN_FRAMES = 3  # shorter clips (or stills) are too easy to confuse
+_FP_TIMEOUT_SEC = 60
+_FP_SCAN_PAGE = 200
+_FP_SCAN_MAX_ROWS = 5000  # per user, version, locale and length ±1s
+
+_lock = threading.Lock()
+_available = True  # flips off when migration 074 is missing
+_pruned_versions: set[tuple[str, str]] = set()
+_stats = {
+    "lookups": 0,
+    "hits_url": 0,
+    "hits_content": 0,
+    "hits_fingerprint": 0,
+    "misses": 0,
+    "stores": 0,
+    "errors": 0,
+}
+
+
+def _count(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+
+def _is_missing_table_error(exc: BaseException) -> bool:
+    text = str(exc).lower()
+    return _TABLE in text and (
+        "42p01" in text or "pgrst205" in text
+        or "does not exist" in text or "could not find the table" in text
+    )
+
+
+def _disable_if_missing(exc: BaseException) -> None:
+    global _available
+    _count("errors")
+    if _is_missing_table_error(exc):
+        if _available:
+            logger.warning("[breakdown_cache] %s missing — apply migration 074; cache disabled", _TABLE)
+        _available = False
+    else:
+        logger.warning("[breakdown_cache] query failed: %s", exc)
+
+
+def enabled() -> bool:
+    return _ENABLED and _available
+
+
+# ── Keys ───────────────────────────────────────────────────────────────────
+
+def prompt_version(prompt: str, model: str) -> str:
+    ident = f"{RESULT_VERSION}\n{model}\n{prompt}"
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()[:16]
+
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(path: Path) -> Optional[str]:
+    """Hex string of one 64-bit dHash per second of video, or None.
+
+    ffmpeg decodes at 1 fps straight into 9×8 grayscale frames; each hash
+    compares horizontally adjacent pixels, which survives re-encodes and
+    resolution changes.
+    """
+    from .scraper_service import _ffmpeg_binary
+
+    binary = _ffmpeg_binary()
+    if not binary:
+        return None
+    try:
+        proc = subprocess.run(
+            [
+                binary,
+                "-i", str(path),
+                "-vf", "fps=1,scale=9:8:flags=area,format=gray",
+                "-frames:v", str(_FP_MAX_FRAMES),
+                "-f", "rawvideo",
+                "-loglevel", "error",
+                "-",
+            ],
+            timeout=_FP_TIMEOUT_SEC,
+            capture_output=True,
+        )
+    except (subprocess.TimeoutExpired, OSError) as e:
+        logger.info("[breakdown_cache] fingerprint failed: %s", e)
+        return None
+    raw = proc.stdout
+    if proc.returncode != 0 or len(raw) < 72:
+        return None
+
+    hashes = []
+    for off in range(0, len(raw) - 71, 72):
+        frame = raw[off:off + 72]
+        bits = 0
+        for row in range(8):
+            base = row * 9
+            for col in range(8):
+                bits = (bits << 1) | (frame[base + col] > frame[base + col + 1])
+        hashes.append(f"{bits:016x}")
+    return "".join(hashes)
+
+
+def _frames(fp: str) -> list[int]:
+    return [int(fp[i:i + 16], 16) for i in range(0, len(fp), 16)]
+
+
+def _distance(a: list[int], b: list[int]) -> float:
+    """Mean Hamming distance per frame at the best alignment (±1s)."""
+    best = float("inf")
+    for shift in (-1, 0, 1):
+        pairs = [
+            (a[i], b[i + shift])
+            for i in range(len(a))
+            if 0 <= i + shift < len(b)
+        ]
+        if len(pairs) < max(1, min(len(a), len(b)) - 1):
+            continue
+        best = min(best, sum(bin(x ^ y).count("1") for x, y in pairs) / len(pairs))
+    return best
+
+
+# ── Lookup / store ─────────────────────────────────────────────────────────
+
+def _hit(row: dict, kind: str) -> dict:
+    _count(f"hits_{kind}")
+    logger.info("[breakdown_cache] hit by %s (entry %s)", kind, row.get("id"))
+    try:
+        get_supabase().table(_TABLE).update({
+            "hits": int(row.get("hits") or 0) + 1,
+            "last_hit_at": datetime.now(timezone.utc).isoformat(),
+        }).eq("id", row["id"]).execute()
+    except Exception as e:  # noqa: BLE001 — hit counter is best-effort
+        logger.info("[breakdown_cache] hit counter update failed: %s", e)
+    return row["result"]
+
+
+def _select(version: str, locale: str):
+    return (
+        get_supabase().table(_TABLE)
+        .select("id, result, hits, fingerprint")
+        .eq("prompt_version", version)
+        .eq("locale", locale)
+    )
+
+
+def _fuzzy_match(version: str, locale: str, user_id: str, frames: list[int]) -> Optional[dict]:
+    """Closest same-user entry of similar length within the distance cap.
+
+    Pages through every candidate (in id order, not recency) so an old
+    match is found as readily as a new one.
+    """
+    n = len(frames)
+    best, best_row = float("inf"), None
+    for offset in range(0, _FP_SCAN_MAX_ROWS, _FP_SCAN_PAGE):
+        rows = (
+            _select(version, locale)
+            .eq("user_id", user_id)
+            .gte("fp_frames", n - 1)
+            .lte("fp_frames", n + 1)
+            .order("id")
+            .range(offset, offset + _FP_SCAN_PAGE - 1)
+            .execute()
+            .data
+        ) or []
+        for row in rows:
+            if not row.get("fingerprint"):
+                continue
+            d = _distance(frames, _frames(row["fingerprint"]))
+            if d < best:
+                best, best_row = d, row
+        if len(rows) < _FP_SCAN_PAGE:
+            break
+    return best_row if best <= _FP_MAX_DISTANCE else None
+
+
+def lookup(
+    *,
+    version: str,
+    locale: str,
+    user_id: Optional[str],
+    video_url: Optional[str] = None,
+    sha256: Optional[str] = None,
+    fp: Optional[str] = None,
+) -> Optional[dict]:
+    """Cached Pass 1 payload for whichever key is given, or None.
+
+    ``sha256`` matches any user's entry; ``video_url`` and ``fp`` only
+    match entries owned by ``user_id``.
+    """
+    if not enabled():
+        return None
+    try:
+        if video_url and user_id:
+            rows = (
+                _select(version, locale).eq("user_id", user_id).eq("video_url", video_url)
+                .order("created_at", desc=True).limit(1).execute().data
+            )
+            if rows:
+                return _hit(rows[0], "url")
+        if sha256:
+            rows = _select(version, locale).eq("content_sha256", sha256).limit(1).execute().data
+            if rows:
+                return _hit(rows[0], "content")
+        frames = _frames(fp) if fp else []
+        if user_id and len(frames) >= _FP_MIN_FRAMES:
+            rows = (
+                _select(version, locale).eq("user_id", user_id).eq("fingerprint_key", fp)
+                .limit(1).execute().data
+            )
+            if rows:
+                return _hit(rows[0], "fingerprint")
+            row = _fuzzy_match(version, locale, user_id, frames)
+            if row is not None:
+                return _hit(row, "fingerprint")
+    except Exception as e:  # noqa: BLE001 — a cache failure must not fail the breakdown
+        _disable_if_missing(e)
+        return None
+    return None
+
+
+def record_lookup(hit: bool) -> None:
+    """Count one breakdown's cache outcome (after every key was tried)."""
+    _count("lookups")
+    if not hit:
+        _count("misses")
+
+
+def store(
+    *,
+    version: str,
+    locale: str,
+    user_id: Optional[str],
+    result: dict,
+    video_url: Optional[str],
+    sha256: Optional[str],
+    fp: Optional[str],
+) -> None:
+    """Upsert this user's entry for the video (one row per fingerprint)."""
+    if not enabled() or not user_id or not sha256:
+        return
+    try:
+        get_supabase().table(_TABLE).upsert({
+            "prompt_version": version,
+            "locale": locale,
+            "user_id": user_id,
+            "fingerprint_key": fp or sha256,
+            "video_url": video_url,
+            "content_sha256": sha256,
+            "fingerprint": fp,
+            "fp_frames": len(fp) // 16 if fp else None,
+            "result": result,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }, on_conflict="prompt_version,locale,user_id,fingerprint_key").execute()
+        _count("stores")
+    except Exception as e:  # noqa: BLE001
+        _disable_if_missing(e)
+        return
+    _prune_other_versions(version, locale)
+
+
+def _prune_other_versions(version: str, locale: str) -> None:
+    """Drop this locale's entries written under another prompt version, once
+    per process and locale.
+
+    The version hashes the locale-specific prompt, so every locale has its
+    own current version — pruning must never cross locales. Only rows older
+    than a day go, so instances still running the previous version during a
+    rolling deploy don't have their fresh entries yanked.
+    """
+    with _lock:
+        if (version, locale) in _pruned_versions:
+            return
+        _pruned_versions.add((version, locale))
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    try:
+        (
+            get_supabase().table(_TABLE).delete()
+            .eq("locale", locale)
+            .neq("prompt_version", version)
+            .lt("created_at", cutoff)
+            .execute()
+        )
+    except Exception as e:  # noqa: BLE001
+        logger.info("[breakdown_cache] prune failed: %s", e)
+
+
+def stats() -> dict:
+    """Per-process hit/miss counters (surfaced on the admin work-queue endpoint)."""
+    with _lock:
+        snapshot = dict(_stats)
+    lookups = snapshot["lookups"]
+    hits = lookups - snapshot["misses"]
+    snapshot["hit_rate"] = round(hits / lookups, 3) if lookups else None
+    snapshot["enabled"] = enabled()
+    return snapshot
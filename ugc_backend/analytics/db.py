@@ -11,6 +11,8 @@ from __future__ import annotations
 
 import logging
 import re
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
 from typing import Any, Iterable, Optional
 
@@ -507,6 +509,7 @@ def upsert_posts(rows: Iterable[dict]) -> list[dict]:
         payload,
         on_conflict="user_id,platform,post_url",
     )
+    refresh_rollups_for_rows(payload)
     return result.data or []
 
 
@@ -770,7 +773,25 @@ def patch_post_metrics(post_id: str, updates: dict) -> None:
     if not payload:
         return
     payload["scraped_at"] = _now()
+    try:
+        old = _fetch_rollup_post(post_id)
+    except Exception as exc:
+        logger.warning("[analytics] rollup lookup failed for post %s: %s", post_id, exc)
+        old = None
     _supabase_update("analytics_posts", payload, id=post_id)
+    if old is None:
+        return
+    # Only this post's buckets change — apply the difference instead of
+    # rebuilding the slice.
+    try:
+        new = _fetch_rollup_post(post_id)
+        if new is None or _apply_post_rollup_delta(old, new):
+            return
+    except Exception as exc:
+        if _rollup_table_missing(exc):
+            return
+        logger.warning("[analytics] rollup delta failed for post %s: %s", post_id, exc)
+    refresh_rollups_for_rows([old])
 
 
 def stats(
@@ -790,6 +811,12 @@ def stats(
     live in dedicated helpers (`stats_extras`, `stats_distribution`,
     `stats_cumulative`) so this contract stays stable.
     """
+    buckets = _fetch_dashboard_rollups(user_id, platform=platform, source=source, username=username)
+    if buckets is not None:
+        return stats_from_rollups(
+            user_id, _period_buckets(buckets, period_days), buckets,
+            platform=platform, username=username,
+        )
     rows, all_rows = _fetch_dashboard_posts(
         user_id,
         period_days=period_days,
@@ -874,6 +901,11 @@ def stats_extras(
     username: Optional[str] = None,
 ) -> dict:
     """Sparkline arrays + period-over-period deltas for KPI cards."""
+    buckets = _fetch_dashboard_rollups(user_id, platform=platform, source=source, username=username)
+    if buckets is not None:
+        return stats_extras_from_rollups(
+            _period_buckets(buckets, period_days), buckets, period_days=period_days,
+        )
     rows, all_rows = _fetch_dashboard_posts(
         user_id,
         period_days=period_days,
@@ -973,6 +1005,9 @@ def stats_distribution(
     ``{platforms: {...}, media_types: {...}}`` shape promised by the
     architecture-reference doc — endpoint consumers can pick either.
     """
+    buckets = _fetch_dashboard_rollups(user_id, platform=platform, source=source, username=username)
+    if buckets is not None:
+        return stats_distribution_from_rollups(_period_buckets(buckets, period_days))
     rows, _all_rows = _fetch_dashboard_posts(
         user_id,
         period_days=period_days,
@@ -1044,7 +1079,13 @@ def stats_cumulative(
     ``cumulative_posts`` (per the architecture-reference contract) and also
     bare ``views`` / ``engagement`` / ``posts`` aliases so the existing FE
     chart doesn't need to know about the rename.
+
+    Served from the daily rollups when available; the row scan below is the
+    pre-migration fallback.
     """
+    buckets = _fetch_dashboard_rollups(user_id, platform=platform, source=source, username=username)
+    if buckets is not None:
+        return stats_cumulative_from_rollups(buckets, period_days=period_days)
     sb = get_supabase()
     span = max(int(period_days or 30), 1)
     today = datetime.now(timezone.utc).date()
@@ -1126,6 +1167,665 @@ def stats_cumulative(
 cumulative_stats = stats_cumulative
 
 
+# ── Daily rollups (analytics_daily_rollups, migration 072) ─────────────────
+#
+# The dashboard endpoints read pre-aggregated per-day buckets instead of
+# re-fetching posts on every load, so load time tracks accounts × days
+# rather than post count and no history is truncated. Bulk writes
+# (upsert_posts and the delete/prune paths) rebuild each touched account
+# slice (user, platform, username) with `refresh_account_rollups`; inside
+# `deferred_rollups()` each slice is rebuilt once at the end of the block.
+# A single-post metric patch only applies that post's old → new bucket
+# difference (`apply_rollup_deltas`, migration 076). The dashboard's
+# consistency check (`repair_user_rollups`) runs on the analytics work
+# scheduler, off the request path. Until the migration is applied every
+# reader falls back to the legacy row-scan helpers above.
+
+_ROLLUP_TABLE = "analytics_daily_rollups"
+_ROLLUP_SOURCES = ("internal", "external")
+_ROLLUP_MEDIA_TYPES = ("video", "image", "carousel")
+_ROLLUP_POST_COLUMNS = (
+    "id,user_id,platform,username,source,media_type,social_post_id,"
+    "views,likes,comments,shares,saves,total_engagement,impressions,reach,"
+    "posted_at,added_at,scraped_at,post_url,external_post_id,raw_payload"
+)
+_ROLLUP_PAGE_SIZE = 1000
+
+_rollups_verified: set[str] = set()
+_rollup_delta_rpc = True  # flips off when migration 076 is missing
+_TWIN_CODE_RE = re.compile(r"^[\w-]+$")
+# Slices touched inside `deferred_rollups()`; None outside such a block.
+_deferred_rollup_slices: ContextVar[Optional[set[tuple[str, str, str]]]] = ContextVar(
+    "deferred_rollup_slices", default=None,
+)
+
+
+def _rollup_table_missing(exc: Exception) -> bool:
+    text = str(exc).lower()
+    return _ROLLUP_TABLE in text and (
+        "does not exist" in text or "not find" in text or "42p01" in text
+        or "pgrst205" in text or "could not find the table" in text
+    )
+
+
+def _rollup_media_type(post: dict) -> str:
+    mt = (post.get("media_type") or "video").lower()
+    return mt if mt in _ROLLUP_MEDIA_TYPES else "other"
+
+
+def _rollup_buckets(rows: list[dict]) -> dict[tuple[str, str], dict]:
+    """{(day, media_type): {posts, views, engagement, reach}} over ``rows``."""
+    buckets: dict[tuple[str, str], dict] = {}
+    for r in rows:
+        day = _bucket_key(r)
+        if not day:
+            continue
+        b = buckets.setdefault(
+            (day, _rollup_media_type(r)),
+            {"posts": 0, "views": 0, "engagement": 0, "reach": 0},
+        )
+        b["posts"] += 1
+        b["views"] += int(r.get("views") or 0)
+        b["engagement"] += post_engagement(r)
+        b["reach"] += int(r.get("impressions") or r.get("reach") or 0)
+    return buckets
+
+
+def _rollup_slice_buckets(rows: list[dict]) -> dict[tuple[str, str, str], dict]:
+    """{(source, media_type, day): bucket} for the rows of one account slice,
+    including the twin-deduplicated 'all' dimension. ``rows`` in id order."""
+    out: dict[tuple[str, str, str], dict] = {}
+    for src in _ROLLUP_SOURCES:
+        src_rows = [r for r in rows if (r.get("source") or "") == src]
+        for (day, media_type), b in _rollup_buckets(src_rows).items():
+            out[(src, media_type, day)] = b
+    for (day, media_type), b in _rollup_buckets(dedupe_physical_posts(rows)).items():
+        out[("all", media_type, day)] = b
+    return out
+
+
+def _fetch_account_posts_for_rollup(user_id: str, platform: str, username: str) -> list[dict]:
+    """Every post in one account slice, paginated (no row cap)."""
+    sb = get_supabase()
+    rows: list[dict] = []
+    offset = 0
+    while True:
+        page = (
+            sb.table("analytics_posts")
+            .select(_ROLLUP_POST_COLUMNS)
+            .eq("user_id", user_id)
+            .eq("platform", platform)
+            .eq("username", username)
+            .order("id")
+            .range(offset, offset + _ROLLUP_PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        rows.extend(page)
+        if len(page) < _ROLLUP_PAGE_SIZE:
+            return rows
+        offset += _ROLLUP_PAGE_SIZE
+
+
+def refresh_account_rollups(user_id: str, platform: str, username: str) -> int:
+    """Rebuild the daily rollup rows for one account slice. Returns buckets written.
+
+    Best-effort — a failure is logged and leaves the previous buckets in
+    place; the next write to the slice (or `rebuild_user_rollups`) repairs it.
+    """
+    plat, nick = _normalize_account_slug(platform, username)
+    if not user_id or not plat or not nick:
+        return 0
+    sb = get_supabase()
+    try:
+        posts = _fetch_account_posts_for_rollup(user_id, plat, nick)
+        now = _now()
+        payload = [
+            {
+                "user_id": user_id, "platform": plat, "username": nick,
+                "source": src, "media_type": media_type, "day": day,
+                **b, "updated_at": now,
+            }
+            for (src, media_type, day), b in _rollup_slice_buckets(posts).items()
+        ]
+        if payload:
+            sb.table(_ROLLUP_TABLE).upsert(
+                payload, on_conflict="user_id,platform,username,source,media_type,day",
+            ).execute()
+
+        # Drop buckets that no longer have posts (deleted / re-dated rows).
+        live = {(r["source"], r["media_type"], r["day"]) for r in payload}
+        existing = (
+            sb.table(_ROLLUP_TABLE)
+            .select("id,source,media_type,day")
+            .eq("user_id", user_id)
+            .eq("platform", plat)
+            .eq("username", nick)
+            .execute()
+        ).data or []
+        stale = [
+            r["id"] for r in existing
+            if (r.get("source"), r.get("media_type"), str(r.get("day"))[:10]) not in live
+        ]
+        if stale:
+            sb.table(_ROLLUP_TABLE).delete().in_("id", stale).execute()
+        return len(payload)
+    except Exception as exc:
+        if not _rollup_table_missing(exc):
+            logger.warning("[analytics] rollup refresh failed for %s %s/%s: %s", user_id, plat, nick, exc)
+        return 0
+
+
+def refresh_rollups_for_rows(rows: Iterable[dict]) -> None:
+    """Refresh every account slice touched by ``rows`` (needs user_id/platform/username).
+
+    Inside ``deferred_rollups()`` the slices are only recorded.
+    """
+    slices = {
+        (str(r.get("user_id")), *_normalize_account_slug(str(r.get("platform") or ""), str(r.get("username") or "")))
+        for r in rows
+        if r.get("user_id")
+    }
+    slices = {sl for sl in slices if sl[1] and sl[2]}
+    pending = _deferred_rollup_slices.get()
+    if pending is not None:
+        pending.update(slices)
+        return
+    for user_id, plat, nick in slices:
+        refresh_account_rollups(user_id, plat, nick)
+
+
+@contextmanager
+def deferred_rollups():
+    """Batch rollup refreshes: every slice touched inside the block is
+    rebuilt once when it exits. Nested blocks defer to the outermost one."""
+    if _deferred_rollup_slices.get() is not None:
+        yield
+        return
+    pending: set[tuple[str, str, str]] = set()
+    token = _deferred_rollup_slices.set(pending)
+    try:
+        yield
+    finally:
+        _deferred_rollup_slices.reset(token)
+        for user_id, plat, nick in pending:
+            refresh_account_rollups(user_id, plat, nick)
+
+
+def _fetch_rollup_post(post_id: str) -> Optional[dict]:
+    rows = (
+        get_supabase().table("analytics_posts")
+        .select(_ROLLUP_POST_COLUMNS)
+        .eq("id", post_id)
+        .limit(1)
+        .execute()
+    ).data or []
+    return rows[0] if rows else None
+
+
+def _fetch_twin_rows(post: dict, plat: str, nick: str, key: str) -> Optional[list[dict]]:
+    """Other rows of the post's slice sharing twin identity ``key``, or None
+    when the identity can't be matched safely in a filter."""
+    code = key.split(":", 1)[1]
+    if not _TWIN_CODE_RE.match(code):
+        return None
+    rows = (
+        get_supabase().table("analytics_posts")
+        .select(_ROLLUP_POST_COLUMNS)
+        .eq("user_id", post["user_id"])
+        .eq("platform", plat)
+        .eq("username", nick)
+        .neq("id", post["id"])
+        .or_(
+            f"external_post_id.ilike.{code},post_url.ilike.*{code}*,"
+            f"raw_payload->>permalink.ilike.*{code}*"
+        )
+        .execute()
+    ).data or []
+    return [r for r in rows if _post_twin_key(r) == key]
+
+
+def _apply_post_rollup_delta(old: dict, new: dict) -> bool:
+    """Move one post's contribution in its slice's buckets from ``old`` to
+    ``new`` (the row before / after a patch).
+
+    The 'all' dimension collapses twins, so the post's twin rows (under its
+    old and new identity) are re-bucketed alongside it. Returns False when
+    the delta can't be applied and the caller should rebuild the slice.
+    """
+    global _rollup_delta_rpc
+    plat, nick = _normalize_account_slug(str(new.get("platform") or ""), str(new.get("username") or ""))
+    if not _rollup_delta_rpc or not new.get("user_id") or not plat or not nick:
+        return False
+
+    twins: dict[str, dict] = {}
+    for key in {_post_twin_key(old), _post_twin_key(new)} - {None}:
+        rows = _fetch_twin_rows(new, plat, nick, key)
+        if rows is None:
+            return False
+        twins.update((r["id"], r) for r in rows)
+    others = list(twins.values())
+
+    def _by_id(rows: list[dict]) -> list[dict]:
+        return sorted(rows, key=lambda r: str(r.get("id") or ""))
+
+    before = _rollup_slice_buckets(_by_id(others + [old]))
+    after = _rollup_slice_buckets(_by_id(others + [new]))
+    deltas = []
+    for src, media_type, day in set(before) | set(after):
+        b = before.get((src, media_type, day), {})
+        a = after.get((src, media_type, day), {})
+        diff = {k: int(a.get(k, 0)) - int(b.get(k, 0)) for k in ("posts", "views", "engagement", "reach")}
+        if any(diff.values()):
+            deltas.append({
+                "user_id": new["user_id"], "platform": plat, "username": nick,
+                "source": src, "media_type": media_type, "day": day, **diff,
+            })
+    if not deltas:
+        return True
+    try:
+        get_supabase().rpc("apply_rollup_deltas", {"p_deltas": deltas}).execute()
+    except Exception as exc:
+        text = str(exc).lower()
+        if "apply_rollup_deltas" in text and ("pgrst202" in text or "could not find the function" in text):
+            logger.warning("[analytics] apply_rollup_deltas missing — apply migration 076; rebuilding slices instead")
+            _rollup_delta_rpc = False
+            return False
+        raise
+    return True
+
+
+def rebuild_user_rollups(user_id: str) -> int:
+    """Rebuild rollups for every account slice the user has posts (or buckets) in."""
+    sb = get_supabase()
+    slugs: set[tuple[str, str]] = set()
+    offset = 0
+    while True:
+        page = (
+            sb.table("analytics_posts")
+            .select("id,platform,username")
+            .eq("user_id", user_id)
+            .order("id")
+            .range(offset, offset + _ROLLUP_PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        for r in page:
+            slug = _normalize_account_slug(str(r.get("platform") or ""), str(r.get("username") or ""))
+            if all(slug):
+                slugs.add(slug)
+        if len(page) < _ROLLUP_PAGE_SIZE:
+            break
+        offset += _ROLLUP_PAGE_SIZE
+    # Slices that still have buckets but no posts left need clearing too.
+    try:
+        existing = (
+            sb.table(_ROLLUP_TABLE)
+            .select("platform,username")
+            .eq("user_id", user_id)
+            .eq("source", "all")
+            .execute()
+        ).data or []
+    except Exception as exc:
+        if _rollup_table_missing(exc):
+            return 0
+        existing = []
+    for r in existing:
+        slugs.add(_normalize_account_slug(str(r.get("platform") or ""), str(r.get("username") or "")))
+    return sum(refresh_account_rollups(user_id, plat, nick) for plat, nick in slugs if plat and nick)
+
+
+def repair_user_rollups(user_id: str) -> int:
+    """Rebuild only the user's slices whose per-source bucket post counts
+    disagree with their posts (missing, partial or orphaned buckets).
+    Returns the number of slices rebuilt."""
+    sb = get_supabase()
+    expected: dict[tuple[str, str, str], int] = {}
+    dated: set[tuple[str, str]] = set()  # slices with at least one bucketable post
+    offset = 0
+    while True:
+        page = (
+            sb.table("analytics_posts")
+            .select("id,platform,username,source,posted_at,added_at,scraped_at")
+            .eq("user_id", user_id)
+            .order("id")
+            .range(offset, offset + _ROLLUP_PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        for r in page:
+            plat, nick = _normalize_account_slug(str(r.get("platform") or ""), str(r.get("username") or ""))
+            if not (plat and nick):
+                continue
+            if not _bucket_key(r):
+                continue
+            dated.add((plat, nick))
+            key = (plat, nick, r.get("source") or "")
+            expected[key] = expected.get(key, 0) + 1
+        if len(page) < _ROLLUP_PAGE_SIZE:
+            break
+        offset += _ROLLUP_PAGE_SIZE
+
+    actual: dict[tuple[str, str, str], int] = {}
+    offset = 0
+    while True:
+        page = (
+            sb.table(_ROLLUP_TABLE)
+            .select("platform,username,source,posts")
+            .eq("user_id", user_id)
+            .order("id")
+            .range(offset, offset + _ROLLUP_PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        for r in page:
+            key = (str(r.get("platform") or ""), str(r.get("username") or ""), r.get("source") or "")
+            actual[key] = actual.get(key, 0) + int(r.get("posts") or 0)
+        if len(page) < _ROLLUP_PAGE_SIZE:
+            break
+        offset += _ROLLUP_PAGE_SIZE
+
+    slugs = dated | {(plat, nick) for plat, nick, _ in actual}
+    stale = {
+        (plat, nick) for plat, nick in slugs
+        if ((plat, nick) in dated) != ((plat, nick, "all") in actual)
+        or any(
+            expected.get((plat, nick, src), 0) != actual.get((plat, nick, src), 0)
+            for src in _ROLLUP_SOURCES
+        )
+    }
+    for plat, nick in stale:
+        refresh_account_rollups(user_id, plat, nick)
+    if stale:
+        logger.info("[analytics] repaired rollups for %s: %d slice(s)", user_id, len(stale))
+    return len(stale)
+
+
+def _fetch_dashboard_rollups(
+    user_id: str,
+    *,
+    platform: Optional[str] = None,
+    source: Optional[str] = None,
+    username: Optional[str] = None,
+) -> Optional[list[dict]]:
+    """Rollup buckets matching the dashboard filters, or None when the rollup
+    table isn't available (callers fall back to the row-scan path).
+
+    Mirrors ``_fetch_dashboard_posts`` scoping: account queries read one
+    slice; otherwise buckets are limited to actively tracked accounts.
+    """
+    sb = get_supabase()
+    dim = source if source and source != "all" else "all"
+
+    def _query():
+        out: list[dict] = []
+        offset = 0
+        while True:
+            q = (
+                sb.table(_ROLLUP_TABLE)
+                .select("platform,username,media_type,day,posts,views,engagement,reach")
+                .eq("user_id", user_id)
+                .eq("source", dim)
+            )
+            if platform and platform != "all":
+                q = q.eq("platform", platform.strip().lower())
+            if username:
+                q = q.eq("username", username.strip().lower().lstrip("@"))
+            page = q.order("id").range(offset, offset + _ROLLUP_PAGE_SIZE - 1).execute().data or []
+            out.extend(page)
+            if len(page) < _ROLLUP_PAGE_SIZE:
+                return out
+            offset += _ROLLUP_PAGE_SIZE
+
+    if user_id not in _rollups_verified:
+        # First read in this process: repair slices whose buckets are missing
+        # or out of step with their posts, in the background — it scans all
+        # of the user's posts. This read serves the buckets as they are.
+        from .work_scheduler import RESOURCE_NETWORK, REJECTED, scheduler
+
+        def _repair():
+            try:
+                repair_user_rollups(user_id)
+            except Exception as exc:
+                if not _rollup_table_missing(exc):
+                    raise
+
+        if scheduler.submit(RESOURCE_NETWORK, "rollup_repair", user_id, _repair) != REJECTED:
+            _rollups_verified.add(user_id)
+    try:
+        buckets = _query()
+    except Exception as exc:
+        if not _rollup_table_missing(exc):
+            logger.warning("[analytics] rollup read failed for %s: %s", user_id, exc)
+        return None
+
+    if not (username and platform and platform != "all"):
+        tracked = active_tracked_slugs(user_id)
+        buckets = [
+            b for b in buckets
+            if _normalize_account_slug(str(b.get("platform") or ""), str(b.get("username") or "")) in tracked
+        ]
+    for b in buckets:
+        b["day"] = str(b.get("day") or "")[:10]
+    return buckets
+
+
+def _period_buckets(buckets: list[dict], period_days: Optional[int]) -> list[dict]:
+    """Rollup equivalent of ``_filter_posts_by_period``."""
+    if not period_days or period_days <= 0:
+        return buckets
+    cutoff = (datetime.now(timezone.utc).date() - timedelta(days=int(period_days) - 1)).isoformat()
+    return [b for b in buckets if b["day"] >= cutoff]
+
+
+def _rate_from_totals(views: int, engagement: int, posts: int, reach: int,
+                      follower_count: Optional[int] = None) -> float:
+    """``period_engagement_rate`` over pre-summed totals."""
+    if not posts:
+        return 0.0
+    if views > 0:
+        return round(engagement / views * 100.0, 2)
+    fc = int(follower_count or 0)
+    if fc > 0:
+        return round((engagement / posts) / fc * 100.0, 2)
+    if reach > 0:
+        return round(engagement / reach * 100.0, 2)
+    return 0.0
+
+
+def _sum_buckets(buckets: list[dict]) -> tuple[int, int, int, int]:
+    return (
+        sum(int(b.get("views") or 0) for b in buckets),
+        sum(int(b.get("engagement") or 0) for b in buckets),
+        sum(int(b.get("posts") or 0) for b in buckets),
+        sum(int(b.get("reach") or 0) for b in buckets),
+    )
+
+
+def stats_from_rollups(
+    user_id: str,
+    period_buckets: list[dict],
+    all_buckets: list[dict],
+    *,
+    platform: Optional[str] = None,
+    username: Optional[str] = None,
+) -> dict:
+    """KPI strip aggregates from rollup buckets (see ``stats_from_rows``)."""
+    views, eng, posts, reach = _sum_buckets(period_buckets)
+    fc = None
+    if username and platform and platform != "all":
+        acct = get_tracked_account_by_slug(user_id, platform=platform, username=username)
+        fc = (acct or {}).get("follower_count") or (acct or {}).get("followers")
+    return {
+        "total_views": views,
+        "total_engagement": eng,
+        "avg_engagement_rate": _rate_from_totals(views, eng, posts, reach, fc),
+        "posts_tracked": posts,
+        "posts_total": sum(int(b.get("posts") or 0) for b in all_buckets),
+    }
+
+
+def stats_extras_from_rollups(
+    period_buckets: list[dict],
+    all_buckets: list[dict],
+    *,
+    period_days: Optional[int] = None,
+) -> dict:
+    """Sparklines + deltas from rollup buckets (see ``stats_extras_from_rows``)."""
+    span = max(int(period_days or 30), 1)
+    today = datetime.now(timezone.utc).date()
+    spark_len = 2 * span
+    spark_index = {
+        (today - timedelta(days=spark_len - 1 - i)).isoformat(): i
+        for i in range(spark_len)
+    }
+    daily_views = [0] * spark_len
+    daily_eng = [0] * spark_len
+    daily_posts = [0] * spark_len
+    for b in all_buckets:
+        idx = spark_index.get(b["day"])
+        if idx is None:
+            continue
+        daily_views[idx] += int(b.get("views") or 0)
+        daily_eng[idx] += int(b.get("engagement") or 0)
+        daily_posts[idx] += int(b.get("posts") or 0)
+
+    daily_engagement_rate = [
+        round(e / v * 100.0, 2) if v > 0 else 0.0
+        for v, e in zip(daily_views, daily_eng)
+    ]
+
+    delta_views = 0.0
+    delta_eng = 0.0
+    delta_posts = 0.0
+    if period_days:
+        prev_start = (today - timedelta(days=2 * span - 1)).isoformat()
+        prev_end = (today - timedelta(days=span)).isoformat()
+        prev_buckets = [b for b in all_buckets if prev_start <= b["day"] <= prev_end]
+        curr = _sum_buckets(period_buckets)
+        prev = _sum_buckets(prev_buckets)
+        if prev[0]:
+            delta_views = round((curr[0] - prev[0]) / prev[0] * 100.0, 1)
+        curr_rate = _rate_from_totals(*curr)
+        prev_rate = _rate_from_totals(*prev)
+        if prev_rate:
+            delta_eng = round((curr_rate - prev_rate) / prev_rate * 100.0, 1)
+        if prev[2]:
+            delta_posts = round((curr[2] - prev[2]) / prev[2] * 100.0, 1)
+
+    return {
+        "daily_views": daily_views,
+        "daily_engagement": daily_eng,
+        "daily_engagement_rate": daily_engagement_rate,
+        "daily_posts": daily_posts,
+        "views_delta_pct": delta_views,
+        "engagement_delta_pct": delta_eng,
+        "posts_delta_pct": delta_posts,
+    }
+
+
+def stats_distribution_from_rollups(period_buckets: list[dict]) -> dict:
+    """Platform + media-type buckets from rollups (see ``stats_distribution_from_rows``)."""
+    platform_buckets: dict[str, dict[str, int]] = {}
+    media_buckets: dict[str, dict[str, int]] = {}
+    for b in period_buckets:
+        plat = (b.get("platform") or "unknown").lower()
+        pb = platform_buckets.setdefault(plat, {"value": 0, "posts": 0})
+        pb["value"] += int(b.get("views") or 0)
+        pb["posts"] += int(b.get("posts") or 0)
+        mb = media_buckets.setdefault(b.get("media_type") or "other", {"value": 0, "posts": 0})
+        mb["value"] += int(b.get("engagement") or 0)
+        mb["posts"] += int(b.get("posts") or 0)
+    return {
+        "platform_distribution": sorted(
+            [{"key": k, **v} for k, v in platform_buckets.items()],
+            key=lambda x: x["value"], reverse=True,
+        ),
+        "content_type_distribution": sorted(
+            [{"key": k, **v} for k, v in media_buckets.items()],
+            key=lambda x: x["posts"], reverse=True,
+        ),
+        "platforms": {k: v["value"] for k, v in platform_buckets.items()},
+        "media_types": {k: v["posts"] for k, v in media_buckets.items()},
+    }
+
+
+def stats_cumulative_from_rollups(all_buckets: list[dict], *, period_days: Optional[int] = None) -> dict:
+    """Cumulative growth series from rollups (see ``stats_cumulative``)."""
+    span = max(int(period_days or 30), 1)
+    today = datetime.now(timezone.utc).date()
+    cutoff = (today - timedelta(days=span - 1)).isoformat()
+
+    daily: dict[str, list[int]] = {}
+    seed = [0, 0, 0]
+    for b in all_buckets:
+        vals = (int(b.get("views") or 0), int(b.get("engagement") or 0), int(b.get("posts") or 0))
+        slot = seed if b["day"] < cutoff else daily.setdefault(b["day"], [0, 0, 0])
+        for i, v in enumerate(vals):
+            slot[i] += v
+
+    points: list[dict] = []
+    cum_v, cum_e, cum_p = seed
+    for offset in range(span - 1, -1, -1):
+        d = (today - timedelta(days=offset)).isoformat()
+        v, e, p = daily.get(d) or (0, 0, 0)
+        cum_v += v
+        cum_e += e
+        cum_p += p
+        points.append({
+            "date": d,
+            "cumulative_views": cum_v,
+            "cumulative_engagement": cum_e,
+            "cumulative_posts": cum_p,
+            "views": cum_v,
+            "engagement": cum_e,
+            "posts": cum_p,
+        })
+    return {
+        "points": points,
+        "total_views": cum_v,
+        "total_engagement": cum_e,
+        "total_posts": cum_p,
+    }
+
+
+def dashboard_stats(
+    user_id: str,
+    *,
+    period_days: Optional[int] = None,
+    platform: Optional[str] = None,
+    source: Optional[str] = None,
+    username: Optional[str] = None,
+) -> dict:
+    """KPI strip + sparklines/deltas + distributions in one read.
+
+    Served from rollups; falls back to one shared row scan when the rollup
+    table isn't available. Returns ``{"base", "extras", "distribution"}``.
+    """
+    buckets = _fetch_dashboard_rollups(user_id, platform=platform, source=source, username=username)
+    if buckets is not None:
+        period_buckets = _period_buckets(buckets, period_days)
+        return {
+            "base": stats_from_rollups(
+                user_id, period_buckets, buckets, platform=platform, username=username,
+            ),
+            "extras": stats_extras_from_rollups(period_buckets, buckets, period_days=period_days),
+            "distribution": stats_distribution_from_rollups(period_buckets),
+        }
+    period_rows, all_rows = _fetch_dashboard_posts(
+        user_id,
+        period_days=period_days,
+        platform=platform,
+        source=source,
+        username=username,
+        limit=500,
+    )
+    return {
+        "base": stats_from_rows(
+            user_id, period_rows, all_rows,
+            platform=platform, source=source, username=username,
+        ),
+        "extras": stats_extras_from_rows(period_rows, all_rows, period_days=period_days),
+        "distribution": stats_distribution_from_rows(period_rows),
+    }
+
+
 # ── analytics_scrape_jobs ───────────────────────────────────────────────────
 
 def create_scrape_job(
@@ -1433,6 +2133,7 @@ def delete_post(user_id: str, post_id: str) -> bool:
         .eq("id", post_id)
         .execute()
     )
+    refresh_rollups_for_rows(res.data or [])
     return bool(res.data)
 
 
@@ -1549,6 +2250,7 @@ def prune_account_posts_to_top_n(
     if not delete_ids:
         return 0
     sb.table("analytics_posts").delete().in_("id", delete_ids).execute()
+    refresh_account_rollups(user_id, platform, username)
     return len(delete_ids)
 
 
@@ -2036,6 +2738,7 @@ def purge_internal_off_connected_platforms(
     if not delete_ids:
         return 0
     sb.table("analytics_posts").delete().in_("id", delete_ids).execute()
+    rebuild_user_rollups(user_id)
     return len(delete_ids)
 
 
@@ -2071,6 +2774,7 @@ def purge_external_for_studio_linked_accounts(user_id: str) -> int:
         ids = [row["id"] for row in (res.data or []) if row.get("id")]
         if ids:
             sb.table("analytics_posts").delete().in_("id", ids).execute()
+            refresh_account_rollups(user_id, plat, user)
             deleted += len(ids)
     return deleted
 
@@ -1,8 +1,9 @@
 """Background job runners for the Analytics module.
 
 Analytics jobs are short and bursty — they don't need the Modal/Celery
-plumbing used by video generation. We default to in-process daemon threads
-and persist status transitions to ``analytics_scrape_jobs`` /
+plumbing used by video generation. They run in-process on the bounded
+per-resource pools of ``work_scheduler`` (LLM / ffmpeg / network) and persist
+status transitions to ``analytics_scrape_jobs`` /
 ``analytics_video_breakdowns`` so the frontend can poll for completion.
 
 If you ever need to scale, swap in the global ``_dispatch_worker`` from
@@ -13,21 +14,41 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import threading
 from datetime import datetime, timezone
 from typing import Optional
 
 from . import db as analytics_db
 from . import scraper_service
 from . import vision_service
+from .work_scheduler import (
+    DUPLICATE,
+    REJECTED,
+    RESOURCE_LLM,
+    RESOURCE_NETWORK,
+    scheduler,
+)
 
 logger = logging.getLogger(__name__)
 
 
+_BUSY_MESSAGE = "The analysis queue is busy — try again in a minute."
+
+
 def _iso_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _fail_scrape_job_busy(job_id: str) -> None:
+    analytics_db.update_scrape_job(
+        job_id,
+        {
+            "status": "failed",
+            "error_message": _BUSY_MESSAGE,
+            "completed_at": _iso_now(),
+        },
+    )
+
+
 def run_breakdown_in_background(
     *,
     breakdown_id: str,
@@ -35,10 +56,12 @@ def run_breakdown_in_background(
     video_url: str,
     metrics: Optional[dict] = None,
     locale: str = "en",
+    use_cache: bool = True,
 ) -> None:
-    """Spawn a daemon thread that runs the two-pass vision pipeline and
-    persists the result. Idempotent at the DB layer — re-running on the same
-    breakdown_id overwrites the row.
+    """Queue the two-pass vision pipeline on the LLM pool and persist the
+    result. Idempotent at the DB layer — re-running on the same breakdown_id
+    overwrites the row — and deduped while a run for it is queued or running.
+    ``use_cache=False`` skips the shared Pass 1 cache (explicit re-analysis).
     """
     from . import locale_content
 
@@ -51,6 +74,8 @@ def run_breakdown_in_background(
                 video_url=video_url,
                 metrics=metrics or {},
                 locale=output_locale,
+                use_cache=use_cache,
+                user_id=user_id,
             )
             updates = result.as_db_updates()
             updates["output_locale"] = output_locale
@@ -72,10 +97,15 @@ def run_breakdown_in_background(
                 },
             )
 
-    thread = threading.Thread(
-        target=_runner, daemon=True, name=f"analytics-breakdown-{breakdown_id[:8]}"
-    )
-    thread.start()
+    if scheduler.submit(RESOURCE_LLM, "breakdown", breakdown_id, _runner) == REJECTED:
+        analytics_db.update_breakdown(
+            breakdown_id,
+            {
+                "status": "failed",
+                "error_message": _BUSY_MESSAGE,
+                "completed_at": _iso_now(),
+            },
+        )
 
 
 def run_linked_account_analyze_in_background(
@@ -127,11 +157,7 @@ def run_linked_account_analyze_in_background(
                 exc,
             )
 
-    threading.Thread(
-        target=_runner,
-        daemon=True,
-        name=f"analytics-linked-{platform}-{username[:8]}",
-    ).start()
+    scheduler.submit(RESOURCE_NETWORK, "linked_analyze", f"{user_id}:{platform}:{username}", _runner)
 
 
 def run_account_refresh_in_background(
@@ -168,11 +194,20 @@ def run_account_refresh_in_background(
                 },
             )
 
-    threading.Thread(
-        target=_runner,
-        daemon=True,
-        name=f"analytics-account-refresh-{job_id[:8]}",
-    ).start()
+    outcome = scheduler.submit(RESOURCE_NETWORK, "account_refresh", account_id, _runner)
+    if outcome == REJECTED:
+        _fail_scrape_job_busy(job_id)
+    elif outcome == DUPLICATE:
+        # Another job already owns this account's refresh; don't leave this
+        # row stuck on 'running'.
+        analytics_db.update_scrape_job(
+            job_id,
+            {
+                "status": "failed",
+                "error_message": "A refresh for this account is already running.",
+                "completed_at": _iso_now(),
+            },
+        )
 
 
 def run_scrape_resume_in_background(
@@ -226,8 +261,5 @@ def run_scrape_resume_in_background(
                 },
             )
 
-    threading.Thread(
-        target=_runner,
-        daemon=True,
-        name=f"analytics-scrape-resume-{job_id[:8]}",
-    ).start()
+    if scheduler.submit(RESOURCE_NETWORK, "scrape_resume", job_id, _runner) == REJECTED:
+        _fail_scrape_job_busy(job_id)
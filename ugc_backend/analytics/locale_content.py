@@ -13,6 +13,8 @@ from fastapi import Request
 
 from ugc_db.db_manager import get_supabase
 
+from . import rate_limits
+
 logger = logging.getLogger(__name__)
 
 SUPPORTED_LOCALES = frozenset({"en", "es"})
@@ -112,6 +114,7 @@ def _translate_breakdown_payload(payload: dict, target_locale: str) -> dict:
         "Do not translate timestamps like 00:03 or MM:SS values.\n\n"
         f"{json.dumps(payload, ensure_ascii=False)}"
     )
+    rate_limits.acquire(rate_limits.OPENAI)
     response = client.chat.completions.create(
         model=_TRANSLATE_MODEL,
         messages=[
@@ -140,6 +143,7 @@ def _translate_markdown(text: str, target_locale: str) -> str:
     client = _get_llm_client()
     target = normalize_locale(target_locale)
     lang_name = "Spanish" if target == "es" else "English"
+    rate_limits.acquire(rate_limits.OPENAI)
     response = client.chat.completions.create(
         model=_TRANSLATE_MODEL,
         messages=[
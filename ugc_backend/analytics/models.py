@@ -412,7 +412,7 @@ class EnsureThumbnailsResponse(BaseModel):
     pending: int = Field(
         default=0,
         ge=0,
-        description="Posts queued for slow background mirroring.",
+        description="Posts still extracting or queued for slow background mirroring.",
     )
 
 
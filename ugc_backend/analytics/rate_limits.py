@@ -0,0 +1,126 @@
+"""Per-provider token buckets for the Analytics module's outbound calls.
+
+The nightly sweep now runs several users at once (see
+``studio_service.run_nightly_analytics_sweep``), so the old fixed stagger
+between users no longer bounds how hard we hit Ayrshare, BrightData, Gemini
+and OpenAI. Every call site for those providers acquires a token from the
+shared, process-wide bucket first; when the bucket is empty the caller waits
+(``acquire`` blocks the thread, ``acquire_async`` yields the event loop).
+
+Buckets refill continuously at ``<rate>/minute`` and hold up to ``burst``
+tokens. Wait time per provider is tracked so sweep summaries can show where
+the time went.
+
+Media CDNs get buckets too (``cdn_*``): poster-frame reads from
+``remote_frames`` are budgeted per CDN so healing a large account's
+thumbnails can't trip a platform's hot-link limits.
+
+Config (per provider — AYRSHARE, BRIGHTDATA, GEMINI, OPENAI, CDN_INSTAGRAM,
+CDN_TIKTOK, CDN_STORAGE, CDN_OTHER):
+  ANALYTICS_RATE_<PROVIDER>_PER_MIN   sustained requests per minute
+  ANALYTICS_RATE_<PROVIDER>_BURST     bucket size (default: 1/6 of a minute)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+
+AYRSHARE = "ayrshare"
+BRIGHTDATA = "brightdata"
+GEMINI = "gemini"
+OPENAI = "openai"
+CDN_INSTAGRAM = "cdn_instagram"
+CDN_TIKTOK = "cdn_tiktok"
+CDN_STORAGE = "cdn_storage"
+CDN_OTHER = "cdn_other"
+
+_DEFAULT_PER_MIN = {
+    AYRSHARE: 120,
+    BRIGHTDATA: 60,
+    GEMINI: 30,
+    OPENAI: 120,
+    CDN_INSTAGRAM: 300,
+    CDN_TIKTOK: 300,
+    CDN_STORAGE: 1200,
+    CDN_OTHER: 120,
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``reserve`` returns how long to wait."""
+
+    def __init__(self, per_minute: float, burst: float):
+        self.rate = max(per_minute, 1e-6) / 60.0
+        self.capacity = max(burst, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def reserve(self) -> float:
+        """Take one token (possibly going into debt) and return the delay the
+        caller must sleep before using it. Debt keeps waiters FIFO-fair."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            self.acquired += 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited_seconds += delay
+            return delay
+
+
+_BUCKETS: dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def bucket(provider: str) -> TokenBucket:
+    with _BUCKETS_LOCK:
+        b = _BUCKETS.get(provider)
+        if b is None:
+            prefix = f"ANALYTICS_RATE_{provider.upper()}"
+            per_min = _env_float(f"{prefix}_PER_MIN", _DEFAULT_PER_MIN.get(provider, 60))
+            burst = _env_float(f"{prefix}_BURST", max(1.0, per_min / 6))
+            b = _BUCKETS[provider] = TokenBucket(per_min, burst)
+        return b
+
+
+def acquire(provider: str) -> None:
+    """Block the calling thread until a ``provider`` request may go out."""
+    delay = bucket(provider).reserve()
+    if delay > 0:
+        time.sleep(delay)
+
+
+async def acquire_async(provider: str) -> None:
+    """Async variant of :func:`acquire` — waits without blocking the loop."""
+    delay = bucket(provider).reserve()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def stats() -> dict:
+    """Requests admitted and total throttle wait per provider."""
+    with _BUCKETS_LOCK:
+        items = list(_BUCKETS.items())
+    return {
+        name: {
+            "per_minute": round(b.rate * 60, 2),
+            "burst": b.capacity,
+            "acquired": b.acquired,
+            "waited_seconds": round(b.waited_seconds, 2),
+        }
+        for name, b in sorted(items)
+    }
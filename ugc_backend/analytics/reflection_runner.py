@@ -57,6 +57,7 @@ from pathlib import Path
 from typing import Optional
 
 from . import db as analytics_db
+from . import rate_limits
 from .ai_analyzer import MEMORY_PATH as STRATEGY_PATH, _get_llm_client
 
 logger = logging.getLogger(__name__)
@@ -1155,6 +1156,7 @@ def run_reflection_session(user_id: str) -> Optional[str]:
         user_prompt = _build_user_prompt(context, payload, today=today)
 
         client = _get_llm_client()
+        rate_limits.acquire(rate_limits.OPENAI)
         response = client.chat.completions.create(
             model=_reflection_model(),
             messages=[
@@ -0,0 +1,202 @@
+"""Seek-only poster extraction from remote videos.
+
+Card thumbnails only need one frame, but the old poster paths downloaded
+the whole video to a temp file first (``_download_video_to_temp``), and
+``ensure_post_thumbnails_sync`` did that post by post while the request
+waited. This module pulls only the bytes needed for one frame:
+
+1. **ffmpeg input seek** — ``-ss`` before ``-i`` on the URL. ffmpeg's HTTP
+   reader issues range requests for the ``moov`` index and the GOP around
+   the seek point, typically a few hundred KB.
+2. **Range prefix** — when the CDN rejects ffmpeg's reads (user agent,
+   connection reuse), fetch ``bytes=0-N`` with httpx and decode from that
+   partial file. Works for fast-start MP4s, which is what IG / TikTok and
+   our own Storage serve.
+
+Only when both fail does the caller fall back to a full mirror.
+
+Batches run on a bounded pool (``ANALYTICS_REMOTE_FRAME_WORKERS`` ffmpeg
+processes per API process, shared by concurrent requests). Every remote
+read first takes a token from the CDN's ``rate_limits`` bucket, so healing
+a 200-post account doesn't hammer one CDN.
+
+Config:
+  ANALYTICS_REMOTE_FRAME_WORKERS     concurrent extractions (default 8)
+  ANALYTICS_REMOTE_FRAME_TIMEOUT     seconds per ffmpeg attempt (default 20)
+  ANALYTICS_REMOTE_FRAME_RANGE_KB    prefix size for the range fallback (default 2048)
+  ANALYTICS_RATE_CDN_<HOST>_PER_MIN  per-CDN budget (INSTAGRAM, TIKTOK, STORAGE, OTHER)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from . import rate_limits
+
+logger = logging.getLogger(__name__)
+
+_WORKERS = max(1, int(os.getenv("ANALYTICS_REMOTE_FRAME_WORKERS", "8")))
+_TIMEOUT_SEC = float(os.getenv("ANALYTICS_REMOTE_FRAME_TIMEOUT", "20"))
+_RANGE_BYTES = int(os.getenv("ANALYTICS_REMOTE_FRAME_RANGE_KB", "2048")) * 1024
+_USER_AGENT = "Mozilla/5.0 (compatible; ugc-analytics/1.0)"
+
+# Caps concurrent ffmpeg processes across every batch in the process.
+_slots = threading.BoundedSemaphore(_WORKERS)
+_lock = threading.Lock()
+_stats = {"seek": 0, "range": 0, "failed": 0, "seconds": 0.0}
+
+
+def cdn_bucket(url: str) -> str:
+    """``rate_limits`` provider name for the host serving ``url``."""
+    host = (urlparse(url).hostname or "").lower()
+    if "cdninstagram" in host or "fbcdn" in host or "fbsbx" in host:
+        return rate_limits.CDN_INSTAGRAM
+    if "tiktok" in host:
+        return rate_limits.CDN_TIKTOK
+    if "supabase" in host:
+        return rate_limits.CDN_STORAGE
+    return rate_limits.CDN_OTHER
+
+
+def _count(key: str, seconds: float = 0.0) -> None:
+    with _lock:
+        _stats[key] += 1
+        _stats["seconds"] += seconds
+
+
+def _run_ffmpeg(binary: str, source: str, out_path: Path, seek: str, *, remote: bool) -> bool:
+    cmd = [binary, "-y", "-loglevel", "error"]
+    if remote:
+        # Fail fast on a stalled CDN instead of hanging the pool slot.
+        cmd += ["-rw_timeout", str(int(_TIMEOUT_SEC * 1_000_000)), "-user_agent", _USER_AGENT]
+    cmd += [
+        "-ss", seek,
+        "-i", source,
+        "-frames:v", "1",
+        "-q:v", "4",
+        str(out_path),
+    ]
+    try:
+        proc = subprocess.run(cmd, timeout=_TIMEOUT_SEC + 5, capture_output=True)
+    except (subprocess.TimeoutExpired, OSError):
+        return False
+    return proc.returncode == 0 and out_path.exists() and out_path.stat().st_size > 0
+
+
+def _fetch_prefix(video_url: str) -> Optional[Path]:
+    """First ``_RANGE_BYTES`` of the video in a temp file, or None."""
+    fd, raw_path = tempfile.mkstemp(prefix="analytics_prefix_", suffix=".mp4")
+    os.close(fd)
+    path = Path(raw_path)
+    try:
+        with httpx.stream(
+            "GET", video_url,
+            headers={"Range": f"bytes=0-{_RANGE_BYTES - 1}", "User-Agent": _USER_AGENT},
+            follow_redirects=True, timeout=_TIMEOUT_SEC,
+        ) as resp:
+            resp.raise_for_status()
+            written = 0
+            with open(path, "wb") as f:
+                # A server that ignores Range answers 200 with the whole
+                # file — stop reading once we have the prefix either way.
+                for chunk in resp.iter_bytes(chunk_size=64 * 1024):
+                    f.write(chunk)
+                    written += len(chunk)
+                    if written >= _RANGE_BYTES:
+                        break
+        if written == 0:
+            path.unlink(missing_ok=True)
+            return None
+        return path
+    except Exception:
+        path.unlink(missing_ok=True)
+        return None
+
+
+def extract_frame(video_url: str) -> Optional[Path]:
+    """One JPEG frame (~1s in, else the first) from a remote video.
+
+    Returns a temp file the caller must delete, or None. Blocks on the pool
+    slot and the CDN's rate-limit bucket.
+    """
+    from .scraper_service import _ffmpeg_binary
+
+    binary = _ffmpeg_binary()
+    if not binary or not video_url:
+        return None
+    fd, raw_path = tempfile.mkstemp(prefix="analytics_poster_", suffix=".jpg")
+    os.close(fd)
+    out_path = Path(raw_path)
+    started = time.monotonic()
+    with _slots:
+        try:
+            rate_limits.acquire(cdn_bucket(video_url))
+            for seek in ("1", "0"):
+                if _run_ffmpeg(binary, video_url, out_path, seek, remote=True):
+                    _count("seek", time.monotonic() - started)
+                    return out_path
+
+            rate_limits.acquire(cdn_bucket(video_url))
+            prefix = _fetch_prefix(video_url)
+            if prefix is not None:
+                try:
+                    for seek in ("1", "0"):
+                        if _run_ffmpeg(binary, str(prefix), out_path, seek, remote=False):
+                            _count("range", time.monotonic() - started)
+                            return out_path
+                finally:
+                    prefix.unlink(missing_ok=True)
+        except Exception as e:  # noqa: BLE001 — extraction is best-effort
+            logger.info("[remote_frames] %s failed: %s", video_url[:80], e)
+    _count("failed", time.monotonic() - started)
+    out_path.unlink(missing_ok=True)
+    return None
+
+
+def run_batch(
+    tasks: list[tuple[str, Callable[[], Any]]],
+    *,
+    deadline_sec: Optional[float] = None,
+) -> dict[str, Any]:
+    """Run ``(key, fn)`` tasks concurrently; return ``{key: fn()}``.
+
+    Keys still running at ``deadline_sec`` are left out of the result —
+    their tasks keep running in the background and should persist their own
+    outcome. A task that raises maps to None.
+    """
+    if not tasks:
+        return {}
+    pool = ThreadPoolExecutor(max_workers=min(_WORKERS, len(tasks)), thread_name_prefix="remote-frames")
+    futures = {pool.submit(fn): key for key, fn in tasks}
+    done, _ = wait(futures, timeout=deadline_sec)
+    pool.shutdown(wait=False)
+
+    results: dict[str, Any] = {}
+    for fut in done:
+        try:
+            results[futures[fut]] = fut.result()
+        except Exception as e:  # noqa: BLE001
+            logger.info("[remote_frames] task %s failed: %s", futures[fut], e)
+            results[futures[fut]] = None
+    return results
+
+
+def stats() -> dict:
+    """Extraction counts by method and mean latency (per process)."""
+    with _lock:
+        snapshot = dict(_stats)
+    total = snapshot["seek"] + snapshot["range"] + snapshot["failed"]
+    snapshot["mean_seconds"] = round(snapshot.pop("seconds") / total, 2) if total else None
+    snapshot["workers"] = _WORKERS
+    return snapshot
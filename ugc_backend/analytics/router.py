@@ -714,6 +714,8 @@ def api_analyze_video(
         video_url=video_url,
         metrics=metrics,
         locale=locale,
+        # Re-running a completed breakdown is an explicit "analyse again".
+        use_cache=not (existing and existing.get("status") == "completed"),
     )
     return AnalyzeVideoResponse(breakdown_id=breakdown["id"], status="pending")
 
@@ -1160,31 +1162,20 @@ def api_stats(
     the single ``StatsResponse`` shape consumed by the dashboard. Keeping
     the helpers separate respects the architecture guardrail to not mutate
     the legacy `stats()` contract while still letting the FE pull
-    everything in one round-trip.
+    everything in one round-trip. All three are served from the daily
+    rollups in one read (``analytics_db.dashboard_stats``).
     """
     import time as _time
     _t0 = _time.perf_counter()
     days = _period_days(period)
-    period_rows, all_rows = analytics_db._fetch_dashboard_posts(
+    composed = analytics_db.dashboard_stats(
         user["id"],
         period_days=days,
         platform=platform,
         source=source,
         username=username,
-        limit=500,
-    )
-    base = analytics_db.stats_from_rows(
-        user["id"],
-        period_rows,
-        all_rows,
-        platform=platform,
-        source=source,
-        username=username,
-    )
-    extras = analytics_db.stats_extras_from_rows(
-        period_rows, all_rows, period_days=days,
     )
-    dist = analytics_db.stats_distribution_from_rows(period_rows)
+    base, extras, dist = composed["base"], composed["extras"], composed["distribution"]
     # Received-in-window deltas (engagement gained during the period, incl. on
     # older posts). Best-effort — empty until snapshot history exists.
     try:
@@ -1196,7 +1187,7 @@ def api_stats(
     if _elapsed_ms > 1500:
         print(
             f"[analytics perf] GET /stats user={str(user['id'])[:8]} "
-            f"ms={_elapsed_ms:.0f} period_rows={len(period_rows)} all_rows={len(all_rows)}",
+            f"ms={_elapsed_ms:.0f} posts_tracked={base['posts_tracked']} posts_total={base['posts_total']}",
             flush=True,
         )
     return StatsResponse(
@@ -1495,9 +1486,11 @@ def api_ensure_post_thumbnails(
 ):
     """Mirror or generate stable poster images for analytics post cards.
 
-    Fast path (image CDN copy + ffmpeg remote frame grab) runs synchronously.
-    Full video mirrors are queued in the background so the UI can paint
-    thumbnails progressively without blocking the account modal.
+    Fast path (image CDN copy + seek-only remote frame grab) runs
+    concurrently for the whole batch, bounded by a deadline; posts still
+    extracting after it count as pending. Full video mirrors are queued in
+    the background so the UI can paint thumbnails progressively without
+    blocking the account modal.
     """
     user_id = user["id"]
     post_ids = [pid for pid in (body.post_ids or []) if pid][:48]
@@ -1508,7 +1501,7 @@ def api_ensure_post_thumbnails(
     if not rows:
         return EnsureThumbnailsResponse(thumbnails={}, pending=0)
 
-    updated, deferred = scraper_service.ensure_post_thumbnails_sync(
+    updated, deferred, in_progress = scraper_service.ensure_post_thumbnails_sync(
         rows,
         user_id=user_id,
         allow_full_video_mirror=False,
@@ -1525,7 +1518,7 @@ def api_ensure_post_thumbnails(
 
     return EnsureThumbnailsResponse(
         thumbnails=thumbnails,
-        pending=len(deferred),
+        pending=len(deferred) + len(in_progress),
     )
 
 
@@ -35,7 +35,9 @@ from typing import Any, Iterable, Optional
 import httpx
 
 from . import db as analytics_db
+from . import rate_limits, remote_frames
 from .url_parser import ParsedInput, detect
+from .work_scheduler import RESOURCE_FFMPEG, RESOURCE_NETWORK, scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -981,47 +983,22 @@ def _thumbnail_from_raw_payload(post: dict) -> Optional[str]:
 def _extract_poster_from_remote_video_url(
     *, video_url: str, user_id: str, post_id: str,
 ) -> Optional[str]:
-    """Extract a single JPEG frame via ffmpeg without downloading the full video.
+    """Extract a single JPEG frame without downloading the full video.
 
-    Much faster than ``_mirror_video_to_storage`` for card thumbnails. Falls
-    back gracefully when the CDN blocks direct reads or ffmpeg is unavailable.
+    Seeks over HTTP (range reads), falling back to a short range prefix —
+    see ``remote_frames``. Returns the uploaded poster URL, or None when
+    the CDN blocks both or ffmpeg is unavailable.
     """
-    binary = _ffmpeg_binary()
-    if not binary:
+    poster_path = remote_frames.extract_frame(video_url)
+    if poster_path is None:
         return None
-    import tempfile
-    fd, raw_path = tempfile.mkstemp(prefix="analytics_poster_", suffix=".jpg")
-    os.close(fd)
-    out_path = Path(raw_path)
     try:
-        for seek in ("1", "0"):
-            proc = subprocess.run(
-                [
-                    binary, "-y",
-                    "-ss", seek,
-                    "-i", video_url,
-                    "-vframes", "1",
-                    "-q:v", "4",
-                    "-loglevel", "error",
-                    str(out_path),
-                ],
-                timeout=25,
-                capture_output=True,
-            )
-            if (
-                proc.returncode == 0
-                and out_path.exists()
-                and out_path.stat().st_size > 0
-            ):
-                return _upload_poster_to_storage(
-                    poster_path=out_path, user_id=user_id, post_id=post_id,
-                )
-        return None
-    except Exception:
-        return None
+        return _upload_poster_to_storage(
+            poster_path=poster_path, user_id=user_id, post_id=post_id,
+        )
     finally:
         try:
-            out_path.unlink(missing_ok=True)
+            poster_path.unlink(missing_ok=True)
         except Exception:
             pass
 
@@ -1029,10 +1006,29 @@ def _extract_poster_from_remote_video_url(
 def _extract_and_store_poster_from_video_url(
     *, video_url: str, user_id: str, post_id: str,
 ) -> Optional[str]:
-    """Download a video, extract one JPEG frame, upload to Storage.
+    """Extract one JPEG frame from a video URL and upload it to Storage.
 
     Used when we already have a playable video URL (typically our own
-    ``storage_video_url``) but the card still needs a stable poster.
+    ``storage_video_url``) but the card still needs a stable poster. Tries
+    the seek-only path first; downloads the whole file only if that fails.
+    """
+    stable = _extract_poster_from_remote_video_url(
+        video_url=video_url, user_id=user_id, post_id=post_id,
+    )
+    if stable:
+        return stable
+    return _download_and_store_poster_from_video_url(
+        video_url=video_url, user_id=user_id, post_id=post_id,
+    )
+
+
+def _download_and_store_poster_from_video_url(
+    *, video_url: str, user_id: str, post_id: str,
+) -> Optional[str]:
+    """Download the whole video, extract one JPEG frame and upload it.
+
+    The fallback for CDNs that refuse the seek-only path; callers that
+    already tried ``_extract_poster_from_remote_video_url`` go here directly.
     """
     tmp_path: Optional[Path] = None
     poster_path: Optional[Path] = None
@@ -1059,95 +1055,147 @@ def _extract_and_store_poster_from_video_url(
                 pass
 
 
+# Posts whose poster is being extracted right now (any request); a retry
+# while one is still running reports it as pending instead of redoing it.
+_THUMBNAILS_IN_FLIGHT: set[str] = set()
+_THUMBNAILS_LOCK = threading.Lock()
+_ENSURE_DEADLINE_SEC = float(os.getenv("ANALYTICS_THUMBNAIL_DEADLINE_SEC", "25"))
+
+
+def _ensure_post_thumbnail(
+    post: dict, *, user_id: str, allow_full_video_mirror: bool,
+) -> tuple[dict, bool]:
+    """Heal one post's poster. Returns ``(post, deferred)`` where
+    ``deferred`` means only a full video mirror can still help."""
+    post_id = str(post["id"])
+    thumb = post.get("thumbnail_url")
+    new_thumb: Optional[str] = None
+    deferred = False
+    storage_video = post.get("storage_video_url")
+    media_video = _first_media_video_url(post)
+    candidate_thumb = thumb or _thumbnail_from_raw_payload(post)
+
+    # Prefer poster extraction from an already-mirrored Studio video.
+    if storage_video:
+        new_thumb = _extract_and_store_poster_from_video_url(
+            video_url=storage_video, user_id=user_id, post_id=post_id,
+        )
+    elif media_video:
+        new_thumb = _extract_poster_from_remote_video_url(
+            video_url=media_video, user_id=user_id, post_id=post_id,
+        )
+        if not new_thumb and allow_full_video_mirror:
+            mirrored = _mirror_video_to_storage(
+                video_url=media_video, user_id=user_id, post_id=post_id,
+            )
+            if mirrored:
+                if mirrored.get("video_url"):
+                    try:
+                        analytics_db.set_post_storage_video_url(
+                            post_id, mirrored["video_url"],
+                        )
+                        post = {**post, "storage_video_url": mirrored["video_url"]}
+                    except Exception:
+                        pass
+                new_thumb = mirrored.get("thumbnail_url")
+        elif not new_thumb:
+            deferred = True
+    elif candidate_thumb and _looks_like_video_url(candidate_thumb):
+        new_thumb = _extract_poster_from_remote_video_url(
+            video_url=candidate_thumb, user_id=user_id, post_id=post_id,
+        )
+        if not new_thumb and allow_full_video_mirror:
+            new_thumb = _download_and_store_poster_from_video_url(
+                video_url=candidate_thumb, user_id=user_id, post_id=post_id,
+            )
+        elif not new_thumb:
+            deferred = True
+    elif candidate_thumb and not _is_supabase_storage_url(candidate_thumb):
+        rate_limits.acquire(remote_frames.cdn_bucket(candidate_thumb))
+        new_thumb = _mirror_thumbnail_to_storage(
+            image_url=candidate_thumb, user_id=user_id, post_id=post_id,
+        )
+
+    if new_thumb:
+        try:
+            analytics_db.set_post_thumbnail_url(post_id, new_thumb)
+        except Exception:
+            pass
+        post = {**post, "thumbnail_url": new_thumb}
+    return post, deferred
+
+
 def ensure_post_thumbnails_sync(
     posts: list[dict],
     *,
     user_id: str,
     allow_full_video_mirror: bool = True,
-) -> tuple[list[dict], list[dict]]:
-    """Synchronously ensure each post has a Supabase-hosted poster image.
-
-    Returns ``(updated_posts, deferred_posts)``. Rows in ``deferred_posts``
-    still need a full video mirror and should be handed to
-    ``_mirror_posts_in_background`` when ``allow_full_video_mirror`` is
-    False (keeps API responses fast).
+) -> tuple[list[dict], list[dict], list[str]]:
+    """Ensure each post has a Supabase-hosted poster image, concurrently.
+
+    Posts are healed in parallel on the ``remote_frames`` pool (seek-only
+    frame grabs, per-CDN rate limits) and the call returns after at most
+    ``ANALYTICS_THUMBNAIL_DEADLINE_SEC``.
+
+    Returns ``(updated_posts, deferred_posts, in_progress_ids)``. Rows in
+    ``deferred_posts`` still need a full video mirror and should be handed
+    to ``_mirror_posts_in_background`` when ``allow_full_video_mirror`` is
+    False (keeps API responses fast). ``in_progress_ids`` are still being
+    extracted (past the deadline, or by an earlier request); they persist
+    their poster when done, so the caller should just poll again.
     """
     if not posts or not user_id:
-        return posts, []
+        return posts, [], []
 
-    updated: list[dict] = []
-    deferred: list[dict] = []
+    tasks = []
+    claimed: list[str] = []
+    in_progress: list[str] = []
     for post in posts:
         post_id = str(post.get("id") or "")
-        if not post_id:
-            updated.append(post)
+        if not post_id or _stable_image_thumbnail(post.get("thumbnail_url")):
             continue
+        with _THUMBNAILS_LOCK:
+            if post_id in _THUMBNAILS_IN_FLIGHT:
+                in_progress.append(post_id)
+                continue
+            _THUMBNAILS_IN_FLIGHT.add(post_id)
+        claimed.append(post_id)
 
-        thumb = post.get("thumbnail_url")
-        if _stable_image_thumbnail(thumb):
-            updated.append(post)
-            continue
-
-        new_thumb: Optional[str] = None
-        storage_video = post.get("storage_video_url")
-        media_video = _first_media_video_url(post)
-        candidate_thumb = thumb or _thumbnail_from_raw_payload(post)
-
-        # Prefer poster extraction from an already-mirrored Studio video.
-        if storage_video:
-            new_thumb = _extract_and_store_poster_from_video_url(
-                video_url=storage_video, user_id=user_id, post_id=post_id,
-            )
-        elif media_video and not post.get("storage_video_url"):
-            new_thumb = _extract_poster_from_remote_video_url(
-                video_url=media_video, user_id=user_id, post_id=post_id,
-            )
-            if not new_thumb and allow_full_video_mirror:
-                mirrored = _mirror_video_to_storage(
-                    video_url=media_video, user_id=user_id, post_id=post_id,
-                )
-                if mirrored:
-                    if mirrored.get("video_url"):
-                        try:
-                            analytics_db.set_post_storage_video_url(
-                                post_id, mirrored["video_url"],
-                            )
-                            post = {**post, "storage_video_url": mirrored["video_url"]}
-                        except Exception:
-                            pass
-                    new_thumb = mirrored.get("thumbnail_url")
-            elif not new_thumb:
-                deferred.append({**post, "user_id": user_id})
-        elif candidate_thumb and _looks_like_video_url(candidate_thumb):
-            new_thumb = _extract_poster_from_remote_video_url(
-                video_url=candidate_thumb, user_id=user_id, post_id=post_id,
-            )
-            if not new_thumb and allow_full_video_mirror:
-                new_thumb = _extract_and_store_poster_from_video_url(
-                    video_url=candidate_thumb, user_id=user_id, post_id=post_id,
+        def _task(p=post, pid=post_id):
+            try:
+                return _ensure_post_thumbnail(
+                    p, user_id=user_id, allow_full_video_mirror=allow_full_video_mirror,
                 )
-            elif not new_thumb:
-                deferred.append({**post, "user_id": user_id})
-        elif candidate_thumb and not _is_supabase_storage_url(candidate_thumb):
-            new_thumb = _mirror_thumbnail_to_storage(
-                image_url=candidate_thumb, user_id=user_id, post_id=post_id,
-            )
-        elif media_video:
-            new_thumb = _extract_poster_from_remote_video_url(
-                video_url=media_video, user_id=user_id, post_id=post_id,
-            )
-            if not new_thumb:
-                deferred.append({**post, "user_id": user_id})
+            finally:
+                with _THUMBNAILS_LOCK:
+                    _THUMBNAILS_IN_FLIGHT.discard(pid)
 
-        if new_thumb:
-            try:
-                analytics_db.set_post_thumbnail_url(post_id, new_thumb)
-            except Exception:
-                pass
-            post = {**post, "thumbnail_url": new_thumb}
+        tasks.append((post_id, _task))
 
-        updated.append(post)
-    return updated, deferred
+    results = remote_frames.run_batch(tasks, deadline_sec=_ENSURE_DEADLINE_SEC)
+    in_progress += [pid for pid in claimed if pid not in results]
+
+    updated: list[dict] = []
+    deferred: list[dict] = []
+    healed_count = 0
+    for post in posts:
+        post_id = str(post.get("id") or "")
+        result = results.get(post_id)
+        if result is None:
+            updated.append(post)
+            continue
+        healed, needs_mirror = result
+        if healed.get("thumbnail_url") != post.get("thumbnail_url"):
+            healed_count += 1
+        updated.append(healed)
+        if needs_mirror:
+            deferred.append({**healed, "user_id": user_id})
+    if tasks:
+        logger.info(
+            "[thumbnails] healed %d/%d posts (%d deferred, %d still running)",
+            healed_count, len(tasks), len(deferred), len(in_progress),
+        )
+    return updated, deferred, in_progress
 
 
 def mirror_avatar_to_storage(
@@ -1296,7 +1344,7 @@ def _queue_breakdown_after_mirror(user_id: str, post_id: str) -> None:
 
 
 def _mirror_posts_in_background(saved_posts: list[dict]) -> None:
-    """Spawn a daemon thread that mirrors each saved post's video AND/OR
+    """Queue background tasks that mirror each saved post's video AND/OR
     thumbnail to Supabase Storage so the frontend has stable, CORS-safe
     URLs to render. The frontend polls the post list / detail endpoints,
     so the new URL surfaces on the next refresh.
@@ -1343,55 +1391,68 @@ def _mirror_posts_in_background(saved_posts: list[dict]) -> None:
     if not user_id:
         return
 
-    def _runner() -> None:
-        for post_id, video_url in video_candidates:
-            _set_prep_state(post_id, "downloading", progress_pct=55)
-            mirrored = _mirror_video_to_storage(
-                video_url=video_url, user_id=user_id, post_id=post_id
-            )
-            if mirrored and mirrored.get("video_url"):
-                try:
-                    analytics_db.set_post_storage_video_url(post_id, mirrored["video_url"])
-                    if mirrored.get("thumbnail_url"):
-                        analytics_db.set_post_thumbnail_url(
-                            post_id, mirrored["thumbnail_url"],
-                        )
-                    _set_prep_state(post_id, "ready", progress_pct=100)
-                    _queue_breakdown_after_mirror(user_id, post_id)
-                except Exception:
-                    _set_prep_state(post_id, "failed",
-                                    error_message="Storage update failed.")
-            else:
+    def _mirror_video(post_id: str, video_url: str) -> None:
+        _set_prep_state(post_id, "downloading", progress_pct=55)
+        mirrored = _mirror_video_to_storage(
+            video_url=video_url, user_id=user_id, post_id=post_id
+        )
+        if mirrored and mirrored.get("video_url"):
+            try:
+                analytics_db.set_post_storage_video_url(post_id, mirrored["video_url"])
+                if mirrored.get("thumbnail_url"):
+                    analytics_db.set_post_thumbnail_url(
+                        post_id, mirrored["thumbnail_url"],
+                    )
+                _set_prep_state(post_id, "ready", progress_pct=100)
+                _queue_breakdown_after_mirror(user_id, post_id)
+            except Exception:
                 _set_prep_state(post_id, "failed",
-                                error_message="Could not mirror the video to storage.")
-
-        for post_id, image_url in thumb_candidates:
-            # Lightweight path — no prep state to update because these posts
-            # never enter the video preparation pipeline. We're only swapping
-            # the thumbnail URL for a CORS-safe copy.
-            stable = _mirror_thumbnail_to_storage(
-                image_url=image_url, user_id=user_id, post_id=post_id,
-            )
-            if stable:
-                try:
-                    analytics_db.set_post_thumbnail_url(post_id, stable)
-                except Exception:
-                    pass  # best-effort; next scrape retries
+                                error_message="Storage update failed.")
+        else:
+            _set_prep_state(post_id, "failed",
+                            error_message="Could not mirror the video to storage.")
+
+    def _mirror_thumbnail(post_id: str, image_url: str) -> None:
+        # Lightweight path — no prep state to update because these posts
+        # never enter the video preparation pipeline. We're only swapping
+        # the thumbnail URL for a CORS-safe copy.
+        stable = _mirror_thumbnail_to_storage(
+            image_url=image_url, user_id=user_id, post_id=post_id,
+        )
+        if stable:
+            try:
+                analytics_db.set_post_thumbnail_url(post_id, stable)
+            except Exception:
+                pass  # best-effort; next scrape retries
 
-        for post_id, video_url in poster_candidates:
-            stable = _extract_and_store_poster_from_video_url(
-                video_url=video_url, user_id=user_id, post_id=post_id,
-            )
-            if stable:
-                try:
-                    analytics_db.set_post_thumbnail_url(post_id, stable)
-                except Exception:
-                    pass
+    def _extract_poster(post_id: str, video_url: str) -> None:
+        stable = _extract_and_store_poster_from_video_url(
+            video_url=video_url, user_id=user_id, post_id=post_id,
+        )
+        if stable:
+            try:
+                analytics_db.set_post_thumbnail_url(post_id, stable)
+            except Exception:
+                pass
 
-    thread_seed = (video_candidates or thumb_candidates or poster_candidates)[0][0][:8]
-    threading.Thread(
-        target=_runner, daemon=True, name=f"analytics-mirror-{thread_seed}"
-    ).start()
+    # One task per post so the shared pools bound concurrency across every
+    # scrape in the process; a post already being mirrored is deduped, and
+    # anything rejected by backpressure is picked up on the next scrape.
+    for post_id, video_url in video_candidates:
+        scheduler.submit(
+            RESOURCE_NETWORK, "mirror_video", post_id,
+            lambda p=post_id, u=video_url: _mirror_video(p, u),
+        )
+    for post_id, image_url in thumb_candidates:
+        scheduler.submit(
+            RESOURCE_NETWORK, "mirror_thumbnail", post_id,
+            lambda p=post_id, u=image_url: _mirror_thumbnail(p, u),
+        )
+    for post_id, video_url in poster_candidates:
+        scheduler.submit(
+            RESOURCE_FFMPEG, "extract_poster", post_id,
+            lambda p=post_id, u=video_url: _extract_poster(p, u),
+        )
 
 
 # ── Lazy video-prep pipeline (on-demand mirror for the post detail modal) ──
@@ -1719,6 +1780,7 @@ async def _trigger_brightdata(
         "Content-Type": "application/json",
     }
     params = {"dataset_id": dataset_id, "format": "json", "include_errors": "true"}
+    await rate_limits.acquire_async(rate_limits.BRIGHTDATA)
     resp = await client.post(
         BRIGHTDATA_BASE + BRIGHTDATA_TRIGGER_PATH,
         headers=headers,
@@ -1745,6 +1807,7 @@ async def _poll_snapshot(snapshot_id: str, *, client: httpx.AsyncClient) -> Opti
     deadline = time.monotonic() + _MAX_WAIT_SEC
     interval = _POLL_INTERVAL_SEC
     while time.monotonic() < deadline:
+        await rate_limits.acquire_async(rate_limits.BRIGHTDATA)
         resp = await client.get(
             BRIGHTDATA_BASE + BRIGHTDATA_SNAPSHOT_PATH.format(snapshot_id=snapshot_id),
             headers=headers,
@@ -1952,6 +2015,7 @@ async def _poll_snapshot_with_timeout(
     deadline = time.monotonic() + max_wait_sec
     interval = _POLL_INTERVAL_SEC
     while time.monotonic() < deadline:
+        await rate_limits.acquire_async(rate_limits.BRIGHTDATA)
         resp = await client.get(
             BRIGHTDATA_BASE + BRIGHTDATA_SNAPSHOT_PATH.format(snapshot_id=snapshot_id),
             headers=headers,
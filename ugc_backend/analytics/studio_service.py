@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
 import logging
+import os
 import threading
 import time
-from datetime import datetime, timezone
-from typing import Any, Optional
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
 
 from ugc_backend import ayrshare_client
 from ugc_db.db_manager import get_supabase
@@ -15,6 +19,7 @@ from ugc_db.db_manager import get_supabase
 from . import ai_analyzer
 from . import db as analytics_db
 from . import jobs as analytics_jobs
+from . import rate_limits
 from . import scraper_service
 
 logger = logging.getLogger(__name__)
@@ -26,6 +31,27 @@ ANALYTICS_PLATFORMS = frozenset({"tiktok", "instagram", "youtube", "facebook"})
 _SYNC_DEBOUNCE: dict[str, float] = {}
 SYNC_DEBOUNCE_SECONDS = 15
 
+# Per-stage wall-clock seconds for the user currently being swept. Only the
+# nightly sweep sets this; for every other caller the stage clock is a no-op.
+_STAGE_TIMINGS: contextvars.ContextVar[Optional[dict[str, float]]] = (
+    contextvars.ContextVar("analytics_stage_timings", default=None)
+)
+
+
+def _stage_clock() -> Callable[[Optional[str]], None]:
+    """Return ``lap(stage)``, which charges the time since the previous lap to
+    ``stage`` in the active sweep's timings (``lap(None)`` just resets)."""
+    timings = _STAGE_TIMINGS.get()
+    last = [time.perf_counter()]
+
+    def lap(stage: Optional[str]) -> None:
+        now = time.perf_counter()
+        if timings is not None and stage:
+            timings[stage] = timings.get(stage, 0.0) + (now - last[0])
+        last[0] = now
+
+    return lap
+
 
 def _coerce_int(value: Any) -> int:
     try:
@@ -367,6 +393,7 @@ async def reconcile_scheduled_social_posts(
             continue
         platform = (sp.get("platform") or "").strip().lower()
         try:
+            await rate_limits.acquire_async(rate_limits.AYRSHARE)
             body = await ayrshare_client.get_post(profile_key, ayr_id)
         except Exception as exc:
             if _is_ayrshare_post_missing(exc):
@@ -535,55 +562,56 @@ def propagate_studio_metrics_to_scraped_posts(
             internal_by_caption.setdefault(cap, []).append(post)
 
     updated = 0
-    for post in posts:
-        if (post.get("source") or "") != "external":
-            continue
-
-        ext_permalink = scraper_service.permalink_from_post(post)
-        ext_code = _instagram_shortcode(ext_permalink or post.get("post_url"))
-
-        match: Optional[dict] = None
-        if ext_code:
-            match = internal_by_code.get(ext_code.lower())
-        if not match and post.get("external_post_id"):
-            match = internal_by_code.get(str(post.get("external_post_id")).lower())
-        if not match:
-            cap = _caption_match_key(post)
-            candidates = internal_by_caption.get(cap) or []
-            match = candidates[0] if len(candidates) == 1 else None
-
-        if match:
-            # Fresh engagement: scraped external → internal Studio mirror.
-            int_patch: dict = {}
-            for key in _TWIN_ENGAGEMENT_KEYS:
-                ext_val = post.get(key)
-                if ext_val is not None and ext_val != match.get(key):
-                    int_patch[key] = ext_val
-            if int_patch:
-                analytics_db.patch_post_metrics(match["id"], int_patch)
-                updated += 1
-
-            # Views: internal → external, fill-missing ONLY.
-            if (post.get("views") or 0) <= 0 and (match.get("views") or 0) > 0:
-                analytics_db.patch_post_metrics(
-                    post["id"], {"views": match["views"]}
-                )
-                updated += 1
+    with analytics_db.deferred_rollups():
+        for post in posts:
+            if (post.get("source") or "") != "external":
+                continue
 
-        # Permalink: scraped duplicate → Studio row
-        if ext_permalink and ext_code:
-            cap = _caption_match_key(post)
-            candidates = internal_by_caption.get(cap) or []
-            for internal in candidates:
-                if _internal_has_permalink(internal):
-                    continue
-                raw_merge = {"permalink": ext_permalink}
-                analytics_db.merge_post_raw_payload(internal["id"], raw_merge)
-                analytics_db.patch_post_metrics(
-                    internal["id"], {"external_post_id": ext_code}
-                )
-                updated += 1
-                break
+            ext_permalink = scraper_service.permalink_from_post(post)
+            ext_code = _instagram_shortcode(ext_permalink or post.get("post_url"))
+
+            match: Optional[dict] = None
+            if ext_code:
+                match = internal_by_code.get(ext_code.lower())
+            if not match and post.get("external_post_id"):
+                match = internal_by_code.get(str(post.get("external_post_id")).lower())
+            if not match:
+                cap = _caption_match_key(post)
+                candidates = internal_by_caption.get(cap) or []
+                match = candidates[0] if len(candidates) == 1 else None
+
+            if match:
+                # Fresh engagement: scraped external → internal Studio mirror.
+                int_patch: dict = {}
+                for key in _TWIN_ENGAGEMENT_KEYS:
+                    ext_val = post.get(key)
+                    if ext_val is not None and ext_val != match.get(key):
+                        int_patch[key] = ext_val
+                if int_patch:
+                    analytics_db.patch_post_metrics(match["id"], int_patch)
+                    updated += 1
+
+                # Views: internal → external, fill-missing ONLY.
+                if (post.get("views") or 0) <= 0 and (match.get("views") or 0) > 0:
+                    analytics_db.patch_post_metrics(
+                        post["id"], {"views": match["views"]}
+                    )
+                    updated += 1
+
+            # Permalink: scraped duplicate → Studio row
+            if ext_permalink and ext_code:
+                cap = _caption_match_key(post)
+                candidates = internal_by_caption.get(cap) or []
+                for internal in candidates:
+                    if _internal_has_permalink(internal):
+                        continue
+                    raw_merge = {"permalink": ext_permalink}
+                    analytics_db.merge_post_raw_payload(internal["id"], raw_merge)
+                    analytics_db.patch_post_metrics(
+                        internal["id"], {"external_post_id": ext_code}
+                    )
+                    updated += 1
+                    break
 
     return updated
 
@@ -685,6 +713,7 @@ def queue_breakdown_for_post(
         video_url=video_url,
         metrics=metrics,
         locale=locale,
+        use_cache=not force,
     )
     return True
 
@@ -712,76 +741,78 @@ async def refresh_studio_post_metrics(
     scope_platform = (platform or "").strip().lower() or None
     scope_username = (username or "").strip().lower().lstrip("@") or None
 
-    for post in posts:
-        platform = (post.get("platform") or "").strip().lower()
-        if connected_platforms is not None and platform not in connected_platforms:
-            continue
-        if scope_platform and platform != scope_platform:
-            continue
-        post_username = (post.get("username") or "").strip().lower().lstrip("@")
-        if scope_username and post_username != scope_username:
-            continue
-
-        sp_id = post.get("social_post_id")
-        if not sp_id:
-            continue
-        sp = analytics_db.get_social_post(user_id, sp_id)
-        if not sp or not _social_post_ready_for_metrics(sp):
-            continue
-        ayr_id = sp.get("ayrshare_post_id")
-        if not ayr_id:
-            continue
+    with analytics_db.deferred_rollups():
+        for post in posts:
+            platform = (post.get("platform") or "").strip().lower()
+            if connected_platforms is not None and platform not in connected_platforms:
+                continue
+            if scope_platform and platform != scope_platform:
+                continue
+            post_username = (post.get("username") or "").strip().lower().lstrip("@")
+            if scope_username and post_username != scope_username:
+                continue
 
-        platform = (platform or sp.get("platform") or "").strip().lower()
-        if not platform:
-            continue
+            sp_id = post.get("social_post_id")
+            if not sp_id:
+                continue
+            sp = analytics_db.get_social_post(user_id, sp_id)
+            if not sp or not _social_post_ready_for_metrics(sp):
+                continue
+            ayr_id = sp.get("ayrshare_post_id")
+            if not ayr_id:
+                continue
 
-        try:
-            raw = await ayrshare_client.get_post_analytics(
-                profile_key,
-                ayr_id,
-                platforms=[platform],
-            )
-            patch = normalize_ayrshare_metrics(platform, raw)
-            if not patch:
+            platform = (platform or sp.get("platform") or "").strip().lower()
+            if not platform:
                 continue
-            raw_merge = patch.pop("_raw_payload_merge", None)
-            # Internal Studio rows must keep their stable key (``studio://…`` or
-            # an existing permalink). Never rewrite ``post_url`` from Ayrshare —
-            # a BrightData-scraped duplicate may already own that unique key.
-            if (post.get("source") or "") == "internal":
-                patch.pop("post_url", None)
-            analytics_db.patch_post_metrics(post["id"], patch)
-            if raw_merge:
-                analytics_db.merge_post_raw_payload(post["id"], raw_merge)
-            refreshed += 1
-        except Exception as exc:
-            post_key = str(post.get("id") or "")
-            if _is_ayrshare_post_not_found(exc):
-                sp_id = post.get("social_post_id")
-                if sp_id:
-                    analytics_db.update_social_post(
-                        user_id,
-                        sp_id,
-                        {
-                            "error_message": (
-                                "[ayrshare:186] Post ID not found in Ayrshare analytics."
-                            ),
-                        },
-                    )
-                if post_key not in _AYRSHARE_186_LOGGED:
-                    _AYRSHARE_186_LOGGED.add(post_key)
-                    logger.info(
-                        "[analytics] Ayrshare analytics unavailable for post %s "
-                        "(code 186) — skipping until publish is reconciled.",
-                        post_key,
-                    )
-            else:
-                logger.warning(
-                    "[analytics] Ayrshare metrics refresh failed for post %s: %s",
-                    post.get("id"),
-                    exc,
+
+            try:
+                await rate_limits.acquire_async(rate_limits.AYRSHARE)
+                raw = await ayrshare_client.get_post_analytics(
+                    profile_key,
+                    ayr_id,
+                    platforms=[platform],
                 )
+                patch = normalize_ayrshare_metrics(platform, raw)
+                if not patch:
+                    continue
+                raw_merge = patch.pop("_raw_payload_merge", None)
+                # Internal Studio rows must keep their stable key (``studio://…`` or
+                # an existing permalink). Never rewrite ``post_url`` from Ayrshare —
+                # a BrightData-scraped duplicate may already own that unique key.
+                if (post.get("source") or "") == "internal":
+                    patch.pop("post_url", None)
+                analytics_db.patch_post_metrics(post["id"], patch)
+                if raw_merge:
+                    analytics_db.merge_post_raw_payload(post["id"], raw_merge)
+                refreshed += 1
+            except Exception as exc:
+                post_key = str(post.get("id") or "")
+                if _is_ayrshare_post_not_found(exc):
+                    sp_id = post.get("social_post_id")
+                    if sp_id:
+                        analytics_db.update_social_post(
+                            user_id,
+                            sp_id,
+                            {
+                                "error_message": (
+                                    "[ayrshare:186] Post ID not found in Ayrshare analytics."
+                                ),
+                            },
+                        )
+                    if post_key not in _AYRSHARE_186_LOGGED:
+                        _AYRSHARE_186_LOGGED.add(post_key)
+                        logger.info(
+                            "[analytics] Ayrshare analytics unavailable for post %s "
+                            "(code 186) — skipping until publish is reconciled.",
+                            post_key,
+                        )
+                else:
+                    logger.warning(
+                        "[analytics] Ayrshare metrics refresh failed for post %s: %s",
+                        post.get("id"),
+                        exc,
+                    )
 
     return refreshed
 
@@ -905,6 +936,7 @@ async def run_connected_accounts_pipeline(
     accounts cost zero tokens. Default False keeps every user-triggered
     call path exactly as before."""
     connected = {p.strip().lower() for p in platform_usernames.keys() if p}
+    lap = _stage_clock()
 
     purged_internal = analytics_db.purge_internal_off_connected_platforms(
         user_id, connected,
@@ -917,6 +949,7 @@ async def run_connected_accounts_pipeline(
         platform_usernames=platform_usernames,
         connected_platforms=connected,
     )
+    lap("publications")
 
     metrics_refreshed = 0
     if profile_key and connected:
@@ -933,11 +966,13 @@ async def run_connected_accounts_pipeline(
                     propagate_studio_metrics_to_scraped_posts(
                         user_id, platform=plat, username=nick,
                     )
+    lap("metrics")
 
     breakdowns_queued = enqueue_studio_breakdowns(
         user_id,
         connected_platforms=connected,
     )
+    lap("breakdowns")
 
     # Feedback loop — kick off the AI strategy reports once we know there's
     # fresh data worth analyzing. Daemon-thread fire-and-forget so it never
@@ -967,6 +1002,7 @@ async def run_connected_accounts_pipeline(
         else:
             ai_analyzer.enqueue_strategy_report(user_id)
             ai_analyzer.enqueue_account_strategy_reports(user_id)
+    lap("strategy")
 
     return {
         "publications_synced": synced,
@@ -1006,31 +1042,32 @@ async def refresh_external_posts_for_account(
         and not str(p.get("post_url")).startswith("studio://")
     ][:limit]
     updated = 0
-    for post in candidates:
-        post_url = (post.get("post_url") or "").strip()
-        try:
-            result = await scraper_service.scrape(
-                input_value=post_url,
-                user_id=user_id,
-                kind_override="post",
-                platform_override=plat,
-            )
-        except Exception as exc:
-            logger.warning(
-                "[analytics] account external metrics refresh failed for %s: %s",
-                post.get("id"),
-                exc,
-            )
-            continue
-        if not result.posts:
-            continue
-        row = dict(result.posts[0])
-        row.pop("_owner_followers", None)
-        row.pop("_owner_avatar_url", None)
-        patch = _metrics_from_scraped_row(row)
-        if patch:
-            analytics_db.patch_post_metrics(post["id"], patch)
-            updated += 1
+    with analytics_db.deferred_rollups():
+        for post in candidates:
+            post_url = (post.get("post_url") or "").strip()
+            try:
+                result = await scraper_service.scrape(
+                    input_value=post_url,
+                    user_id=user_id,
+                    kind_override="post",
+                    platform_override=plat,
+                )
+            except Exception as exc:
+                logger.warning(
+                    "[analytics] account external metrics refresh failed for %s: %s",
+                    post.get("id"),
+                    exc,
+                )
+                continue
+            if not result.posts:
+                continue
+            row = dict(result.posts[0])
+            row.pop("_owner_followers", None)
+            row.pop("_owner_avatar_url", None)
+            patch = _metrics_from_scraped_row(row)
+            if patch:
+                analytics_db.patch_post_metrics(post["id"], patch)
+                updated += 1
     return updated
 
 
@@ -1095,36 +1132,37 @@ async def refresh_external_posts_missing_metrics(
         user_id, source="external", limit=limit,
     )
     updated = 0
-    for post in posts:
-        post_url = (post.get("post_url") or "").strip()
-        if not post_url or post_url.startswith("studio://"):
-            continue
-        platform = (post.get("platform") or "").strip().lower()
-        if not platform:
-            continue
-        try:
-            result = await scraper_service.scrape(
-                input_value=post_url,
-                user_id=user_id,
-                kind_override="post",
-                platform_override=platform,
-            )
-        except Exception as exc:
-            logger.warning(
-                "[analytics] external metrics refresh failed for %s: %s",
-                post.get("id"),
-                exc,
-            )
-            continue
-        if not result.posts:
-            continue
-        row = dict(result.posts[0])
-        row.pop("_owner_followers", None)
-        row.pop("_owner_avatar_url", None)
-        patch = _metrics_from_scraped_row(row)
-        if patch:
-            analytics_db.patch_post_metrics(post["id"], patch)
-            updated += 1
+    with analytics_db.deferred_rollups():
+        for post in posts:
+            post_url = (post.get("post_url") or "").strip()
+            if not post_url or post_url.startswith("studio://"):
+                continue
+            platform = (post.get("platform") or "").strip().lower()
+            if not platform:
+                continue
+            try:
+                result = await scraper_service.scrape(
+                    input_value=post_url,
+                    user_id=user_id,
+                    kind_override="post",
+                    platform_override=platform,
+                )
+            except Exception as exc:
+                logger.warning(
+                    "[analytics] external metrics refresh failed for %s: %s",
+                    post.get("id"),
+                    exc,
+                )
+                continue
+            if not result.posts:
+                continue
+            row = dict(result.posts[0])
+            row.pop("_owner_followers", None)
+            row.pop("_owner_avatar_url", None)
+            patch = _metrics_from_scraped_row(row)
+            if patch:
+                analytics_db.patch_post_metrics(post["id"], patch)
+                updated += 1
     return updated
 
 
@@ -1173,6 +1211,7 @@ async def _connected_platform_usernames(
 ) -> dict[str, str]:
     """Platform → @handle for OAuth-linked profiles (mirrors sync-studio-connections)."""
     try:
+        await rate_limits.acquire_async(rate_limits.AYRSHARE)
         socials_raw = await ayrshare_client.get_user_socials(profile_key)
     except Exception:
         return {}
@@ -1201,6 +1240,7 @@ async def sync_studio_connections_for_user(
 
     Idempotent — safe on login, after OAuth connect, after scheduling, etc.
     """
+    lap = _stage_clock()
     purged_orphans = analytics_db.purge_orphan_analytics_posts(user_id)
     if purged_orphans:
         logger.info(
@@ -1257,6 +1297,7 @@ async def sync_studio_connections_for_user(
     tracked_linked = 0
     if profile_key:
         try:
+            await rate_limits.acquire_async(rate_limits.AYRSHARE)
             socials_raw = await ayrshare_client.get_user_socials(profile_key)
         except Exception as exc:
             logger.warning(
@@ -1325,12 +1366,15 @@ async def sync_studio_connections_for_user(
 
     counts["linked_profiles"] = len(alive)
     counts["tracked_rows_linked"] = tracked_linked
+    lap("accounts")
 
     # Pipeline + scrape run regardless of Ayrshare state.
     await _finish_pipeline()
+    lap(None)  # the pipeline records its own stages
     counts["scrape_jobs_enqueued"] = enqueue_auto_analyze_linked_accounts(
         user_id, profile_key, platform_usernames,
     )
+    lap("scrape_enqueue")
     # Advance the "Metrics as of" label whenever a refresh cycle actually
     # kicks off — independent of the Ayrshare branch (studio_service:906).
     if counts["scrape_jobs_enqueued"] or platform_usernames:
@@ -1369,7 +1413,14 @@ async def run_studio_pipeline_background(
 
 # ── Nightly sweep (triggered by the Modal cron via the internal endpoint) ────
 
-NIGHTLY_SWEEP_STAGGER_SECONDS = 3
+# Users processed concurrently. Provider pressure is bounded by the shared
+# token buckets in ``rate_limits``, not by spacing users out.
+NIGHTLY_SWEEP_CONCURRENCY = max(1, int(os.getenv("NIGHTLY_SWEEP_CONCURRENCY", "4")))
+# An interrupted sweep younger than this resumes from its checkpoint instead
+# of starting over.
+NIGHTLY_SWEEP_RESUME_HOURS = float(os.getenv("NIGHTLY_SWEEP_RESUME_HOURS", "20"))
+_CHECKPOINT_INTERVAL_SECONDS = 15
+_SWEEP_RUNNING = threading.Lock()
 
 # Most recent sweep summary, surfaced by the admin reflection viewer. Held in
 # memory for the current process AND mirrored to Supabase Storage so the admin
@@ -1408,6 +1459,50 @@ def get_last_sweep() -> dict[str, Any]:
     return dict(_LAST_SWEEP)
 
 
+def _resumable_checkpoint() -> Optional[dict[str, Any]]:
+    """The last sweep's record if it never finished and is recent enough to
+    resume (process restart / deploy mid-sweep)."""
+    last = get_last_sweep()
+    if last.get("status") != "running" or not last.get("sweep_id"):
+        return None
+    try:
+        started = datetime.fromisoformat(str(last.get("started_at")))
+    except (TypeError, ValueError):
+        return None
+    if started.tzinfo is None:
+        started = started.replace(tzinfo=timezone.utc)
+    if datetime.now(timezone.utc) - started > timedelta(hours=NIGHTLY_SWEEP_RESUME_HOURS):
+        return None
+    return last
+
+
+def _sweep_one_user(user_id: str) -> tuple[bool, dict[str, float], float]:
+    """Run one user's pipeline on its own event loop (worker thread) and
+    return ``(ok, stage_seconds, total_seconds)``.
+
+    Each user gets a thread because the pipeline mixes awaits with blocking
+    Supabase calls — sharing one loop would serialize users again.
+    """
+    timings: dict[str, float] = {}
+    token = _STAGE_TIMINGS.set(timings)
+    started = time.perf_counter()
+    try:
+        asyncio.run(
+            sync_studio_connections_for_user(
+                user_id,
+                force_metrics=False,
+                require_new_signal=True,
+            )
+        )
+        ok = True
+    except Exception as exc:
+        ok = False
+        logger.warning("[analytics] nightly sweep failed for %s: %s", user_id, exc)
+    finally:
+        _STAGE_TIMINGS.reset(token)
+    return ok, timings, time.perf_counter() - started
+
+
 async def run_nightly_analytics_sweep() -> dict[str, int]:
     """Run the full analytics pipeline for every user with active tracked
     accounts — the autonomous path for users who never open the app.
@@ -1415,44 +1510,121 @@ async def run_nightly_analytics_sweep() -> dict[str, int]:
     Reuses ``sync_studio_connections_for_user`` per user (scrape sync →
     metrics refresh → AI breakdowns → strategy report → chained reflection)
     with ``require_new_signal=True`` so the LLM stages only run for accounts
-    whose data actually changed since the last reflection. Sequential with a
-    small stagger to avoid hammering Ayrshare/Gemini/OpenAI.
+    whose data actually changed since the last reflection.
+
+    Up to ``NIGHTLY_SWEEP_CONCURRENCY`` users run at once; Ayrshare /
+    BrightData / Gemini / OpenAI calls are paced by the shared token buckets
+    in ``rate_limits``. Progress is checkpointed through
+    ``_persist_last_sweep`` so a sweep interrupted by a restart resumes with
+    the users it hadn't processed yet. The summary carries per-stage timings
+    and provider throttle waits.
     """
     user_ids = analytics_db.list_user_ids_with_active_tracked_accounts()
-    counts = {"users_total": len(user_ids), "users_synced": 0, "users_failed": 0}
-    started_at = datetime.now(timezone.utc).isoformat()
-    _LAST_SWEEP.update(
-        {"status": "running", "started_at": started_at, "finished_at": None, **counts}
+    checkpoint = await asyncio.to_thread(_resumable_checkpoint)
+    if checkpoint:
+        processed = set(checkpoint.get("processed_user_ids") or [])
+        record = dict(checkpoint)
+        record["resumed"] = int(record.get("resumed") or 0) + 1
+        logger.info(
+            "[analytics] resuming nightly sweep %s (%s users already processed)",
+            record["sweep_id"], len(processed),
+        )
+    else:
+        processed = set()
+        record = {
+            "sweep_id": uuid.uuid4().hex,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "users_synced": 0,
+            "users_failed": 0,
+            "stage_seconds": {},
+            "resumed": 0,
+        }
+    pending = [u for u in user_ids if u not in processed]
+    stage_seconds: dict[str, float] = dict(record.get("stage_seconds") or {})
+    user_seconds: list[float] = []
+    throttle_before = {k: v["waited_seconds"] for k, v in rate_limits.stats().items()}
+    record.update(
+        {
+            "status": "running",
+            "finished_at": None,
+            "users_total": len(user_ids),
+            "concurrency": NIGHTLY_SWEEP_CONCURRENCY,
+            "processed_user_ids": sorted(processed),
+        }
     )
+    _LAST_SWEEP.clear()
+    _LAST_SWEEP.update(record)
     await asyncio.to_thread(_persist_last_sweep, dict(_LAST_SWEEP))
-    logger.info("[analytics] nightly sweep starting for %s users", len(user_ids))
+    logger.info(
+        "[analytics] nightly sweep starting for %s users (%s pending, concurrency %s)",
+        len(user_ids), len(pending), NIGHTLY_SWEEP_CONCURRENCY,
+    )
 
-    for i, user_id in enumerate(user_ids):
-        if i:
-            await asyncio.sleep(NIGHTLY_SWEEP_STAGGER_SECONDS)
-        try:
-            await sync_studio_connections_for_user(
-                user_id,
-                force_metrics=False,
-                require_new_signal=True,
-            )
-            counts["users_synced"] += 1
-        except Exception as exc:
-            counts["users_failed"] += 1
-            logger.warning(
-                "[analytics] nightly sweep failed for %s: %s", user_id, exc
-            )
+    loop = asyncio.get_running_loop()
+    wall_started = time.perf_counter()
+    last_checkpoint = time.monotonic()
+    with ThreadPoolExecutor(
+        max_workers=NIGHTLY_SWEEP_CONCURRENCY, thread_name_prefix="analytics-sweep",
+    ) as pool:
+        futures = {
+            loop.run_in_executor(pool, _sweep_one_user, user_id): user_id
+            for user_id in pending
+        }
+        for fut in asyncio.as_completed(list(futures)):
+            ok, timings, elapsed = await fut
+            record["users_synced" if ok else "users_failed"] += 1
+            user_seconds.append(elapsed)
+            for stage, secs in timings.items():
+                stage_seconds[stage] = stage_seconds.get(stage, 0.0) + secs
+            processed_count = record["users_synced"] + record["users_failed"]
+            if time.monotonic() - last_checkpoint >= _CHECKPOINT_INTERVAL_SECONDS:
+                last_checkpoint = time.monotonic()
+                done_ids = processed | {
+                    uid for f, uid in futures.items() if f.done()
+                }
+                _LAST_SWEEP.update(
+                    {
+                        **record,
+                        "processed_user_ids": sorted(done_ids),
+                        "stage_seconds": {k: round(v, 2) for k, v in stage_seconds.items()},
+                    }
+                )
+                await asyncio.to_thread(_persist_last_sweep, dict(_LAST_SWEEP))
+                logger.info(
+                    "[analytics] nightly sweep checkpoint: %s/%s users",
+                    processed_count, len(user_ids),
+                )
 
-    _LAST_SWEEP.update(
+    throttle_after = rate_limits.stats()
+    user_seconds.sort()
+    record.update(
         {
             "status": "done",
-            "started_at": started_at,
             "finished_at": datetime.now(timezone.utc).isoformat(),
-            **counts,
+            "duration_seconds": round(time.perf_counter() - wall_started, 2),
+            "stage_seconds": {k: round(v, 2) for k, v in sorted(stage_seconds.items())},
+            "user_seconds_p50": round(user_seconds[len(user_seconds) // 2], 2) if user_seconds else None,
+            "user_seconds_max": round(user_seconds[-1], 2) if user_seconds else None,
+            "throttle_wait_seconds": {
+                k: round(v["waited_seconds"] - throttle_before.get(k, 0.0), 2)
+                for k, v in throttle_after.items()
+            },
+            # Only needed to resume an interrupted run.
+            "processed_user_ids": [],
         }
     )
+    _LAST_SWEEP.clear()
+    _LAST_SWEEP.update(record)
     await asyncio.to_thread(_persist_last_sweep, dict(_LAST_SWEEP))
-    logger.info("[analytics] nightly sweep done: %s", counts)
+    counts = {
+        "users_total": len(user_ids),
+        "users_synced": record["users_synced"],
+        "users_failed": record["users_failed"],
+    }
+    logger.info(
+        "[analytics] nightly sweep done in %ss: %s stages=%s",
+        record["duration_seconds"], counts, record["stage_seconds"],
+    )
     return counts
 
 
@@ -1462,10 +1634,17 @@ def start_nightly_sweep_thread() -> int:
     user_ids = analytics_db.list_user_ids_with_active_tracked_accounts()
 
     def _run() -> None:
+        # A second cron hit while a sweep is still running would double-process
+        # every remaining user; let the running sweep finish instead.
+        if not _SWEEP_RUNNING.acquire(blocking=False):
+            logger.info("[analytics] nightly sweep already running — skipping trigger")
+            return
         try:
             asyncio.run(run_nightly_analytics_sweep())
         except Exception as exc:
             logger.warning("[analytics] nightly sweep thread crashed: %s", exc)
+        finally:
+            _SWEEP_RUNNING.release()
 
     threading.Thread(
         target=_run,
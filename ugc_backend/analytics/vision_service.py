@@ -4,7 +4,8 @@ Architecture
 ------------
 Single ``analyze_video()`` coroutine that:
 
-1. Downloads the input video to a temp file (Supabase Storage URL or external).
+1. Downloads the input video to a temp file (Supabase Storage URL or external)
+   and transcodes it to a small **analysis proxy** (see below).
 2. Runs **Pass 1** — structured JSON analysis matching the columns of
    ``analytics_video_breakdowns`` (summary, hook, scenes, audio,
    visual_details, key_moments). Retries once on invalid JSON.
@@ -35,6 +36,20 @@ provider chains:
     3. ``GEMINI_API_KEY`` → google-genai text call.
 
   All 3 work fine for text-only prompts.
+
+Analysis proxy
+--------------
+Gemini samples video at ~1 fps and reads speech from a downmixed track, so
+full-resolution uploads only cost bytes and latency. Before Pass 1 the
+download is re-encoded with ffmpeg to ``ANALYTICS_PROXY_MAX_DIM`` px on the
+long side, ``ANALYTICS_PROXY_FPS`` fps and mono 16 kHz AAC — usually a few
+MB, so most breakdowns take the inline path instead of the Files API. The
+source is used as-is when ffmpeg is missing, the transcode fails, or the
+proxy isn't smaller (``ANALYTICS_PROXY_ENABLED=false`` disables it).
+
+The prepared upload (inline blob, Files API handle or FAL URL) is built
+once per breakdown and reused by transient-error retries and the Pass 1
+JSON retry; a Files API upload is deleted when the breakdown finishes.
 """
 
 from __future__ import annotations
@@ -43,6 +58,7 @@ import json
 import logging
 import os
 import re
+import subprocess
 import tempfile
 import time
 import concurrent.futures
@@ -52,6 +68,8 @@ from typing import Any, Optional
 
 import httpx
 
+from . import rate_limits
+
 logger = logging.getLogger(__name__)
 
 
@@ -164,6 +182,12 @@ class VisionResult:
 _MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 _MAX_VIDEO_BYTES = int(os.getenv("ANALYTICS_MAX_VIDEO_BYTES", str(150 * 1024 * 1024)))
 _GEMINI_CALL_TIMEOUT_SEC = int(os.getenv("ANALYTICS_GEMINI_TIMEOUT_SEC", "120"))
+_GEMINI_INLINE_MAX_BYTES = 18 * 1024 * 1024
+_PROXY_ENABLED = os.getenv("ANALYTICS_PROXY_ENABLED", "true").lower() != "false"
+_PROXY_MAX_DIM = int(os.getenv("ANALYTICS_PROXY_MAX_DIM", "640"))
+_PROXY_FPS = int(os.getenv("ANALYTICS_PROXY_FPS", "2"))
+_PROXY_CRF = int(os.getenv("ANALYTICS_PROXY_CRF", "32"))
+_PROXY_TIMEOUT_SEC = int(os.getenv("ANALYTICS_PROXY_TIMEOUT_SEC", "120"))
 
 
 def _detect_video_provider() -> str:
@@ -239,6 +263,88 @@ def _download_video(url: str) -> Path:
         raise
 
 
+def _make_analysis_proxy(src: Path) -> Optional[Path]:
+    """Transcode ``src`` to the low-bitrate analysis rendition.
+
+    Returns None (caller keeps the source) when the proxy is disabled,
+    ffmpeg is unavailable, the transcode fails, or the result isn't smaller.
+    """
+    if not _PROXY_ENABLED:
+        return None
+    from .scraper_service import _ffmpeg_binary
+
+    binary = _ffmpeg_binary()
+    if not binary:
+        logger.info("[vision] ffmpeg unavailable — uploading source video")
+        return None
+
+    fd, raw_path = tempfile.mkstemp(prefix="analytics_proxy_", suffix=".mp4")
+    os.close(fd)
+    out = Path(raw_path)
+    dim = _PROXY_MAX_DIM
+    # Fit the long side into `dim` without upscaling; -2 keeps dimensions even.
+    scale = (
+        f"scale='if(gte(iw,ih),min(iw,{dim}),-2)':'if(gte(iw,ih),-2,min(ih,{dim}))',"
+        f"fps={_PROXY_FPS}"
+    )
+    started = time.monotonic()
+    try:
+        proc = subprocess.run(
+            [
+                binary, "-y",
+                "-i", str(src),
+                "-vf", scale,
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", str(_PROXY_CRF),
+                "-pix_fmt", "yuv420p",
+                "-c:a", "aac", "-ac", "1", "-ar", "16000", "-b:a", "48k",
+                "-movflags", "+faststart",
+                "-loglevel", "error",
+                str(out),
+            ],
+            timeout=_PROXY_TIMEOUT_SEC,
+            capture_output=True,
+        )
+        if proc.returncode != 0 or not out.exists() or out.stat().st_size == 0:
+            logger.warning(
+                "[vision] analysis proxy transcode failed (rc=%s): %s",
+                proc.returncode, (proc.stderr or b"")[-300:].decode("utf-8", "replace"),
+            )
+            out.unlink(missing_ok=True)
+            return None
+    except (subprocess.TimeoutExpired, OSError) as e:
+        logger.warning("[vision] analysis proxy transcode failed: %s", e)
+        out.unlink(missing_ok=True)
+        return None
+
+    src_size, proxy_size = src.stat().st_size, out.stat().st_size
+    if proxy_size >= src_size:
+        out.unlink(missing_ok=True)
+        return None
+    logger.info(
+        "[vision] analysis proxy %.1fMB -> %.1fMB in %.1fs",
+        src_size / 1024 / 1024, proxy_size / 1024 / 1024, time.monotonic() - started,
+    )
+    return out
+
+
+@dataclass
+class _VideoInput:
+    """A video prepared for Pass 1. Provider upload state is filled lazily by
+    the first call and reused by every retry."""
+    path: Path
+    gemini_client: Any = None
+    gemini_part: Any = None
+    gemini_file_name: Optional[str] = None
+    fal_url: Optional[str] = None
+
+    def cleanup(self) -> None:
+        if self.gemini_client is not None and self.gemini_file_name:
+            try:
+                self.gemini_client.files.delete(name=self.gemini_file_name)
+            except Exception as e:  # noqa: BLE001 — expires server-side anyway
+                logger.info("[vision] could not delete Gemini upload %s: %s", self.gemini_file_name, e)
+
+
 _JSON_BLOCK_RE = re.compile(r"\{[\s\S]*\}", re.MULTILINE)
 
 
@@ -276,13 +382,59 @@ def _call_with_timeout(fn, *, timeout_sec: int, label: str):
             raise RuntimeError(f"Gemini {label} timed out after {timeout_sec}s") from exc
 
 
-def _call_gemini_video(prompt: str, video_path: Path, *, model: str) -> str:
+def _gemini_video_part(video: _VideoInput):
+    """Inline ``types.Blob`` (≤18 MB) or Files API handle, built once per video."""
+    from google.genai import types
+
+    if video.gemini_part is not None:
+        return video.gemini_part
+
+    client = video.gemini_client
+    video_path = video.path
+    size = video_path.stat().st_size
+    mime = _mime_for(video_path)
+
+    if size <= _GEMINI_INLINE_MAX_BYTES:
+        logger.info(
+            "[vision] provider=gemini size=%.1fMB inline=true",
+            size / 1024 / 1024,
+        )
+        video.gemini_part = types.Part(inline_data=types.Blob(data=video_path.read_bytes(), mime_type=mime))
+        return video.gemini_part
+
+    logger.info(
+        "[vision] provider=gemini size=%.1fMB inline=false (Files API)",
+        size / 1024 / 1024,
+    )
+    uploaded = client.files.upload(file=str(video_path))
+    video.gemini_file_name = uploaded.name
+    elapsed = 0
+    while elapsed < 300:
+        refreshed = client.files.get(name=uploaded.name)
+        state = getattr(refreshed.state, "name", str(refreshed.state))
+        if state == "ACTIVE":
+            video.gemini_part = types.Part(
+                file_data=types.FileData(
+                    file_uri=refreshed.uri,
+                    mime_type=refreshed.mime_type or mime,
+                )
+            )
+            return video.gemini_part
+        if state == "FAILED":
+            raise RuntimeError("Gemini Files API failed to process upload")
+        time.sleep(3)
+        elapsed += 3
+    raise RuntimeError("Gemini Files API processing timed out after 300s")
+
+
+def _call_gemini_video(prompt: str, video: _VideoInput, *, model: str) -> str:
     """Direct google-genai call — mirrors the claude-vision skill verbatim.
 
     Inline path (≤18 MB) uses ``types.Blob``; larger files go through the
     Files API (``client.files.upload`` + poll for ACTIVE). This is the only
     provider chain in this module that can actually upload a video to
-    Gemini — see ``_detect_video_provider`` for the rationale.
+    Gemini — see ``_detect_video_provider`` for the rationale. The prepared
+    part is cached on ``video`` so retries don't upload again.
     """
     try:
         from google import genai
@@ -292,40 +444,10 @@ def _call_gemini_video(prompt: str, video_path: Path, *, model: str) -> str:
             "google-genai is not installed. Add `google-genai>=1.0` to requirements.txt."
         ) from e
 
-    client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
-    size = video_path.stat().st_size
-    mime = _mime_for(video_path)
-
-    if size <= 18 * 1024 * 1024:
-        logger.info(
-            "[vision] provider=gemini model=%s size=%.1fMB inline=true",
-            model, size / 1024 / 1024,
-        )
-        part = types.Part(inline_data=types.Blob(data=video_path.read_bytes(), mime_type=mime))
-    else:
-        logger.info(
-            "[vision] provider=gemini model=%s size=%.1fMB inline=false (Files API)",
-            model, size / 1024 / 1024,
-        )
-        uploaded = client.files.upload(file=str(video_path))
-        elapsed = 0
-        while elapsed < 300:
-            refreshed = client.files.get(name=uploaded.name)
-            state = getattr(refreshed.state, "name", str(refreshed.state))
-            if state == "ACTIVE":
-                part = types.Part(
-                    file_data=types.FileData(
-                        file_uri=refreshed.uri,
-                        mime_type=refreshed.mime_type or mime,
-                    )
-                )
-                break
-            if state == "FAILED":
-                raise RuntimeError("Gemini Files API failed to process upload")
-            time.sleep(3)
-            elapsed += 3
-        else:
-            raise RuntimeError("Gemini Files API processing timed out after 300s")
+    if video.gemini_client is None:
+        video.gemini_client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+    client = video.gemini_client
+    part = _gemini_video_part(video)
 
     def _generate() -> str:
         resp = client.models.generate_content(
@@ -334,6 +456,7 @@ def _call_gemini_video(prompt: str, video_path: Path, *, model: str) -> str:
         )
         return resp.text or ""
 
+    rate_limits.acquire(rate_limits.GEMINI)
     return _call_with_timeout(
         _generate,
         timeout_sec=_GEMINI_CALL_TIMEOUT_SEC,
@@ -353,6 +476,7 @@ def _call_gemini_text(prompt: str, *, model: str) -> str:
         )
         return resp.text or ""
 
+    rate_limits.acquire(rate_limits.GEMINI)
     return _call_with_timeout(
         _generate,
         timeout_sec=_GEMINI_CALL_TIMEOUT_SEC,
@@ -360,7 +484,7 @@ def _call_gemini_text(prompt: str, *, model: str) -> str:
     )
 
 
-def _call_kie_video(prompt: str, video_path: Path, *, model: str) -> str:
+def _call_kie_video(prompt: str, video: _VideoInput, *, model: str) -> str:
     """KIE AI does **not** support video uploads to Gemini.
 
     KIE's Gemini routing exposes only the OpenAI-compatible chat completions
@@ -385,6 +509,7 @@ def _call_kie_text(prompt: str, *, model: str) -> str:
 
     base_url = os.getenv("KIE_BASE_URL", "https://api.kie.ai/v1")
     client = OpenAI(api_key=os.environ["KIE_API_KEY"], base_url=base_url)
+    rate_limits.acquire(rate_limits.GEMINI)
     response = client.chat.completions.create(
         model=model,
         messages=[{"role": "user", "content": prompt}],
@@ -393,9 +518,10 @@ def _call_kie_text(prompt: str, *, model: str) -> str:
     return response.choices[0].message.content or ""
 
 
-def _call_fal_video(prompt: str, video_path: Path, *, model: str) -> str:
+def _call_fal_video(prompt: str, video: _VideoInput, *, model: str) -> str:
     """FAL AI Gemini endpoint. FAL hosts Gemini behind their `fal-ai/gemini` ID
-    family and accepts a video URL or base64-encoded file."""
+    family and accepts a video URL or base64-encoded file. The upload URL is
+    cached on ``video`` so retries don't upload again."""
     try:
         import fal_client  # type: ignore
     except ImportError as e:
@@ -403,14 +529,15 @@ def _call_fal_video(prompt: str, video_path: Path, *, model: str) -> str:
             "fal_client not installed but FAL_KEY is set. Add `fal_client` to requirements.txt."
         ) from e
 
-    size = video_path.stat().st_size
-    logger.info(
-        "[vision] provider=fal model=%s size=%.1fMB",
-        model, size / 1024 / 1024,
-    )
-
-    # fal_client picks up FAL_KEY from env automatically.
-    uploaded_url = fal_client.upload_file(str(video_path))
+    if video.fal_url is None:
+        size = video.path.stat().st_size
+        logger.info(
+            "[vision] provider=fal model=%s size=%.1fMB",
+            model, size / 1024 / 1024,
+        )
+        # fal_client picks up FAL_KEY from env automatically.
+        video.fal_url = fal_client.upload_file(str(video.path))
+    uploaded_url = video.fal_url
     fal_app = os.getenv("FAL_GEMINI_APP", "fal-ai/gemini-flash-vision")
     result = fal_client.run(
         fal_app,
@@ -508,16 +635,16 @@ def _call_with_retry(label: str, fn, *args, **kwargs):
     raise last_err
 
 
-def _run_pass1(video_path: Path, *, provider: str, model: str, locale: str = "en") -> str:
+def _run_pass1(video: _VideoInput, *, provider: str, model: str, locale: str = "en") -> str:
     from . import locale_content
 
     prompt = PASS1_SYSTEM + locale_content.locale_prompt_suffix(locale)
     if provider == "fal":
-        return _call_with_retry("pass1.fal", _call_fal_video, prompt, video_path, model=model)
+        return _call_with_retry("pass1.fal", _call_fal_video, prompt, video, model=model)
     if provider == "kie":
         # Defensive: _detect_video_provider should never return "kie".
-        return _call_kie_video(prompt, video_path, model=model)
-    return _call_with_retry("pass1.gemini", _call_gemini_video, prompt, video_path, model=model)
+        return _call_kie_video(prompt, video, model=model)
+    return _call_with_retry("pass1.gemini", _call_gemini_video, prompt, video, model=model)
 
 
 def _run_pass2(structured: dict, metrics: dict, *, provider: str, model: str, locale: str = "en") -> str:
@@ -601,10 +728,23 @@ def _sanitize_takeaways(text: str) -> Optional[list[str]]:
 
 # ── Public entry point ─────────────────────────────────────────────────────
 
-def analyze_video(*, video_url: str, metrics: Optional[dict] = None, locale: str = "en") -> VisionResult:
+def analyze_video(
+    *,
+    video_url: str,
+    metrics: Optional[dict] = None,
+    locale: str = "en",
+    use_cache: bool = True,
+    user_id: Optional[str] = None,
+) -> VisionResult:
     """Run the full two-pass analysis. Synchronous — designed to run inside a
     background thread spawned by jobs.run_breakdown_in_background.
+
+    Pass 1 is served from ``breakdown_cache`` when the same video was already
+    analysed for this locale and prompt (fuzzy matches only among
+    ``user_id``'s own entries); ``use_cache=False`` forces a fresh analysis
+    (which then refreshes the cache).
     """
+    from . import breakdown_cache
     from . import locale_content
 
     loc = locale_content.normalize_locale(locale)
@@ -625,26 +765,67 @@ def analyze_video(*, video_url: str, metrics: Optional[dict] = None, locale: str
         video_provider, text_provider, model, video_url[:80],
     )
 
+    cache_version = breakdown_cache.prompt_version(
+        PASS1_SYSTEM + locale_content.locale_prompt_suffix(loc), model,
+    )
+    use_cache = use_cache and breakdown_cache.enabled()
+    sha256: Optional[str] = None
+    fingerprint: Optional[str] = None
+
     tmp_path: Optional[Path] = None
+    proxy_path: Optional[Path] = None
+    video: Optional[_VideoInput] = None
     try:
-        tmp_path = _download_video(video_url)
-
-        raw_text = _run_pass1(tmp_path, provider=video_provider, model=model, locale=loc)
-        parsed = _coerce_json(raw_text)
-        if parsed is None:
-            # Retry once with an explicit instruction reminder.
-            raw_text_retry = _run_pass1(tmp_path, provider=video_provider, model=model, locale=loc)
-            parsed = _coerce_json(raw_text_retry)
+        cached = (
+            breakdown_cache.lookup(version=cache_version, locale=loc, user_id=user_id, video_url=video_url)
+            if use_cache else None
+        )
+        if cached is None:
+            tmp_path = _download_video(video_url)
+            if use_cache:
+                sha256 = breakdown_cache.content_hash(tmp_path)
+                cached = breakdown_cache.lookup(version=cache_version, locale=loc, user_id=user_id, sha256=sha256)
+        if cached is None:
+            proxy_path = _make_analysis_proxy(tmp_path)
+            video = _VideoInput(path=proxy_path or tmp_path)
+            if use_cache:
+                fingerprint = breakdown_cache.fingerprint(video.path)
+                if fingerprint:
+                    cached = breakdown_cache.lookup(version=cache_version, locale=loc, user_id=user_id, fp=fingerprint)
+        if use_cache:
+            breakdown_cache.record_lookup(cached is not None)
+
+        if cached is not None:
+            sanitized = dict(cached.get("structured") or {})
+            raw_text = cached.get("raw_markdown")
+            video_provider = cached.get("provider") or video_provider
+        else:
+            raw_text = _run_pass1(video, provider=video_provider, model=model, locale=loc)
+            parsed = _coerce_json(raw_text)
             if parsed is None:
-                return VisionResult(
-                    raw_markdown=raw_text,
-                    model=model,
-                    provider=video_provider,
-                    error_message="Pass 1 did not return valid JSON after retry.",
+                # Retry once with an explicit instruction reminder.
+                raw_text_retry = _run_pass1(video, provider=video_provider, model=model, locale=loc)
+                parsed = _coerce_json(raw_text_retry)
+                if parsed is None:
+                    return VisionResult(
+                        raw_markdown=raw_text,
+                        model=model,
+                        provider=video_provider,
+                        error_message="Pass 1 did not return valid JSON after retry.",
+                    )
+                raw_text = raw_text_retry
+
+            sanitized = _sanitize_structured(parsed)
+            if breakdown_cache.enabled():
+                breakdown_cache.store(
+                    version=cache_version,
+                    locale=loc,
+                    user_id=user_id,
+                    result={"structured": sanitized, "raw_markdown": raw_text, "provider": video_provider},
+                    video_url=video_url,
+                    sha256=sha256 or breakdown_cache.content_hash(tmp_path),
+                    fp=fingerprint or breakdown_cache.fingerprint(video.path),
                 )
-            raw_text = raw_text_retry
-
-        sanitized = _sanitize_structured(parsed)
 
         # Pass 2 — strategic takeaways (text-only, can use any provider)
         takeaways: Optional[list[str]] = None
@@ -679,8 +860,11 @@ def analyze_video(*, video_url: str, metrics: Optional[dict] = None, locale: str
             error_message=_friendly_error(e),
         )
     finally:
-        if tmp_path:
-            try:
-                tmp_path.unlink(missing_ok=True)
-            except Exception:
-                pass
+        if video is not None:
+            video.cleanup()
+        for path in (proxy_path, tmp_path):
+            if path:
+                try:
+                    path.unlink(missing_ok=True)
+                except Exception:
+                    pass
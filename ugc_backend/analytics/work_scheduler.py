@@ -0,0 +1,176 @@
+"""Bounded background-work scheduler for the Analytics module.
+
+Every analytics background task (video breakdowns, account refreshes,
+BrightData snapshot resumes, Storage mirrors) used to start its own daemon
+thread, so enqueueing breakdowns for a large account launched dozens of
+concurrent Gemini uploads and ffmpeg processes inside the API process.
+
+Work is now submitted here and runs on one bounded pool per resource class:
+
+  * ``llm``     — Gemini / OpenAI calls (video breakdowns)
+  * ``ffmpeg``  — local transcodes and poster-frame extraction
+  * ``network`` — BrightData scrapes and Supabase Storage mirrors
+
+Each task carries a dedupe key ``(kind, subject_id)`` — e.g.
+``("breakdown", breakdown_id)`` or ``("mirror_video", post_id)``. Submitting
+a key that is already queued or running is a no-op, so a re-scrape or a
+double-clicked "Analyze" never queues the same work twice.
+
+Backpressure: a class accepts at most ``ANALYTICS_QUEUE_MAX`` waiting tasks.
+Past that ``submit`` returns ``"rejected"`` and the caller marks its status
+row failed ("busy — try again") instead of piling more work onto the box.
+
+``stats()`` backs the admin ``GET /api/admin/analytics/work-queue`` endpoint
+(queue depth, in-flight tasks and their age, per-class counters).
+
+Config:
+  ANALYTICS_LLM_WORKERS       concurrent LLM tasks (default 3)
+  ANALYTICS_FFMPEG_WORKERS    concurrent ffmpeg tasks (default 2)
+  ANALYTICS_NETWORK_WORKERS   concurrent scrape / mirror tasks (default 4)
+  ANALYTICS_QUEUE_MAX         waiting tasks per class before rejecting (default 200)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_LLM = "llm"
+RESOURCE_FFMPEG = "ffmpeg"
+RESOURCE_NETWORK = "network"
+
+_DEFAULT_WORKERS = {
+    RESOURCE_LLM: ("ANALYTICS_LLM_WORKERS", 3),
+    RESOURCE_FFMPEG: ("ANALYTICS_FFMPEG_WORKERS", 2),
+    RESOURCE_NETWORK: ("ANALYTICS_NETWORK_WORKERS", 4),
+}
+
+QUEUED = "queued"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+class _ResourcePool:
+    """One bounded executor plus the bookkeeping ``stats()`` reports."""
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"analytics-{name}",
+        )
+        self.queued: dict[tuple[str, str], float] = {}   # key -> enqueued_at
+        self.running: dict[tuple[str, str], float] = {}  # key -> started_at
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+
+class WorkScheduler:
+    """Per-resource bounded pools with (kind, subject) dedupe and backpressure."""
+
+    def __init__(self, max_queue: Optional[int] = None):
+        self.max_queue = max_queue or _env_int("ANALYTICS_QUEUE_MAX", 200)
+        self._lock = threading.Lock()
+        self._pools: dict[str, _ResourcePool] = {}
+
+    def _pool(self, resource: str) -> _ResourcePool:
+        pool = self._pools.get(resource)
+        if pool is None:
+            env_name, default = _DEFAULT_WORKERS.get(resource, ("", 2))
+            workers = _env_int(env_name, default) if env_name else default
+            pool = _ResourcePool(resource, workers, self.max_queue)
+            self._pools[resource] = pool
+        return pool
+
+    def submit(
+        self,
+        resource: str,
+        kind: str,
+        subject_id: str,
+        fn: Callable[[], None],
+    ) -> str:
+        """Queue ``fn`` on the ``resource`` pool.
+
+        Returns ``"queued"``, ``"duplicate"`` (the same ``(kind, subject_id)``
+        is already queued or running) or ``"rejected"`` (the class's queue is
+        full — the caller owns reporting that to the user).
+        """
+        key = (kind, str(subject_id))
+        with self._lock:
+            pool = self._pool(resource)
+            if key in pool.queued or key in pool.running:
+                return DUPLICATE
+            if len(pool.queued) >= pool.max_queue:
+                pool.rejected += 1
+                logger.warning(
+                    "[analytics] %s queue full (%d waiting) — rejected %s %s",
+                    resource, len(pool.queued), kind, key[1][:8],
+                )
+                return REJECTED
+            pool.queued[key] = time.time()
+        pool.executor.submit(self._run, pool, key, fn)
+        return QUEUED
+
+    def _run(self, pool: _ResourcePool, key: tuple[str, str], fn: Callable[[], None]) -> None:
+        with self._lock:
+            pool.queued.pop(key, None)
+            pool.running[key] = time.time()
+        ok = False
+        try:
+            fn()
+            ok = True
+        except Exception as exc:
+            # Runners persist their own failure state; this only guards the pool.
+            logger.warning("[analytics] %s task %s %s crashed: %s",
+                           pool.name, key[0], key[1][:8], exc)
+        finally:
+            with self._lock:
+                pool.running.pop(key, None)
+                if ok:
+                    pool.completed += 1
+                else:
+                    pool.failed += 1
+
+    def stats(self) -> dict:
+        """Queue depth and in-flight work per resource class."""
+        now = time.time()
+        with self._lock:
+            resources = {}
+            for name, pool in sorted(self._pools.items()):
+                resources[name] = {
+                    "workers": pool.workers,
+                    "max_queue": pool.max_queue,
+                    "queued": len(pool.queued),
+                    "running": len(pool.running),
+                    "completed": pool.completed,
+                    "failed": pool.failed,
+                    "rejected": pool.rejected,
+                    "in_flight": [
+                        {"kind": kind, "subject_id": subject,
+                         "running_seconds": round(now - started, 1)}
+                        for (kind, subject), started in pool.running.items()
+                    ],
+                    "oldest_queued_seconds": (
+                        round(now - min(pool.queued.values()), 1) if pool.queued else None
+                    ),
+                }
+        return {"max_queue": self.max_queue, "resources": resources}
+
+
+# Global singleton — shared by every analytics background entry point.
+scheduler = WorkScheduler()
@@ -18,6 +18,7 @@ from pydantic import BaseModel
 from typing import Optional
 
 from ugc_backend.auth import get_current_user
+from ugc_backend import media_stream
 from ugc_db.db_manager import get_job, update_job, get_supabase
 
 router = APIRouter(prefix="/api/editor", tags=["editor"])
@@ -514,16 +515,23 @@ def _auto_transcribe_video(
     closes gaps in word timestamps that otherwise appear when audio is ducked
     or noisy.
     """
-    import requests as req_lib
     from ugc_backend.transcription_client import TranscriptionClient
 
     with tempfile.TemporaryDirectory() as tmpdir:
         # Download video
         video_path = Path(tmpdir) / "video.mp4"
         print(f"[EDITOR] Downloading video for transcription...")
-        response = req_lib.get(video_url, timeout=120)
-        response.raise_for_status()
-        video_path.write_bytes(response.content)
+        with open(video_path, "wb") as f:
+            for chunk in media_stream.iter_url(video_url, timeout=120):
+                f.write(chunk)
+
+        # Videos the pipeline already transcribed are served from the
+        # transcription store — no audio extraction, no Whisper upload.
+        import transcription_store
+        _, cached = transcription_store.lookup(video_path, language)
+        if cached is not None:
+            print(f"[EDITOR] Reusing cached transcription ({len(cached['words'])} words)")
+            return cached
 
         # Extract audio with ffmpeg
         audio_path = Path(tmpdir) / "audio.wav"
@@ -693,7 +701,6 @@ def generate_captions(req: CaptionsRequest, user: dict = Depends(get_current_use
     format the Remotion Editor expects.
     """
     try:
-        import requests as req_lib
         from ugc_backend.transcription_client import TranscriptionClient
 
         sb = get_supabase()
@@ -704,9 +711,9 @@ def generate_captions(req: CaptionsRequest, user: dict = Depends(get_current_use
         with tempfile.TemporaryDirectory() as tmpdir:
             # Download the audio file
             audio_path = Path(tmpdir) / "audio.wav"
-            response = req_lib.get(public_url, timeout=120)
-            response.raise_for_status()
-            audio_path.write_bytes(response.content)
+            with open(audio_path, "wb") as f:
+                for chunk in media_stream.iter_url(public_url, timeout=120):
+                    f.write(chunk)
 
             # Transcribe with Whisper. When the editor tells us which job this
             # audio belongs to, bias decoding with the known script and force the
@@ -1015,6 +1022,11 @@ def _subtitles_filter_available(ffmpeg_path: str) -> bool:
         return False
 
 
+# A faststart MP4's moov box must arrive within this many bytes for the
+# source to be piped into ffmpeg; otherwise it is spooled to disk first.
+_PIPE_HEADER_MAX_BYTES = 16 * 1024 * 1024
+
+
 def _ffmpeg_burn_captions(
     video_url: str,
     captions: list[dict],
@@ -1048,16 +1060,45 @@ def _ffmpeg_burn_captions(
 
     with tempfile.TemporaryDirectory() as tmpdir:
         try:
-            # 1. Download video
+            # 1. Open the download as a stream. A faststart MP4 (moov before
+            #    mdat, as our renders are) is piped straight into ffmpeg while
+            #    it downloads; anything else is spooled to disk in large
+            #    chunks. Either way the video is never held in memory.
             video_path = Path(tmpdir) / "input.mp4"
-            print(f"[CAPTION BURN] Downloading video...")
-            resp = req_lib.get(video_url, timeout=120)
+            print(f"[CAPTION BURN] Streaming video...")
+            resp = req_lib.get(video_url, stream=True, timeout=120)
             resp.raise_for_status()
-            video_path.write_bytes(resp.content)
+            source = media_stream.iter_response(resp)
+            head = bytearray()
+            header_len = None
+            for chunk in source:
+                head += chunk
+                header_len = media_stream.mp4_header_length(bytes(head))
+                if header_len is not None and len(head) >= header_len:
+                    break
+                if len(head) > _PIPE_HEADER_MAX_BYTES:
+                    header_len = 0
+                    break
+            pipe_input = bool(header_len)
+
+            def _remaining():
+                yield bytes(head)
+                yield from source
+
+            if pipe_input:
+                # 2a. The moov box alone is enough for ffprobe.
+                (Path(tmpdir) / "head.mp4").write_bytes(bytes(head[:header_len]))
+                probe_source = Path(tmpdir) / "head.mp4"
+            else:
+                with open(video_path, "wb") as f:
+                    for chunk in _remaining():
+                        f.write(chunk)
+                resp.close()
+                probe_source = video_path
 
             # 2. Probe dimensions — ASS PlayResX/Y must match the real frame so
             #    fontSize/strokeWidth land at their intended pixel size.
-            probe_width, probe_height = _probe_local_video_dimensions(video_path, ffmpeg_path)
+            probe_width, probe_height = _probe_local_video_dimensions(probe_source, ffmpeg_path)
             print(f"[CAPTION BURN] Video: {probe_width}x{probe_height}")
 
             # 3. Build the ASS subtitle file
@@ -1091,20 +1132,30 @@ def _ffmpeg_burn_captions(
             # 5. Burn. Run from tmpdir and reference everything by bare relative
             #    name — the subtitles filter parses ':' and '\' as syntax, which
             #    every absolute Windows path would break.
+            #    The output stays a seekable faststart file (published as-is to
+            #    social platforms), so it is encoded to disk, then streamed up.
             output_path = Path(tmpdir) / "output.mp4"
             cmd = [
                 ffmpeg_path,
-                "-i", "input.mp4",
+                "-i", "pipe:0" if pipe_input else "input.mp4",
                 "-vf", "subtitles=captions.ass:fontsdir=fonts",
                 "-c:v", "libx264", "-preset", "fast", "-crf", "18",
                 "-pix_fmt", "yuv420p",
                 "-c:a", "copy",
+                "-movflags", "+faststart",
                 "-y", "output.mp4",
             ]
-            print(f"[CAPTION BURN] Running ffmpeg (libass)...")
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, timeout=300, cwd=tmpdir,
-            )
+            if pipe_input:
+                print(f"[CAPTION BURN] Running ffmpeg (libass) on the download stream...")
+                try:
+                    result = media_stream.pipe_into_ffmpeg(cmd, _remaining(), cwd=tmpdir, timeout=300)
+                finally:
+                    resp.close()
+            else:
+                print(f"[CAPTION BURN] Running ffmpeg (libass)...")
+                result = subprocess.run(
+                    cmd, capture_output=True, text=True, timeout=300, cwd=tmpdir,
+                )
             if result.returncode != 0:
                 err_tail = (result.stderr or result.stdout or "")[-800:]
                 print(f"[CAPTION BURN] ffmpeg failed: {err_tail}")
@@ -1119,13 +1170,7 @@ def _ffmpeg_burn_captions(
             timestamp = _dt.now().strftime("%Y%m%d_%H%M%S")
             storage_filename = f"captioned_{job_id[:8]}_{timestamp}.mp4"
             try:
-                sb = get_supabase()
-                with open(output_path, "rb") as f:
-                    sb.storage.from_("generated-videos").upload(
-                        storage_filename, f,
-                        file_options={"content-type": "video/mp4"},
-                    )
-                public_url = sb.storage.from_("generated-videos").get_public_url(storage_filename)
+                public_url = media_stream.upload_file("generated-videos", storage_filename, output_path)
                 print(f"[CAPTION BURN] Uploaded: {public_url}")
                 return public_url, None
             except Exception as upload_err:
@@ -1614,7 +1659,6 @@ def _run_editor_render(
     (wrong instance, network issues). The direct renderer avoids this.
     """
     import requests as _req
-    import tempfile
     from datetime import datetime as _dt
 
     def _update(data: dict):
@@ -1691,31 +1735,32 @@ def _run_editor_render(
         timestamp = _dt.now().strftime("%Y%m%d_%H%M%S")
         storage_filename = f"edited_{job_id[:8]}_{timestamp}.mp4"
 
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    tmp.write(chunk)
-            tmp_path = tmp.name
+        # Stream the render body straight into Storage — no temp file, and
+        # progress (50 → 95) follows the bytes Storage has acknowledged.
+        content_length = int(response.headers.get("Content-Length") or 0) or None
+        transferred = {"bytes": 0}
 
-        _update({"progress": 80})
+        def _on_upload(done: int, total: Optional[int]):
+            transferred["bytes"] = done
+            patch = {"bytes_transferred": done}
+            if total:
+                patch["progress"] = 50 + int(45 * min(done, total) / total)
+            _update(patch)
 
         try:
-            from ugc_db.db_manager import get_supabase
-            sb = get_supabase()
-            with open(tmp_path, "rb") as f:
-                sb.storage.from_("generated-videos").upload(
-                    storage_filename, f,
-                    file_options={"content-type": "video/mp4"},
-                )
-            output_url = sb.storage.from_("generated-videos").get_public_url(
-                storage_filename
+            output_url = media_stream.upload_stream(
+                "generated-videos", storage_filename,
+                media_stream.iter_response(response),
+                size=content_length,
+                on_progress=_on_upload,
             )
         except Exception as upload_err:
             print(f"[EDITOR RENDER] Upload failed: {upload_err}")
-            output_url = f"file:///{tmp_path}"
+            raise RuntimeError(f"Upload failed: {upload_err}")
+        finally:
+            response.close()
 
-        output_size = os.path.getsize(tmp_path)
-        os.unlink(tmp_path)
+        output_size = transferred["bytes"]
 
         _update({
             "status": "done",
@@ -0,0 +1,354 @@
+"""
+Local Job Queue — durable, bounded, fair in-process dispatch for video jobs.
+
+_dispatch_worker used to fall back to one daemon thread per job when neither
+Modal nor Celery/Redis was available, so a 50-video /jobs/bulk request
+started 50 renders inside the API process and a restart silently dropped
+every queued job. This module replaces that fallback:
+
+  - Durable: jobs are recorded in a local SQLite file before they run.
+    On startup, queued jobs resume and jobs interrupted mid-run are re-queued
+    (the worker's idempotency guard recovers stale 'processing' rows) until
+    JOB_QUEUE_MAX_ATTEMPTS is reached.
+  - Shared store: a running row records its owner (one id per queue
+    instance) and a heartbeat the owner refreshes while it is alive. Only
+    rows whose heartbeat is older than JOB_QUEUE_LEASE_SECONDS are treated
+    as interrupted, so processes sharing the file never re-run each
+    other's live jobs; the check repeats while the queue runs, not only at
+    startup.
+  - Bounded: at most JOB_QUEUE_WORKERS jobs run at once on a fixed pool.
+  - Priority classes: PRIORITY_INTERACTIVE (single /jobs previews) always
+    runs ahead of PRIORITY_BULK (/jobs/bulk campaign fan-out).
+  - Fair share: within a class the next job goes to the user with the fewest
+    running jobs, then the user who started a job least recently, so one
+    user's bulk campaign can't starve everyone else's.
+  - Admission control: each job reserves provider render slots (its kind's
+    weight; a UGC job can run SCENE_CONCURRENCY_VIDEO renders in parallel)
+    and is only admitted while the running total fits the account-wide
+    PROVIDER_CONCURRENCY_LIMIT.
+
+Celery/Redis (when reachable) and Modal stay ahead of this queue in
+_dispatch_worker; the queue is the local backend for single-box deploys.
+
+Config:
+  JOB_QUEUE_DB                 SQLite path (default <tmp>/ugc_job_queue.sqlite3)
+  JOB_QUEUE_WORKERS            max concurrent local jobs (default 2)
+  JOB_QUEUE_MAX_ATTEMPTS       runs per job before it is failed (default 2)
+  JOB_QUEUE_LEASE_SECONDS      heartbeat age after which a running job is recovered (default 60)
+  PROVIDER_CONCURRENCY_LIMIT   provider renders the account allows (default 8)
+"""
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import tempfile
+import threading
+import traceback
+from contextlib import contextmanager
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queued_jobs (
+    job_id       TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    user_id      TEXT,
+    priority     INTEGER NOT NULL,
+    status       TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    enqueued_at  REAL NOT NULL,
+    started_at   REAL,
+    finished_at  REAL,
+    error        TEXT,
+    owner        TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_queued_jobs_status ON queued_jobs (status, priority, enqueued_at);
+"""
+
+
+def _kind_weight(kind: str) -> int:
+    """Provider render slots one job of `kind` may hold at once."""
+    if kind == "ugc":
+        try:
+            return max(1, int(os.getenv("SCENE_CONCURRENCY_VIDEO", "4")))
+        except ValueError:
+            return 4
+    if kind == "clip_prewarm":
+        return 0  # local ffmpeg only
+    return 1
+
+
+class LocalJobQueue:
+    """SQLite-backed priority queue with a bounded worker pool."""
+
+    def __init__(self, db_path=None, max_workers: int = None, provider_limit: int = None,
+                 max_attempts: int = None):
+        self.db_path = Path(db_path or os.getenv("JOB_QUEUE_DB") or Path(tempfile.gettempdir()) / "ugc_job_queue.sqlite3")
+        self.max_workers = max_workers or int(os.getenv("JOB_QUEUE_WORKERS", "2"))
+        self.provider_limit = provider_limit or int(os.getenv("PROVIDER_CONCURRENCY_LIMIT", "8"))
+        self.max_attempts = max_attempts or int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", "2"))
+        self.lease_seconds = max(15.0, float(os.getenv("JOB_QUEUE_LEASE_SECONDS", "60")))
+        # Identifies this instance's running rows in a store shared with other processes.
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._last_beat = 0.0
+        self._last_recover = 0.0
+        self._runners: dict = {}
+        self._abandon_hooks: dict = {}
+        self._running: dict[str, tuple[str, str, int]] = {}  # job_id -> (kind, user_id, weight)
+        self._last_start_by_user: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pool: ThreadPoolExecutor | None = None
+        self._started = False
+
+    # ── Storage ──────────────────────────────────────────────────────────
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Stores created before owner leases existed.
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(queued_jobs)")}
+            for column, ddl in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE queued_jobs ADD COLUMN {column} {ddl}")
+
+    def _recover(self, startup: bool = False):
+        """Re-queue running jobs whose owner stopped heartbeating (a process
+        that exited or died); fail ones out of attempts. Live owners' rows,
+        in this process or another one sharing the store, are left alone."""
+        now = time.time()
+        stale = "status='running' AND owner IS NOT ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)"
+        cutoff = now - self.lease_seconds
+        abandoned = []
+        with self._connect() as conn:
+            candidates = conn.execute(
+                f"SELECT job_id, kind FROM queued_jobs WHERE {stale} AND attempts >= ?",
+                (self.owner, cutoff, self.max_attempts),
+            ).fetchall()
+            for row in candidates:
+                # Per row, so only the process whose UPDATE wins reports it.
+                if conn.execute(
+                    "UPDATE queued_jobs SET status='failed', finished_at=?, error='abandoned by its worker', "
+                    f"owner=NULL WHERE job_id=? AND {stale}",
+                    (now, row["job_id"], self.owner, cutoff),
+                ).rowcount:
+                    abandoned.append((row["job_id"], row["kind"]))
+            requeued = conn.execute(
+                f"UPDATE queued_jobs SET status='queued', owner=NULL, heartbeat_at=NULL WHERE {stale}",
+                (self.owner, cutoff),
+            ).rowcount
+            pending = conn.execute("SELECT COUNT(*) FROM queued_jobs WHERE status='queued'").fetchone()[0]
+        self._last_recover = now
+        for job_id, kind in abandoned:
+            print(f"!! [QUEUE] Job {job_id} abandoned after {self.max_attempts} attempt(s)")
+            on_abandon = self._abandon_hooks.get(kind)
+            if on_abandon is not None:
+                try:
+                    on_abandon(job_id)
+                except Exception as e:
+                    print(f"!! [QUEUE] Abandon hook failed for {job_id}: {e}")
+        if requeued or (startup and pending):
+            print(f"[QUEUE] Resuming {pending} queued job(s) ({requeued} interrupted)")
+        if requeued:
+            self._wake.set()
+
+    def _heartbeat(self):
+        """Refresh this instance's running rows so no other process recovers them."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE queued_jobs SET heartbeat_at=? WHERE owner=? AND status='running'",
+                (now, self.owner),
+            )
+        self._last_beat = now
+
+    def _maintain(self):
+        now = time.time()
+        if now - self._last_beat >= self.lease_seconds / 4:
+            self._heartbeat()
+        if now - self._last_recover >= self.lease_seconds:
+            self._recover()
+
+    # ── Lifecycle ────────────────────────────────────────────────────────
+
+    def register_runner(self, kind: str, fn, on_abandon=None):
+        """Register `fn(job_id, recovered)` as the executor for jobs of `kind`.
+
+        `recovered` is True when the run re-executes a job whose previous
+        owner died mid-run (its own state may still say "in progress").
+        `on_abandon(job_id)` is called once when such a job runs out of
+        attempts, so the job's own record can be failed too.
+        """
+        self._runners[kind] = fn
+        if on_abandon is not None:
+            self._abandon_hooks[kind] = on_abandon
+
+    def start(self):
+        """Open the store, recover interrupted jobs and start dispatching. Idempotent."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._init_db()
+        self._recover(startup=True)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        threading.Thread(target=self._dispatch_loop, name="job-queue", daemon=True).start()
+
+    def submit(self, job_id: str, kind: str = "ugc", user_id: str = None,
+               priority: int = PRIORITY_INTERACTIVE) -> bool:
+        """Durably enqueue a job. Returns False if it was already queued or running."""
+        self.start()
+        with self._connect() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO queued_jobs (job_id, kind, user_id, priority, status, enqueued_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, kind, user_id, priority, time.time()),
+            ).rowcount
+            if not inserted:
+                # A finished job being retried goes back on the queue.
+                inserted = conn.execute(
+                    "UPDATE queued_jobs SET status='queued', priority=?, attempts=0, error=NULL, enqueued_at=? "
+                    "WHERE job_id=? AND status IN ('done', 'failed')",
+                    (priority, time.time(), job_id),
+                ).rowcount
+        self._wake.set()
+        return bool(inserted)
+
+    # ── Scheduling ───────────────────────────────────────────────────────
+
+    def _pick_next(self, conn):
+        """Highest-priority admissible job, fair-shared across users. Caller holds _lock."""
+        if len(self._running) >= self.max_workers:
+            return None
+        reserved = sum(w for _, _, w in self._running.values())
+        running_by_user: dict[str, int] = {}
+        for _, user, _ in self._running.values():
+            running_by_user[user] = running_by_user.get(user, 0) + 1
+
+        rows = conn.execute(
+            "SELECT job_id, kind, user_id, priority, attempts, enqueued_at FROM queued_jobs "
+            "WHERE status='queued' ORDER BY priority, enqueued_at LIMIT 500"
+        ).fetchall()
+        if not rows:
+            return None
+
+        def _share_key(row):
+            user = row["user_id"] or ""
+            return (
+                row["priority"],
+                running_by_user.get(user, 0),
+                self._last_start_by_user.get(user, 0.0),
+                row["enqueued_at"],
+            )
+
+        for row in sorted(rows, key=_share_key):
+            if row["kind"] not in self._runners:
+                continue
+            weight = min(_kind_weight(row["kind"]), self.provider_limit)
+            # Always admit when idle so an oversized job can't wedge the queue.
+            if self._running and reserved + weight > self.provider_limit:
+                continue
+            return row, weight
+        return None
+
+    def _dispatch_loop(self):
+        while True:
+            self._wake.wait(timeout=5)
+            self._wake.clear()
+            try:
+                self._maintain()
+                while self._dispatch_one():
+                    pass
+            except Exception as e:
+                print(f"!! [QUEUE] Dispatcher error: {e}")
+
+    def _dispatch_one(self) -> bool:
+        with self._lock, self._connect() as conn:
+            picked = self._pick_next(conn)
+            if picked is None:
+                return False
+            row, weight = picked
+            now = time.time()
+            claimed = conn.execute(
+                "UPDATE queued_jobs SET status='running', attempts=attempts+1, started_at=?, "
+                "owner=?, heartbeat_at=? WHERE job_id=? AND status='queued'",
+                (now, self.owner, now, row["job_id"]),
+            ).rowcount
+            if not claimed:
+                return True
+            user = row["user_id"] or ""
+            self._running[row["job_id"]] = (row["kind"], user, weight)
+            self._last_start_by_user[user] = time.time()
+        label = "bulk" if row["priority"] == PRIORITY_BULK else "interactive"
+        print(f"[QUEUE] Starting {row['kind']} job {row['job_id']} ({label}, "
+              f"{len(self._running)}/{self.max_workers} running)")
+        self._pool.submit(self._execute, row["job_id"], row["kind"], row["attempts"] > 0)
+        return True
+
+    def _execute(self, job_id: str, kind: str, recovered: bool = False):
+        error = None
+        try:
+            self._runners[kind](job_id, recovered)
+        except Exception as e:
+            error = str(e)[:1000]
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+            with self._connect() as conn:
+                # Owner-guarded: a row recovered by another process is its business now.
+                conn.execute(
+                    "UPDATE queued_jobs SET status=?, finished_at=?, error=?, owner=NULL "
+                    "WHERE job_id=? AND owner=?",
+                    ("failed" if error else "done", time.time(), error, job_id, self.owner),
+                )
+            self._wake.set()
+
+    # ── Introspection ────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """Queue depth per status/priority plus currently running jobs."""
+        if not self._started:
+            return {"started": False}
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, priority, COUNT(*) AS n FROM queued_jobs GROUP BY status, priority"
+            ).fetchall()
+        counts: dict[str, dict[str, int]] = {}
+        for r in rows:
+            label = "bulk" if r["priority"] == PRIORITY_BULK else "interactive"
+            counts.setdefault(r["status"], {})[label] = r["n"]
+        with self._lock:
+            running = [
+                {"job_id": jid, "kind": kind, "user_id": user or None, "provider_slots": w}
+                for jid, (kind, user, w) in self._running.items()
+            ]
+        return {
+            "started": True,
+            "owner": self.owner,
+            "max_workers": self.max_workers,
+            "provider_limit": self.provider_limit,
+            "counts": counts,
+            "running": running,
+        }
+
+
+# Global singleton — the API process's local job backend
+job_queue = LocalJobQueue()
@@ -74,15 +74,75 @@ from ugc_db.db_manager import (
     get_stats_scoped,
     get_notifications,
 )
+from ugc_backend.job_queue import job_queue, PRIORITY_INTERACTIVE, PRIORITY_BULK
 
 # Lazy Celery import — avoids blocking the backend if Redis isn't running
-def _dispatch_worker(job_id: str) -> bool:
+def _run_ugc_job_in_process(job_id: str, recovered: bool = False) -> None:
+    """Local job-queue runner: call the worker task directly (not as a Celery task).
+
+    A `recovered` run re-executes a job whose queue owner died, so its
+    video_jobs row may still look freshly 'processing' — bypass that guard.
+    """
+    try:
+        print(f"[RUN] Running job {job_id} in-process (no Redis)...")
+        from ugc_worker.tasks import generate_ugc_video
+        generate_ugc_video(job_id, force_recover=recovered)
+    except Exception as e:
+        print(f"[FAIL] In-process job {job_id} failed: {e}")
+        from ugc_db.db_manager import update_job
+        update_job(job_id, {"status": "failed", "error_message": str(e)})
+        raise
+
+
+def _fail_abandoned_ugc_job(job_id: str) -> None:
+    """Local job-queue hook: the job ran out of attempts with no live worker."""
+    from ugc_db.db_manager import update_job
+    update_job(job_id, {
+        "status": "failed",
+        "error_message": "Job worker stopped responding and the job ran out of retries",
+    })
+
+
+job_queue.register_runner("ugc", _run_ugc_job_in_process, on_abandon=_fail_abandoned_ugc_job)
+
+
+def _run_clip_prewarm_in_process(clip_id: str, recovered: bool = False) -> None:
+    """Local job-queue runner: cache the normalized rendition of an app clip."""
+    from ugc_db.db_manager import get_app_clip
+    clip = get_app_clip(clip_id)
+    if not clip or not clip.get("video_url"):
+        return
+    from assemble_video import prewarm_normalized_clip
+    prewarm_normalized_clip(clip["video_url"])
+
+
+job_queue.register_runner("clip_prewarm", _run_clip_prewarm_in_process)
+
+
+def _celery_broker_reachable() -> bool:
+    """Quick socket check against CELERY_BROKER_URL's Redis."""
+    import socket
+    from urllib.parse import urlparse
+
+    broker_url = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    parsed = urlparse(broker_url)
+    host = parsed.hostname or "localhost"
+    port = parsed.port or 6379
+    try:
+        sock = socket.create_connection((host, port), timeout=1)
+        sock.close()
+        return True
+    except (socket.timeout, ConnectionRefusedError, OSError):
+        return False
+
+
+def _dispatch_worker(job_id: str, user_id: str = None, priority: int = PRIORITY_INTERACTIVE) -> bool:
     """Try to dispatch a job to a worker. Returns True if successful.
 
     Priority order:
     1. Modal serverless worker (if USE_MODAL_WORKER=true)
     2. Celery via Redis (if Redis is reachable)
-    3. In-process background thread (always-available fallback)
+    3. Local durable job queue (always-available fallback; see job_queue.py)
     """
 
     # --- Option 1: Modal serverless worker ---
@@ -103,24 +163,7 @@ def _dispatch_worker(job_id: str) -> bool:
             print("!! USE_MODAL_WORKER=true but MODAL_WEBHOOK_URL not set, falling back")
 
     # --- Option 2: Celery via Redis ---
-    import socket
-    from urllib.parse import urlparse
-
-    broker_url = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
-    parsed = urlparse(broker_url)
-    host = parsed.hostname or "localhost"
-    port = parsed.port or 6379
-
-    # Quick socket check — if Redis isn't reachable, run in-process
-    redis_available = False
-    try:
-        sock = socket.create_connection((host, port), timeout=1)
-        sock.close()
-        redis_available = True
-    except (socket.timeout, ConnectionRefusedError, OSError):
-        pass
-
-    if redis_available:
+    if _celery_broker_reachable():
         try:
             from ugc_worker.tasks import generate_ugc_video
             generate_ugc_video.delay(job_id)
@@ -129,35 +172,39 @@ def _dispatch_worker(job_id: str) -> bool:
         except Exception as e:
             print(f"!! Celery dispatch failed: {e}, falling back to in-process")
 
-    # --- Option 3: Fallback — run in background thread ---
-    import threading
+    # --- Option 3: Fallback — bounded, durable local queue ---
+    job_queue.submit(job_id, kind="ugc", user_id=user_id, priority=priority)
+    print(f"[START] Job {job_id} queued locally (no Redis)")
+    return True
+
 
-    def _run_in_background():
+def _dispatch_clip_prewarm(clip: dict) -> None:
+    """Pre-warm a new app clip's normalized rendition on the box that renders jobs.
+
+    The cache is local disk, so the encode only pays off where jobs run:
+    a Celery worker when Redis is reachable, else the local job queue (bulk
+    priority, bounded by JOB_QUEUE_WORKERS). Modal containers don't share a
+    disk with anything, so nothing is pre-warmed there.
+    """
+    if os.getenv("USE_MODAL_WORKER", "").lower() == "true" and os.getenv("MODAL_WEBHOOK_URL"):
+        return
+    if _celery_broker_reachable():
         try:
-            print(f"[RUN] Running job {job_id} in-process (no Redis)...")
-            from ugc_worker.tasks import generate_ugc_video
-            # Call the underlying function directly (not as a Celery task)
-            generate_ugc_video(job_id)
+            from ugc_worker.tasks import prewarm_app_clip
+            prewarm_app_clip.delay(clip["video_url"])
+            return
         except Exception as e:
-            print(f"[FAIL] In-process job {job_id} failed: {e}")
-            from ugc_db.db_manager import update_job
-            update_job(job_id, {"status": "failed", "error_message": str(e)})
-
-    thread = threading.Thread(target=_run_in_background, daemon=True)
-    thread.start()
-    print(f"[START] Job {job_id} started in background thread (no Redis)")
-    return True
+            print(f"!! Celery pre-warm dispatch failed: {e}, queueing locally")
+    job_queue.submit(clip["id"], kind="clip_prewarm", user_id=clip.get("user_id"), priority=PRIORITY_BULK)
 
 
 def _download_to_path(url: str, path) -> None:
-    """Download a file from URL to a local Path. Used by clone B-roll assembly."""
-    import requests as _req
-    resp = _req.get(str(url), stream=True, timeout=120)
-    resp.raise_for_status()
-    with open(str(path), "wb") as f:
-        for chunk in resp.iter_content(chunk_size=8192):
-            if chunk:
-                f.write(chunk)
+    """Download a file from URL to a local Path. Used by clone B-roll assembly.
+
+    Served from the shared media cache when the URL was fetched before.
+    """
+    from media_cache import media_cache
+    media_cache.fetch(str(url), path)
 
 
 # Lazy dispatch for AI Clone jobs — mirrors _dispatch_worker but uses clone_engine
@@ -442,42 +489,14 @@ def _dispatch_clone_worker(job_id: str) -> bool:
                             if use_remotion:
                                 try:
                                     print(f"[CLONE-THREAD] Rendering with Remotion (style={subtitle_style})...", flush=True)
-                                    import json as _json
-                                    import tempfile as _tempfile
-                                    
-                                    remotion_dir = "/root/remotion_renderer"
-                                    if not os.path.isdir(remotion_dir):
-                                        remotion_dir = os.path.join(os.path.dirname(__file__), "..", "remotion_renderer")
-                                        
-                                    render_script = os.path.join(remotion_dir, "render_captions.js")
-                                    
-                                    props = {
-                                        "transcription": transcription,
-                                        "subtitleStyle": subtitle_style,
-                                        "subtitlePlacement": subtitle_placement,
-                                    }
-                                    with _tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as pf:
-                                        _json.dump(props, pf)
-                                        props_path = pf.name
-                                        
-                                    captioned_output = str(work_dir / "final_remotion.mp4")
-                                    cmd = [
-                                        "node", render_script,
-                                        "--input", str(assembled_path),
-                                        "--props", props_path,
-                                        "--output", captioned_output,
-                                    ]
-                                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=300, cwd=remotion_dir)
-                                    try:
-                                        os.unlink(props_path)
-                                    except OSError:
-                                        pass
-                                        
-                                    if result.returncode == 0 and os.path.isfile(captioned_output):
-                                        captioned_path = captioned_output
-                                        print(f"[CLONE-THREAD] Remotion render complete", flush=True)
-                                    else:
-                                        print(f"[CLONE-THREAD] Remotion failed, falling back. Code: {result.returncode}, Stderr: {result.stderr}", flush=True)
+                                    import remotion_pool
+
+                                    captioned_path = remotion_pool.render_captions(
+                                        assembled_path, transcription, str(work_dir / "final_remotion.mp4"),
+                                        subtitle_style=subtitle_style, subtitle_placement=subtitle_placement,
+                                        timeout=300,
+                                    )
+                                    print(f"[CLONE-THREAD] Remotion render complete", flush=True)
                                 except Exception as rem_err:
                                     print(f"[CLONE-THREAD] Remotion error: {rem_err}, falling back", flush=True)
 
@@ -517,11 +536,15 @@ def _dispatch_clone_worker(job_id: str) -> bool:
                     destination_path=destination,
                 )
                 print(f"[CLONE-THREAD] Final video uploaded: {final_url}", flush=True)
+
+                update_cjob({"status": "complete", "progress": 100, "final_video_url": final_url})
+                print(f"[CLONE-THREAD] ✓ Clone job {job_id} complete: {final_url}", flush=True)
+
+                # Poster / sprite / preview from the local file before work_dir goes
+                import media_derivatives
+                media_derivatives.attach("clone_video_jobs", job_id, final_path)
             finally:
                 shutil.rmtree(work_dir, ignore_errors=True)
-
-            update_cjob({"status": "complete", "progress": 100, "final_video_url": final_url})
-            print(f"[CLONE-THREAD] ✓ Clone job {job_id} complete: {final_url}", flush=True)
         except Exception as e:
             print(f"[CLONE-THREAD] ✗ Clone job {job_id} failed: {e}", flush=True)
             _tb.print_exc()
@@ -615,6 +638,16 @@ def startup_event():
         print(">> Connected to Supabase (REST API)")
     except Exception as e:
         print(f"!! WARNING: Supabase connection failed: {e}")
+    try:
+        # Resume locally queued jobs that a previous process didn't finish.
+        job_queue.start()
+    except Exception as e:
+        print(f"!! WARNING: Local job queue failed to start: {e}")
+    # Provider webhooks land on this process (see /api/webhooks/*), so its
+    # tracked tasks can poll less often.
+    import task_tracker
+    if task_tracker.tracker.accept_callbacks():
+        print(">> Provider webhooks enabled for tracked tasks")
 
 
 # ---------------------------------------------------------------------------
@@ -896,18 +929,18 @@ async def api_product_upload(file: UploadFile = File(...)):
         if not content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail=f"Expected image upload, got {content_type!r}")
 
-        from ugc_db.image_normalize import normalize_image_bytes
-        png_bytes = normalize_image_bytes(contents)
-        unique_name = f"{uuid.uuid4()}.png"
+        from ugc_db.image_normalize import ORIGINAL, normalize_image_async
+        normalized = await normalize_image_async(contents, ORIGINAL)
+        unique_name = f"{uuid.uuid4()}.{normalized.ext}"
 
         sb = get_supabase()
         bucket = "product-images"
         sb.storage.from_(bucket).upload(
-            unique_name, png_bytes,
-            file_options={"content-type": "image/png", "upsert": "true"},
+            unique_name, normalized.data,
+            file_options={"content-type": normalized.content_type, "upsert": "true"},
         )
         public_url = sb.storage.from_(bucket).get_public_url(unique_name)
-        print(f"[Product Upload] {file.filename!r} ({len(contents)} B) -> {unique_name} ({len(png_bytes)} B PNG)")
+        print(f"[Product Upload] {file.filename!r} ({len(contents)} B) -> {unique_name} ({len(normalized.data)} B {normalized.ext.upper()})")
         return {"public_url": public_url, "path": unique_name}
 
     except HTTPException:
@@ -1430,7 +1463,7 @@ def api_create_job(
             print(f"[Creative OS] Job {job['id']} created (skip_dispatch=True — no worker)")
             worker_dispatched = False
         else:
-            worker_dispatched = _dispatch_worker(job["id"])
+            worker_dispatched = _dispatch_worker(job["id"], user_id=user["id"] if user else None)
 
         return {**job, "worker_dispatched": worker_dispatched, "credits_deducted": credit_cost}
 
@@ -1650,12 +1683,17 @@ def api_create_transition_shot(product_id: str, data: TransitionShotRequest):
 
 @app.get("/health")
 def health():
+    from media_cache import media_cache
+    import remotion_pool
     return {
         "status": "ok",
         "version": "3.0.0",
         "database": "supabase-rest",
         "schedule_schema": "v2",
         "schedule_supports_media_urls": True,
+        "media_cache": media_cache.stats(),
+        "job_queue": job_queue.stats(),
+        "remotion_pool": remotion_pool.stats(),
     }
 
 
@@ -2023,6 +2061,11 @@ def api_create_app_clip(data: AppClipCreate, request: Request, user: dict = Depe
                     print(f"      !! Auto frame extraction failed for clip {new_clip['id']}: {e}")
             threading.Thread(target=_extract_in_background, daemon=True).start()
 
+        # Pre-warm the normalized-clip cache so the first job using this clip
+        # skips the 1080x1920 re-encode.
+        if new_clip.get("video_url"):
+            _dispatch_clip_prewarm(new_clip)
+
         return new_clip
     except HTTPException:
         raise
@@ -2441,7 +2484,7 @@ def api_create_bulk_jobs(data: BulkJobCreate, request: Request, user: dict = Dep
             if not job:
                 print(f"WARNING: create_job returned None for bulk job")
                 continue
-            _dispatch_worker(job["id"])
+            _dispatch_worker(job["id"], user_id=user["id"] if user else None, priority=PRIORITY_BULK)
             created_jobs.append(job["id"])
 
         if bulk_deduction and user and per_video_credit is not None:
@@ -2478,11 +2521,15 @@ def api_create_bulk_jobs(data: BulkJobCreate, request: Request, user: dict = Dep
 def api_list_jobs(request: Request, status: Optional[str] = None, limit: int = Query(default=50, le=200), include_clones: bool = Query(default=False), user: dict = Depends(get_optional_user)):
     if user:
         pid = _resolve_project_id(request, user)
-        regular_jobs = list_jobs_scoped(user["id"], project_id=pid, status=status, limit=limit)
-    else:
-        regular_jobs = list_jobs(status, limit)
+        return _list_jobs_for_user(user["id"], pid, status=status, limit=limit, include_clones=include_clones)
+    return list_jobs(status, limit)
 
-    if not include_clones or not user:
+
+def _list_jobs_for_user(user_id: str, pid: Optional[str], status: Optional[str] = None,
+                        limit: int = 50, include_clones: bool = False) -> list:
+    """Project-scoped video jobs, optionally merged with clone jobs (newest first)."""
+    regular_jobs = list_jobs_scoped(user_id, project_id=pid, status=status, limit=limit)
+    if not include_clones:
         return regular_jobs
 
     # Also fetch clone video jobs and normalize them to match the VideoJob shape
@@ -2491,7 +2538,7 @@ def api_list_jobs(request: Request, status: Optional[str] = None, limit: int = Q
         q = (
             sb.table("clone_video_jobs")
             .select(CLONE_JOB_LIST_COLUMNS)
-            .eq("user_id", user["id"])
+            .eq("user_id", user_id)
             .order("created_at", desc=True)
             .limit(limit)
         )
@@ -2505,7 +2552,7 @@ def api_list_jobs(request: Request, status: Optional[str] = None, limit: int = Q
         q = (
             sb.table("clone_video_jobs")
             .select(CLONE_JOB_LIST_COLUMNS)
-            .eq("user_id", user["id"])
+            .eq("user_id", user_id)
             .order("created_at", desc=True)
             .limit(limit)
         )
@@ -2782,6 +2829,95 @@ def api_delete_project_endpoint(project_id: str, user: dict = Depends(get_curren
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# ---------------------------------------------------------------------------
+# Project snapshot — one batched read for agent context priming
+# ---------------------------------------------------------------------------
+# The Creative OS agent used to prime each turn with separate list_products /
+# list_influencers / list_clones (+ one looks call per clone) / list_scripts /
+# list_jobs / app-clips round-trips. This returns every section in one
+# response; sections load concurrently and fail independently.
+
+PROJECT_SNAPSHOT_FIELDS = ("products", "influencers", "clones", "scripts", "app_clips", "jobs")
+
+
+def _snapshot_clones(user_id: str) -> list:
+    """Clones with their usable looks attached — two queries instead of 1 + N."""
+    sb = get_supabase()
+    clones = (
+        sb.table("user_ai_clones").select("*").eq("user_id", user_id)
+        .order("created_at", desc=True).execute().data or []
+    )
+    clone_ids = [c["id"] for c in clones if c.get("id")]
+    looks_by_clone: dict = {cid: [] for cid in clone_ids}
+    if clone_ids:
+        looks = (
+            sb.table("user_ai_clone_looks").select("id, clone_id, label, image_url, is_base")
+            .eq("user_id", user_id).in_("clone_id", clone_ids).order("created_at")
+            .execute().data or []
+        )
+        for look in looks:
+            url = look.get("image_url")
+            if url and url != "error" and str(url).startswith("http"):
+                looks_by_clone.setdefault(look.get("clone_id"), []).append(look)
+    for c in clones:
+        c["looks"] = looks_by_clone.get(c.get("id"), [])
+    return clones
+
+
+@app.get("/api/projects/{project_id}/snapshot")
+def api_project_snapshot(
+    project_id: str,
+    request: Request,
+    fields: Optional[str] = None,
+    jobs_limit: int = Query(default=25, le=200),
+    user: dict = Depends(get_current_user),
+):
+    """Products, influencers, clones, scripts, app clips and recent jobs for a
+    project in one response. `fields` is a comma-separated subset of
+    PROJECT_SNAPSHOT_FIELDS (default: all). Products, influencers, clones and
+    app clips are account-wide (as in their list endpoints); scripts and
+    jobs are scoped to the project."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    owned = {p["id"] for p in (list_projects(user["id"]) or [])}
+    if project_id not in owned:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    wanted = [f.strip() for f in (fields or "").split(",") if f.strip()] or list(PROJECT_SNAPSHOT_FIELDS)
+    unknown = sorted(set(wanted) - set(PROJECT_SNAPSHOT_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown snapshot field(s): {', '.join(unknown)}. "
+                   f"Valid: {', '.join(PROJECT_SNAPSHOT_FIELDS)}",
+        )
+
+    uid = user["id"]
+    loaders = {
+        "products": lambda: api_list_products(request, None, user),
+        "influencers": lambda: list_influencers_for_user(uid),
+        "clones": lambda: _snapshot_clones(uid),
+        "scripts": lambda: list_scripts_scoped(uid, project_id),
+        "app_clips": lambda: list_app_clips_for_user(uid),
+        "jobs": lambda: _list_jobs_for_user(uid, project_id, limit=jobs_limit, include_clones=True),
+    }
+    snapshot: dict = {"project_id": project_id}
+    errors: dict = {}
+    with ThreadPoolExecutor(max_workers=len(wanted), thread_name_prefix="snapshot") as pool:
+        futures = {name: pool.submit(loaders[name]) for name in dict.fromkeys(wanted)}
+        for name, fut in futures.items():
+            try:
+                snapshot[name] = fut.result()
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                print(f"WARN: project snapshot section '{name}' failed: {detail}")
+                snapshot[name] = []
+                errors[name] = str(detail)[:300]
+    if errors:
+        snapshot["errors"] = errors
+    return snapshot
+
+
 # ---------------------------------------------------------------------------
 # Subscription
 # ---------------------------------------------------------------------------
@@ -4383,6 +4519,47 @@ async def api_ayrshare_webhook(request: Request):
     return {"status": "ok"}
 
 
+# ---------------------------------------------------------------------------
+# Provider completion webhooks (Kie.ai callBackUrl / WaveSpeed ?webhook=)
+# ---------------------------------------------------------------------------
+# Both handlers only wake the shared task tracker (task_tracker.py) so the
+# owning generate_scenes call re-polls immediately. Polling stays the source
+# of truth, which keeps these unauthenticated routes safe to expose and
+# idempotent under provider retries.
+
+def _provider_webhook_task_id(payload) -> str | None:
+    if not isinstance(payload, dict):
+        return None
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else payload
+    return data.get("taskId") or data.get("task_id") or data.get("id")
+
+
+@app.post("/api/webhooks/kie")
+async def api_kie_webhook(request: Request):
+    """Kie.ai task completion callback."""
+    try:
+        payload = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    import task_tracker
+    task_id = _provider_webhook_task_id(payload or {})
+    woke = bool(task_id) and task_tracker.tracker.notify(task_id)
+    return {"status": "ok", "tracked": woke}
+
+
+@app.post("/api/webhooks/wavespeed")
+async def api_wavespeed_webhook(request: Request):
+    """WaveSpeed prediction completion callback."""
+    try:
+        payload = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    import task_tracker
+    task_id = _provider_webhook_task_id(payload or {})
+    woke = bool(task_id) and task_tracker.tracker.notify(task_id)
+    return {"status": "ok", "tracked": woke}
+
+
 # ===========================================================================
 # Analytics & Admin routers
 #   • analytics_router  → /api/analytics/*  (Publish-page Analytics tab)
@@ -0,0 +1,293 @@
+"""
+Streaming media transfer — HTTP downloads, ffmpeg pipes and Storage uploads
+without holding a whole video in memory.
+
+The editor paths used to buffer entire videos: the Remotion render was
+spooled to a temp file in 8 KB chunks and re-read for a one-shot upload, and
+the caption burn pulled the source into RAM with `resp.content`. These
+helpers move media as a bounded stream of large chunks instead:
+
+  iter_url(url)                  HTTP download as chunks (requests, stream=True)
+  pipe_into_ffmpeg(cmd, chunks)  feed chunks to an ffmpeg process's stdin
+  upload_stream(bucket, name, chunks, size=...)
+                                 Supabase Storage upload: resumable (TUS,
+                                 6 MB parts, each retried from the server's
+                                 offset) when the size is known, a chunked
+                                 POST otherwise
+  upload_file(bucket, name, path)  upload_stream over a local file
+  mp4_header_length(head)        whether (and from how many bytes) an MP4
+                                 can be probed and demuxed from a pipe
+
+Progress callbacks receive (bytes_done, total_or_None) computed from bytes
+actually acknowledged by Storage (or written to ffmpeg), never estimated.
+At most one TUS part (6 MB) plus one read chunk is buffered per transfer.
+
+Config:
+  MEDIA_STREAM_CHUNK_MB     read chunk size for downloads/files (default 1)
+  MEDIA_STREAM_RETRIES      retries per upload part (default 3)
+"""
+import base64
+import os
+import struct
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+import requests
+
+CHUNK_SIZE = int(float(os.getenv("MEDIA_STREAM_CHUNK_MB", "1")) * 1024 * 1024)
+# Supabase's resumable endpoint requires 6 MB parts (the last may be shorter).
+TUS_PART_SIZE = 6 * 1024 * 1024
+UPLOAD_RETRIES = int(os.getenv("MEDIA_STREAM_RETRIES", "3"))
+
+ProgressFn = Callable[[int, Optional[int]], None]
+
+
+def _storage_auth() -> tuple[str, dict]:
+    url = os.getenv("SUPABASE_URL", "").rstrip("/")
+    key = os.getenv("SUPABASE_SERVICE_KEY", "")
+    if not url or not key:
+        raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set for storage uploads")
+    return url, {"Authorization": f"Bearer {key}", "apikey": key}
+
+
+def public_url(bucket: str, object_name: str) -> str:
+    return f"{os.getenv('SUPABASE_URL', '').rstrip('/')}/storage/v1/object/public/{bucket}/{object_name}"
+
+
+# ── Sources ─────────────────────────────────────────────────────────────
+
+def iter_response(response, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Non-empty chunks of a streamed `requests` response."""
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if chunk:
+            yield chunk
+
+
+def iter_url(url: str, timeout: float = 120, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Stream `url` as chunks; raises on an HTTP error status."""
+    with requests.get(url, stream=True, timeout=timeout) as resp:
+        resp.raise_for_status()
+        yield from iter_response(resp, chunk_size)
+
+
+def iter_file(path, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            yield chunk
+
+
+def _rechunk(chunks: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """Regroup arbitrary chunks into `size`-byte parts (last one shorter)."""
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        while len(buf) >= size:
+            yield bytes(buf[:size])
+            del buf[:size]
+    if buf:
+        yield bytes(buf)
+
+
+def mp4_header_length(head: bytes) -> Optional[int]:
+    """
+    Bytes up to the end of the `moov` box when it precedes `mdat` (a
+    faststart MP4 that ffmpeg can demux from a pipe and ffprobe can read from
+    that prefix alone); 0 when `mdat` comes first (needs a seekable file);
+    None when `head` is too short to tell.
+    """
+    pos = 0
+    while pos + 8 <= len(head):
+        size, box = struct.unpack(">I4s", head[pos:pos + 8])
+        if size == 1:
+            if pos + 16 > len(head):
+                return None
+            size = struct.unpack(">Q", head[pos + 8:pos + 16])[0]
+        if box == b"mdat":
+            return 0
+        if size < 8:
+            return 0  # box runs to EOF or is malformed — don't pipe it
+        if box == b"moov":
+            return pos + size
+        pos += size
+    return None
+
+
+# ── ffmpeg ──────────────────────────────────────────────────────────────
+
+def pipe_into_ffmpeg(
+    cmd: list,
+    chunks: Iterable[bytes],
+    cwd=None,
+    timeout: float = 300,
+    on_progress: Optional[ProgressFn] = None,
+    total: Optional[int] = None,
+) -> subprocess.CompletedProcess:
+    """
+    Run `cmd` (which reads `-i pipe:0`) and feed it `chunks` on stdin, so the
+    encode starts while the download is still in flight. Returns the
+    CompletedProcess (stderr as text); a source error is re-raised after
+    ffmpeg is stopped.
+    """
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, cwd=cwd)
+    stderr_parts: list[bytes] = []
+    drain = threading.Thread(target=lambda: stderr_parts.append(proc.stderr.read()), daemon=True)
+    drain.start()
+
+    fed = 0
+    source_error = None
+    try:
+        for chunk in chunks:
+            proc.stdin.write(chunk)
+            fed += len(chunk)
+            if on_progress:
+                on_progress(fed, total)
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its return code tells the story
+    except Exception as e:
+        source_error = e
+        proc.kill()
+    finally:
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    drain.join(timeout=5)
+    if source_error is not None:
+        raise source_error
+    stderr = b"".join(stderr_parts).decode("utf-8", errors="ignore")
+    return subprocess.CompletedProcess(cmd, proc.returncode, None, stderr)
+
+
+# ── Uploads ─────────────────────────────────────────────────────────────
+
+def _tus_metadata(bucket: str, object_name: str, content_type: str) -> str:
+    fields = {
+        "bucketName": bucket,
+        "objectName": object_name,
+        "contentType": content_type,
+        "cacheControl": "3600",
+    }
+    return ",".join(f"{k} {base64.b64encode(v.encode()).decode()}" for k, v in fields.items())
+
+
+def _upload_resumable(base: str, auth: dict, bucket: str, object_name: str,
+                      chunks: Iterable[bytes], size: int, content_type: str,
+                      upsert: bool, on_progress: Optional[ProgressFn]) -> None:
+    tus = {**auth, "Tus-Resumable": "1.0.0"}
+    create = requests.post(
+        f"{base}/storage/v1/upload/resumable",
+        headers={
+            **tus,
+            "Upload-Length": str(size),
+            "Upload-Metadata": _tus_metadata(bucket, object_name, content_type),
+            "x-upsert": "true" if upsert else "false",
+        },
+        timeout=30,
+    )
+    if create.status_code not in (200, 201):
+        raise RuntimeError(f"resumable upload create failed ({create.status_code}): {create.text[:300]}")
+    location = create.headers["Location"]
+    if location.startswith("/"):
+        location = base + location
+
+    offset = 0
+    for part in _rechunk(chunks, TUS_PART_SIZE):
+        part_start = offset
+        attempt = 0
+        while offset < part_start + len(part):
+            try:
+                resp = requests.patch(
+                    location,
+                    headers={
+                        **tus,
+                        "Upload-Offset": str(offset),
+                        "Content-Type": "application/offset+octet-stream",
+                    },
+                    data=part[offset - part_start:],
+                    timeout=120,
+                )
+                if resp.status_code not in (200, 204):
+                    raise RuntimeError(f"part upload failed ({resp.status_code}): {resp.text[:300]}")
+                offset = int(resp.headers.get("Upload-Offset", part_start + len(part)))
+            except (requests.RequestException, RuntimeError) as e:
+                attempt += 1
+                if attempt > UPLOAD_RETRIES:
+                    raise
+                wait = min(8.0, 0.5 * 2 ** attempt)
+                print(f"   !! [STREAM] Upload part at {offset} failed ({e}); resuming in {wait:.1f}s")
+                time.sleep(wait)
+                # Ask the server how much of this part it actually kept.
+                head = requests.head(location, headers=tus, timeout=30)
+                if head.ok and head.headers.get("Upload-Offset"):
+                    offset = max(part_start, int(head.headers["Upload-Offset"]))
+        if on_progress:
+            on_progress(offset, size)
+    if offset != size:
+        raise RuntimeError(f"resumable upload incomplete: {offset}/{size} bytes")
+
+
+def _upload_chunked(base: str, auth: dict, bucket: str, object_name: str,
+                    chunks: Iterable[bytes], content_type: str,
+                    upsert: bool, on_progress: Optional[ProgressFn]) -> None:
+    sent = 0
+
+    def body():
+        nonlocal sent
+        for chunk in chunks:
+            yield chunk
+            sent += len(chunk)
+            if on_progress:
+                on_progress(sent, None)
+
+    # A generator body goes out with Transfer-Encoding: chunked.
+    resp = requests.post(
+        f"{base}/storage/v1/object/{bucket}/{object_name}",
+        headers={**auth, "Content-Type": content_type, "x-upsert": "true" if upsert else "false"},
+        data=body(),
+        timeout=600,
+    )
+    if not resp.ok:
+        raise RuntimeError(f"upload failed ({resp.status_code}): {resp.text[:300]}")
+
+
+def upload_stream(
+    bucket: str,
+    object_name: str,
+    chunks: Iterable[bytes],
+    size: Optional[int] = None,
+    content_type: str = "video/mp4",
+    upsert: bool = False,
+    on_progress: Optional[ProgressFn] = None,
+) -> str:
+    """
+    Upload `chunks` to Storage at `bucket/object_name` and return its public
+    URL. With a known `size` above one part the upload is resumable (a failed
+    part is retried from the offset the server confirms); otherwise the
+    chunks are sent as one chunked-encoding request.
+    """
+    base, auth = _storage_auth()
+    if size is not None and size > TUS_PART_SIZE:
+        _upload_resumable(base, auth, bucket, object_name, chunks, size,
+                          content_type, upsert, on_progress)
+    else:
+        _upload_chunked(base, auth, bucket, object_name, chunks,
+                        content_type, upsert, on_progress)
+    return public_url(bucket, object_name)
+
+
+def upload_file(bucket: str, object_name: str, path, content_type: str = "video/mp4",
+                upsert: bool = False, on_progress: Optional[ProgressFn] = None) -> str:
+    """upload_stream over a local file (resumable when larger than one part)."""
+    return upload_stream(bucket, object_name, iter_file(path), size=Path(path).stat().st_size,
+                         content_type=content_type, upsert=upsert, on_progress=on_progress)
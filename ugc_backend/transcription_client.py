@@ -34,15 +34,25 @@ class TranscriptionClient:
         Returns:
             Dictionary with transcription data, including 'words' list with timestamps.
             Returns None if transcription fails.
+
+        Results are cached by audio content and language (see
+        transcription_store), so the same audio is only sent to Whisper once.
         """
-        if not self.api_key:
-            print("[FAIL] Cannot transcribe: No API Key")
-            return None
+        import transcription_store
 
         if not Path(file_path).exists():
             print(f"[FAIL] Cannot transcribe: File not found {file_path}")
             return None
 
+        fingerprint, cached = transcription_store.lookup(file_path, language)
+        if cached is not None:
+            print(f"      [CACHE] Reusing transcription of {Path(file_path).name} ({len(cached['words'])} words)")
+            return cached
+
+        if not self.api_key:
+            print("[FAIL] Cannot transcribe: No API Key")
+            return None
+
         print(f"      [MIC] Transcribing audio with Whisper: {Path(file_path).name}...")
 
         try:
@@ -112,7 +122,9 @@ class TranscriptionClient:
                     words_plain.append({"word": str(getattr(w, 'word', '')), "start": getattr(w, 'start', 0), "end": getattr(w, 'end', 0)})
 
             print(f"      [OK] Transcription complete: {len(words_plain)} words found.")
-            return {"words": words_plain, "text": response.text}
+            result = {"words": words_plain, "text": response.text}
+            transcription_store.put(fingerprint, language, result)
+            return result
 
         except Exception as e:
             print(f"      [FAIL] Transcription failed: {e}")
@@ -6,6 +6,7 @@ This avoids IPv6/TCP connection issues from Windows by using
 the Supabase REST API (PostgREST) instead of raw PostgreSQL.
 """
 import os
+import time
 import threading
 from datetime import datetime, timezone
 from dotenv import load_dotenv
@@ -201,6 +202,11 @@ def list_app_clips():
     sb = get_supabase()
     return sb.table("app_clips").select("*").execute().data
 
+def get_app_clip(clip_id: str):
+    sb = get_supabase()
+    result = sb.table("app_clips").select("*").eq("id", clip_id).execute()
+    return result.data[0] if result.data else None
+
 def create_app_clip(data: dict):
     sb = get_supabase()
     result = sb.table("app_clips").insert(data).execute()
@@ -292,7 +298,7 @@ JOB_LIST_COLUMNS = ", ".join([
     "id", "user_id", "influencer_id", "app_clip_id", "product_id", "script_id",
     "project_id", "campaign_name", "assistant_type", "product_type",
     "status", "status_message", "progress", "error_message",
-    "final_video_url", "preview_url", "preview_type",
+    "final_video_url", "preview_url", "preview_type", "thumbnail_url",
     "hook", "length", "metadata", "model_api", "variation_prompt",
     "music_enabled", "subtitles_enabled", "subtitle_style", "subtitle_placement",
     "video_language", "language_accent", "auto_transition_type",
@@ -371,17 +377,32 @@ def get_product_shots_by_ids(shot_ids: list[str]) -> dict[str, dict]:
 def create_job(data: dict):
     sb = get_supabase()
     result = sb.table("video_jobs").insert(data).execute()
-    return result.data[0] if result.data else None
+    job = result.data[0] if result.data else None
+    if job:
+        _stats_apply_job_delta(job.get("user_id"), None, job.get("status") or "pending")
+    return job
 
 def update_job(job_id: str, data: dict):
     sb = get_supabase()
     data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    previous = None
+    if "status" in data and _stats_cache_active():
+        # Only read the old status when there are cached counters to adjust.
+        try:
+            prev = sb.table("video_jobs").select("status,user_id").eq("id", job_id).execute()
+            previous = prev.data[0] if prev.data else None
+        except Exception:
+            invalidate_stats_cache()
     result = sb.table("video_jobs").update(data).eq("id", job_id).execute()
-    return result.data[0] if result.data else None
+    job = result.data[0] if result.data else None
+    if job and previous and previous.get("status") != job.get("status"):
+        _stats_apply_job_delta(job.get("user_id"), previous.get("status"), job.get("status"))
+    return job
 
 def delete_job(job_id: str):
     sb = get_supabase()
     sb.table("video_jobs").delete().eq("id", job_id).execute()
+    invalidate_stats_cache()
 
 
 # ---------------------------------------------------------------------------
@@ -409,27 +430,88 @@ def update_social_post(post_id: str, data: dict):
 # Stats
 # ---------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------------
+# Dashboard Stats — one aggregate query + short per-user TTL cache
+# ---------------------------------------------------------------------------
+# Counters come from the dashboard_stats RPC (migration 071) in one round
+# trip, falling back to count="exact" head requests where the RPC isn't
+# deployed. Cached results are adjusted in place by create_job/update_job
+# status transitions so the dashboard stays live between refreshes.
+
+_STATS_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", "30"))
+_STATS_JOB_STATUSES = ("pending", "processing", "success", "failed")
+_stats_cache: dict = {}  # user_id or None (global) -> (expires_at, stats dict)
+_stats_lock = threading.Lock()
+
+
+def _stats_cache_active() -> bool:
+    return bool(_stats_cache)
+
+
+def invalidate_stats_cache(user_id: str = None):
+    """Drop cached stats for `user_id` (and the global entry), or everything."""
+    with _stats_lock:
+        if user_id is None:
+            _stats_cache.clear()
+        else:
+            _stats_cache.pop(user_id, None)
+            _stats_cache.pop(None, None)
+
+
+def _stats_apply_job_delta(user_id, old_status, new_status):
+    """Move one job between status counters in every cached entry it belongs to."""
+    with _stats_lock:
+        for key in (None, user_id) if user_id else (None,):
+            entry = _stats_cache.get(key)
+            if not entry:
+                continue
+            stats = entry[1]
+            if old_status is None:
+                stats["total_jobs"] += 1
+            elif old_status in _STATS_JOB_STATUSES:
+                stats[old_status] = max(0, stats[old_status] - 1)
+            if new_status in _STATS_JOB_STATUSES:
+                stats[new_status] += 1
+
+
+def _count_exact(table: str, user_id: str = None, status: str = None) -> int:
+    q = get_supabase().table(table).select("id", count="exact", head=True)
+    if user_id:
+        q = q.eq("user_id", user_id)
+    if status:
+        q = q.eq("status", status)
+    return q.execute().count or 0
+
+
+def _compute_stats(user_id: str = None) -> dict:
+    try:
+        result = get_supabase().rpc("dashboard_stats", {"p_user_id": user_id}).execute()
+        if isinstance(result.data, dict):
+            return {k: int(v or 0) for k, v in result.data.items()}
+    except Exception as e:
+        print(f"      [stats] dashboard_stats RPC unavailable ({e}); using count queries")
+    stats = {"total_jobs": _count_exact("video_jobs", user_id)}
+    for status in _STATS_JOB_STATUSES:
+        stats[status] = _count_exact("video_jobs", user_id, status)
+    for table in ("influencers", "scripts", "app_clips"):
+        stats[table] = _count_exact(table, user_id)
+    return stats
+
+
+def _cached_stats(user_id: str = None) -> dict:
+    now = time.monotonic()
+    with _stats_lock:
+        entry = _stats_cache.get(user_id)
+        if entry and entry[0] > now:
+            return dict(entry[1])
+    stats = _compute_stats(user_id)
+    with _stats_lock:
+        _stats_cache[user_id] = (now + _STATS_TTL_SECONDS, dict(stats))
+    return stats
+
+
 def get_stats():
-    sb = get_supabase()
-    total = len(sb.table("video_jobs").select("id").execute().data)
-    pending = len(sb.table("video_jobs").select("id").eq("status", "pending").execute().data)
-    processing = len(sb.table("video_jobs").select("id").eq("status", "processing").execute().data)
-    success = len(sb.table("video_jobs").select("id").eq("status", "success").execute().data)
-    failed = len(sb.table("video_jobs").select("id").eq("status", "failed").execute().data)
-    influencers = len(sb.table("influencers").select("id").execute().data)
-    scripts = len(sb.table("scripts").select("id").execute().data)
-    app_clips = len(sb.table("app_clips").select("id").execute().data)
-
-    return {
-        "total_jobs": total,
-        "pending": pending,
-        "processing": processing,
-        "success": success,
-        "failed": failed,
-        "influencers": influencers,
-        "scripts": scripts,
-        "app_clips": app_clips,
-    }
+    return _cached_stats(None)
 
 
 # ---------------------------------------------------------------------------
@@ -1264,26 +1346,7 @@ def get_notifications(user_id: str, limit: int = 20):
 
 def get_stats_scoped(user_id: str):
     """Get dashboard stats scoped to a specific user."""
-    sb = get_supabase()
-    total = len(sb.table("video_jobs").select("id").eq("user_id", user_id).execute().data)
-    pending = len(sb.table("video_jobs").select("id").eq("user_id", user_id).eq("status", "pending").execute().data)
-    processing = len(sb.table("video_jobs").select("id").eq("user_id", user_id).eq("status", "processing").execute().data)
-    success = len(sb.table("video_jobs").select("id").eq("user_id", user_id).eq("status", "success").execute().data)
-    failed = len(sb.table("video_jobs").select("id").eq("user_id", user_id).eq("status", "failed").execute().data)
-    influencers = len(sb.table("influencers").select("id").eq("user_id", user_id).execute().data)
-    scripts = len(sb.table("scripts").select("id").eq("user_id", user_id).execute().data)
-    app_clips = len(sb.table("app_clips").select("id").eq("user_id", user_id).execute().data)
-
-    return {
-        "total_jobs": total,
-        "pending": pending,
-        "processing": processing,
-        "success": success,
-        "failed": failed,
-        "influencers": influencers,
-        "scripts": scripts,
-        "app_clips": app_clips,
-    }
+    return _cached_stats(user_id)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,42 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Migration 071: dashboard_stats RPC
+--
+-- db_manager.get_stats / get_stats_scoped used to run eight `select("id")`
+-- queries and len() the results, downloading every job id just to count
+-- rows. This function returns every dashboard counter from one round trip:
+-- one GROUP BY over video_jobs plus three counts.
+--
+-- p_user_id NULL → global stats (service/admin dashboard).
+-- Called with the service key from db_manager; not exposed to anon.
+-- ─────────────────────────────────────────────────────────────────────────────
+
+CREATE INDEX IF NOT EXISTS idx_video_jobs_user_status
+    ON video_jobs (user_id, status);
+
+CREATE OR REPLACE FUNCTION public.dashboard_stats(p_user_id UUID DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH job_counts AS (
+        SELECT status, COUNT(*) AS n
+        FROM video_jobs
+        WHERE p_user_id IS NULL OR user_id = p_user_id
+        GROUP BY status
+    )
+    SELECT jsonb_build_object(
+        'total_jobs',  COALESCE((SELECT SUM(n) FROM job_counts), 0),
+        'pending',     COALESCE((SELECT n FROM job_counts WHERE status = 'pending'), 0),
+        'processing',  COALESCE((SELECT n FROM job_counts WHERE status = 'processing'), 0),
+        'success',     COALESCE((SELECT n FROM job_counts WHERE status = 'success'), 0),
+        'failed',      COALESCE((SELECT n FROM job_counts WHERE status = 'failed'), 0),
+        'influencers', (SELECT COUNT(*) FROM influencers WHERE p_user_id IS NULL OR user_id = p_user_id),
+        'scripts',     (SELECT COUNT(*) FROM scripts     WHERE p_user_id IS NULL OR user_id = p_user_id),
+        'app_clips',   (SELECT COUNT(*) FROM app_clips   WHERE p_user_id IS NULL OR user_id = p_user_id)
+    );
+$$;
+
+REVOKE ALL ON FUNCTION public.dashboard_stats(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.dashboard_stats(UUID) TO service_role;
@@ -0,0 +1,41 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Migration 072: analytics_daily_rollups
+--
+-- Pre-aggregated per-day dashboard series. Every dashboard load used to
+-- re-fetch up to 500 (stats) / 2000 (cumulative) analytics_posts rows and
+-- aggregate them in Python, silently dropping history past the cap.
+--
+-- One row per (user, account, publish day, source dimension, media type).
+-- `source` is 'internal' / 'external' for raw rows, plus 'all' for the
+-- twin-deduplicated view the unfiltered dashboard shows (an internal Studio
+-- post and its BrightData-scraped twin count once).
+--
+-- Maintained by ugc_backend/analytics/db.py (refresh_account_rollups) on
+-- every post upsert / metric patch / delete, so reads are bounded by
+-- accounts × days instead of post count.
+-- ─────────────────────────────────────────────────────────────────────────────
+
+CREATE TABLE IF NOT EXISTS analytics_daily_rollups (
+    id          UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id     UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    platform    TEXT NOT NULL,
+    username    TEXT NOT NULL,
+    source      TEXT NOT NULL,              -- internal | external | all
+    media_type  TEXT NOT NULL,              -- video | image | carousel | other
+    day         DATE NOT NULL,
+    posts       INTEGER NOT NULL DEFAULT 0,
+    views       BIGINT  NOT NULL DEFAULT 0,
+    engagement  BIGINT  NOT NULL DEFAULT 0,
+    reach       BIGINT  NOT NULL DEFAULT 0, -- impressions, else reach (ER fallback)
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (user_id, platform, username, source, media_type, day)
+);
+
+ALTER TABLE analytics_daily_rollups ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS adr_user_policy ON analytics_daily_rollups;
+CREATE POLICY adr_user_policy ON analytics_daily_rollups
+    FOR ALL USING (user_id = auth.uid());
+
+CREATE INDEX IF NOT EXISTS idx_adr_user_source_day
+    ON analytics_daily_rollups (user_id, source, day);
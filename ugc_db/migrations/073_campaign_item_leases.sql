@@ -0,0 +1,66 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Migration 073: campaign_plan_items watcher leases
+--
+-- The Creative OS campaign watcher read the first 100 generating /
+-- ready_to_post items each tick and processed them one by one, so running
+-- more than one Creative OS instance meant two watchers could book the same
+-- Ayrshare post, and items past the 100th were never reached.
+--
+-- Each watcher now leases the items it works on. claim_campaign_plan_items
+-- hands out one page (keyset on id, after p_after) of unleased or expired
+-- items and stamps them with the caller's owner id; rows another watcher is
+-- claiming at the same moment are skipped (FOR UPDATE SKIP LOCKED). The
+-- watcher clears its leases when the tick ends; a crashed watcher's leases
+-- simply expire.
+--
+-- Called with the service key from services/creative-os/services/campaign_store.py.
+-- ─────────────────────────────────────────────────────────────────────────────
+
+ALTER TABLE campaign_plan_items
+    ADD COLUMN IF NOT EXISTS lease_owner      TEXT,
+    ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+
+CREATE OR REPLACE FUNCTION public.claim_campaign_plan_items(
+    p_owner         TEXT,
+    p_statuses      TEXT[],
+    p_after         UUID DEFAULT NULL,
+    p_limit         INT  DEFAULT 100,
+    p_lease_seconds INT  DEFAULT 300
+)
+RETURNS SETOF JSONB
+LANGUAGE sql
+VOLATILE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH candidates AS (
+        SELECT id
+        FROM campaign_plan_items
+        WHERE status = ANY (p_statuses)
+          AND (p_after IS NULL OR id > p_after)
+          AND (lease_expires_at IS NULL OR lease_expires_at < NOW() OR lease_owner = p_owner)
+        ORDER BY id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ),
+    claimed AS (
+        UPDATE campaign_plan_items i
+        SET lease_owner = p_owner,
+            lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+        FROM candidates
+        WHERE i.id = candidates.id
+        RETURNING i.*
+    )
+    SELECT to_jsonb(claimed) || jsonb_build_object(
+               'campaigns',
+               (SELECT jsonb_build_object('id', c.id, 'user_id', c.user_id,
+                                          'branding_notes', c.branding_notes, 'status', c.status)
+                FROM campaigns c
+                WHERE c.id = claimed.campaign_id)
+           )
+    FROM claimed
+    ORDER BY claimed.id;
+$$;
+
+REVOKE ALL ON FUNCTION public.claim_campaign_plan_items(TEXT, TEXT[], UUID, INT, INT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.claim_campaign_plan_items(TEXT, TEXT[], UUID, INT, INT) TO service_role;
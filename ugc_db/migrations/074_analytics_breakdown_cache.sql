@@ -0,0 +1,52 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Migration 074: analytics_breakdown_cache
+--
+-- Every breakdown ran the Gemini video pass again, even for a video that was
+-- already analysed: a trending post tracked by many users, a Studio
+-- publication and its scraped twin, a re-scrape of an unchanged post.
+--
+-- One row per analysed video × locale × prompt version × owner. Looked up by:
+--   * SHA-256 of the file — exact bytes, shared across users;
+--   * video URL — same user only;
+--   * perceptual fingerprint (one 64-bit dHash per second, hex;
+--     fp_frames = seconds) that survives platform re-encodes — same user
+--     only, since visually similar clips from different users must never
+--     share an analysis.
+-- `fingerprint_key` is the fingerprint, or the SHA-256 when none could be
+-- taken; re-analysing the same video upserts onto its row. `result` holds
+-- the sanitized Pass 1 output ({structured, raw_markdown, provider}); Pass 2
+-- takeaways are per post and are not cached. A new prompt_version (prompt /
+-- model / sanitizer change) invalidates older rows.
+--
+-- Service-role only: read and written by
+-- ugc_backend/analytics/breakdown_cache.py.
+-- ─────────────────────────────────────────────────────────────────────────────
+
+CREATE TABLE IF NOT EXISTS analytics_breakdown_cache (
+    id              UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    prompt_version  TEXT NOT NULL,
+    locale          TEXT NOT NULL,
+    user_id         UUID NOT NULL,
+    video_url       TEXT,
+    content_sha256  TEXT NOT NULL,
+    fingerprint     TEXT,
+    fingerprint_key TEXT NOT NULL,
+    fp_frames       INTEGER,
+    result          JSONB NOT NULL,
+    hits            INTEGER NOT NULL DEFAULT 0,
+    last_hit_at     TIMESTAMPTZ,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- No policies: only the service role (which bypasses RLS) touches the cache.
+ALTER TABLE analytics_breakdown_cache ENABLE ROW LEVEL SECURITY;
+
+-- Upsert target; also serves exact-fingerprint lookups.
+CREATE UNIQUE INDEX IF NOT EXISTS uq_abc_fingerprint
+    ON analytics_breakdown_cache (prompt_version, locale, user_id, fingerprint_key);
+CREATE INDEX IF NOT EXISTS idx_abc_sha
+    ON analytics_breakdown_cache (prompt_version, locale, content_sha256);
+CREATE INDEX IF NOT EXISTS idx_abc_user_url
+    ON analytics_breakdown_cache (prompt_version, locale, user_id, video_url);
+CREATE INDEX IF NOT EXISTS idx_abc_user_frames
+    ON analytics_breakdown_cache (prompt_version, locale, user_id, fp_frames);
@@ -0,0 +1,27 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Migration 075: media_derivatives
+--
+-- Posters used to be made lazily: the Creative OS /video-thumbnails endpoint
+-- ran FFmpeg per job while the gallery waited. The worker now renders every
+-- finished video's derivatives once, at write time (media_derivatives.py):
+--
+--   { "poster_jpg": url, "poster_webp": url, "preview_mp4": url,
+--     "sprite": { "url", "frames", "columns", "tile_width", "tile_height",
+--                 "interval_seconds" },
+--     "duration_seconds": n }
+--
+-- thumbnail_url keeps holding the poster JPEG so existing readers work
+-- unchanged; clone_video_jobs gets the column too.
+-- ─────────────────────────────────────────────────────────────────────────────
+
+ALTER TABLE public.video_jobs
+    ADD COLUMN IF NOT EXISTS media_derivatives JSONB;
+
+ALTER TABLE public.clone_video_jobs
+    ADD COLUMN IF NOT EXISTS thumbnail_url TEXT,
+    ADD COLUMN IF NOT EXISTS media_derivatives JSONB;
+
+COMMENT ON COLUMN public.video_jobs.media_derivatives IS
+    'Poster / scrub sprite / preview clip URLs rendered when the job finished (media_derivatives.py).';
+COMMENT ON COLUMN public.clone_video_jobs.media_derivatives IS
+    'Poster / scrub sprite / preview clip URLs rendered when the job finished (media_derivatives.py).';
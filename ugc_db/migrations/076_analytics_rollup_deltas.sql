@@ -0,0 +1,58 @@
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Migration 076: apply_rollup_deltas RPC
+--
+-- Patching one post's metrics used to rebuild its whole account slice of
+-- analytics_daily_rollups (072), re-reading every post in the slice. The
+-- backend now computes the post's old → new bucket contribution and applies
+-- the signed difference here. Increments happen in SQL, so two concurrent
+-- patches to the same bucket can't overwrite each other.
+--
+-- p_deltas: [{user_id, platform, username, source, media_type, day,
+--             posts, views, engagement, reach}, ...]
+-- Buckets left with no posts are deleted.
+-- Called with the service key from ugc_backend/analytics/db.py.
+-- ─────────────────────────────────────────────────────────────────────────────
+
+CREATE OR REPLACE FUNCTION public.apply_rollup_deltas(p_deltas JSONB)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    d JSONB;
+BEGIN
+    FOR d IN SELECT * FROM jsonb_array_elements(p_deltas) LOOP
+        INSERT INTO analytics_daily_rollups AS r (
+            user_id, platform, username, source, media_type, day,
+            posts, views, engagement, reach, updated_at
+        ) VALUES (
+            (d->>'user_id')::UUID, d->>'platform', d->>'username',
+            d->>'source', d->>'media_type', (d->>'day')::DATE,
+            COALESCE((d->>'posts')::INTEGER, 0),
+            COALESCE((d->>'views')::BIGINT, 0),
+            COALESCE((d->>'engagement')::BIGINT, 0),
+            COALESCE((d->>'reach')::BIGINT, 0),
+            NOW()
+        )
+        ON CONFLICT (user_id, platform, username, source, media_type, day) DO UPDATE SET
+            posts      = r.posts + EXCLUDED.posts,
+            views      = r.views + EXCLUDED.views,
+            engagement = r.engagement + EXCLUDED.engagement,
+            reach      = r.reach + EXCLUDED.reach,
+            updated_at = NOW();
+
+        DELETE FROM analytics_daily_rollups
+        WHERE user_id = (d->>'user_id')::UUID
+          AND platform = d->>'platform'
+          AND username = d->>'username'
+          AND source = d->>'source'
+          AND media_type = d->>'media_type'
+          AND day = (d->>'day')::DATE
+          AND posts <= 0;
+    END LOOP;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.apply_rollup_deltas(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.apply_rollup_deltas(JSONB) TO service_role;
@@ -61,12 +61,11 @@ def _upload_to_storage(file_path: str, bucket: str, filename: str) -> str:
 
 def _upload_url_to_storage(url: str, bucket: str, filename: str, content_type: str = "image/png") -> str:
     """Download a remote URL and re-upload to Supabase Storage. Returns permanent public URL."""
-    import requests as _req
+    from media_cache import media_cache
     from ugc_db.db_manager import get_supabase
-    resp = _req.get(url, timeout=120)
-    resp.raise_for_status()
+    body = media_cache.get_bytes(url)
     sb = get_supabase()
-    sb.storage.from_(bucket).upload(filename, resp.content, file_options={"content-type": content_type})
+    sb.storage.from_(bucket).upload(filename, body, file_options={"content-type": content_type})
     public_url = sb.storage.from_(bucket).get_public_url(filename)
     print(f"      ☁️ Re-uploaded to Supabase Storage: {public_url}")
     return public_url
@@ -77,7 +76,7 @@ def _upload_url_to_storage(url: str, bucket: str, filename: str, content_type: s
 # ---------------------------------------------------------------------------
 
 @celery.task(name="generate_ugc_video", bind=True)
-def generate_ugc_video(self, job_id: str):
+def generate_ugc_video(self, job_id: str, force_recover: bool = False):
     """
     Self-sufficient video generation task.
     Fetches all necessary data from Supabase REST API using only the job_id.
@@ -108,6 +107,8 @@ def generate_ugc_video(self, job_id: str):
         # generation steps). Continue from scratch in that case. If the
         # timestamp is fresh, another worker is genuinely running it —
         # skip to avoid duplicate Kie/Suno calls and file races.
+        # `force_recover` (local job queue, whose lease already proved the
+        # previous owner dead) restarts regardless of the timestamp.
         STALE_PROCESSING_MIN = 5
         current_status = (job.get("status") or "").lower()
         if current_status in ("success", "complete", "completed"):
@@ -122,7 +123,7 @@ def generate_ugc_video(self, job_id: str):
                     age_min = (datetime.now(timezone.utc) - last_update).total_seconds() / 60.0
                 except Exception as _e:
                     print(f"[RECOVER] Job {job_id} status=processing, could not parse updated_at={last_update_str!r}: {_e}; assuming stale")
-            if age_min is not None and age_min < STALE_PROCESSING_MIN:
+            if age_min is not None and age_min < STALE_PROCESSING_MIN and not force_recover:
                 print(f"[SKIP] Job {job_id} actively processing ({age_min:.1f} min old) — skipping duplicate run")
                 return {"status": "skipped", "reason": "actively processing", "job_id": job_id}
             print(f"[RECOVER] Job {job_id} stale 'processing' (age={age_min}) — likely Modal preemption, restarting from scratch")
@@ -385,9 +386,11 @@ def generate_ugc_video(self, job_id: str):
         if isinstance(result, dict):
             final_video_path = result["path"]
             transcription_data = result.get("transcription")
+            transcription_language = result.get("transcription_language")
         else:
             final_video_path = result
             transcription_data = None
+            transcription_language = None
 
         # 5. Upload final video to Supabase Storage
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -419,6 +422,16 @@ def generate_ugc_video(self, job_id: str):
         except Exception as _probe_err:
             print(f"[EDITOR] ffprobe failed (non-fatal): {_probe_err}")
 
+        # Record the transcript's language so the editor reuses it instead of
+        # re-running Whisper (it only trusts unlabeled transcripts for English).
+        extra_fields = {}
+        if transcription_data and transcription_language:
+            try:
+                latest_metadata = (get_job(job_id) or {}).get("metadata") or job_metadata
+                extra_fields["metadata"] = {**latest_metadata, "transcription_language": transcription_language}
+            except Exception as _meta_err:
+                print(f"[EDITOR] Could not record transcription language (non-fatal): {_meta_err}")
+
         # 6. Update job as success (clear preview fields — final video replaces them)
         update_job(job_id, {
             "status": "success",
@@ -432,8 +445,13 @@ def generate_ugc_video(self, job_id: str):
             "video_duration_seconds": video_duration_seconds,
             "video_width": video_width,
             "video_height": video_height,
+            **extra_fields,
         })
 
+        # 7. Poster / scrub sprite / preview clip, so list pages never run ffmpeg
+        import media_derivatives
+        media_derivatives.attach("video_jobs", job_id, final_video_path, duration=video_duration_seconds)
+
         print(f"✅ Job {job_id} complete! Video: {final_url}")
         return {"status": "success", "video_url": final_url, "job_id": job_id}
 
@@ -632,6 +650,20 @@ def animate_product_shot_video(shot_id: str):
             pass
 
 
+# ---------------------------------------------------------------------------
+# App Clip Pre-warm Task
+# ---------------------------------------------------------------------------
+
+@celery.task(name="prewarm_app_clip")
+def prewarm_app_clip(video_url: str):
+    """Caches the normalized rendition of a new app clip on this worker."""
+    from assemble_video import prewarm_normalized_clip
+    try:
+        prewarm_normalized_clip(video_url)
+    except Exception as e:
+        print(f"!! Normalized-clip pre-warm failed for {video_url[:80]}: {e}")
+
+
 # ---------------------------------------------------------------------------
 # Transition Shot Generation Task (Workflow B)
 # ---------------------------------------------------------------------------